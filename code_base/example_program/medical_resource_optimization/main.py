@@ -20,7 +20,8 @@ from medical_opt.p04_objective import ObjectiveFunction
 from medical_opt.p05_constraints import Constraints
 from medical_opt.p06_optimizer import ResourceOptimizer
 from medical_opt.p07_visualizer import Visualizer
-from medical_opt.p08_utils import setup_logging, ensure_directory, set_random_seeds
+from medical_opt.p08_utils import (setup_logging, ensure_directory, set_random_seeds,
+                                   save_arrays_atomic, load_arrays, load_seed_solutions)
 
 def main():
     """主函数：执行医疗资源优化配置的完整流程"""
@@ -79,7 +80,7 @@ def main():
         
         # 4. 设置约束条件
         logger.info("开始设置约束条件。")
-        from medical_opt.config import BUDGET_CONFIG, HOSPITAL_LEVELS, RESOURCE_TYPES
+        from medical_opt.config import BUDGET_CONFIG, HOSPITAL_LEVELS, RESOURCE_TYPES, OPTIMIZER_CONFIG
         constraints = Constraints(BUDGET_CONFIG, HOSPITAL_LEVELS)
         logger.info("约束条件设置完成。")
         
@@ -89,28 +90,52 @@ def main():
             resource_types=RESOURCE_TYPES,
             hospital_levels=HOSPITAL_LEVELS,
             budget_config=BUDGET_CONFIG,
-            constraints=constraints
+            constraints=constraints,
+            weights=weights
         )
         logger.info("优化器初始化完成。")
         
+        # 鲁棒模式：需求情景的变异系数由需求数据 (人口与需求) 估计
+        if optimizer.robust:
+            variation = data_loader.estimate_demand_variation()
+            if np.all(variation > 0):
+                optimizer.set_demand_variation(variation)
+        
+        # 参考前沿 (如精确模式导出的帕累托存档)，用于计算 IGD/IGD+
+        reference_path = OPTIMIZER_CONFIG["metrics"]["reference_front"]
+        if reference_path and Path(reference_path).exists():
+            optimizer.reference_front = load_arrays(reference_path)["objectives"]
+            logger.info(f"读取到 {len(optimizer.reference_front)} 个参考前沿点。")
+        
         # 6. 执行优化
         logger.info("开始执行优化过程。")
-        best_solution, objective_values = optimizer.optimize()
+        if OPTIMIZER_CONFIG["mode"] == "exact":
+            # AHP 加权和的精确最优解 + ε-约束参考前沿
+            result = optimizer.optimize_exact()
+        else:
+            # 以上次运行的结果热启动 (预算/需求小幅调整后的重新规划)
+            seeds = None
+            warm_start = OPTIMIZER_CONFIG["warm_start"]
+            if warm_start["enabled"]:
+                seeds = load_seed_solutions(warm_start["paths"],
+                                            (len(RESOURCE_TYPES), len(HOSPITAL_LEVELS)))
+                logger.info(f"读取到 {len(seeds)} 个热启动种子。")
+            result = optimizer.optimize(seeds=seeds)
+        best_solution, objective_values, (front_allocations, front_objectives) = result
         logger.info("优化过程完成。")
         logger.info(f"最优解: {best_solution}")
         logger.info(f"目标函数值 (效率损失, 可及性损失, 成本损失): {objective_values}")
+        if optimizer.robust:
+            logger.info(f"最优解在需求情景中的满足比例: {optimizer.demand_satisfaction(best_solution):.3f}")
         
         # 7. 结果可视化
         logger.info("开始进行结果可视化。")
         visualizer = Visualizer()
         ensure_directory("./results/figures/")
         
-        # 绘制帕累托前沿
-        # 假设我们保存了优化过程中的所有目标函数值，需在优化器中进行记录
-        # 这里为了示例，使用随机数据
-        # 请根据实际优化器实现调整
-        # pareto_objectives = np.random.rand(50, 2)  # 示例数据
-        # visualizer.plot_pareto_front(pareto_objectives, save_path="./results/figures/pareto_front.png")
+        # 绘制帕累托前沿 (优化过程中存档的全部非支配解)
+        logger.info(f"帕累托前沿包含 {len(front_objectives)} 个非支配解。")
+        visualizer.plot_pareto_front(front_objectives, save_path="./results/figures/pareto_front.png")
         
         # 绘制资源分配热图
         visualizer.plot_resource_allocation(
@@ -123,10 +148,42 @@ def main():
         # 保存优化结果
         np.savetxt("./results/optimzation_result.csv", best_solution, delimiter=",")
         logger.info("优化结果已保存至 ./results/optimzation_result.csv")
-        
-        # 可视化其他内容，如目标函数趋势（需要在优化器中记录）
-        # history = optimizer.get_objective_history()  # 假设有此方法
-        # visualizer.plot_objective_trends(history, save_path="./results/figures/objective_trends.png")
+        np.savetxt("./results/pareto_front.csv", front_objectives, delimiter=",",
+                   header="efficiency_loss,accessibility_loss,cost_loss", comments="")
+        logger.info("帕累托前沿已保存至 ./results/pareto_front.csv")
+        save_arrays_atomic("./results/pareto_archive.npz",
+                           {"solutions": front_allocations, "objectives": front_objectives})
+        logger.info("帕累托存档已保存至 ./results/pareto_archive.npz")
+        
+        # 前沿质量指标 (超体积、IGD/IGD+、间距、分布广度)
+        quality = optimizer.front_quality(front_objectives)
+        metrics_path = OPTIMIZER_CONFIG["metrics"]["path"]
+        np.savetxt(metrics_path, np.array([list(quality.values())]), delimiter=",",
+                   header=",".join(quality), comments="")
+        logger.info(f"前沿质量指标: {quality}，已保存至 {metrics_path}")
+
+        # 折中方案：按 AHP 权重 (fuzzy_topsis 时为模糊 AHP 的模糊权重) 对整个前沿排序
+        decision_method = OPTIMIZER_CONFIG["decision"]["method"]
+        decision_weights = weights
+        if decision_method == "fuzzy_topsis":
+            decision_weights, _ = FuzzyAHP().fuzzy_ahp(ahp_matrix)
+        plans, plan_objectives, scores = optimizer.compromise_solutions(
+            weights=decision_weights, objectives=front_objectives, allocations=front_allocations
+        )
+        for rank, (plan_objective, score) in enumerate(zip(plan_objectives, scores), 1):
+            logger.info(f"{decision_method} 折中方案 {rank}: 目标值 {plan_objective}，得分 {score:.4f}")
+        np.savetxt("./results/compromise_solutions.csv",
+                   np.column_stack([plan_objectives, scores, plans.reshape(len(plans), -1)]),
+                   delimiter=",", comments="",
+                   header="efficiency_loss,accessibility_loss,cost_loss,score," + ",".join(
+                       f"x_{i}_{j}" for i in RESOURCE_TYPES for j in HOSPITAL_LEVELS))
+        logger.info("折中方案已保存至 ./results/compromise_solutions.csv")
+
+        # 绘制目标函数逐代变化趋势 (种群各目标最小值)，并导出逐代遥测记录
+        if OPTIMIZER_CONFIG["mode"] != "exact":
+            history = optimizer.get_objective_history()
+            visualizer.plot_objective_trends(history, save_path="./results/figures/objective_trends.png")
+            optimizer.telemetry.save(OPTIMIZER_CONFIG["telemetry"]["path"])
         
         logger.info("结果可视化完成。")
         
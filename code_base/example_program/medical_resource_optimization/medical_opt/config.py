@@ -40,7 +40,22 @@ BUDGET_CONFIG = {
         1: {"equipment": 10, "maintenance": 2},
         2: {"salary": 15, "training": 3},
         3: {"construction": 5, "operation": 1}
-    }
+    },
+
+    # 附加线性约束规则，由 Constraints 编译为稀疏系统 A_ub x <= b_ub / A_eq x = b_eq
+    # resources/levels 缺省表示全部；per_level=True 时按医院等级逐级生成约束
+    # 示例：
+    #   {"type": "cap", "levels": [1], "limit": 300, "weight": "cost"}           # 区域支出上限
+    #   {"type": "floor", "resources": [2], "levels": [3], "limit": 20}          # 分组最低配置
+    #   {"type": "ratio", "numerator": {"resources": [2]},
+    #    "denominator": {"resources": [3]}, "ratio": 0.5, "per_level": True}     # 医护/床位比
+    #   {"type": "coupling", "follow": {"resources": [2]},
+    #    "lead": {"resources": [1]}, "factor": 0.2, "per_level": True}           # 设备配套人员
+    #   {"type": "minimum", "resources": [3], "levels": [3], "value": 5}         # 单元格最低值
+    #   {"type": "maximum", "resources": [1], "levels": [3], "value": 40}        # 单元格最高值
+    #   {"type": "linear", "terms": [[1, 1, 1.0], [2, 1, -2.0]],
+    #    "sense": "<=", "rhs": 0}                                               # 任意线性约束
+    "CONSTRAINT_RULES": []
 }
 
 # 3. 权重参数配置
@@ -82,13 +97,179 @@ FUZZY_CONFIG = {
 
 # 5. 优化器配置
 OPTIMIZER_CONFIG = {
-    "algorithm": "NSGA-II",  # 使用NSGA-II多目标优化算法
+    "algorithm": "NSGA-II",  # 进化算法：NSGA-II, NSGA-III 或 MOEA/D (见 p12_algorithms.ALGORITHMS)
+    "mode": "evolutionary",  # evolutionary: 进化算法; exact: 加权和 QP + ε-约束扫描
+    "backend": "deap",       # deap: DEAP 逐个体对象; array: 整个种群为一个数组，向量化进化
     "population_size": 100,
     "generations": 200,
     "crossover_prob": 0.8,
     "mutation_prob": 0.1,
     "convergence_threshold": 1e-5,
-    "random_seed": 42
+    "random_seed": 42,
+    "repair_offspring": True,      # 变异/交叉后将子代投影回可行域
+    "repair_max_iterations": 500,  # 投影修复的最大迭代次数
+    "repair_tolerance": 1e-6,      # 投影修复的收敛阈值
+    "archive_size": 10000,         # 帕累托存档容量，超出时按拥挤距离截断
+    "compact": False,              # 紧凑存储：种群与存档以 float32 (整数模式下为整数) 存放于连续数组，
+                                   # 需 array 后端；修复与损失累加仍用 float64
+
+    # 精确求解 (optimize_exact)：加权和 QP 与 ε-约束扫描
+    "exact": {
+        "n_points": 10,              # 每个受约束目标的 ε 网格点数
+        "objective": 1,              # ε-约束中被最小化的目标 (0 效率, 1 可及性, 2 成本)
+        "tolerance": 1e-9,           # SLSQP 收敛阈值
+        "max_iterations": 200,
+        "feasibility_tolerance": 1e-6  # 解的最大约束违反量 (按行归一化) 超过该值视为求解失败
+    },
+
+    # 整数配置模式：资源按整数单位分配 (设备台数、床位数、人员编制)
+    "integer": {
+        "enabled": False,
+        "branch_and_bound": False,   # 结束后对加权最优解做分支定界精修 (仅小规模实例)
+        "max_variables": 50,         # 允许分支定界的最大变量数
+        "max_nodes": 2000            # 分支定界最大节点数
+    },
+
+    # MOEA/D 参数
+    "moead": {
+        "neighbors": 20,             # 每个子问题的邻域大小
+        "delta": 0.9,                # 在邻域内选择亲本的概率
+        "max_replacements": 2        # 每个子代至多替换的邻域解个数
+    },
+
+    # 热启动 (optimize(seeds=...))
+    "warm_start": {
+        "enabled": True,
+        "fraction": 0.5,             # 初始种群中种子个体所占比例
+        "perturbation": 0.05,        # 种子不足时补充个体的相对扰动标准差
+        "paths": [                   # main.py 读取的上次运行结果
+            "./results/optimzation_result.csv",
+            "./results/pareto_archive.npz"
+        ]
+    },
+
+    # 提前停止 (optimize(deadline=..., max_evaluations=...))：到达预算时返回当前存档
+    "stopping": {
+        "deadline": None,            # 墙钟时间预算 (秒)，None 表示不限
+        "max_evaluations": None,     # 适应度评估次数预算，None 表示不限
+        "hv_window": 20,             # 超体积停滞判定的滑动窗口 (代数)，0 表示不判定
+        "hv_tolerance": 1e-4         # 窗口内超体积相对增幅低于该值时判定停滞
+    },
+
+    # 逐代遥测 (目标统计、可行比例、存档规模、吞吐量与各阶段耗时)
+    "telemetry": {
+        "capacity": 10000,           # 环形缓冲区容量 (代数)，超出时覆盖最早的记录
+        "path": "./results/telemetry.npz"  # main.py 导出遥测记录的路径
+    },
+
+    # 鲁棒模式 (p16_robust)：可及性损失与需求约束针对 K 个抽样需求情景同时评估
+    "robust": {
+        "enabled": False,
+        "n_scenarios": 64,           # 需求情景个数 K
+        "variation": 0.15,           # 需求变异系数 (标量或逐级)，main.py 可由需求数据估计
+        "measure": "expected",       # 可及性损失的风险度量：expected (期望) / cvar
+        "alpha": 0.9,                # CVaR 置信水平
+        "chance_level": None,        # 需求约束的满足概率 (如 0.9)，None 表示按均值约束
+        "seed": None                 # 情景抽样的随机种子，None 表示取优化器的种子
+    },
+
+    # 多期滚动规划 (p17_multiperiod.RollingHorizonPlanner)
+    "multi_period": {
+        "n_periods": 10,             # 规划期数 (年)
+        "window": 3,                 # 每次求解的窗口期数
+        "depreciation": 0.1,         # 年折旧率，标量或 {资源类型: 折旧率}
+        "budget_growth": 0.0,        # 未给出各期预算时，预算的年增长率
+        "demand_growth": 0.03,       # 未给出各期需求时，需求的年增长率
+        "initial_inventory": None,   # 规划开始前的存量 (resource_type × hospital_level)，None 为 0
+        "solver": "exact",           # exact: 加权和 QP (窗口为凸二次问题，毫秒级);
+                                     # evolutionary: 进化算法，取加权损失最小的前沿解
+        "optimizer_backend": "array",  # 进化算法的后端
+        "warm_start": True,          # 以上一窗口的方案 (平移一期) 热启动
+        "n_seeds": 50                # 热启动种子个数上限
+    },
+
+    # 前沿质量指标 (p14_metrics)：超体积、IGD/IGD+、间距、分布广度
+    "metrics": {
+        "every_generation": True,    # 逐代计算全部指标并写入遥测；False 时只记录超体积
+        "reference_front": None,     # 参考前沿 npz 文件 (含 objectives，如精确模式导出的
+                                     # pareto_archive.npz)，None 时不计算 IGD/IGD+
+        "path": "./results/metrics.csv"  # main.py 导出最终前沿指标的路径
+    },
+
+    # 折中方案选取 (p19_decision)：按 AHP / 模糊 AHP 权重对整个前沿排序
+    "decision": {
+        "method": "topsis",          # topsis、vikor 或 fuzzy_topsis (见 p19_decision.DECISION_METHODS)
+        "top_k": 5,                  # 返回的折中方案个数
+        "vikor_v": 0.5,              # VIKOR 的群体效用权重
+        "select_best": False         # True 时 optimize() 返回排名第一的折中方案，
+                                     # 而非按目标字典序最小的个体
+    },
+
+    # What-if 查询 (p20_query.FrontIndex)：已保存前沿与情景扫描结果上的交互式查询
+    "query": {
+        "interpolation_steps": 16,   # 与近邻连线上的插值点数
+        "neighbours": 8,             # 插值所用近邻个数 (情景查询的参数空间近邻个数)
+        "refine": False              # 是否以 QP (ε-约束 / 加权和) 精修查询结果
+    },
+
+    # 空间可及性 (p21_spatial.SpatialAccessibility)：KD 树距离结构与 2SFCA 可及性差异
+    "spatial": {
+        "metric": "euclidean",       # euclidean: 平面坐标; haversine: (经度, 纬度)，距离单位为千米
+        "radius": 30.0,              # 2SFCA 搜索半径
+        "decay": "gaussian",         # binary: 半径内等权; gaussian: 高斯距离衰减
+        "earth_radius": 6371.0,      # 地球半径 (千米)，haversine 时使用
+        "cache_dir": "./data/temp/spatial/"  # 距离结构缓存目录，None 表示不缓存
+    },
+
+    # 模因局部精修 (p22_memetic.LocalRefiner)：沿三个损失的公共下降方向做约束感知的局部搜索
+    "memetic": {
+        "enabled": False,            # 优化结束后对帕累托存档做局部精修
+        "interval": 0,               # 每隔多少代精修种群第一前沿，0 表示进化中不精修
+        "members": 20,               # 进化中每次精修的个体数上限
+        "steps": 5,                  # 每个解的局部步数
+        "backtracks": 4,             # 每步尝试的步长个数 (自精确线搜索步长逐次减半)
+        "tolerance": 1e-12,          # 公共下降方向范数平方低于该值时视为帕累托稳定点
+        "active_tolerance": 1e-7     # 松弛量不超过 active_tolerance * (1 + |右端项|) 的约束视为有效
+    },
+
+    # 情景扫描 (p15_sweep.ScenarioSweep)：预算/需求/成本的网格或拉丁超立方采样
+    "sweep": {
+        "backend": "process",        # process: 进程池; thread: 线程池
+        "max_workers": None,         # 并发数，None 表示取 SYSTEM_CONFIG["parallel"]["n_jobs"]
+        "optimizer_backend": "array",  # 各情景优化器的后端
+        "warm_start": True,          # 以热启动树上父情景的解热启动
+        "n_seeds": 50,               # 每个情景从父情景继承的种子个数上限
+        "path": "./results/sweep.npz"  # 结果表路径 (.npz 或 .csv)
+    },
+
+    # 区域分解 (p18_decomposition.RegionalDecomposition)：各区域并行求解，ADMM 协调共享预算
+    "decomposition": {
+        "rho": 1.0,                  # ADMM 罚参数初值 (预算占用按全局预算归一化)
+        "adaptive_rho": True,        # 按原始/对偶残差自适应调整 rho
+        "max_iterations": 200,       # 最大协调轮数
+        "tolerance": 1e-3,           # 原始/对偶残差阈值 (预算比例)
+        "backend": "process",        # process: 进程池; thread: 线程池
+        "max_workers": None          # 并发数，None 表示取 SYSTEM_CONFIG["parallel"]["n_jobs"]
+    },
+
+    # 检查点 (断点续算)
+    "checkpoint": {
+        "path": None,                # 检查点文件路径，None 表示不保存
+        "interval": 10               # 每隔多少代保存一次
+    },
+
+    # 岛屿模型 (optimize_islands)
+    "islands": {
+        "n_islands": 4,
+        "migration_interval": 10,    # 每隔多少代迁移一次
+        "migration_size": 5,         # 每次迁出的精英个体数
+        "topology": "ring",          # ring: 单向环; complete: 全连接
+        "transport": "queue",        # queue: 本机进程队列; socket: TCP (可跨主机)
+        "addresses": None,           # socket 模式下各岛屿 (主机, 端口)，None 表示本机连续端口
+        "collector_address": None,   # socket 模式下主进程收集结果的 (主机, 端口)
+        "base_port": 50000,
+        "authkey": "medical_opt"
+    }
 }
 
 # 6. 可视化配置
@@ -128,7 +309,11 @@ SYSTEM_CONFIG = {
     # 并行计算配置
     "parallel": {
         "enabled": True,
-        "n_jobs": -1  # 使用所有可用CPU核心
+        "n_jobs": -1,            # 使用所有可用CPU核心
+        "chunks_per_worker": 4,  # 每个进程平均分到的分块数
+        "min_batch_size": 0,     # 批量小于该值时串行评估
+        "min_batch_seconds": 0.01  # 按实测耗时估计整批串行评估不足该时长 (秒) 时串行评估；
+                                   # 进程池每次分派约 1-2 ms，向量化评估种群约 0.1 ms。0 表示总是分派
     }
 }
 
@@ -189,6 +189,51 @@ class DataLoader:
             
         return matrix
         
+    def estimate_demand_variation(self) -> np.ndarray:
+        """
+        由需求数据估计各级医院需求的变异系数 (供鲁棒优化采样需求情景)
+
+        每行视为一个服务区域：需求 = 人口 × 人均需求率。各级医院的总需求方差取
+        区域间人均需求率的异质性 (人口加权方差 × Σ 人口²) 与泊松抽样波动 (Σ 需求) 之和。
+
+        Returns:
+            np.ndarray: 各级医院需求的变异系数 (标准差 / 均值)
+        """
+        if self.demand_data is None:
+            raise ValueError("No demand data loaded")
+
+        variation = np.zeros(len(HOSPITAL_LEVELS))
+        for level, rows in self.demand_data.groupby('hospital_level'):
+            demand = rows['demand_value'].to_numpy(dtype=float)
+            population = rows['population'].to_numpy(dtype=float)
+            total = demand.sum()
+            if total <= 0 or population.sum() <= 0:
+                continue
+            rate = demand / np.maximum(population, 1.0)
+            mean_rate = total / population.sum()
+            rate_variance = np.average((rate - mean_rate) ** 2, weights=population)
+            variance = rate_variance * np.sum(population ** 2) + total
+            variation[int(level) - 1] = np.sqrt(variance) / total
+        return variation
+        
+    def regional_demands(self) -> Dict[str, Dict[int, float]]:
+        """
+        按区域汇总各级医院需求 (供区域分解 RegionalDecomposition 构造区域列表)
+
+        Returns:
+            Dict[str, Dict[int, float]]: 区域名 -> {医院等级: 需求}
+        """
+        if self.demand_data is None:
+            raise ValueError("No demand data loaded")
+        if 'region' not in self.demand_data.columns:
+            raise ValueError("Demand data has no 'region' column")
+
+        totals = self.demand_data.groupby(['region', 'hospital_level'])['demand_value'].sum()
+        demands = {}
+        for (region, level), value in totals.items():
+            demands.setdefault(str(region), {j: 0.0 for j in HOSPITAL_LEVELS})[int(level)] = float(value)
+        return demands
+        
     def generate_test_data(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         生成测试数据
@@ -39,17 +39,34 @@ class ObjectiveFunction:
         
         Args:
             x: 决策变量
-            distance_matrix: 距离矩阵
+            distance_matrix: 距离矩阵 (如 SpatialAccessibility.distance_matrix 构造的矩阵)
             
         Returns:
             float: 可及性目标值
         """
-        # 计算加权平均距离
-        weighted_distance = np.sum(x * distance_matrix) / np.sum(x)
-        # 计算可及性差异
+        # 计算各医院级别按资源量加权的平均距离
+        totals = np.sum(x, axis=0)
+        weighted_distance = np.divide(np.sum(x * distance_matrix, axis=0), totals,
+                                      out=np.zeros_like(totals, dtype=float), where=totals > 0)
+        # 计算各级别之间的可及性差异
         accessibility_variance = np.var(weighted_distance)
         return accessibility_variance
         
+    def spatial_accessibility_objective(self, x: np.ndarray, spatial, measure: str = "gini") -> float:
+        """
+        空间可及性目标函数
+        最小化各需求点之间人口加权的可及性差异 (2SFCA)
+        
+        Args:
+            x: 决策变量
+            spatial: SpatialAccessibility 实例
+            measure: 差异指标，"gini" 或 "variance"
+            
+        Returns:
+            float: 各资源差异指标的平均值
+        """
+        return float(np.mean(spatial.disparity(x, measure)))
+        
     def cost_objective(self, x: np.ndarray, cost_matrix: np.ndarray) -> float:
         """
         成本目标函数
@@ -1,29 +1,355 @@
 """
 约束条件模块 (p05_constraints.py)
 定义医疗资源优化问题中的约束条件，用于确保优化解的可行性。
+
+内置的预算、需求、非负约束与配置中声明的附加规则 (BUDGET_CONFIG["CONSTRAINT_RULES"])
+统一编译为稀疏线性系统：
+
+    A_ub x <= b_ub,  A_eq x = b_eq,  lower <= x <= upper
+
+其中 x 为按行展开的分配矩阵 (resource_type × hospital_level)，
+x[i * n_levels + j] 对应第 i 类资源在第 j 级医院的配置数量。
 """
 
 import numpy as np
-from typing import Dict, Tuple
+import scipy.sparse as sp
+from scipy.optimize import linprog
+from typing import Dict, List, Optional, Tuple
+
+
+def _project_simplex(v: np.ndarray, z: np.ndarray, w: np.ndarray = None) -> np.ndarray:
+    """
+    沿最后一维将批量向量投影到加权单纯形 {x >= 0, sum(w * x) = z} (排序法)。
+
+    Args:
+        v (np.ndarray): 待投影向量，形状为 (..., n)。
+        z (np.ndarray): 各向量对应的加权和，形状可广播到 v.shape[:-1]，要求 z > 0。
+        w (np.ndarray, optional): 正权重，形状可广播到 v.shape。默认全为 1。
+
+    Returns:
+        np.ndarray: 投影结果，形状与 v 相同。
+    """
+    n = v.shape[-1]
+    w = np.broadcast_to(np.ones(n) if w is None else w, v.shape)
+    z = np.broadcast_to(z, v.shape[:-1])
+    # 解的形式为 max(v - theta * w, 0)，按断点 v / w 降序排列
+    order = np.argsort(-(v / w), axis=-1)
+    vs = np.take_along_axis(v, order, axis=-1)
+    ws = np.take_along_axis(w, order, axis=-1)
+    css = np.cumsum(ws * vs, axis=-1) - z[..., None]
+    thetas = css / np.cumsum(ws * ws, axis=-1)
+    cond = vs / ws - thetas > 0
+    # 最后一个满足条件的位置
+    rho = n - 1 - np.argmax(cond[..., ::-1], axis=-1)
+    theta = np.take_along_axis(thetas, rho[..., None], axis=-1)
+    return np.maximum(v - theta * w, 0)
+
+
+def _project_capped(v: np.ndarray, cap: np.ndarray, w: np.ndarray = None) -> np.ndarray:
+    """批量投影到 {x >= 0, sum(w * x) <= cap}"""
+    clipped = np.maximum(v, 0)
+    weighted = clipped if w is None else clipped * w
+    over = weighted.sum(axis=-1) > cap
+    return np.where(over[..., None], _project_simplex(v, cap, w), clipped)
+
+
+def _project_floored(v: np.ndarray, floor: np.ndarray, w: np.ndarray = None) -> np.ndarray:
+    """批量投影到 {x >= 0, sum(w * x) >= floor}"""
+    clipped = np.maximum(v, 0)
+    weighted = clipped if w is None else clipped * w
+    under = weighted.sum(axis=-1) < floor
+    return np.where(under[..., None], _project_simplex(v, floor, w), clipped)
+
 
 class Constraints:
     """
     约束条件类
     """
 
-    def __init__(self, budget_config: Dict, hospital_levels: Dict):
+    # 支持的声明式规则类型
+    RULE_TYPES = ("cap", "floor", "ratio", "coupling", "minimum", "maximum", "linear")
+
+    def __init__(self,
+                 budget_config: Dict,
+                 hospital_levels: Dict,
+                 cost_matrix: Optional[np.ndarray] = None):
         """
         初始化约束条件类
 
         Args:
-            budget_config (Dict): 包含预算限制、需求阈值和单位成本的配置。
+            budget_config (Dict): 包含预算限制、需求阈值、单位成本和附加规则的配置。
             hospital_levels (Dict): 医院等级配置。
+            cost_matrix (np.ndarray, optional): 单位成本矩阵 (resource_type × hospital_level)。
+                                                 默认由 UNIT_COSTS 中各项成本之和按行展开。
         """
         self.budget_limits = budget_config["BUDGET_LIMITS"]
         self.demand_thresholds = budget_config["DEMAND_THRESHOLDS"]
         self.unit_costs = budget_config["UNIT_COSTS"]
+        self.rules = list(budget_config.get("CONSTRAINT_RULES", []))
         self.hospital_levels = hospital_levels
 
+        self.resource_keys = sorted(self.budget_limits)
+        self.level_keys = sorted(self.demand_thresholds)
+        self.n_resources = len(self.resource_keys)
+        self.n_levels = len(self.level_keys)
+        self.n_variables = self.n_resources * self.n_levels
+
+        if cost_matrix is None:
+            unit_cost_totals = np.array(
+                [sum(self.unit_costs[i].values()) for i in self.resource_keys], dtype=float
+            )
+            cost_matrix = np.repeat(unit_cost_totals[:, None], self.n_levels, axis=1)
+        self.cost_matrix = np.asarray(cost_matrix, dtype=float)
+        if self.cost_matrix.shape != (self.n_resources, self.n_levels):
+            raise ValueError(
+                f"cost_matrix shape {self.cost_matrix.shape} does not match "
+                f"({self.n_resources}, {self.n_levels})"
+            )
+
+        self.budget_vector = np.array(
+            [self.budget_limits[i] for i in self.resource_keys], dtype=float
+        )
+        self.demand_floors = np.array(
+            [self.demand_thresholds[j] for j in self.level_keys], dtype=float
+        )
+
+        self._compile()
+
+    # ------------------------------------------------------------------
+    # 编译
+    # ------------------------------------------------------------------
+
+    def _variable_index(self, resource_type: int, hospital_level: int) -> int:
+        """资源类型/医院等级编号 -> 展开后的变量下标"""
+        return (self.resource_keys.index(resource_type) * self.n_levels +
+                self.level_keys.index(hospital_level))
+
+    def _select(self, spec: Dict, levels: Optional[List[int]] = None) -> List[Tuple[int, int]]:
+        """
+        按规则中的 resources/levels 选择单元格
+
+        Args:
+            spec (Dict): 含可选键 "resources"、"levels" 的选择说明，缺省表示全部。
+            levels (List[int], optional): 进一步限定的医院等级。
+
+        Returns:
+            List[Tuple[int, int]]: (资源类型, 医院等级) 编号列表。
+        """
+        resources = spec.get("resources", self.resource_keys)
+        selected_levels = spec.get("levels", self.level_keys)
+        if levels is not None:
+            selected_levels = [j for j in selected_levels if j in levels]
+        return [(i, j) for i in resources for j in selected_levels]
+
+    def _terms(self, cells: List[Tuple[int, int]], weight: str = "quantity",
+               scale: float = 1.0) -> List[Tuple[int, float]]:
+        """单元格列表 -> (变量下标, 系数) 列表，weight 为 "cost" 时按单位成本加权"""
+        terms = []
+        for i, j in cells:
+            coef = scale
+            if weight == "cost":
+                coef *= self.cost_matrix[self.resource_keys.index(i), self.level_keys.index(j)]
+            terms.append((self._variable_index(i, j), coef))
+        return terms
+
+    def _add_row(self, terms: List[Tuple[int, float]], sense: str, rhs: float, name: str) -> None:
+        """追加一行约束到三元组缓冲区"""
+        if sense not in ("<=", ">=", "=="):
+            raise ValueError(f"Unsupported constraint sense: {sense}")
+        sign = -1.0 if sense == ">=" else 1.0
+        buffer = self._eq_buffer if sense == "==" else self._ub_buffer
+        row = len(buffer["rhs"])
+        for col, coef in terms:
+            buffer["rows"].append(row)
+            buffer["cols"].append(col)
+            buffer["data"].append(sign * coef)
+        buffer["rhs"].append(sign * rhs)
+        buffer["names"].append(name)
+
+    def _compile_rule(self, rule: Dict, index: int) -> None:
+        """将一条声明式规则编译为约束行或变量界"""
+        rule_type = rule.get("type")
+        if rule_type not in self.RULE_TYPES:
+            raise ValueError(f"Unknown constraint rule type: {rule_type}")
+        name = rule.get("name", f"{rule_type}[{index}]")
+        weight = rule.get("weight", "quantity")
+
+        if rule_type in ("minimum", "maximum"):
+            for i, j in self._select(rule):
+                k = self._variable_index(i, j)
+                if rule_type == "minimum":
+                    self.lower[k] = max(self.lower[k], rule["value"])
+                else:
+                    self.upper[k] = min(self.upper[k], rule["value"])
+            return
+
+        if rule_type == "linear":
+            terms = [(self._variable_index(i, j), coef) for i, j, coef in rule["terms"]]
+            self._add_row(terms, rule["sense"], rule["rhs"], name)
+            return
+
+        # 其余规则可按医院等级逐级展开
+        level_groups = [[j] for j in self.level_keys] if rule.get("per_level") else [None]
+        for levels in level_groups:
+            row_name = name if levels is None else f"{name}@{levels[0]}"
+            if rule_type in ("cap", "floor"):
+                terms = self._terms(self._select(rule, levels), weight)
+                sense = "<=" if rule_type == "cap" else ">="
+                self._add_row(terms, sense, rule["limit"], row_name)
+            elif rule_type == "ratio":
+                # sum(numerator) >= ratio * sum(denominator)
+                terms = (self._terms(self._select(rule["numerator"], levels), weight) +
+                         self._terms(self._select(rule["denominator"], levels), weight,
+                                     scale=-rule["ratio"]))
+                self._add_row(terms, ">=", 0.0, row_name)
+            elif rule_type == "coupling":
+                # sum(follow) == factor * sum(lead)
+                terms = (self._terms(self._select(rule["follow"], levels), weight) +
+                         self._terms(self._select(rule["lead"], levels), weight,
+                                     scale=-rule["factor"]))
+                self._add_row(terms, "==", 0.0, row_name)
+
+    def _compile(self) -> None:
+        """将预算、需求、非负约束及附加规则编译为稀疏矩阵"""
+        self._ub_buffer = {"rows": [], "cols": [], "data": [], "rhs": [], "names": []}
+        self._eq_buffer = {"rows": [], "cols": [], "data": [], "rhs": [], "names": []}
+        self.lower = np.zeros(self.n_variables)
+        self.upper = np.full(self.n_variables, np.inf)
+
+        # 预算约束：sum_j c_ij x_ij <= B_i
+        for i in self.resource_keys:
+            self._add_row(self._terms(self._select({"resources": [i]}), "cost"),
+                          "<=", self.budget_limits[i], f"budget[{i}]")
+        # 需求约束：sum_i x_ij >= D_j
+        for j in self.level_keys:
+            self._add_row(self._terms(self._select({"levels": [j]})),
+                          ">=", self.demand_thresholds[j], f"demand[{j}]")
+        self.n_builtin_rows = self.n_resources + self.n_levels
+
+        for index, rule in enumerate(self.rules):
+            self._compile_rule(rule, index)
+
+        shape = (self.n_variables,)
+        for kind, buffer in (("ub", self._ub_buffer), ("eq", self._eq_buffer)):
+            matrix = sp.csr_matrix(
+                (buffer["data"], (buffer["rows"], buffer["cols"])),
+                shape=(len(buffer["rhs"]),) + shape
+            )
+            setattr(self, f"A_{kind}", matrix)
+            setattr(self, f"b_{kind}", np.array(buffer["rhs"], dtype=float))
+            setattr(self, f"{kind}_names", buffer["names"])
+        del self._ub_buffer, self._eq_buffer
+
+        # 附加不等式/等式行，供投影修复逐行使用
+        self._extra_rows = [
+            self._sparse_row(self.A_ub, r, self.b_ub[r], "<=")
+            for r in range(self.n_builtin_rows, self.A_ub.shape[0])
+        ] + [
+            self._sparse_row(self.A_eq, r, self.b_eq[r], "==")
+            for r in range(self.A_eq.shape[0])
+        ]
+        self._has_bounds = bool(np.any(self.lower > 0) or np.any(np.isfinite(self.upper)))
+        self._empty = None
+
+    def is_empty(self) -> bool:
+        """
+        可行域是否为空 (LP 检验，结果缓存)
+
+        Returns:
+            bool: 不存在满足全部约束的方案时为 True。
+        """
+        if self._empty is None:
+            has_eq = self.A_eq.shape[0] > 0
+            result = linprog(
+                np.zeros(self.n_variables),
+                A_ub=self.A_ub, b_ub=self.b_ub,
+                A_eq=self.A_eq if has_eq else None, b_eq=self.b_eq if has_eq else None,
+                bounds=list(zip(self.lower, np.where(np.isfinite(self.upper), self.upper, None))),
+                method="highs"
+            )
+            self._empty = result.status == 2
+        return self._empty
+
+    @staticmethod
+    def _sparse_row(matrix: sp.csr_matrix, r: int, rhs: float, sense: str) -> Tuple:
+        """提取 CSR 矩阵中一行的 (下标, 系数, 右端项, 系数平方和, 类型)"""
+        start, end = matrix.indptr[r], matrix.indptr[r + 1]
+        idx = matrix.indices[start:end]
+        coef = matrix.data[start:end]
+        return idx, coef, rhs, float(np.dot(coef, coef)), sense
+
+    # ------------------------------------------------------------------
+    # 可行性与违反量
+    # ------------------------------------------------------------------
+
+    def _flatten(self, allocations: np.ndarray) -> np.ndarray:
+        """(resource_type, hospital_level) 或 (batch, ...) -> (batch, n_variables)"""
+        x = np.asarray(allocations, dtype=float)
+        return x.reshape(-1, self.n_variables)
+
+    def residuals(self, allocations: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        计算一批分配方案在各约束上的残差 (每类约束一次稀疏矩阵乘法)。
+
+        Args:
+            allocations (np.ndarray): 分配方案，形状为 (resource_type, hospital_level)
+                                      或 (batch, resource_type, hospital_level)。
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                不等式残差 A_ub x - b_ub (batch × m_ub，>0 表示违反)、
+                等式残差 A_eq x - b_eq (batch × m_eq)、
+                变量界违反量 (batch × n_variables，>=0)。
+        """
+        x = self._flatten(allocations)
+        ub = (self.A_ub @ x.T).T - self.b_ub
+        eq = (self.A_eq @ x.T).T - self.b_eq
+        bound = np.maximum(self.lower - x, 0) + np.maximum(x - self.upper, 0)
+        return ub, eq, bound
+
+    def violation_matrix(self, allocations: np.ndarray) -> np.ndarray:
+        """
+        逐行约束违反量
+
+        Args:
+            allocations (np.ndarray): 分配方案 (单个或批量)。
+
+        Returns:
+            np.ndarray: 形状为 (batch, m_ub + m_eq) 的非负违反量。
+        """
+        ub, eq, _ = self.residuals(allocations)
+        return np.hstack([np.maximum(ub, 0), np.abs(eq)])
+
+    def total_violation(self, allocations: np.ndarray) -> np.ndarray:
+        """
+        总约束违反量 (含变量界)
+
+        Args:
+            allocations (np.ndarray): 分配方案 (单个或批量)。
+
+        Returns:
+            np.ndarray: 形状为 (batch,) 的总违反量。
+        """
+        ub, eq, bound = self.residuals(allocations)
+        return np.maximum(ub, 0).sum(axis=1) + np.abs(eq).sum(axis=1) + bound.sum(axis=1)
+
+    def is_feasible(self, allocations: np.ndarray, tolerance: float = 1e-9) -> np.ndarray:
+        """
+        批量可行性检验
+
+        Args:
+            allocations (np.ndarray): 分配方案 (单个或批量)。
+            tolerance (float): 相对容差，残差需不超过 tolerance * (1 + |b|)。
+
+        Returns:
+            np.ndarray: 形状为 (batch,) 的布尔数组。
+        """
+        ub, eq, bound = self.residuals(allocations)
+        ok_ub = np.all(ub <= tolerance * (1 + np.abs(self.b_ub)), axis=1)
+        ok_eq = np.all(np.abs(eq) <= tolerance * (1 + np.abs(self.b_eq)), axis=1)
+        ok_bound = np.all(bound <= tolerance, axis=1)
+        return ok_ub & ok_eq & ok_bound
+
     def budget_constraint(self, allocation_matrix: np.ndarray) -> bool:
         """
         检查预算约束是否满足。
@@ -36,21 +362,9 @@ class Constraints:
             bool: 是否满足预算约束。
         """
         try:
-            # 计算每种资源的总成本
-            total_costs = np.zeros(len(self.budget_limits))
-            for resource_type, costs in self.unit_costs.items():
-                for hospital_level in range(allocation_matrix.shape[1]):
-                    total_costs[resource_type - 1] += (
-                        allocation_matrix[resource_type - 1, hospital_level] *
-                        sum(costs.values())  # 单位成本之和
-                    )
-
-            # 检查总成本是否在预算限制内
-            for resource_type, total_cost in enumerate(total_costs, start=1):
-                if total_cost > self.budget_limits[resource_type]:
-                    return False
-
-            return True
+            # 各类资源总成本与预算上限比较
+            total_costs = np.sum(allocation_matrix * self.cost_matrix, axis=1)
+            return bool(np.all(total_costs <= self.budget_vector))
 
         except Exception as e:
             print(f"Error in budget constraint: {str(e)}")
@@ -72,11 +386,7 @@ class Constraints:
             allocated_resources = np.sum(allocation_matrix, axis=0)
 
             # 检查是否满足每个医院等级的最低需求
-            for hospital_level, allocated in enumerate(allocated_resources, start=1):
-                if allocated < self.demand_thresholds[hospital_level]:
-                    return False
-
-            return True
+            return bool(np.all(allocated_resources >= self.demand_floors))
 
         except Exception as e:
             print(f"Error in demand constraint: {str(e)}")
@@ -98,6 +408,29 @@ class Constraints:
             print(f"Error in non-negativity constraint: {str(e)}")
             return False
 
+    def rule_constraint(self, allocation_matrix: np.ndarray, tolerance: float = 1e-6) -> bool:
+        """
+        检查附加规则 (CONSTRAINT_RULES) 是否满足。
+
+        Args:
+            allocation_matrix (np.ndarray): 资源分配矩阵 (resource_type × hospital_level)。
+            tolerance (float): 相对容差。
+
+        Returns:
+            bool: 是否满足所有附加规则。
+        """
+        try:
+            ub, eq, bound = self.residuals(allocation_matrix)
+            extra = ub[:, self.n_builtin_rows:]
+            return bool(
+                np.all(extra <= tolerance * (1 + np.abs(self.b_ub[self.n_builtin_rows:]))) and
+                np.all(np.abs(eq) <= tolerance * (1 + np.abs(self.b_eq))) and
+                np.all(bound <= tolerance)
+            )
+        except Exception as e:
+            print(f"Error in rule constraint: {str(e)}")
+            return False
+
     def validate_constraints(self, allocation_matrix: np.ndarray, demand_matrix: np.ndarray) -> bool:
         """
         验证所有约束条件是否满足。
@@ -113,12 +446,351 @@ class Constraints:
             return (
                 self.budget_constraint(allocation_matrix) and
                 self.demand_constraint(allocation_matrix, demand_matrix) and
-                self.non_negativity_constraint(allocation_matrix)
+                self.non_negativity_constraint(allocation_matrix) and
+                self.rule_constraint(allocation_matrix)
             )
         except Exception as e:
             print(f"Error in validating constraints: {str(e)}")
             return False
 
+    # ------------------------------------------------------------------
+    # 预处理
+    # ------------------------------------------------------------------
+
+    def presolve(self, tolerance: float = 1e-9, max_passes: int = 10) -> Dict:
+        """
+        LP 预处理：删除空行与冗余行，将单变量行转化为变量界，并检测明显不可行。
+
+        行活动量的上下界通过稀疏矩阵与变量界的乘积一次求出。
+
+        Args:
+            tolerance (float): 判定不可行/冗余时的容差。
+            max_passes (int): 最大迭代轮数。
+
+        Returns:
+            Dict: 精简后的系统，键为 "A_ub", "b_ub", "A_eq", "b_eq", "lower", "upper",
+                  "ub_rows" (保留的原不等式行号), "eq_rows" (保留的原等式行号),
+                  "infeasible" (是否检测到不可行)。
+        """
+        A_ub, b_ub = self.A_ub.tocsr(), self.b_ub.copy()
+        A_eq, b_eq = self.A_eq.tocsr(), self.b_eq.copy()
+        ub_rows = np.arange(A_ub.shape[0])
+        eq_rows = np.arange(A_eq.shape[0])
+        lower, upper = self.lower.copy(), self.upper.copy()
+        infeasible = False
+
+        for _ in range(max_passes):
+            changed = False
+
+            # 1. 单变量行 -> 变量界
+            nnz = np.diff(A_ub.indptr)
+            for r in np.flatnonzero(nnz == 1):
+                k, a = A_ub.indices[A_ub.indptr[r]], A_ub.data[A_ub.indptr[r]]
+                if a > 0:
+                    upper[k] = min(upper[k], b_ub[r] / a)
+                elif a < 0:
+                    lower[k] = max(lower[k], b_ub[r] / a)
+            nnz_eq = np.diff(A_eq.indptr)
+            for r in np.flatnonzero(nnz_eq == 1):
+                k, a = A_eq.indices[A_eq.indptr[r]], A_eq.data[A_eq.indptr[r]]
+                value = b_eq[r] / a
+                if value < lower[k] - tolerance or value > upper[k] + tolerance:
+                    infeasible = True
+                lower[k] = upper[k] = value
+
+            # 2. 行活动量上下界
+            A_pos, A_neg = A_ub.maximum(0), A_ub.minimum(0)
+            with np.errstate(invalid="ignore"):
+                max_activity = A_pos @ upper + A_neg @ lower
+                min_activity = A_pos @ lower + A_neg @ upper
+            if np.any(min_activity > b_ub + tolerance * (1 + np.abs(b_ub))):
+                infeasible = True
+            if np.any(lower > upper + tolerance):
+                infeasible = True
+
+            # 3. 删除空行、单变量行和冗余行
+            keep = (nnz > 1) & ~(max_activity <= b_ub)
+            keep_eq = nnz_eq > 1
+            if not np.all(keep) or not np.all(keep_eq):
+                changed = True
+            A_ub, b_ub, ub_rows = A_ub[keep], b_ub[keep], ub_rows[keep]
+            A_eq, b_eq, eq_rows = A_eq[keep_eq], b_eq[keep_eq], eq_rows[keep_eq]
+
+            if infeasible or not changed:
+                break
+
+        return {
+            "A_ub": A_ub, "b_ub": b_ub,
+            "A_eq": A_eq, "b_eq": b_eq,
+            "lower": lower, "upper": upper,
+            "ub_rows": ub_rows, "eq_rows": eq_rows,
+            "infeasible": infeasible
+        }
+
+    # ------------------------------------------------------------------
+    # 投影修复
+    # ------------------------------------------------------------------
+
+    def project(self,
+                allocations: np.ndarray,
+                max_iterations: int = 500,
+                tolerance: float = 1e-6) -> np.ndarray:
+        """
+        将一批资源分配方案投影到可行域。
+
+        可行域是若干凸集的交集：按行的 {x >= 0, sum_j c_ij x_ij <= B_i}、
+        按列的 {x >= 0, sum_i x_ij >= D_j}、变量界以及附加规则的每一行。
+        行/列集合的投影可通过排序法批量求出，附加规则逐行做半空间/超平面投影，
+        因此用 Dykstra 交替投影代替通用 QP 求解，整个批次一次完成。
+        若可行域为空 (需求超出预算所能覆盖的数量)，返回满足非负和预算约束、
+        且距其余约束最近的方案。Dykstra 在最大迭代次数内未得到可行点时，
+        再做不带校正量的交替投影，返回附近的可行点 (不再是精确投影)。
+
+        Args:
+            allocations (np.ndarray): 分配方案，形状为 (resource_type, hospital_level)
+                                      或 (batch, resource_type, hospital_level)。
+            max_iterations (int): Dykstra 最大迭代次数。
+            tolerance (float): 迭代收敛阈值 (相邻两次迭代的最大绝对差)。
+
+        Returns:
+            np.ndarray: 投影后的分配方案，形状与输入相同。
+        """
+        x = np.asarray(allocations, dtype=float)
+        single = x.ndim == 2
+        if single:
+            x = x[None]
+        shape = x.shape
+        x = x.reshape(shape[0], -1)
+
+        # 不等式约束各收紧 tolerance，使迭代点在有限步内严格满足原约束
+        caps = self.budget_vector[None, :] - tolerance
+        floors = self.demand_floors[None, :] + tolerance
+        lower = np.where(self.lower > 0, self.lower + tolerance, self.lower)
+        upper = self.upper - tolerance
+        grid = (-1, self.n_resources, self.n_levels)
+
+        def project_rows(v):
+            # 行集合：非负 + 预算
+            return _project_capped(v.reshape(grid), caps, self.cost_matrix).reshape(v.shape)
+
+        def project_columns(v):
+            # 列集合：非负 + 需求
+            cols = np.swapaxes(v.reshape(grid), 1, 2)
+            return np.swapaxes(_project_floored(cols, floors), 1, 2).reshape(v.shape)
+
+        def project_row(row):
+            idx, coef, rhs, norm2, sense = row
+
+            def apply(v):
+                r = v[:, idx] @ coef - rhs
+                if sense == "<=":
+                    r = np.maximum(r + tolerance, 0)
+                v = v.copy()
+                v[:, idx] -= (r / norm2)[:, None] * coef
+                return v
+            return apply
+
+        # 行集合放在最后，返回的迭代点严格满足预算与非负约束
+        sets = [project_row(row) for row in self._extra_rows if row[3] > 0]
+        if self._has_bounds:
+            sets.append(lambda v: np.clip(v, lower, upper))
+        sets += [project_columns, project_rows]
+        increments = [np.zeros_like(x) for _ in sets]
+
+        # 逐行判断停止并冻结已收敛的行，结果与批次大小无关。
+        # 可行域非空时迭代点可能停滞若干轮 (校正量仍在变化)，只以可行作为停止条件；
+        # 可行域为空时迭代点最终停滞，以此停止
+        empty = self.is_empty()
+        y = x.copy()
+        active = np.arange(len(x))
+        for _ in range(max_iterations):
+            start = y[active]
+            v = start
+            for k, project_set in enumerate(sets):
+                w = v + increments[k][active]
+                z = project_set(w)
+                increments[k][active] = w - z
+                v = z
+            done = self.is_feasible(v, tolerance=0.0) | self._near_equalities(v, tolerance)
+            if empty:
+                done |= np.max(np.abs(v - start), axis=1) < tolerance * 1e-3
+            y[active] = v
+            active = active[~done]
+            if len(active) == 0:
+                break
+
+        # 可行域非空而 Dykstra 仍停滞在不可行点 (远离可行域的起点可能停滞上千轮) 时，
+        # 从当前迭代点做不带校正量的交替投影，收敛到附近的可行点
+        for _ in range(max_iterations if not empty else 0):
+            if len(active) == 0:
+                break
+            v = y[active]
+            for project_set in sets:
+                v = project_set(v)
+            y[active] = v
+            active = active[~(self.is_feasible(v, tolerance=0.0) | self._near_equalities(v, tolerance))]
+
+        y = y.reshape(shape)
+        return y[0] if single else y
+
+    def round_feasible(self,
+                       allocations: np.ndarray,
+                       max_rounds: Optional[int] = None,
+                       tolerance: float = 1e-9) -> np.ndarray:
+        """
+        将一批 (通常已投影的) 连续分配方案取整并修复可行性。
+
+        先就近取整并截断到整数变量界，再做逐单位的贪心修复。候选移动只来自当前被违反的行：
+        违反行中各变量朝减小违反量方向 ±1；若该移动会使某个已紧的预算/规则行违反，
+        再与该行中最佳的"让出"移动组成两变量间转移一个单位的移动 (预算紧时补足需求)。
+        候选移动对各行残差的影响由稀疏矩阵乘积一次求出，按
+        (预算与附加规则违反量, 需求与等式违反量, 偏离原连续解的距离) 的变化量字典序选出最优移动，
+        直到可行或没有能减少违反量的移动。
+        预算/规则优先于需求，与 project 在可行域为空时的处理一致；
+        距离作为最后的判据，使取整方案尽量贴近连续解，目标值损失最小。
+        整个批次按轮向量化，候选移动个数与违反行的非零元个数成正比，
+        内存不随变量数平方增长，上千个变量的方案也可快速取整。
+
+        Args:
+            allocations (np.ndarray): 分配方案，形状为 (resource_type, hospital_level)
+                                      或 (batch, resource_type, hospital_level)。
+            max_rounds (int, optional): 最大修复轮数，默认 2 * n_variables + 10。
+            tolerance (float): 违反量的判定阈值。
+
+        Returns:
+            np.ndarray: 取整后的分配方案 (浮点数组，元素均为整数)，形状与输入相同。
+        """
+        x = np.asarray(allocations, dtype=float)
+        shape = x.shape
+        x = x.reshape(-1, self.n_variables)
+        if max_rounds is None:
+            max_rounds = 2 * self.n_variables + 10
+
+        lower = np.ceil(self.lower - tolerance)
+        upper = np.floor(self.upper + tolerance)
+        y = np.clip(np.rint(x), lower, upper) + 0.0  # + 0.0 消除 -0.0
+
+        # 不等式行与等式行合并为一个系统 A y - b：hard 为预算与附加不等式行，其余 (需求、等式) 为 soft
+        A = sp.vstack([self.A_ub, self.A_eq]).tocsr()
+        AT = A.T.tocsr()
+        b = np.concatenate([self.b_ub, self.b_eq])
+        n_rows = A.shape[0]
+        is_eq = np.arange(n_rows) >= self.A_ub.shape[0]
+        hard_row = ~is_eq
+        hard_row[self.n_resources:self.n_builtin_rows] = False
+        row_length = np.diff(A.indptr)
+
+        def violation(values, rows):
+            return np.where(is_eq[rows], np.abs(values), np.maximum(values, 0.0))
+
+        def row_moves(plans, rows, direction):
+            """行 rows 中每个变量的单位移动，direction=+1 减小该行残差，-1 增大残差"""
+            counts = row_length[rows]
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            entries = np.repeat(A.indptr[rows], counts) + offsets
+            steps = -np.sign(A.data[entries]) * np.repeat(direction, counts)
+            return np.repeat(plans, counts), A.indices[entries], steps
+
+        def score(plans, columns, steps):
+            """
+            候选移动 (每行为 columns/steps 中的一或两个变量) 造成的
+            (hard 违反量变化, soft 违反量变化, 距离变化, 残差变化的 COO 矩阵)，越界移动的 hard 变化为 inf
+            """
+            n_moves, width = columns.shape
+            moves = sp.csr_matrix(
+                (steps.ravel(), columns.ravel(), np.arange(0, n_moves * width + 1, width)),
+                shape=(n_moves, self.n_variables)
+            )
+            delta = (moves @ AT).tocoo()
+            before = residual[plans[delta.row], delta.col]
+            change = violation(before + delta.data, delta.col) - violation(before, delta.col)
+            hard = hard_row[delta.col]
+            hard_change = np.bincount(delta.row, weights=change * hard, minlength=n_moves)
+            soft_change = np.bincount(delta.row, weights=change * ~hard, minlength=n_moves)
+
+            owners = np.repeat(plans, width).reshape(n_moves, width)
+            current = y[owners, columns]
+            moved = current + steps
+            outside = (steps != 0) & ((moved < lower[columns]) | (moved > upper[columns]))
+            hard_change[outside.any(axis=1)] = np.inf
+            distance_change = (np.abs(moved - x[owners, columns]) -
+                               np.abs(current - x[owners, columns])).sum(axis=1)
+            return hard_change, soft_change, distance_change, delta
+
+        def best_per_group(groups, hard_change, soft_change, distance_change):
+            """每组中字典序最优的候选移动下标 (按组号升序)"""
+            order = np.lexsort((distance_change, soft_change, hard_change, groups))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = groups[order][1:] != groups[order][:-1]
+            return order[first]
+
+        residual = (A @ y.T).T - b
+        for _ in range(max_rounds):
+            plans, rows = np.nonzero(violation(residual, np.arange(n_rows)) > tolerance)
+            if len(plans) == 0:
+                break
+
+            # 1. 违反行中各变量朝减小违反量方向的单位移动
+            direction = np.where(residual[plans, rows] > 0, 1.0, -1.0)
+            move_plans, columns, steps = row_moves(plans, rows, direction)
+            columns, steps = columns[:, None], steps[:, None]
+            hard_change, soft_change, distance_change, delta = score(move_plans, columns, steps)
+
+            # 2. 会使已紧的 hard 行违反的移动，与该行中最佳的让出移动组成两变量间的转移
+            blocked = (hard_row[delta.col] & (delta.data > 0) &
+                       (residual[move_plans[delta.row], delta.col] + delta.data > tolerance))
+            if blocked.any():
+                single, first = np.unique(delta.row[blocked], return_index=True)
+                blocking_row = delta.col[blocked][first]
+                keys = move_plans[single] * n_rows + blocking_row
+                groups = np.unique(keys)
+                group_rows = groups % n_rows
+                release_plans, release_columns, release_steps = row_moves(
+                    groups // n_rows, group_rows, np.ones(len(groups)))
+                release_columns, release_steps = release_columns[:, None], release_steps[:, None]
+                release_score = score(release_plans, release_columns, release_steps)
+                release_groups = np.repeat(groups, row_length[group_rows])
+                best_release = best_per_group(release_groups, *release_score[:3])
+                partner = best_release[np.searchsorted(groups, keys)]
+                pair_columns = np.hstack([columns[single], release_columns[partner]])
+                pair_steps = np.hstack([steps[single], release_steps[partner]])
+                distinct = pair_columns[:, 0] != pair_columns[:, 1]
+                pair_plans = move_plans[single][distinct]
+                pair_columns, pair_steps = pair_columns[distinct], pair_steps[distinct]
+                if len(pair_plans):
+                    pair_score = score(pair_plans, pair_columns, pair_steps)
+                    move_plans = np.concatenate([move_plans, pair_plans])
+                    columns = np.vstack([np.hstack([columns, columns]), pair_columns])
+                    steps = np.vstack([np.hstack([steps, np.zeros_like(steps)]), pair_steps])
+                    hard_change = np.concatenate([hard_change, pair_score[0]])
+                    soft_change = np.concatenate([soft_change, pair_score[1]])
+                    distance_change = np.concatenate([distance_change, pair_score[2]])
+
+            # 3. 各方案取字典序最优的移动，只接受减少违反量的移动
+            best = best_per_group(move_plans, hard_change, soft_change, distance_change)
+            improved = ((hard_change[best] < -tolerance) |
+                        ((hard_change[best] <= tolerance) & (soft_change[best] < -tolerance)))
+            best = best[improved]
+            if len(best) == 0:
+                break
+            width = columns.shape[1]
+            applied = sp.csr_matrix(
+                (steps[best].ravel(), (np.repeat(move_plans[best], width), columns[best].ravel())),
+                shape=y.shape
+            )
+            y += applied.toarray()
+            residual += (applied @ AT).toarray()
+
+        return y.reshape(shape)
+
+    def _near_equalities(self, x: np.ndarray, tolerance: float) -> np.ndarray:
+        """不等式与变量界严格满足、等式残差不超过 tolerance 的方案"""
+        if self.A_eq.shape[0] == 0:
+            return np.zeros(x.shape[0], dtype=bool)
+        ub, eq, bound = self.residuals(x)
+        return (np.all(ub <= 0, axis=1) & np.all(bound <= 0, axis=1) &
+                np.all(np.abs(eq) <= tolerance, axis=1))
+
 
 # 测试代码
 if __name__ == "__main__":
@@ -143,3 +815,7 @@ if __name__ == "__main__":
         print("所有约束条件均满足！")
     else:
         print("约束条件未满足！")
+
+    # 编译后的稀疏线性系统
+    print(f"A_ub: {constraints.A_ub.shape}, A_eq: {constraints.A_eq.shape}")
+    print("总违反量:", constraints.total_violation(allocation_matrix))
@@ -4,12 +4,61 @@
 """
 
 import numpy as np
-from typing import List, Tuple, Dict, Optional
+from typing import AsyncIterator, Callable, List, Tuple, Dict, Optional
+import copy
+import asyncio
+import inspect
+import json
 import logging
-from deap import base, creator, tools, algorithms
-import random
-from .config import OPTIMIZER_CONFIG, WEIGHT_CONFIG
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from deap import base, tools
+from multiprocessing import get_context
+from .config import OPTIMIZER_CONFIG, WEIGHT_CONFIG, SYSTEM_CONFIG
 from .p05_constraints import Constraints
+from .p08_utils import save_arrays_atomic, load_arrays
+from .p09_parallel import ParallelEvaluator, make_transport, resolve_n_jobs
+from .p10_archive import ParetoArchive, hypervolume, non_dominated_mask
+from .p11_exact import ExactSolver
+from .p12_algorithms import make_engine
+from .p13_telemetry import GenerationTelemetry
+from .p14_metrics import front_metrics
+from .p16_robust import DemandScenarios
+from .p19_decision import rank_front
+from .p22_memetic import LocalRefiner
+
+
+class FitnessMin(base.Fitness):
+    """三个目标均最小化的适应度"""
+    weights = (-1.0, -1.0, -1.0)
+
+
+class Individual(np.ndarray):
+    """
+    带适应度的资源分配方案 (numpy 数组子类)
+
+    代替 creator.create 在 deap.creator 模块上动态创建的全局类型，
+    多个优化器实例可在同一进程内共存而互不覆盖。
+    """
+    fitness_class = FitnessMin
+
+    def __new__(cls, allocation):
+        obj = np.array(allocation, dtype=float).view(cls)
+        obj.fitness = cls.fitness_class()
+        return obj
+
+    def __deepcopy__(self, memo):
+        copy_ = np.ndarray.copy(self)
+        copy_.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return copy_
+
+    def __reduce__(self):
+        return (self.__class__, (np.asarray(self),), self.__dict__)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
 
 class ResourceOptimizer:
     """医疗资源优化器类"""
@@ -18,7 +67,15 @@ class ResourceOptimizer:
                  resource_types: Dict,
                  hospital_levels: Dict,
                  budget_config: Dict,
-                 constraints: Constraints):
+                 constraints: Constraints,
+                 seed: Optional[int] = None,
+                 parallel: Optional[bool] = None,
+                 backend: Optional[str] = None,
+                 weights: Optional[np.ndarray] = None,
+                 algorithm: Optional[str] = None,
+                 integer: Optional[bool] = None,
+                 compact: Optional[bool] = None,
+                 robust: Optional[bool] = None):
         """
         初始化优化器
 
@@ -27,6 +84,17 @@ class ResourceOptimizer:
             hospital_levels: 医院等级配置
             budget_config: 预算配置
             constraints: 约束条件对象
+            seed: 随机种子，默认取 OPTIMIZER_CONFIG["random_seed"]
+            parallel: 是否启用并行评估，默认取 SYSTEM_CONFIG["parallel"]["enabled"]
+            backend: 进化引擎，"deap" (逐个体对象) 或 "array" (整个种群为一个数组，
+                     向量化变异/交叉/排序)，默认取 OPTIMIZER_CONFIG["backend"]
+            weights: (效率, 可及性, 成本) 损失的权重 (如 AHP 权重)，供精确求解的加权和使用，
+                     默认取 WEIGHT_CONFIG["OBJECTIVE_WEIGHTS"] 各区间中点
+            algorithm: 进化算法 ("NSGA-II", "NSGA-III", "MOEA/D")，默认取 OPTIMIZER_CONFIG["algorithm"]
+            integer: 是否按整数单位分配资源，默认取 OPTIMIZER_CONFIG["integer"]["enabled"]
+            compact: 是否以紧凑类型存储种群与存档 (float32，整数模式下为整数)，
+                     默认取 OPTIMIZER_CONFIG["compact"]；需要 array 后端
+            robust: 是否针对抽样需求情景做鲁棒优化，默认取 OPTIMIZER_CONFIG["robust"]["enabled"]
         """
         self.logger = logging.getLogger(__name__)
         self.resource_types = resource_types
@@ -40,37 +108,226 @@ class ResourceOptimizer:
         self.cx_prob = OPTIMIZER_CONFIG["crossover_prob"]
         self.mut_prob = OPTIMIZER_CONFIG["mutation_prob"]
         self.convergence_threshold = OPTIMIZER_CONFIG["convergence_threshold"]
+        self.backend = OPTIMIZER_CONFIG["backend"] if backend is None else backend
+        if self.backend not in ("deap", "array"):
+            raise ValueError(f"Unknown optimizer backend: {self.backend}")
+        self.algorithm = OPTIMIZER_CONFIG["algorithm"] if algorithm is None else algorithm
+        if self.algorithm == "MOEA/D" and self.backend == "deap":
+            # MOEA/D 的个体与子问题一一对应，只在数组表示下实现
+            self.logger.warning("MOEA/D requires the array backend; switching backend to 'array'")
+            self.backend = "array"
+        self.n_objectives = 3
+        if weights is None:
+            weights = [np.mean(w_range) for w_range in WEIGHT_CONFIG["OBJECTIVE_WEIGHTS"].values()]
+        self.weights = np.asarray(weights, dtype=float) / np.sum(weights)
+        self.exact_config = OPTIMIZER_CONFIG["exact"]
+        self.warm_start_config = OPTIMIZER_CONFIG["warm_start"]
+        self.integer_config = OPTIMIZER_CONFIG["integer"]
+        self.integer = self.integer_config["enabled"] if integer is None else integer
+        self.robust_config = OPTIMIZER_CONFIG["robust"]
+        self.robust = self.robust_config["enabled"] if robust is None else robust
+        self.nominal_constraints = constraints
+        self.demand_scenarios: Optional[DemandScenarios] = None
+        if self.robust:
+            # 公共随机数：情景只抽样一次，所有代共用
+            scenario_seed = self.robust_config["seed"]
+            if scenario_seed is None:
+                scenario_seed = OPTIMIZER_CONFIG["random_seed"] if seed is None else seed
+            self.demand_scenarios = DemandScenarios(
+                self._demand_vector(), self.robust_config["variation"],
+                self.robust_config["n_scenarios"], scenario_seed
+            )
+            self._apply_chance_constraints()
+        self.compact = OPTIMIZER_CONFIG["compact"] if compact is None else compact
+        if self.compact and self.backend == "deap":
+            # 紧凑存储要求整个种群为一个连续数组
+            self.logger.warning("Compact storage requires the array backend; switching backend to 'array'")
+            self.backend = "array"
+        self.storage_dtype = self._storage_dtype()
+        self.repair_offspring = OPTIMIZER_CONFIG["repair_offspring"]
+        self.repair_max_iterations = OPTIMIZER_CONFIG["repair_max_iterations"]
+        self.repair_tolerance = OPTIMIZER_CONFIG["repair_tolerance"]
+        if self.storage_dtype == np.float32:
+            # 约束留出 float32 舍入误差的余量，使存储后的解仍满足约束
+            scale = np.max(np.abs(self.constraints.b_ub), initial=1.0)
+            self.repair_tolerance = max(self.repair_tolerance,
+                                        4 * float(np.finfo(np.float32).eps) * scale)
+        self.parallel_config = SYSTEM_CONFIG["parallel"]
+        self.parallel = self.parallel_config["enabled"] if parallel is None else parallel
+        self.checkpoint_path = OPTIMIZER_CONFIG["checkpoint"]["path"]
+        self.checkpoint_interval = OPTIMIZER_CONFIG["checkpoint"]["interval"]
+        self._parallel_evaluator: Optional[ParallelEvaluator] = None
+        self.archive_size = OPTIMIZER_CONFIG["archive_size"]
+        self.archive = self._new_archive()
+        self.telemetry_capacity = OPTIMIZER_CONFIG["telemetry"]["capacity"]
+        self.telemetry = GenerationTelemetry(self.telemetry_capacity, self.n_objectives)
+        self.metrics_config = OPTIMIZER_CONFIG["metrics"]
+        self.decision_config = OPTIMIZER_CONFIG["decision"]
+        self.memetic_config = OPTIMIZER_CONFIG["memetic"]
+        self.reference_front: Optional[np.ndarray] = None  # IGD/IGD+ 的参考前沿 (目标值)
+        self.stopping_config = OPTIMIZER_CONFIG["stopping"]
+        self.stop_reason: Optional[str] = None
+        self.hv_reference: Optional[np.ndarray] = None
+        self._cancel_event = threading.Event()
         
-        # 设置随机种子
-        random.seed(OPTIMIZER_CONFIG["random_seed"])
-        np.random.seed(OPTIMIZER_CONFIG["random_seed"])
+        # 实例私有的随机数生成器 (不修改全局 random / np.random 状态)
+        self.seed = OPTIMIZER_CONFIG["random_seed"] if seed is None else seed
+        self.rng = np.random.default_rng(self.seed)
 
-        # 初始化DEAP工具箱
+        # 初始化DEAP工具箱与进化引擎
+        self.engine = make_engine(self.algorithm, self)
         self._setup_toolbox()
 
+    def _demand_vector(self) -> np.ndarray:
+        """各级医院的需求阈值 D_j"""
+        return np.array([self.budget_config["DEMAND_THRESHOLDS"][j+1]
+                         for j in range(len(self.hospital_levels))], dtype=float)
+
+    def _apply_chance_constraints(self) -> None:
+        """
+        鲁棒模式设置了 chance_level 时，需求约束的下限改为各级需求情景的该分位数
+        (逐级机会约束)，其余约束 (预算、附加规则、成本矩阵) 沿用传入的约束条件
+        """
+        level = self.robust_config["chance_level"]
+        if level is None:
+            self.constraints = self.nominal_constraints
+            return
+        config = copy.deepcopy(self.budget_config)
+        config["DEMAND_THRESHOLDS"] = {
+            j + 1: float(demand) for j, demand in enumerate(self.demand_scenarios.quantile(level))
+        }
+        self.constraints = Constraints(config, self.hospital_levels,
+                                       cost_matrix=self.nominal_constraints.cost_matrix)
+
+    def set_demand_variation(self, variation: np.ndarray) -> None:
+        """
+        鲁棒模式下更新需求的变异系数 (如由 DataLoader.estimate_demand_variation 估计)，
+        沿用同一组标准正态样本，并相应更新机会约束
+
+        Args:
+            variation: 各级医院需求的变异系数，标量或形状为 (hospital_level,)
+        """
+        if not self.robust:
+            raise ValueError("Demand variation only applies in robust mode")
+        self.demand_scenarios.set_distribution(self._demand_vector(), variation)
+        self._apply_chance_constraints()
+        self.logger.info(f"Demand variation set to {self.demand_scenarios.variation}")
+
+    def demand_satisfaction(self, allocations: np.ndarray) -> np.ndarray:
+        """
+        鲁棒模式下各分配方案在全部需求情景中同时满足各级需求的比例
+
+        Args:
+            allocations: 形状为 (..., resource_type, hospital_level) 的分配方案
+
+        Returns:
+            np.ndarray: 形状为 (...) 的比例
+        """
+        if not self.robust:
+            raise ValueError("Demand satisfaction is only defined in robust mode")
+        return self.demand_scenarios.satisfaction(np.sum(allocations, axis=-2, dtype=np.float64))
+
+    def _storage_dtype(self) -> np.dtype:
+        """
+        种群与存档中分配方案的存储类型：默认 float64；紧凑模式下为 float32，
+        整数模式下为能容纳最大可购买单位数的最小有符号整数类型 (至少 int16)
+        """
+        if not self.compact:
+            return np.dtype(np.float64)
+        if not self.integer:
+            return np.dtype(np.float32)
+        min_costs = self.constraints.cost_matrix.min(axis=1)
+        if np.any(min_costs <= 0):
+            return np.dtype(np.int32)
+        bound = int(np.ceil(np.max(self.constraints.budget_vector / min_costs)))
+        return np.promote_types(np.min_scalar_type(bound), np.int16)
+
+    def _new_archive(self) -> ParetoArchive:
+        """按存储类型创建空的帕累托存档"""
+        return ParetoArchive(self.archive_size, self.n_objectives, dtype=self.storage_dtype)
+
+    def _store(self, allocations: np.ndarray) -> np.ndarray:
+        """float64 工作数组 -> 存储类型 (整数类型时先四舍五入)"""
+        if self.storage_dtype.kind in "iu":
+            allocations = np.rint(allocations)
+        return allocations.astype(self.storage_dtype, copy=False)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        帕累托存档占用的字节数
+
+        Returns:
+            Dict[str, int]: {"archive_solutions": 解, "archive_objectives": 目标值}
+        """
+        solutions = self.archive.solutions
+        return {
+            "archive_solutions": 0 if solutions is None else int(solutions.nbytes),
+            "archive_objectives": int(self.archive.objectives.nbytes)
+        }
+
     def _setup_toolbox(self) -> None:
         """配置DEAP工具箱"""
-        # 1. 创建最小化问题的Fitness类
-        creator.create("FitnessMin", base.Fitness, weights=(-1.0, -1.0, -1.0))
-        
-        # 2. 创建Individual类
-        creator.create("Individual", np.ndarray, fitness=creator.FitnessMin)
+        # 1. 个体类型 (实例属性，不注册到全局 deap.creator)
+        self.individual_class = Individual
         
-        # 3. 初始化工具箱
+        # 2. 初始化工具箱
         self.toolbox = base.Toolbox()
         
-        # 4. 注册个体生成函数
+        # 3. 注册个体生成函数
         self.toolbox.register("attr_float", self._generate_random_allocation)
-        self.toolbox.register("individual", tools.initIterate, creator.Individual, 
+        self.toolbox.register("individual", tools.initIterate, self.individual_class, 
                             self.toolbox.attr_float)
         self.toolbox.register("population", tools.initRepeat, list, 
                             self.toolbox.individual)
         
-        # 5. 注册遗传算法操作
+        # 4. 注册遗传算法操作 (均使用实例私有的随机数生成器)
         self.toolbox.register("evaluate", self._evaluate)
-        self.toolbox.register("mate", tools.cxTwoPoint)
-        self.toolbox.register("mutate", tools.mutGaussian, mu=0, sigma=1, indpb=0.1)
-        self.toolbox.register("select", tools.selNSGA2)
+        self.toolbox.register("mate", self._mate_two_point)
+        self.toolbox.register("mutate", self._mutate_gaussian, mu=0, sigma=1, indpb=0.1)
+        if self.algorithm == "NSGA-II":
+            self.toolbox.register("select", tools.selNSGA2)
+        else:
+            self.toolbox.register("select", self._select_individuals)
+        
+        # 5. 按并行配置注册适应度评估：deap 后端替换 toolbox.map，
+        #    array 后端由 _evaluate_array 把向量化评估按块分发到进程池
+        if self.parallel:
+            vectorized = self.backend == "array"
+            self._parallel_evaluator = ParallelEvaluator(
+                self._evaluate_batch if vectorized else self._evaluate,
+                individual_shape=(len(self.resource_types), len(self.hospital_levels)),
+                n_objectives=3,
+                n_jobs=self.parallel_config["n_jobs"],
+                seed=self.seed,
+                chunks_per_worker=self.parallel_config["chunks_per_worker"],
+                min_batch_size=self.parallel_config["min_batch_size"],
+                vectorized=vectorized,
+                min_batch_seconds=self.parallel_config["min_batch_seconds"]
+            )
+            if not vectorized:
+                self.toolbox.register("map", self._parallel_evaluator.map)
+
+    def _select_individuals(self, individuals: List, k: int) -> List:
+        """用进化引擎的环境选择从 DEAP 个体列表中选出 k 个"""
+        _, fitness = self._population_arrays(individuals)
+        return [individuals[i] for i in self.engine.select(fitness, k)]
+
+    def __getstate__(self) -> Dict:
+        """序列化时去掉工具箱和进程池 (工作进程只需评估函数)"""
+        state = self.__dict__.copy()
+        state["toolbox"] = None
+        state["_parallel_evaluator"] = None
+        state["_cancel_event"] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._cancel_event = threading.Event()
+
+    def close(self) -> None:
+        """关闭并行评估进程池并释放共享内存"""
+        if self._parallel_evaluator is not None:
+            self._parallel_evaluator.close()
 
     def _generate_random_allocation(self) -> np.ndarray:
         """
@@ -82,20 +339,119 @@ class ResourceOptimizer:
         n_resources = len(self.resource_types)
         n_hospitals = len(self.hospital_levels)
         
-        # 生成满足约束的随机分配方案
-        while True:
-            allocation = np.random.uniform(
-                low=0,
-                high=[self.budget_config["BUDGET_LIMITS"][i+1] for i in range(n_resources)],
-                size=(n_resources, n_hospitals)
+        # 随机采样后投影到可行域 (拒绝采样在需求接近预算上限时可能无法终止)
+        allocation = self.rng.uniform(
+            low=0,
+            high=[[self.budget_config["BUDGET_LIMITS"][i+1]] for i in range(n_resources)],
+            size=(n_resources, n_hospitals)
+        )
+        return self._repair_allocations(allocation)
+
+    def _mate_two_point(self, ind1: np.ndarray, ind2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        两点交叉 (在展开后的分配向量上原地交换片段，整数解交叉后仍为整数)
+
+        Args:
+            ind1: 个体1
+            ind2: 个体2
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 交叉后的两个个体
+        """
+        flat1, flat2 = ind1.reshape(-1), ind2.reshape(-1)
+        start, stop = np.sort(self.rng.choice(np.arange(1, flat1.size + 1), 2, replace=False))
+        segment = flat1[start:stop].copy()
+        flat1[start:stop] = flat2[start:stop]
+        flat2[start:stop] = segment
+        return ind1, ind2
+
+    def _mutate_gaussian(self, individual: np.ndarray, mu: float, sigma: float,
+                         indpb: float) -> Tuple[np.ndarray]:
+        """
+        高斯变异：每个元素以概率 indpb 加上 N(mu, sigma) 扰动 (整数模式下为取整后的整数步长)
+
+        Args:
+            individual: 个体
+            mu: 扰动均值
+            sigma: 扰动标准差
+            indpb: 每个元素的变异概率
+
+        Returns:
+            Tuple[np.ndarray]: 变异后的个体
+        """
+        mask = self.rng.random(individual.shape) < indpb
+        individual += mask * self._mutation_step(mu, sigma, individual.shape)
+        return individual,
+
+    def _mutation_step(self, mu: float, sigma: float, shape: Tuple[int, ...]) -> np.ndarray:
+        """高斯扰动；整数模式下取整为非零的整数步长 (至少改变一个单位)"""
+        step = self.rng.normal(mu, sigma, shape)
+        if self.integer:
+            step = np.sign(step) * np.maximum(1, np.rint(np.abs(step)))
+        return step
+
+    def _vary(self, pop: List) -> List:
+        """
+        产生 population_size 个子代 (与 algorithms.varOr 相同的交叉/变异/复制规则，
+        但使用实例私有的随机数生成器)
+
+        Args:
+            pop: 当前种群
+
+        Returns:
+            List: 子代个体列表
+        """
+        offspring = []
+        with self.telemetry.timer("variation"):
+            for _ in range(self.population_size):
+                op_choice = self.rng.random()
+                if op_choice < self.cx_prob:
+                    i, j = self.rng.choice(len(pop), 2, replace=False)
+                    ind1, ind2 = self.toolbox.clone(pop[i]), self.toolbox.clone(pop[j])
+                    ind1, ind2 = self.toolbox.mate(ind1, ind2)
+                    del ind1.fitness.values
+                    offspring.append(ind1)
+                elif op_choice < self.cx_prob + self.mut_prob:
+                    ind = self.toolbox.clone(pop[self.rng.integers(len(pop))])
+                    ind, = self.toolbox.mutate(ind)
+                    del ind.fitness.values
+                    offspring.append(ind)
+                else:
+                    offspring.append(self.toolbox.clone(pop[self.rng.integers(len(pop))]))
+        return offspring
+
+    def _repair(self, offspring: List) -> None:
+        """
+        将变异/交叉产生的子代批量投影回可行域 (原地修改)
+
+        Args:
+            offspring: 子代个体列表
+        """
+        if not offspring:
+            return
+        repaired = self._repair_allocations(np.stack([np.asarray(ind) for ind in offspring]))
+        for ind, allocation in zip(offspring, repaired):
+            ind[:] = allocation
+
+    def _repair_allocations(self, allocations: np.ndarray) -> np.ndarray:
+        """
+        投影到可行域；整数模式下再向量化取整并修复可行性 (Constraints.round_feasible)
+
+        Args:
+            allocations: 形状为 (resource_type, hospital_level) 或 (n, resource_type, hospital_level)
+
+        Returns:
+            np.ndarray: 修复后的分配方案
+        """
+        with self.telemetry.timer("repair"):
+            repaired = self.constraints.project(
+                allocations,
+                max_iterations=self.repair_max_iterations,
+                tolerance=self.repair_tolerance
             )
-            
-            if self.constraints.validate_constraints(
-                allocation, 
-                np.array([self.budget_config["DEMAND_THRESHOLDS"][i+1] 
-                         for i in range(n_hospitals)])
-            ):
-                return allocation
+            if self.integer:
+                repaired = self.constraints.round_feasible(repaired)
+        return repaired
 
     def _evaluate(self, individual: np.ndarray) -> Tuple[float, float, float]:
         """
@@ -108,106 +464,1172 @@ class ResourceOptimizer:
             Tuple[float, float, float]: (效率损失, 可及性损失, 成本损失)
         """
         # 1. 计算效率目标
-        efficiency_loss = self._calculate_efficiency_loss(individual)
+        efficiency_loss = float(self._calculate_efficiency_loss(individual))
         
         # 2. 计算可及性目标
-        accessibility_loss = self._calculate_accessibility_loss(individual)
+        accessibility_loss = float(self._calculate_accessibility_loss(individual))
         
         # 3. 计算成本目标
-        cost_loss = self._calculate_cost_loss(individual)
+        cost_loss = float(self._calculate_cost_loss(individual))
         
         return efficiency_loss, accessibility_loss, cost_loss
 
-    def _calculate_efficiency_loss(self, allocation: np.ndarray) -> float:
+    def _evaluate_batch(self, allocations: np.ndarray) -> np.ndarray:
+        """
+        批量评估适应度 (向量化)
+
+        Args:
+            allocations: 形状为 (n, resource_type, hospital_level) 的分配方案
+
+        Returns:
+            np.ndarray: 形状为 (n, 3) 的目标值
+        """
+        return np.column_stack([
+            self._calculate_efficiency_loss(allocations),
+            self._calculate_accessibility_loss(allocations),
+            self._calculate_cost_loss(allocations)
+        ])
+
+    def quadratic_objectives(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        三个损失函数的最小二乘形式：L_m(x) = mean((G_m @ x - h_m) ** 2)，
+        x 为展开后的分配向量 (下标 i * hospital_level + j)。
+        鲁棒模式下可及性损失取各需求情景的期望 (各情景的行堆叠)；CVaR 不是二次函数，
+        精确求解时同样以期望近似
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray]]: [(G_效率, h), (G_可及性, h), (G_成本, h)]
+        """
+        n_resources, n_levels = len(self.resource_types), len(self.hospital_levels)
+        limits = np.array([self.budget_config["BUDGET_LIMITS"][i+1] for i in range(n_resources)])
+        demands = np.array([self.budget_config["DEMAND_THRESHOLDS"][j+1] for j in range(n_levels)])
+        row_sums = np.kron(np.eye(n_resources), np.ones(n_levels))
+        column_sums = np.kron(np.ones(n_resources), np.eye(n_levels))
+        cost_sums = row_sums * self.constraints.cost_matrix.reshape(-1)
+        if self.robust:
+            scenario_demands = self.demand_scenarios.demands
+            accessibility = (np.vstack([column_sums / d[:, None] for d in scenario_demands]),
+                             np.ones(scenario_demands.size))
+        else:
+            accessibility = (column_sums / demands[:, None], np.ones(n_levels))
+        return [
+            (row_sums / limits[:, None], np.ones(n_resources)),
+            accessibility,
+            (cost_sums / limits[:, None], np.zeros(n_resources))
+        ]
+
+    # 以下三个损失函数均支持 (..., resource_type, hospital_level) 形状的批量输入，
+    # 紧凑存储的 float32/整数分配方案按 float64 累加
+    def _calculate_efficiency_loss(self, allocation: np.ndarray) -> np.ndarray:
         """计算效率损失"""
         # 资源利用率偏差
-        utilization_rates = np.sum(allocation, axis=1) / np.array(
+        utilization_rates = np.sum(allocation, axis=-1, dtype=np.float64) / np.array(
             [self.budget_config["BUDGET_LIMITS"][i+1] for i in range(len(self.resource_types))]
         )
-        efficiency_loss = np.mean((1 - utilization_rates) ** 2)
+        efficiency_loss = np.mean((1 - utilization_rates) ** 2, axis=-1)
         
-        return float(efficiency_loss)
+        return efficiency_loss
 
-    def _calculate_accessibility_loss(self, allocation: np.ndarray) -> float:
-        """计算可及性损失"""
+    def _calculate_accessibility_loss(self, allocation: np.ndarray) -> np.ndarray:
+        """计算可及性损失 (鲁棒模式下为各需求情景损失的期望或 CVaR)"""
+        if self.robust:
+            supply = np.sum(allocation, axis=-2, dtype=np.float64)
+            losses = self.demand_scenarios.accessibility_losses(supply)
+            return self.demand_scenarios.risk(losses, self.robust_config["measure"],
+                                              self.robust_config["alpha"])
+        
         # 需求满足度偏差
-        demand_satisfaction = np.sum(allocation, axis=0) / np.array(
+        demand_satisfaction = np.sum(allocation, axis=-2, dtype=np.float64) / np.array(
             [self.budget_config["DEMAND_THRESHOLDS"][i+1] 
              for i in range(len(self.hospital_levels))]
         )
-        accessibility_loss = np.mean((1 - demand_satisfaction) ** 2)
+        accessibility_loss = np.mean((1 - demand_satisfaction) ** 2, axis=-1)
         
-        return float(accessibility_loss)
+        return accessibility_loss
 
-    def _calculate_cost_loss(self, allocation: np.ndarray) -> float:
+    def _calculate_cost_loss(self, allocation: np.ndarray) -> np.ndarray:
         """计算成本损失"""
-        total_costs = np.zeros(len(self.resource_types))
-        
-        for resource_type, costs in self.budget_config["UNIT_COSTS"].items():
-            resource_idx = resource_type - 1
-            unit_cost = sum(costs.values())
-            total_costs[resource_idx] = np.sum(allocation[resource_idx]) * unit_cost
+        # 单位成本取自约束条件编译后的成本矩阵
+        total_costs = np.sum(allocation * self.constraints.cost_matrix, axis=-1)
             
         cost_loss = np.mean(
             (total_costs / np.array([self.budget_config["BUDGET_LIMITS"][i+1] 
-                                   for i in range(len(self.resource_types))])) ** 2
+                                   for i in range(len(self.resource_types))])) ** 2,
+            axis=-1
         )
         
-        return float(cost_loss)
+        return cost_loss
+
+    def _seed_allocations(self, seeds: np.ndarray) -> np.ndarray:
+        """
+        由热启动种子生成初始种群中的种子部分 (占 warm_start["fraction"])：
+        种子过多时按决策空间最远点采样保留分散的子集，不足时以种子加相对高斯扰动补足，
+        最后全部投影到当前约束的可行域。
+
+        Args:
+            seeds: 形状为 (n, resource_type, hospital_level) 的种子分配方案，第一个优先保留
 
-    def optimize(self) -> Tuple[np.ndarray, List[float]]:
+        Returns:
+            np.ndarray: 修复后的种子分配方案
+        """
+        shape = (len(self.resource_types), len(self.hospital_levels))
+        seeds = np.asarray(seeds, dtype=float).reshape((-1,) + shape)
+        if len(seeds) == 0:
+            return seeds
+        n_seeded = min(max(1, int(round(self.warm_start_config["fraction"] * self.population_size))),
+                       self.population_size)
+
+        if len(seeds) > n_seeded:
+            # 最远点采样
+            flat = seeds.reshape(len(seeds), -1)
+            chosen = [0]
+            distance = np.linalg.norm(flat - flat[0], axis=1)
+            for _ in range(n_seeded - 1):
+                chosen.append(int(np.argmax(distance)))
+                distance = np.minimum(distance, np.linalg.norm(flat - flat[chosen[-1]], axis=1))
+            seeds = seeds[chosen]
+        elif len(seeds) < n_seeded:
+            # 对种子施加相对扰动，保持多样性
+            base = seeds[self.rng.integers(len(seeds), size=n_seeded - len(seeds))]
+            noise = self.rng.normal(0, self.warm_start_config["perturbation"], base.shape)
+            seeds = np.concatenate([seeds, base * (1 + noise)])
+
+        return self._repair_allocations(seeds)
+
+    def _initial_population(self, seeds: Optional[np.ndarray] = None):
+        """
+        生成并评估初始种群 (array 后端返回 (分配数组, 目标值数组))
+
+        Args:
+            seeds: 热启动种子分配方案，修复后混入初始种群，其余个体随机生成
+        """
+        seeded = self._seed_allocations(seeds) if seeds is not None else None
+        n_random = self.population_size - (0 if seeded is None else len(seeded))
+        if self.backend == "array":
+            return self._initial_population_array(n_random, seeded)
+        pop = self.toolbox.population(n=n_random)
+        if seeded is not None:
+            pop += [self.individual_class(allocation) for allocation in seeded]
+        self._evaluate_individuals(pop)
+        self._update_archive(pop)
+        return pop
+
+    def _evaluate_individuals(self, individuals: List) -> None:
+        """评估 DEAP 个体并写入适应度"""
+        with self.telemetry.timer("evaluation"):
+            fitnesses = self.toolbox.map(self.toolbox.evaluate, individuals)
+            for ind, fit in zip(individuals, fitnesses):
+                ind.fitness.values = fit
+        self.telemetry.add_evaluations(len(individuals))
+
+    def _update_archive(self, individuals: List) -> None:
+        """将已评估的个体并入帕累托存档"""
+        with self.telemetry.timer("archive"):
+            self.archive.update(
+                np.stack([np.asarray(ind) for ind in individuals]),
+                np.array([ind.fitness.values for ind in individuals], dtype=float)
+            )
+
+    def _next_generation(self, pop):
+        """
+        执行一代进化：变异/交叉、修复、评估、环境选择
+
+        Args:
+            pop: 当前种群
+
+        Returns:
+            下一代种群
+        """
+        if self.backend == "array":
+            return self._next_generation_array(pop)
+        # 选择下一代个体
+        offspring = self._vary(pop)
+        
+        # 修复不可行子代
+        if self.repair_offspring:
+            self._repair(offspring)
+        
+        # 评估子代适应度
+        self._evaluate_individuals(offspring)
+        self._update_archive(offspring)
+        
+        # 环境选择
+        with self.telemetry.timer("selection"):
+            return self.toolbox.select(pop + offspring, self.population_size)
+
+    def _initial_population_array(self, n_random: int,
+                                  seeded: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """array 后端：批量采样并投影初始种群 (随机数序列与逐个体生成相同)"""
+        n_resources = len(self.resource_types)
+        allocations = self.rng.uniform(
+            low=0,
+            high=[[self.budget_config["BUDGET_LIMITS"][i+1]] for i in range(n_resources)],
+            size=(n_random, n_resources, len(self.hospital_levels))
+        )
+        allocations = self._store(self._repair_allocations(allocations))
+        if seeded is not None:
+            allocations = np.concatenate([allocations, self._store(seeded)])
+        fitness = self._evaluate_array(allocations)
+        return allocations, fitness
+
+    def _vary_array(self, allocations: np.ndarray, pool: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        array 后端：一次产生 population_size 个子代，规则同 _vary
+        (交叉取两点交叉的第一个子代，变异为逐元素高斯扰动，其余复制)
+
+        Args:
+            allocations: 形状为 (n, resource_type, hospital_level) 的当前种群
+            pool: 形状为 (population_size, T) 的亲本候选下标 (如 MOEA/D 的邻域)，
+                  第 i 个子代的两个亲本取自第 i 行的不同位置；None 表示从整个种群中选
+
+        Returns:
+            np.ndarray: 形状为 (population_size, resource_type, hospital_level) 的子代 (float64 工作数组)
+        """
+        n_parents = len(allocations)
+        flat = allocations.reshape(n_parents, -1)
+        size = flat.shape[1]
+        op_choice = self.rng.random(self.population_size)
+        crossover = op_choice < self.cx_prob
+        mutation = ~crossover & (op_choice < self.cx_prob + self.mut_prob)
+        if pool is None:
+            first = self.rng.integers(n_parents, size=self.population_size)
+        else:
+            slot = self.rng.integers(pool.shape[1], size=self.population_size)
+            first = pool[np.arange(self.population_size), slot]
+        offspring = flat[first].astype(np.float64)
+
+        # 两点交叉：用另一个不同亲本的 [start, stop) 片段替换
+        n_cx = int(crossover.sum())
+        parents = np.flatnonzero(crossover)
+        if pool is None:
+            mates = (first[parents] + self.rng.integers(1, n_parents, size=n_cx)) % n_parents
+        else:
+            mate_slot = (slot[parents] + self.rng.integers(1, pool.shape[1], size=n_cx)) % pool.shape[1]
+            mates = pool[parents, mate_slot]
+        start = self.rng.integers(1, size + 1, size=n_cx)
+        stop = self.rng.integers(1, size, size=n_cx)
+        stop += stop >= start
+        start, stop = np.minimum(start, stop), np.maximum(start, stop)
+        columns = np.arange(size)
+        segment = (columns >= start[:, None]) & (columns < stop[:, None])
+        offspring[parents] = np.where(segment, flat[mates], offspring[parents])
+
+        # 高斯变异 (参数与 toolbox.mutate 的注册参数一致)
+        params = self.toolbox.mutate.keywords
+        n_mut = int(mutation.sum())
+        mask = self.rng.random((n_mut, size)) < params["indpb"]
+        offspring[mutation] += mask * self._mutation_step(params["mu"], params["sigma"], (n_mut, size))
+
+        return offspring.reshape((self.population_size,) + allocations.shape[1:])
+
+    def _make_offspring(self, allocations: np.ndarray,
+                        pool: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        各进化引擎共用的子代生成：变异/交叉、批量修复、向量化评估、并入帕累托存档
+
+        Args:
+            allocations: 当前种群的分配数组
+            pool: 亲本候选下标，见 _vary_array
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (子代分配数组, 子代目标值数组)
+        """
+        with self.telemetry.timer("variation"):
+            offspring = self._vary_array(allocations, pool)
+        if self.repair_offspring:
+            offspring = self._repair_allocations(offspring)
+        offspring = self._store(offspring)
+        offspring_fitness = self._evaluate_array(offspring)
+        return offspring, offspring_fitness
+
+    def _evaluate_array(self, allocations: np.ndarray) -> np.ndarray:
+        """array 后端：向量化评估 (启用并行时按块分发到进程池) 并并入帕累托存档"""
+        with self.telemetry.timer("evaluation"):
+            if self._parallel_evaluator is not None:
+                fitness = self._parallel_evaluator.evaluate(allocations)
+            else:
+                fitness = self._evaluate_batch(allocations)
+        self.telemetry.add_evaluations(len(allocations))
+        with self.telemetry.timer("archive"):
+            self.archive.update(allocations, fitness)
+        return fitness
+
+    def _next_generation_array(self, pop: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """array 后端：由进化引擎 (OPTIMIZER_CONFIG["algorithm"]) 执行一代进化"""
+        # 引擎内部的变异/修复/评估各自计时，其余 (环境选择/替换) 计入 selection
+        with self.telemetry.timer("selection"):
+            return self.engine.step(pop)
+
+    def _population_from_arrays(self, allocations: np.ndarray, fitness: np.ndarray):
+        """由分配数组和目标值数组构造当前后端的种群"""
+        if self.backend == "array":
+            return self._store(np.asarray(allocations)), fitness
+        return [self._make_individual(x, f) for x, f in zip(allocations, fitness)]
+
+    def _population_arrays(self, pop) -> Tuple[np.ndarray, np.ndarray]:
+        """种群转为 (分配数组 (n, resource_type, hospital_level), 目标值数组 (n, 3))"""
+        if self.backend == "array":
+            return pop
+        return (np.stack([np.asarray(ind) for ind in pop]),
+                np.array([ind.fitness.values for ind in pop], dtype=float))
+
+    def _make_individual(self, allocation: np.ndarray, fitness: Tuple[float, ...]):
+        """由分配矩阵和目标值构造带适应度的个体"""
+        ind = self.individual_class(allocation)
+        ind.fitness.values = tuple(fitness)
+        return ind
+
+    def save_checkpoint(self, path: str, pop, generation: int, finished: bool = False) -> None:
+        """
+        原子地保存检查点：种群、适应度、帕累托存档、遥测记录、代数及随机数生成器状态
+
+        Args:
+            path: 检查点文件路径 (npz 二进制)
+            pop: 当前种群
+            generation: 已完成的代数
+            finished: 是否已结束进化 (收敛或达到最大代数)
+        """
+        population, fitness = self._population_arrays(pop)
+        arrays = {
+            "population": population,
+            "fitness": fitness,
+            "archive_solutions": self.archive.solutions,
+            "archive_objectives": self.archive.objectives,
+            "generation": np.array(generation),
+            "finished": np.array(finished),
+            "stop_reason": np.array(self.stop_reason or ""),
+            "hv_reference": self.hv_reference if self.hv_reference is not None else np.empty(0),
+            "demand_scenarios": (self.demand_scenarios.demands if self.robust
+                                 else np.empty((0, len(self.hospital_levels)))),
+            # 位生成器状态含 128 位整数，以 JSON 文本保存
+            "rng_state": np.array(json.dumps(self.rng.bit_generator.state)),
+            "evaluation_calls": np.array(
+                self._parallel_evaluator._n_calls if self._parallel_evaluator else 0
+            ),
+        }
+        arrays.update({f"telemetry_{name}": column
+                       for name, column in self.telemetry.to_dict().items()})
+        save_arrays_atomic(path, arrays)
+
+    def load_checkpoint(self, path: str) -> Tuple[object, int, bool]:
+        """
+        读取检查点并恢复随机数状态
+
+        Args:
+            path: 检查点文件路径
+
+        Returns:
+            Tuple[object, int, bool]: (种群, 已完成的代数, 是否已结束进化)
+        """
+        arrays = load_arrays(path)
+        pop = self._population_from_arrays(arrays["population"], arrays["fitness"])
+        self.archive = self._new_archive()
+        self.archive.update(arrays["archive_solutions"], arrays["archive_objectives"])
+        self.telemetry = GenerationTelemetry(self.telemetry_capacity, self.n_objectives)
+        self.telemetry.restore({name[len("telemetry_"):]: column for name, column in arrays.items()
+                                if name.startswith("telemetry_")})
+
+        self.stop_reason = str(arrays["stop_reason"]) or None
+        self.hv_reference = arrays["hv_reference"] if arrays["hv_reference"].size else None
+        if self.robust and arrays.get("demand_scenarios", np.empty(0)).size:
+            self.demand_scenarios.demands = arrays["demand_scenarios"]
+            self._apply_chance_constraints()
+        self.rng.bit_generator.state = json.loads(str(arrays["rng_state"]))
+        if self._parallel_evaluator is not None:
+            self._parallel_evaluator._n_calls = int(arrays["evaluation_calls"])
+        return pop, int(arrays["generation"]), bool(arrays["finished"])
+
+    def optimize(self,
+                 resume_from: Optional[str] = None,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_interval: Optional[int] = None,
+                 seeds: Optional[np.ndarray] = None,
+                 deadline: Optional[float] = None,
+                 max_evaluations: Optional[int] = None
+                 ) -> Tuple[np.ndarray, List[float], Tuple[np.ndarray, np.ndarray]]:
         """
         执行优化过程
 
+        Args:
+            resume_from: 检查点文件路径，给定时从该检查点继续进化，
+                         结果与未中断的运行逐位一致
+            checkpoint_path: 检查点保存路径，默认取 OPTIMIZER_CONFIG["checkpoint"]["path"]，
+                             为 None 时不保存
+            checkpoint_interval: 每隔多少代保存一次检查点
+            seeds: 热启动种子 (如上次运行的最优解与帕累托前沿)，形状为
+                   (n, resource_type, hospital_level)；修复到当前约束后混入初始种群，
+                   从检查点恢复时忽略
+            deadline: 墙钟时间预算 (秒，自调用起计)，默认取 OPTIMIZER_CONFIG["stopping"]["deadline"]；
+                      预计下一代会超时则停止，返回当前结果
+            max_evaluations: 适应度评估次数预算 (含初始种群)，默认取
+                             OPTIMIZER_CONFIG["stopping"]["max_evaluations"]；下一代会超出时停止
+
+        停止原因记录在 self.stop_reason："generations" (达到最大代数)、"converged" (目标值收敛)、
+        "stalled" (存档超体积在 hv_window 代内的相对增幅低于 hv_tolerance)、
+        "deadline" 或 "max_evaluations" (预算用尽)、"cancelled" (调用了 cancel())。
+
         Returns:
-            Tuple[np.ndarray, List[float]]: (最优解, 目标函数值)
+            Tuple[np.ndarray, List[float], Tuple[np.ndarray, np.ndarray]]:
+                (最优解, 目标函数值, (帕累托前沿上的分配方案 (n, resource_type, hospital_level),
+                                     对应目标值 (n, 3)))。前沿取自整个进化过程的存档
+                (紧凑模式下分配方案为存储类型)，
+                优化结束后也可通过 self.archive 访问。整数模式启用分支定界时，
+                最优解为 weights 加权和意义下的整数最优解。
+        """
+        self._cancel_event.clear()
+        evolution = self._evolve(resume_from, checkpoint_path, checkpoint_interval,
+                                 seeds, deadline, max_evaluations)
+        while True:
+            try:
+                next(evolution)
+            except StopIteration as stop:
+                return stop.value
+
+    def _evolve(self,
+                resume_from: Optional[str] = None,
+                checkpoint_path: Optional[str] = None,
+                checkpoint_interval: Optional[int] = None,
+                seeds: Optional[np.ndarray] = None,
+                deadline: Optional[float] = None,
+                max_evaluations: Optional[int] = None):
+        """
+        优化主循环 (生成器)：初始化后及每完成一代产出已完成的代数，
+        结束时以 StopIteration.value 返回 optimize() 的结果。参数同 optimize()。
         """
+        checkpoint_path = checkpoint_path or self.checkpoint_path
+        checkpoint_interval = checkpoint_interval or self.checkpoint_interval
+        deadline = self.stopping_config["deadline"] if deadline is None else deadline
+        if max_evaluations is None:
+            max_evaluations = self.stopping_config["max_evaluations"]
+        started = time.perf_counter()
         try:
-            # 1. 生成初始种群
-            pop = self.toolbox.population(n=self.population_size)
+            # 1. 生成并评估初始种群，或从检查点恢复
+            if resume_from is not None:
+                pop, start_gen, finished = self.load_checkpoint(resume_from)
+                self.logger.info(f"Resumed from {resume_from} at generation {start_gen}")
+            else:
+                self.archive = self._new_archive()
+                self.telemetry = GenerationTelemetry(self.telemetry_capacity, self.n_objectives)
+                self.stop_reason = None
+                pop, start_gen, finished = self._initial_population(seeds), 0, False
+                self._set_hypervolume_reference()
+                self._record_generation(0, pop)
+            if not finished:
+                self.stop_reason = "generations"
+            yield start_gen
             
-            # 2. 评估初始种群
-            fitnesses = list(map(self.toolbox.evaluate, pop))
-            for ind, fit in zip(pop, fitnesses):
-                ind.fitness.values = fit
-            
-            # 3. 开始进化
-            for gen in range(self.n_generations):
-                # 选择下一代个体
-                offspring = algorithms.varOr(
-                    pop, self.toolbox, 
-                    lambda_=self.population_size, 
-                    cxpb=self.cx_prob, 
-                    mutpb=self.mut_prob
-                )
-                
-                # 评估子代适应度
-                fits = self.toolbox.map(self.toolbox.evaluate, offspring)
-                for fit, ind in zip(fits, offspring):
-                    ind.fitness.values = fit
-                
-                # 环境选择
-                pop = self.toolbox.select(pop + offspring, self.population_size)
+            # 2. 开始进化
+            for gen in range(start_gen, 0 if finished else self.n_generations):
+                # 已取消或预算不足以再进化一代时停止
+                if self._cancel_event.is_set():
+                    exhausted = "cancelled"
+                else:
+                    exhausted = self._budget_exhausted(started, deadline, max_evaluations)
+                if exhausted:
+                    self.stop_reason = exhausted
+                    if checkpoint_path:
+                        self.save_checkpoint(checkpoint_path, pop, gen)
+                    break
+
+                self.telemetry.start()
+                pop = self._next_generation(pop)
+                interval = self.memetic_config["interval"]
+                if interval and (gen + 1) % interval == 0:
+                    pop = self._refine_population(pop)
+                self._record_generation(gen + 1, pop)
                 
-                # 检查收敛性
+                # 检查收敛性与超体积停滞
                 if self._check_convergence(pop):
-                    self.logger.info(f"Converged after {gen+1} generations")
+                    self.stop_reason = "converged"
+                elif self._hypervolume_stalled():
+                    self.stop_reason = "stalled"
+                finished = self.stop_reason in ("converged", "stalled")
+                last = finished or gen + 1 == self.n_generations
+                if checkpoint_path and ((gen + 1) % checkpoint_interval == 0 or last):
+                    self.save_checkpoint(checkpoint_path, pop, gen + 1, finished=finished)
+                yield gen + 1
+                if finished:
                     break
+            self.logger.info(f"Stopped after generation {int(self.telemetry.latest('generation'))}: "
+                             f"{self.stop_reason}")
             
-            # 4. 获取最优解
-            best_solution = tools.selBest(pop, 1)[0]
-            return np.array(best_solution), best_solution.fitness.values
+            # 3. 模因精修：对存档做几步局部下降 (时间预算已用尽或已取消时跳过)
+            refined = (self.memetic_config["enabled"] and len(self.archive) > 0 and
+                       self.stop_reason not in ("deadline", "cancelled"))
+            if refined:
+                self.refine_archive()
+
+            # 4. 获取最优解 (目标值按字典序最小者，同 tools.selBest，精修后在存档中选取；
+            #    select_best 时取存档中排名第一的折中方案)
+            if self.decision_config["select_best"] and len(self.archive):
+                allocations, fitness, _ = self.compromise_solutions(k=1)
+                best_allocation, best_fitness = allocations[0], fitness[0]
+            else:
+                allocations, fitness = self.archive.to_arrays() if refined else self._population_arrays(pop)
+                best = int(np.lexsort(fitness.T[::-1])[0])
+                best_allocation, best_fitness = allocations[best].astype(np.float64), fitness[best]
+
+            # 5. 整数模式：分支定界精修加权最优解 (时间预算已用尽或已取消时跳过)
+            if (self.integer and self.integer_config["branch_and_bound"] and
+                    self.stop_reason not in ("deadline", "cancelled")):
+                polished = self._polish_integer()
+                if polished is not None:
+                    best_allocation, best_fitness = polished
+
+            self.logger.info(f"Pareto archive holds {len(self.archive)} non-dominated solutions")
+            return best_allocation, tuple(best_fitness.tolist()), self.archive.to_arrays()
             
         except Exception as e:
             self.logger.error(f"Optimization error: {str(e)}")
             raise
 
-    def _check_convergence(self, population: List) -> bool:
+    def cancel(self) -> None:
+        """请求停止正在进行的优化 (协作式：当前一代完成后停止，返回当前结果)"""
+        self._cancel_event.set()
+
+    def _progress_event(self) -> Dict:
+        """
+        进度事件：已完成的代数、当前帕累托前沿、最新一代的遥测记录与停止原因
+        """
+        return {
+            "generation": int(self.telemetry.latest("generation")),
+            "front": self.archive.to_arrays(),
+            "telemetry": {name: self.telemetry.latest(name) for name in self.telemetry.fields},
+            "stop_reason": self.stop_reason,
+            "done": False,
+            "result": None
+        }
+
+    async def optimize_stream(self, executor=None, **kwargs) -> AsyncIterator[Dict]:
+        """
+        异步迭代优化进度：每一代在执行器 (默认线程池) 中运行，事件循环不被阻塞。
+
+        每完成一代 (含初始种群) 产出一个进度事件 (见 _progress_event)；最后一个事件的
+        "done" 为 True，"result" 为 optimize() 的返回值。等待中的任务被取消或迭代提前
+        结束时，当前一代完成后即停止，不再占用 CPU。同一优化器实例不能同时运行多个优化。
+
+        Args:
+            executor: concurrent.futures 执行器，None 表示事件循环的默认线程池
+            **kwargs: optimize() 的参数
+
+        Yields:
+            Dict: 进度事件
+        """
+        loop = asyncio.get_running_loop()
+        self._cancel_event.clear()
+        evolution = self._evolve(**kwargs)
+        running = threading.Lock()      # 持有期间生成器正在执行器中运行
+        abandoned = threading.Event()   # 迭代已被取消或提前结束
+
+        def stop_if_abandoned():
+            # 生成器不在运行时才能关闭；由最后离开的一方执行
+            if abandoned.is_set() and running.acquire(blocking=False):
+                try:
+                    evolution.close()
+                    self.stop_reason = "cancelled"
+                finally:
+                    running.release()
+
+        def step():
+            with running:
+                try:
+                    next(evolution)
+                    event = self._progress_event()
+                except StopIteration as stop:
+                    event = self._progress_event()
+                    event.update(done=True, result=stop.value)
+            stop_if_abandoned()
+            return event
+
+        done = False
+        try:
+            while not done:
+                event = await loop.run_in_executor(executor, step)
+                done = event["done"]
+                yield event
+        finally:
+            if not done:
+                # 当前一代完成后停止，不再调度后续各代
+                self.cancel()
+                abandoned.set()
+                stop_if_abandoned()
+
+    async def optimize_async(self,
+                             progress_callback: Optional[Callable[[Dict], object]] = None,
+                             executor=None,
+                             **kwargs) -> Tuple[np.ndarray, List[float], Tuple[np.ndarray, np.ndarray]]:
+        """
+        optimize() 的协程版本
+
+        Args:
+            progress_callback: 每代完成后以进度事件调用，可为普通函数或协程函数
+            executor: 运行各代的执行器，见 optimize_stream
+            **kwargs: optimize() 的参数
+
+        Returns:
+            与 optimize() 相同的 (最优解, 目标函数值, (前沿分配方案, 前沿目标值))
+        """
+        async for event in self.optimize_stream(executor=executor, **kwargs):
+            if progress_callback is not None:
+                returned = progress_callback(event)
+                if inspect.isawaitable(returned):
+                    await returned
+            if event["done"]:
+                return event["result"]
+
+    def _record_generation(self, generation: int, pop) -> None:
+        """将当前种群的统计量与存档的前沿质量指标写入遥测缓冲区"""
+        allocations, fitness = self._population_arrays(pop)
+        if self.metrics_config["every_generation"]:
+            quality = self.front_quality()
+        else:
+            quality = {"hypervolume": self._archive_hypervolume()}
+        self.telemetry.record(
+            generation, fitness,
+            feasible_fraction=float(np.mean(self.constraints.is_feasible(allocations))),
+            archive_size=len(self.archive),
+            quality=quality
+        )
+
+    def front_quality(self, objectives: Optional[np.ndarray] = None,
+                      reference_front: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        前沿质量指标：超体积、IGD/IGD+、间距与分布广度 (见 p14_metrics.front_metrics)。
+        归一化方式与逐代超体积相同 (self.hv_reference)，不同运行、不同代之间可直接比较。
+
+        Args:
+            objectives: 形状为 (n, 3) 的前沿目标值，默认为帕累托存档
+            reference_front: 参考前沿目标值，默认为 self.reference_front
+
+        Returns:
+            Dict[str, float]: 指标名 -> 指标值，无参考前沿时 IGD/IGD+ 为 nan
+        """
+        if objectives is None:
+            objectives = self.archive.objectives
+        if reference_front is None:
+            reference_front = self.reference_front
+        return front_metrics(objectives, reference_front, self.hv_reference)
+
+    def compromise_solutions(self, k: Optional[int] = None,
+                             method: Optional[str] = None,
+                             weights: Optional[np.ndarray] = None,
+                             objectives: Optional[np.ndarray] = None,
+                             allocations: Optional[np.ndarray] = None
+                             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        按多准则决策方法对前沿排序，返回前 k 个折中方案 (见 p19_decision.rank_front)。
+        只依赖前沿的目标值，调整权重或方法后可直接重新排序，无需重新优化。
+
+        Args:
+            k: 方案个数，默认取 OPTIMIZER_CONFIG["decision"]["top_k"]
+            method: "topsis"、"vikor" 或 "fuzzy_topsis"，默认取配置值
+            weights: (3,) 的权重或 (3, 3) 的三角模糊权重 (FuzzyAHP 模糊权重向量)，默认为 self.weights
+            objectives: 形状为 (n, 3) 的前沿目标值，默认为帕累托存档
+            allocations: 与 objectives 对应的分配方案，默认为帕累托存档
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: (分配方案, 目标值, 得分)，按优劣排序
+        """
+        if objectives is None:
+            allocations, objectives = self.archive.solutions, self.archive.objectives
+        k = self.decision_config["top_k"] if k is None else k
+        method = self.decision_config["method"] if method is None else method
+        weights = self.weights if weights is None else weights
+        index, scores = rank_front(objectives, weights, method, k, self.decision_config["vikor_v"])
+        return (np.asarray(allocations)[index].astype(np.float64),
+                np.asarray(objectives)[index].astype(np.float64), scores)
+
+    def refine_solutions(self, allocations: np.ndarray, fitness: np.ndarray,
+                         steps: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        对一批解做约束感知的局部下降 (见 p22_memetic.LocalRefiner)，并将结果并入帕累托存档
+
+        Args:
+            allocations: 形状为 (n, resource_type, hospital_level) 的分配方案
+            fitness: 形状为 (n, 3) 的目标值
+            steps: 每个解的局部步数，默认取 OPTIMIZER_CONFIG["memetic"]["steps"]
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, int]: (精修后的分配方案, 目标值, 评估次数)
+        """
+        refined, refined_fitness, evaluations = LocalRefiner(self).refine(allocations, fitness, steps)
+        self.telemetry.add_evaluations(evaluations)
+        with self.telemetry.timer("archive"):
+            self.archive.update(self._store(refined), refined_fitness)
+        return refined, refined_fitness, evaluations
+
+    def refine_archive(self, members: Optional[int] = None,
+                       steps: Optional[int] = None) -> Dict[str, float]:
+        """
+        模因后处理：对帕累托存档成员做局部精修，改进的解重新并入存档
+
+        Args:
+            members: 精修的成员个数上限 (沿第一个目标均匀选取)，None 表示全部
+            steps: 每个解的局部步数，默认取配置
+
+        Returns:
+            Dict[str, float]: 精修的成员数 members、被改进的个数 improved、评估次数 evaluations
+                与耗时 seconds
+        """
+        started = time.perf_counter()
+        allocations, fitness = self.archive.to_arrays()
+        chosen = _spread_members(fitness, np.arange(len(fitness)), members)
+        _, refined_fitness, evaluations = self.refine_solutions(allocations[chosen], fitness[chosen], steps)
+        stats = {
+            "members": len(chosen),
+            "improved": int(np.sum(np.any(refined_fitness != fitness[chosen], axis=1))),
+            "evaluations": evaluations,
+            "seconds": time.perf_counter() - started,
+        }
+        self.logger.info(f"Memetic refinement improved {stats['improved']} of {stats['members']} archive "
+                         f"members with {evaluations} evaluations")
+        return stats
+
+    def _refine_population(self, pop):
+        """
+        进化中的模因步骤：精修种群第一前沿中的至多 memetic["members"] 个个体，
+        改进的解替换原个体 (拉马克式) 并并入存档
+
+        Args:
+            pop: 当前种群
+
+        Returns:
+            精修后的种群
+        """
+        allocations, fitness = self._population_arrays(pop)
+        front = np.flatnonzero(non_dominated_mask(fitness))
+        chosen = _spread_members(fitness, front, self.memetic_config["members"])
+        refined, refined_fitness, _ = self.refine_solutions(allocations[chosen], fitness[chosen])
+        allocations, fitness = allocations.astype(np.float64), fitness.copy()
+        allocations[chosen], fitness[chosen] = refined, refined_fitness
+        return self._population_from_arrays(allocations, fitness)
+
+    def _set_hypervolume_reference(self) -> None:
+        """
+        以初始存档确定超体积的归一化方式：各目标减去理想点后除以 1.1 倍的 (最差值 - 理想点)，
+        参考点为全 1。整个运行过程 (含断点续算) 使用同一参考，超体积可逐代比较。
+        初始存档在某个目标上几乎退化为一点时，跨度至少取理想点绝对值的 10%，
+        否则该目标上 1e-8 量级的差异 (如 float32 存储误差) 就会使超体积归零。
+        """
+        ideal = self.archive.objectives.min(axis=0)
+        scale = np.maximum(1.1 * (self.archive.objectives.max(axis=0) - ideal), 0.1 * np.abs(ideal))
+        scale[scale <= 0] = 1.0
+        self.hv_reference = np.stack([ideal, scale])
+
+    def _archive_hypervolume(self) -> float:
+        """帕累托存档的归一化超体积"""
+        if self.hv_reference is None or len(self.archive) == 0:
+            return np.nan
+        ideal, scale = self.hv_reference
+        return hypervolume((self.archive.objectives - ideal) / scale, np.ones(self.n_objectives))
+
+    def _hypervolume_stalled(self) -> bool:
+        """存档超体积在最近 hv_window 代内的相对增幅是否低于 hv_tolerance"""
+        window = self.stopping_config["hv_window"]
+        if not window:
+            return False
+        past = self.telemetry.latest("hypervolume", window)
+        if not np.isfinite(past):
+            return False
+        gain = self.telemetry.latest("hypervolume") - past
+        return gain <= self.stopping_config["hv_tolerance"] * max(past, 1e-12)
+
+    def _budget_exhausted(self, started: float, deadline: Optional[float],
+                          max_evaluations: Optional[int]) -> Optional[str]:
+        """
+        按上一代的耗时与评估次数预估，再进化一代是否会超出预算
+
+        Returns:
+            Optional[str]: "deadline"、"max_evaluations"，预算充足时为 None
+        """
+        if deadline is not None:
+            last_generation = self.telemetry.latest("time_total")
+            if time.perf_counter() - started + np.nan_to_num(last_generation) > deadline:
+                return "deadline"
+        if max_evaluations is not None:
+            if self.telemetry.total_evaluations + self.population_size > max_evaluations:
+                return "max_evaluations"
+        return None
+
+    def get_objective_history(self, statistic: str = "min") -> np.ndarray:
+        """
+        各目标逐代的统计量 (第 0 行为初始种群)，可直接传给 Visualizer.plot_objective_trends
+
+        Args:
+            statistic: "min"、"mean" 或 "max"
+
+        Returns:
+            np.ndarray: 形状为 (n_generations, 3)
+        """
+        return self.telemetry.objective_history(statistic)
+
+    def get_telemetry(self) -> Dict[str, np.ndarray]:
+        """
+        逐代遥测记录 (列名 -> 一维数组)，列名见 GenerationTelemetry.fields
+
+        Returns:
+            Dict[str, np.ndarray]: 目标统计、可行比例、存档规模、吞吐量及各阶段耗时
+        """
+        return self.telemetry.to_dict()
+
+    def _polish_integer(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        以存档中加权损失最小的整数解为初始解，分支定界求加权和问题的整数最优解，
+        并将结果并入帕累托存档。变量数超过 OPTIMIZER_CONFIG["integer"]["max_variables"] 时跳过。
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: (整数分配矩阵, 目标值)，跳过时为 None
+        """
+        if self.constraints.n_variables > self.integer_config["max_variables"]:
+            self.logger.info(
+                f"Skipping branch and bound: {self.constraints.n_variables} variables exceed "
+                f"max_variables={self.integer_config['max_variables']}"
+            )
+            return None
+        solver = ExactSolver(
+            self.constraints, self.quadratic_objectives(),
+            tolerance=self.exact_config["tolerance"],
+            max_iterations=self.exact_config["max_iterations"],
+            feasibility_tolerance=self.exact_config["feasibility_tolerance"]
+        )
+        incumbent = self.archive.solutions[int(np.argmin(self.archive.objectives @ self.weights))]
+        x, _ = solver.solve_integer(self.weights, incumbent,
+                                    max_nodes=self.integer_config["max_nodes"])
+        allocation = x.reshape(incumbent.shape)
+        fitness = self._evaluate_batch(allocation[None])
+        self.archive.update(allocation[None], fitness)
+        return allocation, fitness[0]
+
+    def optimize_exact(self,
+                       weights: Optional[np.ndarray] = None,
+                       n_points: Optional[int] = None,
+                       n_jobs: Optional[int] = None
+                       ) -> Tuple[np.ndarray, List[float], Tuple[np.ndarray, np.ndarray]]:
+        """
+        精确求解：加权和 QP 给出折中最优解，ε-约束扫描给出参考帕累托前沿
+
+        Args:
+            weights: 损失权重，默认取构造时的 weights
+            n_points: ε 网格点数，默认取 OPTIMIZER_CONFIG["exact"]["n_points"]
+            n_jobs: 并行进程数，默认在启用并行时取 SYSTEM_CONFIG["parallel"]["n_jobs"]，否则为 1
+
+        Returns:
+            Tuple[np.ndarray, List[float], Tuple[np.ndarray, np.ndarray]]:
+                与 optimize() 相同的 (最优解, 目标函数值, (前沿分配方案, 前沿目标值))
+        """
+        try:
+            solver = ExactSolver(
+                self.constraints, self.quadratic_objectives(),
+                tolerance=self.exact_config["tolerance"],
+                max_iterations=self.exact_config["max_iterations"],
+                feasibility_tolerance=self.exact_config["feasibility_tolerance"]
+            )
+            weights = self.weights if weights is None else weights
+            x, losses = solver.solve_weighted(weights)
+
+            if n_jobs is None:
+                n_jobs = self.parallel_config["n_jobs"] if self.parallel else 1
+            front_x, front_losses = solver.epsilon_front(
+                n_points=n_points or self.exact_config["n_points"],
+                objective=self.exact_config["objective"],
+                n_jobs=n_jobs
+            )
+            shape = (len(self.resource_types), len(self.hospital_levels))
+            return (x.reshape(shape), tuple(losses.tolist()),
+                    (front_x.reshape((-1,) + shape), front_losses))
+
+        except Exception as e:
+            self.logger.error(f"Exact optimization error: {str(e)}")
+            raise
+
+    def optimize_islands(self,
+                         n_islands: Optional[int] = None,
+                         transport=None,
+                         local_islands: Optional[List[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        岛屿模型：多个独立的 NSGA-II 种群在各自进程中进化，
+        按拓扑结构定期交换精英个体，最后合并为一个帕累托前沿。
+
+        Args:
+            n_islands: 岛屿数量，默认取 OPTIMIZER_CONFIG["islands"]["n_islands"]
+            transport: 迁移通信方式 (QueueTransport / SocketTransport)，
+                       默认按 OPTIMIZER_CONFIG["islands"]["transport"] 创建
+            local_islands: 在本机启动的岛屿编号，默认全部。其余岛屿需在其他主机上
+                           以相同的 SocketTransport 配置调用 run_island 启动。
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (前沿上的分配方案 (n, resource_type, hospital_level),
+                                           对应目标值 (n, 3))
+        """
+        island_config = OPTIMIZER_CONFIG["islands"]
+        n_islands = n_islands or island_config["n_islands"]
+        if transport is None:
+            transport = make_transport(island_config, n_islands)
+        if local_islands is None:
+            local_islands = list(range(n_islands))
+
+        optimizer_args = (self.resource_types, self.hospital_levels,
+                          self.budget_config, self.constraints)
+        base_seed = self.seed
+        transport.bind_collector()
+        context = get_context()
+        processes = [
+            context.Process(
+                target=run_island,
+                args=(island_id, n_islands, optimizer_args, island_config, transport,
+                      int(np.random.SeedSequence([base_seed, island_id]).generate_state(1)[0])),
+                daemon=True
+            )
+            for island_id in local_islands
+        ]
+        try:
+            for process in processes:
+                process.start()
+
+            # 收集各岛屿的帕累托存档 (须先于 join，避免队列阻塞)
+            results = {}
+            while len(results) < n_islands:
+                for island_id, payload in transport.poll_results(timeout=0.1):
+                    results[island_id] = payload
+                if len(results) < n_islands and processes and \
+                        not any(p.is_alive() for p in processes):
+                    for island_id, payload in transport.poll_results(timeout=1.0):
+                        results[island_id] = payload
+                    missing = sorted(set(local_islands) - set(results))
+                    if missing:
+                        raise RuntimeError(f"Islands {missing} exited without returning results")
+            for process in processes:
+                process.join()
+
+            # 合并各岛屿的存档为一个帕累托前沿
+            self.archive = self._new_archive()
+            n_received = 0
+            for island_id in sorted(results):
+                allocations, objectives = results[island_id]
+                self.archive.update(allocations, objectives)
+                n_received += len(objectives)
+            self.logger.info(
+                f"Islands merged: {n_received} archived solutions, {len(self.archive)} non-dominated"
+            )
+            return self.archive.to_arrays()
+
+        except Exception as e:
+            self.logger.error(f"Island optimization error: {str(e)}")
+            raise
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            transport.close()
+
+    def _check_convergence(self, population) -> bool:
         """检查是否收敛"""
-        fitness_values = [ind.fitness.values for ind in population]
+        _, fitness_values = self._population_arrays(population)
         std_dev = np.std(fitness_values, axis=0)
         return np.all(std_dev < self.convergence_threshold)
 
+def _spread_members(fitness: np.ndarray, candidates: np.ndarray, k: Optional[int]) -> np.ndarray:
+    """
+    从候选下标中沿第一个目标均匀选取至多 k 个 (k 为 None 时全部返回)
+
+    Args:
+        fitness: 形状为 (n, 3) 的目标值
+        candidates: 候选下标
+        k: 个数上限
+
+    Returns:
+        np.ndarray: 选中的下标
+    """
+    if k is None or len(candidates) <= k:
+        return candidates
+    ordered = candidates[np.argsort(fitness[candidates, 0], kind="stable")]
+    return ordered[np.unique(np.linspace(0, len(ordered) - 1, k).round().astype(int))]
+
+
+def migration_targets(island_id: int, n_islands: int, topology: str) -> List[int]:
+    """
+    按拓扑结构确定迁移目标岛屿
+
+    Args:
+        island_id: 当前岛屿编号
+        n_islands: 岛屿数量
+        topology: "ring" (单向环) 或 "complete" (全连接)
+
+    Returns:
+        List[int]: 目标岛屿编号
+    """
+    if n_islands <= 1:
+        return []
+    if topology == "ring":
+        return [(island_id + 1) % n_islands]
+    if topology == "complete":
+        return [j for j in range(n_islands) if j != island_id]
+    raise ValueError(f"Unknown migration topology: {topology}")
+
+
+def run_island(island_id: int,
+               n_islands: int,
+               optimizer_args: Tuple,
+               island_config: Dict,
+               transport,
+               seed: int) -> None:
+    """
+    运行单个岛屿 (在独立进程或其他主机上)
+
+    Args:
+        island_id: 岛屿编号
+        n_islands: 岛屿数量
+        optimizer_args: ResourceOptimizer 的构造参数
+                        (resource_types, hospital_levels, budget_config, constraints)
+        island_config: 岛屿配置 (migration_interval, migration_size, topology)
+        transport: 迁移通信方式
+        seed: 本岛屿的随机种子
+    """
+    # 岛屿本身即为并行单元，岛内串行评估
+    optimizer = ResourceOptimizer(*optimizer_args, seed=seed, parallel=False)
+
+    transport.bind(island_id)
+    try:
+        targets = migration_targets(island_id, n_islands, island_config["topology"])
+        interval = island_config["migration_interval"]
+        pop = optimizer._initial_population()
+        for gen in range(optimizer.n_generations):
+            pop = optimizer._next_generation(pop)
+            if (gen + 1) % interval != 0:
+                continue
+
+            # 发送精英个体 (按进化引擎的环境选择规则选出)
+            allocations, fitness = optimizer._population_arrays(pop)
+            elites = optimizer.engine.select(fitness, island_config["migration_size"])
+            message = [(allocations[i], tuple(fitness[i])) for i in elites]
+            for target in targets:
+                transport.send(target, message)
+
+            # 接收移民并与本地种群一起做环境选择
+            immigrants = [(x, f) for received in transport.receive(island_id) for x, f in received]
+            if immigrants:
+                allocations = np.concatenate([allocations, np.array([x for x, _ in immigrants])])
+                fitness = np.concatenate([fitness, np.array([f for _, f in immigrants])])
+                chosen = optimizer.engine.select(fitness, optimizer.population_size)
+                pop = optimizer._population_from_arrays(allocations[chosen], fitness[chosen])
+
+        transport.send_result(island_id, optimizer.archive.to_arrays())
+    finally:
+        transport.close()
+
+
+def _solve_scenario(task: Tuple) -> Tuple[np.ndarray, List[float], Tuple[np.ndarray, np.ndarray]]:
+    """求解单个预算情景 (供 run_scenarios 在线程或进程中调用)"""
+    resource_types, hospital_levels, budget_config, seed = task
+    optimizer = ResourceOptimizer(
+        resource_types, hospital_levels, budget_config,
+        Constraints(budget_config, hospital_levels),
+        seed=seed, parallel=False
+    )
+    return optimizer.optimize()
+
+
+def run_scenarios(budget_configs: List[Dict],
+                  resource_types: Dict,
+                  hospital_levels: Dict,
+                  backend: str = "thread",
+                  max_workers: Optional[int] = None,
+                  seeds: Optional[List[int]] = None
+                  ) -> List[Tuple[np.ndarray, List[float], Tuple[np.ndarray, np.ndarray]]]:
+    """
+    并发求解多个预算情景。每个情景使用独立的优化器实例和随机数生成器，互不干扰。
+
+    Args:
+        budget_configs: 各情景的预算配置 (结构同 BUDGET_CONFIG)
+        resource_types: 资源类型配置
+        hospital_levels: 医院等级配置
+        backend: "thread" (线程池) 或 "process" (进程池)
+        max_workers: 并发数，约定同 resolve_n_jobs，默认取 SYSTEM_CONFIG["parallel"]["n_jobs"]
+        seeds: 各情景的随机种子，默认均为 OPTIMIZER_CONFIG["random_seed"]
+
+    Returns:
+        List[Tuple]: 与 budget_configs 顺序一致的 optimize() 结果
+                     (最优解, 目标函数值, (前沿分配方案, 前沿目标值))
+    """
+    if seeds is None:
+        seeds = [OPTIMIZER_CONFIG["random_seed"]] * len(budget_configs)
+    if backend == "thread":
+        executor_class = ThreadPoolExecutor
+    elif backend == "process":
+        executor_class = ProcessPoolExecutor
+    else:
+        raise ValueError(f"Unknown scenario backend: {backend}")
+
+    n_workers = resolve_n_jobs(
+        SYSTEM_CONFIG["parallel"]["n_jobs"] if max_workers is None else max_workers
+    )
+    tasks = [(resource_types, hospital_levels, config, seed)
+             for config, seed in zip(budget_configs, seeds)]
+    with executor_class(max_workers=n_workers) as executor:
+        return list(executor.map(_solve_scenario, tasks))
+
+
+def precision_report(resource_types: Dict,
+                     hospital_levels: Dict,
+                     budget_config: Dict,
+                     constraints: Constraints,
+                     seed: Optional[int] = None,
+                     integer: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    紧凑存储的精度与内存对比：以相同随机种子分别用 float64 与紧凑存储运行 array 后端。
+
+    报告项：
+    - bytes_per_individual: 每个分配方案的字节数
+    - population_bytes: 父代 + 子代合并种群的字节数
+    - archive_bytes: 帕累托存档 (解 + 目标值) 的字节数
+    - archive_size: 存档中的解个数
+    - hypervolume: 存档超体积 (两次运行使用 float64 运行的同一归一化参考)
+    - feasible_fraction: 存档中满足全部约束的解的比例
+    - max_storage_error: float64 存档转存为该类型后重新评估，目标值的最大绝对变化
+    - seconds: 运行时间
+
+    Args:
+        resource_types: 资源类型配置
+        hospital_levels: 医院等级配置
+        budget_config: 预算配置
+        constraints: 约束条件对象
+        seed: 随机种子
+        integer: 是否同时启用整数模式 (紧凑存储为整数类型)
+
+    Returns:
+        Dict[str, Dict[str, float]]: {"float64": 报告项, "compact": 报告项}
+    """
+    report, reference, baseline = {}, None, None
+    for name, compact in (("float64", False), ("compact", True)):
+        optimizer = ResourceOptimizer(resource_types, hospital_levels, budget_config, constraints,
+                                      seed=seed, parallel=False, backend="array",
+                                      integer=integer, compact=compact)
+        started = time.perf_counter()
+        optimizer.optimize(checkpoint_path=None)
+        seconds = time.perf_counter() - started
+        if reference is None:
+            reference = optimizer.hv_reference
+            baseline = optimizer.archive.solutions
+        ideal, scale = reference
+        solutions, objectives = optimizer.archive.to_arrays()
+        stored = optimizer._store(baseline)
+        error = np.abs(optimizer._evaluate_batch(stored) - optimizer._evaluate_batch(baseline))
+        memory = optimizer.memory_usage()
+        n_variables = optimizer.constraints.n_variables
+        report[name] = {
+            "dtype": str(optimizer.storage_dtype),
+            "bytes_per_individual": n_variables * optimizer.storage_dtype.itemsize,
+            "population_bytes": 2 * optimizer.population_size * n_variables * optimizer.storage_dtype.itemsize,
+            "archive_bytes": memory["archive_solutions"] + memory["archive_objectives"],
+            "archive_size": len(objectives),
+            "hypervolume": hypervolume((objectives - ideal) / scale, np.ones(optimizer.n_objectives)),
+            "feasible_fraction": float(np.mean(constraints.is_feasible(solutions.astype(np.float64)))),
+            "max_storage_error": float(error.max(initial=0.0)),
+            "seconds": seconds
+        }
+    return report
+
+
 # 测试代码
 if __name__ == "__main__":
     from .config import RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG
@@ -224,9 +1646,10 @@ if __name__ == "__main__":
     )
     
     # 执行优化
-    best_solution, objective_values = optimizer.optimize()
+    best_solution, objective_values, (front_allocations, front_objectives) = optimizer.optimize()
     
     print("最优解:")
     print(best_solution)
     print("\n目标函数值 (效率损失, 可及性损失, 成本损失):")
     print(objective_values)
+    print(f"\n帕累托前沿: {len(front_objectives)} 个非支配解")
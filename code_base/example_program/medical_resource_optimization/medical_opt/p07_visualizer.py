@@ -23,7 +23,13 @@ class Visualizer:
         """
         try:
             plt.figure(figsize=(10, 6))
-            plt.scatter(objectives[:, 0], objectives[:, 1], c='blue', marker='o', label='Pareto Front')
+            if objectives.shape[1] > 2:
+                # 第三个目标 (成本损失) 以颜色表示
+                plt.scatter(objectives[:, 0], objectives[:, 1], c=objectives[:, 2],
+                            cmap='viridis', marker='o', label='Pareto Front')
+                plt.colorbar(label='成本损失 (Cost Loss)')
+            else:
+                plt.scatter(objectives[:, 0], objectives[:, 1], c='blue', marker='o', label='Pareto Front')
             plt.xlabel('效率损失 (Efficiency Loss)')
             plt.ylabel('可及性损失 (Accessibility Loss)')
             plt.title('Pareto Front')
@@ -67,7 +73,8 @@ class Visualizer:
         绘制目标函数值的变化趋势
 
         Args:
-            history (List[Tuple[float, float, float]]): 历史目标函数值
+            history (np.ndarray | List[Tuple[float, float, float]]): 逐代目标函数值，
+                形状为 (n_generations, 3)，如 ResourceOptimizer.get_objective_history()
             save_path (str, optional): 图像保存路径。如果为 None，则不保存。
         """
         try:
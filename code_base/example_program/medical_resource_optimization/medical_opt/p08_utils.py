@@ -2,7 +2,8 @@
 
 import logging
 import os
-from typing import Any, Dict
+import tempfile
+from typing import Any, Dict, List, Tuple
 import numpy as np
 
 def setup_logging(log_config: Dict[str, Any] = None) -> None:
@@ -67,6 +68,96 @@ def set_random_seeds(seed: int = 42) -> None:
     random.seed(seed)
     np.random.seed(seed)
 
+def save_arrays_atomic(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    """
+    以原子方式将多个数组保存为未压缩的 npz 二进制文件。
+
+    先写入同目录下的临时文件并刷新到磁盘，再用 os.replace 替换目标文件，
+    因此写入过程中崩溃不会留下损坏的文件。
+
+    Args:
+        path (str): 目标文件路径。
+        arrays (Dict[str, np.ndarray]): 数组名到数组的映射。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    ensure_directory(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def save_npy_atomic(path: str, array: np.ndarray) -> None:
+    """
+    以原子方式将单个数组保存为 npy 文件 (可用 np.load(mmap_mode="r") 内存映射读取)。
+
+    Args:
+        path (str): 目标文件路径。
+        array (np.ndarray): 要保存的数组。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    ensure_directory(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def load_arrays(path: str) -> Dict[str, np.ndarray]:
+    """
+    读取 save_arrays_atomic 保存的 npz 文件。
+
+    Args:
+        path (str): 文件路径。
+
+    Returns:
+        Dict[str, np.ndarray]: 数组名到数组的映射。
+    """
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+def load_seed_solutions(paths: List[str], shape: Tuple[int, int]) -> np.ndarray:
+    """
+    读取上次运行保存的分配方案，作为热启动种子。
+
+    支持 np.savetxt 保存的单个分配矩阵 (.csv) 和含 "solutions" 数组的存档 (.npz)；
+    不存在或形状不符的文件被跳过。
+
+    Args:
+        paths (List[str]): 文件路径，按优先级排列。
+        shape (Tuple[int, int]): 分配矩阵形状 (resource_type, hospital_level)。
+
+    Returns:
+        np.ndarray: 形状为 (n, resource_type, hospital_level) 的种子。
+    """
+    seeds = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        try:
+            if path.endswith(".npz"):
+                solutions = load_arrays(path)["solutions"]
+            else:
+                solutions = np.loadtxt(path, delimiter=",", ndmin=2)
+            seeds.append(np.asarray(solutions, dtype=float).reshape((-1,) + tuple(shape)))
+        except (KeyError, ValueError) as e:
+            logging.warning(f"跳过无法作为种子的文件 {path}: {str(e)}")
+    if not seeds:
+        return np.empty((0,) + tuple(shape))
+    return np.concatenate(seeds)
+
 # 示例使用
 if __name__ == "__main__":
     setup_logging()
@@ -0,0 +1,527 @@
+"""
+并行评估模块 (p09_parallel.py)
+使用常驻进程池分块评估种群适应度。
+
+种群与适应度保存在 multiprocessing.shared_memory 缓冲区中，
+进程间只传递缓冲区名称和下标区间，不再序列化整个数组。
+评估函数既可以是单个体函数，也可以是向量化的批量函数 (vectorized=True，整块一次评估)。
+每个分块使用由 (随机种子, 调用序号, 起始下标) 派生的独立随机流，
+因此结果与分块被哪个工作进程执行无关，可复现。
+
+另提供岛屿模型的迁移通信：进程队列 (单机) 与 TCP (可跨主机)。
+"""
+
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import weakref
+from multiprocessing import get_context, resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 工作进程内的状态：评估函数、个体形状及已连接的共享内存
+_WORKER_STATE: Dict = {}
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """
+    解析并行进程数 (与 joblib 约定一致)
+
+    Args:
+        n_jobs: 正数表示进程数；-1 表示全部 CPU 核心，-2 表示全部核心减一，以此类推。
+
+    Returns:
+        int: 实际进程数 (至少为 1)。
+    """
+    n_cpus = os.cpu_count() or 1
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(n_cpus + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    在工作进程中连接共享内存。
+
+    工作进程与主进程共用同一个资源跟踪器，重复注册不会导致提前回收；
+    缓冲区的释放只由主进程负责。
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(evaluate: Callable, individual_shape: Tuple[int, ...], vectorized: bool = False) -> None:
+    """工作进程初始化"""
+    _WORKER_STATE["evaluate"] = evaluate
+    _WORKER_STATE["individual_shape"] = individual_shape
+    _WORKER_STATE["vectorized"] = vectorized
+    _WORKER_STATE["segments"] = {}
+
+
+def _drop_stale_segments(current: Sequence[str]) -> None:
+    """
+    关闭不在当前任务中的已缓存共享内存
+
+    主进程扩容缓冲区时会 unlink 旧缓冲区，但工作进程的映射要等 close 后才释放，
+    否则每次扩容都会泄漏一段映射。
+    """
+    segments = _WORKER_STATE["segments"]
+    for name in [name for name in segments if name not in current]:
+        segments.pop(name).close()
+
+
+def _buffer(name: str, shape: Tuple[int, int]) -> np.ndarray:
+    """获取 (并缓存) 共享内存缓冲区上的数组视图"""
+    segments = _WORKER_STATE["segments"]
+    if name not in segments:
+        segments[name] = _attach(name)
+    return np.ndarray(shape, dtype=np.float64, buffer=segments[name].buf)
+
+
+def _evaluate_chunk(task: Tuple) -> Tuple[int, float]:
+    """
+    评估种群中的一个分块，结果直接写入共享适应度缓冲区
+
+    Args:
+        task: (种群缓冲区名, 适应度缓冲区名, 缓冲区行数, 变量数, 目标数,
+               起始下标, 结束下标, 分块随机种子)
+
+    Returns:
+        Tuple[int, float]: 评估的个体数及评估耗时 (秒)
+    """
+    x_name, f_name, capacity, n_variables, n_objectives, start, stop, seed = task
+    _drop_stale_segments((x_name, f_name))
+    population = _buffer(x_name, (capacity, n_variables))
+    fitness = _buffer(f_name, (capacity, n_objectives))
+
+    # 分块独立随机流
+    random.seed(seed)
+    np.random.seed(seed)
+
+    evaluate = _WORKER_STATE["evaluate"]
+    shape = _WORKER_STATE["individual_shape"]
+    started = time.perf_counter()
+    if _WORKER_STATE["vectorized"]:
+        fitness[start:stop] = evaluate(population[start:stop].reshape((-1,) + shape))
+    else:
+        for row in range(start, stop):
+            fitness[row] = evaluate(population[row].reshape(shape))
+    return stop - start, time.perf_counter() - started
+
+
+def _release(pool, segments: List[shared_memory.SharedMemory]) -> None:
+    """关闭进程池并释放共享内存"""
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+    for shm in segments:
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ParallelEvaluator:
+    """基于共享内存的常驻进程池适应度评估器"""
+
+    def __init__(self,
+                 evaluate: Callable,
+                 individual_shape: Tuple[int, ...],
+                 n_objectives: int,
+                 n_jobs: int = -1,
+                 seed: Optional[int] = None,
+                 chunks_per_worker: int = 4,
+                 min_batch_size: int = 0,
+                 vectorized: bool = False,
+                 min_batch_seconds: float = 0.0):
+        """
+        初始化并行评估器
+
+        Args:
+            evaluate: 单个体评估函数，输入为 individual_shape 形状的数组，
+                      返回长度为 n_objectives 的目标值序列。需可被 pickle
+                      (spawn 启动方式下传递给工作进程)。
+            individual_shape: 个体形状，如 (resource_type, hospital_level)
+            n_objectives: 目标个数
+            n_jobs: 进程数，约定同 resolve_n_jobs
+            seed: 随机种子，用于派生各分块的随机流
+            chunks_per_worker: 每个进程平均分到的分块数，用于负载均衡
+            min_batch_size: 批量小于该值时在主进程内串行评估，避免进程间开销
+            vectorized: evaluate 为批量函数，输入形状为 (k, *individual_shape)，
+                        返回 (k, n_objectives)；每个分块只调用一次
+            min_batch_seconds: 按实测的单个体评估耗时估计，整批串行评估不足该时长时
+                               在主进程内串行评估；首批串行评估以取得耗时。0 表示不按耗时判断
+        """
+        self.logger = logging.getLogger(__name__)
+        self.evaluate_fn = evaluate
+        self.individual_shape = tuple(individual_shape)
+        self.n_variables = int(np.prod(self.individual_shape))
+        self.n_objectives = n_objectives
+        self.n_jobs = resolve_n_jobs(n_jobs)
+        self.seed = 0 if seed is None else seed
+        self.chunks_per_worker = chunks_per_worker
+        self.min_batch_size = min_batch_size
+        self.vectorized = vectorized
+        self.min_batch_seconds = min_batch_seconds
+        # 单个体评估耗时的估计 (秒)，由串行评估与工作进程的计时更新
+        self._row_seconds: Optional[float] = None
+
+        self._pool = None
+        self._capacity = 0
+        self._x_shm = None
+        self._f_shm = None
+        self._segments: List[shared_memory.SharedMemory] = []
+        self._n_calls = 0
+        self._finalizer = weakref.finalize(self, _release, None, self._segments)
+
+    def _ensure_pool(self) -> None:
+        """惰性创建常驻进程池"""
+        if self._pool is None:
+            # 先启动资源跟踪器，使工作进程继承同一个跟踪器
+            resource_tracker.ensure_running()
+            self._pool = get_context().Pool(
+                processes=self.n_jobs,
+                initializer=_init_worker,
+                initargs=(self.evaluate_fn, self.individual_shape, self.vectorized)
+            )
+            self._finalizer.detach()
+            self._finalizer = weakref.finalize(self, _release, self._pool, self._segments)
+
+    def _ensure_capacity(self, n_rows: int) -> None:
+        """确保共享缓冲区至少能容纳 n_rows 个个体"""
+        if n_rows <= self._capacity:
+            return
+        capacity = max(n_rows, 2 * self._capacity)
+        for shm in (self._x_shm, self._f_shm):
+            if shm is not None:
+                self._segments.remove(shm)
+                shm.close()
+                shm.unlink()
+        self._x_shm = shared_memory.SharedMemory(create=True, size=capacity * self.n_variables * 8)
+        self._f_shm = shared_memory.SharedMemory(create=True, size=capacity * self.n_objectives * 8)
+        self._segments.extend([self._x_shm, self._f_shm])
+        self._capacity = capacity
+
+    def _chunk_seed(self, start: int) -> int:
+        """由 (种子, 调用序号, 起始下标) 派生分块随机种子"""
+        sequence = np.random.SeedSequence([self.seed, self._n_calls, start])
+        return int(sequence.generate_state(1)[0])
+
+    def _serial(self, n: int) -> bool:
+        """
+        判断 n 个个体的批量是否在主进程内串行评估
+
+        进程池每次分派约有 1-2 ms 的固定开销；向量化评估整个种群通常只需约 0.1 ms，
+        此时串行评估更快。尚无耗时估计时先串行评估一次。
+        """
+        if self.n_jobs == 1 or n < max(self.min_batch_size, 2):
+            return True
+        if self.min_batch_seconds <= 0:
+            return False
+        return self._row_seconds is None or self._row_seconds * n < self.min_batch_seconds
+
+    def evaluate(self, population: np.ndarray) -> np.ndarray:
+        """
+        评估一批个体
+
+        Args:
+            population: 形状为 (n, *individual_shape) 或 (n, n_variables) 的数组
+
+        Returns:
+            np.ndarray: 形状为 (n, n_objectives) 的目标值
+        """
+        original = np.asarray(population)
+        population = original.astype(np.float64, copy=False).reshape(-1, self.n_variables)
+        n = population.shape[0]
+        self._n_calls += 1
+        if n == 0:
+            return np.empty((0, self.n_objectives))
+
+        if self._serial(n):
+            started = time.perf_counter()
+            if self.vectorized:
+                # 串行时直接评估原数组 (保持存储精度下的结果与不启用并行时一致)
+                fitness = np.asarray(self.evaluate_fn(original.reshape((n,) + self.individual_shape)),
+                                     dtype=np.float64)
+            else:
+                fitness = np.array([
+                    self.evaluate_fn(row.reshape(self.individual_shape)) for row in population
+                ], dtype=np.float64)
+            self._row_seconds = (time.perf_counter() - started) / n
+            return fitness
+
+        self._ensure_pool()
+        self._ensure_capacity(n)
+        x_buffer = np.ndarray((self._capacity, self.n_variables), dtype=np.float64,
+                              buffer=self._x_shm.buf)
+        f_buffer = np.ndarray((self._capacity, self.n_objectives), dtype=np.float64,
+                              buffer=self._f_shm.buf)
+        x_buffer[:n] = population
+
+        n_chunks = min(n, self.n_jobs * self.chunks_per_worker)
+        bounds = np.linspace(0, n, n_chunks + 1).astype(int)
+        tasks = [
+            (self._x_shm.name, self._f_shm.name, self._capacity, self.n_variables,
+             self.n_objectives, int(start), int(stop), self._chunk_seed(int(start)))
+            for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+        ]
+        seconds = sum(elapsed for _, elapsed in self._pool.imap_unordered(_evaluate_chunk, tasks))
+        self._row_seconds = seconds / n
+        return f_buffer[:n].copy()
+
+    def map(self, func: Callable, individuals: Sequence) -> List[Tuple[float, ...]]:
+        """
+        与 toolbox.map 兼容的接口。func 为构造时传入的评估函数 (或其 partial 包装) 时
+        走共享内存并行评估，否则退化为内置 map。
+
+        Args:
+            func: 评估函数
+            individuals: 个体序列
+
+        Returns:
+            List[Tuple[float, ...]]: 各个体的目标值
+        """
+        individuals = list(individuals)
+        if getattr(func, "func", func) != self.evaluate_fn:
+            return list(map(func, individuals))
+        if not individuals:
+            return []
+        fitness = self.evaluate(np.stack([np.asarray(ind) for ind in individuals]))
+        return [tuple(row) for row in fitness]
+
+    def close(self) -> None:
+        """关闭进程池并释放共享内存"""
+        self._finalizer()
+        self._segments.clear()
+        self._pool = None
+        self._x_shm = self._f_shm = None
+        self._capacity = 0
+
+    def __enter__(self) -> "ParallelEvaluator":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class QueueTransport:
+    """
+    基于进程队列的岛屿迁移通信 (单机多进程)
+
+    每个岛屿一个收件队列，另有一个结果队列供主进程收集最终结果 (帕累托存档)。
+    迁移是尽力而为的：岛屿结束时未读取的移民直接丢弃。
+    """
+
+    def __init__(self, n_islands: int, context=None):
+        """
+        初始化队列通信
+
+        Args:
+            n_islands: 岛屿数量
+            context: multiprocessing 上下文，默认使用全局默认上下文
+        """
+        context = context or get_context()
+        self._inboxes = [context.Queue() for _ in range(n_islands)]
+        self._results = context.Queue()
+
+    def bind(self, island_id: int) -> None:
+        """岛屿进程启动时调用 (队列无需绑定)"""
+
+    def bind_collector(self) -> None:
+        """主进程开始收集结果前调用 (队列无需绑定)"""
+
+    def send(self, target: int, message) -> None:
+        """向目标岛屿发送移民"""
+        self._inboxes[target].put(message)
+
+    def receive(self, island_id: int) -> List:
+        """取出本岛屿收件队列中的全部移民 (不阻塞)"""
+        messages = []
+        while True:
+            try:
+                messages.append(self._inboxes[island_id].get_nowait())
+            except queue.Empty:
+                return messages
+
+    def send_result(self, island_id: int, payload) -> None:
+        """发送岛屿最终结果"""
+        self._results.put((island_id, payload))
+
+    def poll_results(self, timeout: float = 0.0) -> List:
+        """等待至多 timeout 秒，返回已到达的 (岛屿编号, 种群) 列表"""
+        results = []
+        try:
+            results.append(self._results.get(timeout=timeout))
+            while True:
+                results.append(self._results.get_nowait())
+        except queue.Empty:
+            return results
+
+    def close(self) -> None:
+        """岛屿退出时不等待收件队列中的移民写出，避免阻塞进程退出"""
+        for inbox in self._inboxes:
+            inbox.cancel_join_thread()
+
+
+class SocketTransport:
+    """
+    基于 TCP 的岛屿迁移通信，岛屿可分布在多台主机上
+
+    每个岛屿在 addresses[island_id] 上监听，后台线程把收到的消息放入本地收件箱；
+    主进程在 collector_address 上监听各岛屿的最终结果。消息通过
+    multiprocessing.connection 以 authkey 认证并序列化传输。
+    """
+
+    def __init__(self,
+                 addresses: List[Tuple[str, int]],
+                 collector_address: Tuple[str, int],
+                 authkey: bytes = b"medical_opt",
+                 retries: int = 20,
+                 retry_delay: float = 0.05):
+        """
+        初始化 TCP 通信
+
+        Args:
+            addresses: 各岛屿的 (主机, 端口)
+            collector_address: 主进程收集结果的 (主机, 端口)
+            authkey: 连接认证密钥
+            retries: 目标尚未监听时的重试次数
+            retry_delay: 重试间隔 (秒)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.addresses = [tuple(address) for address in addresses]
+        self.collector_address = tuple(collector_address)
+        self.authkey = authkey
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._listener = None
+        self._inbox: queue.Queue = queue.Queue()
+
+    @classmethod
+    def localhost(cls, n_islands: int, base_port: int = 50000, **kwargs) -> "SocketTransport":
+        """在本机连续端口上创建通信 (岛屿 base_port + i，收集端 base_port + n_islands)"""
+        addresses = [("127.0.0.1", base_port + i) for i in range(n_islands)]
+        return cls(addresses, ("127.0.0.1", base_port + n_islands), **kwargs)
+
+    def __getstate__(self) -> Dict:
+        """传给子进程时不携带监听器和收件箱"""
+        state = self.__dict__.copy()
+        state["_listener"] = None
+        state["_inbox"] = None
+        state.pop("_stopped", None)
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._inbox = queue.Queue()
+
+    def _listen(self, address: Tuple[str, int]) -> None:
+        """在 address 上监听，并在后台线程中接收消息"""
+        self._address = address
+        self._stopped = threading.Event()
+        self._listener = Listener(address, authkey=self.authkey)
+        listener, inbox, stopped = self._listener, self._inbox, self._stopped
+
+        def accept_loop():
+            while not stopped.is_set():
+                try:
+                    with listener.accept() as conn:
+                        inbox.put(conn.recv())
+                except Exception as e:
+                    if stopped.is_set():
+                        return
+                    self.logger.warning(f"Dropped incoming message: {str(e)}")
+
+        threading.Thread(target=accept_loop, daemon=True).start()
+
+    def _deliver(self, address: Tuple[str, int], message) -> bool:
+        """发送一条消息，目标尚未监听时重试"""
+        for _ in range(self.retries):
+            try:
+                with Client(address, authkey=self.authkey) as conn:
+                    conn.send(message)
+                return True
+            except ConnectionRefusedError:
+                time.sleep(self.retry_delay)
+        return False
+
+    def bind(self, island_id: int) -> None:
+        """岛屿进程启动时在自己的地址上监听"""
+        self._listen(self.addresses[island_id])
+
+    def bind_collector(self) -> None:
+        """主进程在收集端地址上监听"""
+        self._listen(self.collector_address)
+
+    def send(self, target: int, message) -> None:
+        """向目标岛屿发送移民 (目标不可达时丢弃)"""
+        if not self._deliver(self.addresses[target], message):
+            self.logger.warning(f"Island {target} unreachable, migration dropped")
+
+    def receive(self, island_id: int) -> List:
+        """取出收件箱中的全部移民 (不阻塞)"""
+        messages = []
+        while True:
+            try:
+                messages.append(self._inbox.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def send_result(self, island_id: int, payload) -> None:
+        """向收集端发送岛屿最终结果"""
+        if not self._deliver(self.collector_address, (island_id, payload)):
+            raise ConnectionError(f"Collector {self.collector_address} unreachable")
+
+    def poll_results(self, timeout: float = 0.0) -> List:
+        """等待至多 timeout 秒，返回已到达的 (岛屿编号, 种群) 列表"""
+        results = []
+        try:
+            results.append(self._inbox.get(timeout=timeout))
+            while True:
+                results.append(self._inbox.get_nowait())
+        except queue.Empty:
+            return results
+
+    def close(self) -> None:
+        """关闭监听器 (先以一次空连接唤醒阻塞在 accept 上的后台线程)"""
+        if self._listener is not None:
+            self._stopped.set()
+            try:
+                Client(self._address, authkey=self.authkey).close()
+            except OSError:
+                pass
+            self._listener.close()
+            self._listener = None
+
+
+def make_transport(island_config: Dict, n_islands: int):
+    """
+    按配置创建岛屿迁移通信
+
+    Args:
+        island_config: OPTIMIZER_CONFIG["islands"]
+        n_islands: 岛屿数量
+
+    Returns:
+        QueueTransport 或 SocketTransport
+    """
+    kind = island_config["transport"]
+    if kind == "queue":
+        return QueueTransport(n_islands)
+    if kind == "socket":
+        authkey = island_config["authkey"].encode()
+        if island_config.get("addresses"):
+            return SocketTransport(island_config["addresses"],
+                                   island_config["collector_address"], authkey=authkey)
+        return SocketTransport.localhost(n_islands, island_config["base_port"], authkey=authkey)
+    raise ValueError(f"Unknown migration transport: {kind}")
@@ -0,0 +1,342 @@
+"""
+帕累托存档模块 (p10_archive.py)
+维护优化过程中发现的全部非支配解，并提供快速非支配筛选与拥挤距离计算。
+
+三目标情形使用 Kung 等人的扫描算法：按第一个目标排序后依次处理，
+用按第二目标有序的二维"阶梯"记录已处理的非支配点，每个点的支配检验
+和插入均为 O(log n) 次比较，总体 O(n log n)，远低于两两比较的 O(n^2)。
+超体积指标沿用同样的阶梯扫描。
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def _unique_rows(objectives: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按字典序排序并去除重复行 (重复时保留下标最小者)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (唯一行在原数组中的下标 (按字典序), 原数组每行对应的唯一行序号)
+    """
+    order = np.lexsort(objectives.T[::-1])
+    sorted_objectives = objectives[order]
+    is_new = np.ones(len(order), dtype=bool)
+    is_new[1:] = np.any(sorted_objectives[1:] != sorted_objectives[:-1], axis=1)
+    inverse = np.empty(len(order), dtype=int)
+    inverse[order] = np.cumsum(is_new) - 1
+    return order[is_new], inverse
+
+
+def _sweep_2d(points: np.ndarray) -> np.ndarray:
+    """二维非支配筛选 (输入已按字典序排序且无重复)：第二目标严格小于此前最小值者保留"""
+    previous_min = np.minimum.accumulate(np.concatenate([[np.inf], points[:-1, 1]]))
+    return points[:, 1] < previous_min
+
+
+def _sweep_3d(points: np.ndarray) -> np.ndarray:
+    """三维非支配筛选 (输入已按字典序排序且无重复)，Kung 阶梯扫描"""
+    keep = np.zeros(len(points), dtype=bool)
+    stair_f2 = []      # 阶梯上的第二目标，升序
+    stair_neg_f3 = []  # 阶梯上的第三目标取负，升序 (即第三目标降序)
+    for idx, (_, f2, f3) in enumerate(points.tolist()):
+        # 第二目标不超过 f2 的阶梯点中第三目标最小者
+        k = bisect_right(stair_f2, f2) - 1
+        if k >= 0 and -stair_neg_f3[k] <= f3:
+            continue
+        keep[idx] = True
+        # 删除被新点在 (f2, f3) 上支配的阶梯点后插入
+        start = bisect_left(stair_f2, f2)
+        stop = bisect_right(stair_neg_f3, -f3, lo=start)
+        stair_f2[start:stop] = [f2]
+        stair_neg_f3[start:stop] = [-f3]
+    return keep
+
+
+def _sweep_nd(points: np.ndarray) -> np.ndarray:
+    """
+    任意维非支配筛选 (输入已按字典序排序且无重复)。
+
+    排序后只可能被前面的点支配，因此只需与当前的非支配集合比较 (ENS 思路)。
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    front = np.empty((0, points.shape[1]))
+    for idx, point in enumerate(points):
+        if len(front) and np.any(np.all(front <= point, axis=1)):
+            continue
+        keep[idx] = True
+        front = np.vstack([front, point])
+    return keep
+
+
+def non_dominated_mask(objectives: np.ndarray) -> np.ndarray:
+    """
+    求非支配解的掩码 (最小化)。目标值完全相同的点只保留第一个。
+
+    Args:
+        objectives (np.ndarray): 形状为 (n, k) 的目标值。
+
+    Returns:
+        np.ndarray: 形状为 (n,) 的布尔数组。
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    mask = np.zeros(len(objectives), dtype=bool)
+    if len(objectives) == 0:
+        return mask
+    unique_idx, _ = _unique_rows(objectives)
+    points = objectives[unique_idx]
+    n_objectives = objectives.shape[1]
+    if n_objectives == 1:
+        keep = np.arange(len(points)) == 0
+    elif n_objectives == 2:
+        keep = _sweep_2d(points)
+    elif n_objectives == 3:
+        keep = _sweep_3d(points)
+    else:
+        keep = _sweep_nd(points)
+    mask[unique_idx[keep]] = True
+    return mask
+
+
+def _rank_3d(points: np.ndarray) -> np.ndarray:
+    """
+    三维非支配排序 (输入已按字典序排序且无重复)。
+
+    每个前沿维护一个 Kung 阶梯；若点被第 f 层支配则必被第 f-1 层支配，
+    故可二分查找第一个不支配它的前沿，总体 O(n log n log F)。
+    """
+    ranks = np.empty(len(points), dtype=int)
+    fronts = []  # 每层前沿的 (第二目标升序, 第三目标取负升序)
+    for idx, (_, f2, f3) in enumerate(points.tolist()):
+        lo, hi = 0, len(fronts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            stair_f2, stair_neg_f3 = fronts[mid]
+            k = bisect_right(stair_f2, f2) - 1
+            if k >= 0 and -stair_neg_f3[k] <= f3:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(fronts):
+            fronts.append(([], []))
+        ranks[idx] = lo
+        stair_f2, stair_neg_f3 = fronts[lo]
+        start = bisect_left(stair_f2, f2)
+        stop = bisect_right(stair_neg_f3, -f3, lo=start)
+        stair_f2[start:stop] = [f2]
+        stair_neg_f3[start:stop] = [-f3]
+    return ranks
+
+
+def non_dominated_ranks(objectives: np.ndarray) -> np.ndarray:
+    """
+    快速非支配排序 (最小化)，目标值完全相同的点位于同一层前沿。
+
+    Args:
+        objectives (np.ndarray): 形状为 (n, k) 的目标值。
+
+    Returns:
+        np.ndarray: 形状为 (n,) 的前沿序号，0 为第一前沿。
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    if len(objectives) == 0:
+        return np.empty(0, dtype=int)
+    unique_idx, inverse = _unique_rows(objectives)
+    points = objectives[unique_idx]
+    n_objectives = objectives.shape[1]
+    if n_objectives <= 3:
+        # 不足三个目标时补零列，沿用三维扫描
+        padded = np.zeros((len(points), 3))
+        padded[:, :n_objectives] = points
+        ranks = _rank_3d(padded)
+    else:
+        ranks = np.empty(len(points), dtype=int)
+        remaining = np.arange(len(points))
+        rank = 0
+        while len(remaining):
+            keep = _sweep_nd(points[remaining])
+            ranks[remaining[keep]] = rank
+            remaining = remaining[~keep]
+            rank += 1
+    return ranks[inverse]
+
+
+def crowding_distance(objectives: np.ndarray) -> np.ndarray:
+    """
+    拥挤距离 (NSGA-II)，各目标按取值范围归一化，边界点为无穷大。
+
+    Args:
+        objectives (np.ndarray): 形状为 (n, k) 的目标值。
+
+    Returns:
+        np.ndarray: 形状为 (n,) 的拥挤距离。
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    n, k = objectives.shape
+    distance = np.zeros(n)
+    if n <= 2:
+        distance[:] = np.inf
+        return distance
+    order = np.argsort(objectives, axis=0, kind="stable")
+    sorted_objectives = np.take_along_axis(objectives, order, axis=0)
+    ranges = sorted_objectives[-1] - sorted_objectives[0]
+    ranges[ranges == 0] = 1.0
+    gaps = (sorted_objectives[2:] - sorted_objectives[:-2]) / ranges
+    for m in range(k):
+        distance[order[1:-1, m]] += gaps[:, m]
+        distance[order[[0, -1], m]] = np.inf
+    return distance
+
+
+def select_nsga2(objectives: np.ndarray, k: int) -> np.ndarray:
+    """
+    NSGA-II 环境选择：按前沿序号逐层选入，最后一层按拥挤距离从大到小截取。
+
+    Args:
+        objectives (np.ndarray): 形状为 (n, m) 的目标值。
+        k (int): 选出的个数。
+
+    Returns:
+        np.ndarray: 被选中个体的下标。
+    """
+    ranks = non_dominated_ranks(objectives)
+    order = np.argsort(ranks, kind="stable")
+    if k >= len(order):
+        return order
+    last_rank = ranks[order[k - 1]]
+    chosen = order[ranks[order] < last_rank]
+    last_front = np.flatnonzero(ranks == last_rank)
+    distance = crowding_distance(objectives[last_front])
+    n_rest = k - len(chosen)
+    return np.concatenate([chosen, last_front[np.argsort(-distance, kind="stable")[:n_rest]]])
+
+
+def _hypervolume_3d(points: np.ndarray, reference: np.ndarray) -> float:
+    """
+    三维超体积 (输入各点均严格优于参考点)。
+
+    按第三目标升序扫描，维护 (f1, f2) 平面上的二维阶梯及其支配面积；
+    每插入一个点只局部更新被它覆盖的阶梯段，总体 O(n log n) (删除操作均摊)。
+    """
+    r1, r2, r3 = reference.tolist()
+    points = points[np.argsort(points[:, 2], kind="stable")]
+    xs, ys = [], []  # 阶梯：f1 升序、f2 降序
+    area, volume = 0.0, 0.0
+    f3_values = points[:, 2].tolist() + [r3]
+    for idx, (a, b, _) in enumerate(points.tolist()):
+        k = bisect_right(xs, a) - 1
+        if not (k >= 0 and ys[k] <= b):
+            start = k if (k >= 0 and xs[k] == a) else k + 1
+            stop = start
+            while stop < len(xs) and ys[stop] >= b:
+                stop += 1
+            x_next = xs[stop] if stop < len(xs) else r1
+            # 原阶梯在 [a, x_next] 上的面积
+            height = ys[start - 1] if start >= 1 else r2
+            if start == stop:
+                old = (x_next - a) * (r2 - height)
+            else:
+                old = (xs[start] - a) * (r2 - height)
+                for t in range(start, stop):
+                    right = xs[t + 1] if t + 1 < stop else x_next
+                    old += (right - xs[t]) * (r2 - ys[t])
+            area += (x_next - a) * (r2 - b) - old
+            xs[start:stop] = [a]
+            ys[start:stop] = [b]
+        volume += area * (f3_values[idx + 1] - f3_values[idx])
+    return volume
+
+
+def hypervolume(objectives: np.ndarray, reference: np.ndarray) -> float:
+    """
+    超体积指标 (最小化)：被点集支配、且支配参考点的区域的体积。
+
+    不严格优于参考点的点不贡献体积；两个目标时按二维阶梯计算，三个目标时用扫描算法。
+
+    Args:
+        objectives (np.ndarray): 形状为 (n, k) 的目标值，k 为 2 或 3。
+        reference (np.ndarray): 形状为 (k,) 的参考点。
+
+    Returns:
+        float: 超体积。
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    reference = np.asarray(reference, dtype=float)
+    n_objectives = len(reference)
+    if n_objectives not in (2, 3):
+        raise ValueError(f"hypervolume supports 2 or 3 objectives, got {n_objectives}")
+    points = objectives[np.all(objectives < reference, axis=1)]
+    if len(points) == 0:
+        return 0.0
+    if n_objectives == 2:
+        points = np.column_stack([points, np.zeros(len(points))])
+        reference = np.append(reference, 1.0)
+    return _hypervolume_3d(points, reference)
+
+
+class ParetoArchive:
+    """有界的外部帕累托存档，增量更新，超出容量时按拥挤距离截断"""
+
+    def __init__(self, capacity: int = 10000, n_objectives: int = 3, dtype=np.float64):
+        """
+        初始化存档
+
+        Args:
+            capacity: 存档容量上限
+            n_objectives: 目标个数
+            dtype: 解的存储类型 (紧凑模式下为 float32 或整数类型)，目标值始终为 float64
+        """
+        self.logger = logging.getLogger(__name__)
+        self.capacity = capacity
+        self.n_objectives = n_objectives
+        self.dtype = np.dtype(dtype)
+        self.solutions: Optional[np.ndarray] = None
+        self.objectives = np.empty((0, n_objectives))
+
+    def __len__(self) -> int:
+        return len(self.objectives)
+
+    def update(self, solutions: np.ndarray, objectives: np.ndarray) -> int:
+        """
+        将一批解并入存档，只保留非支配解
+
+        Args:
+            solutions: 形状为 (n, ...) 的解 (如资源分配矩阵)
+            objectives: 形状为 (n, k) 的目标值
+
+        Returns:
+            int: 本批中进入存档的解的个数
+        """
+        solutions = np.asarray(solutions, dtype=self.dtype)
+        objectives = np.asarray(objectives, dtype=float).reshape(-1, self.n_objectives)
+        if len(objectives) == 0:
+            return 0
+        if self.solutions is None:
+            self.solutions = np.empty((0,) + solutions.shape[1:], dtype=self.dtype)
+
+        n_old = len(self.objectives)
+        all_solutions = np.concatenate([self.solutions, solutions])
+        all_objectives = np.concatenate([self.objectives, objectives])
+        # 已有存档成员排在前面，目标值重复时优先保留旧成员
+        mask = non_dominated_mask(all_objectives)
+        keep = np.flatnonzero(mask)
+
+        if len(keep) > self.capacity:
+            self.logger.debug(f"存档超出容量 {self.capacity}，按拥挤距离截断 {len(keep) - self.capacity} 个解")
+            distance = crowding_distance(all_objectives[keep])
+            keep = np.sort(keep[np.argsort(-distance, kind="stable")[:self.capacity]])
+
+        self.solutions = all_solutions[keep]
+        self.objectives = all_objectives[keep]
+        return int(np.sum(keep >= n_old))
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (存档中的解, 对应目标值) 的副本
+        """
+        solutions = self.solutions if self.solutions is not None else np.empty((0,), dtype=self.dtype)
+        return solutions.copy(), self.objectives.copy()
@@ -0,0 +1,398 @@
+"""
+精确求解模块 (p11_exact.py)
+三个损失函数均为线性约束下的凸二次函数 (最小二乘形式)，可直接用 QP 求解：
+- 加权和：给定 AHP 权重，求加权损失的最优解
+- ε-约束：固定一个目标为优化目标，其余目标取 ε 上界网格，扫描得到帕累托前沿
+- 整数：以 QP 松弛为下界做最优优先的分支定界，求加权和问题的整数最优解 (小规模实例)
+
+每个子问题用 SLSQP 求解 (规模很小，毫秒级)；同一行网格点依次求解并以前一个解热启动，
+不同行之间并行求解。所得前沿可作为进化算法结果的参考前沿。
+SLSQP 未收敛或解违反约束时，加权和/ε-约束求解抛出 RuntimeError，ε 扫描跳过该网格点。
+"""
+
+import heapq
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog, minimize
+
+from .p05_constraints import Constraints
+from .p09_parallel import resolve_n_jobs
+from .p10_archive import non_dominated_mask
+
+
+class ExactSolver:
+    """凸二次目标 + 线性约束的确定性求解器"""
+
+    def __init__(self,
+                 constraints: Constraints,
+                 objectives: List[Tuple[np.ndarray, np.ndarray]],
+                 tolerance: float = 1e-9,
+                 max_iterations: int = 200,
+                 feasibility_tolerance: float = 1e-6):
+        """
+        初始化求解器
+
+        Args:
+            constraints: 约束条件对象 (使用其编译后的稀疏线性系统)
+            objectives: 各损失函数的最小二乘形式 [(G, h), ...]，
+                        损失为 mean((G @ x - h) ** 2)
+            tolerance: SLSQP 收敛阈值
+            max_iterations: SLSQP 最大迭代次数
+            feasibility_tolerance: 解的最大约束违反量 (线性约束按行归一化) 超过该值时视为求解失败
+        """
+        self.logger = logging.getLogger(__name__)
+        self.constraints = constraints
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.feasibility_tolerance = feasibility_tolerance
+
+        # 损失 L(x) = x'Qx/2 + c'x + r
+        self.n_objectives = len(objectives)
+        self.designs = [G for G, _ in objectives]
+        self.quadratic = np.stack([2 * G.T @ G / len(h) for G, h in objectives])
+        self.linear = np.stack([-2 * G.T @ h / len(h) for G, h in objectives])
+        self.constant = np.array([h @ h / len(h) for _, h in objectives])
+
+        self.relaxed_rows: List[str] = []
+        self._setup_constraints()
+
+    def _setup_constraints(self) -> None:
+        """
+        准备线性约束；整体不可行时放宽需求约束 (需求缺口已由可及性损失惩罚)。
+        需求约束包括内置需求行与名称以 "demand[" 开头的附加行 (如多期模型的存量需求)
+        """
+        c = self.constraints
+        A_ub, b_ub = c.A_ub.tocsr(), c.b_ub.copy()
+        keep = np.ones(A_ub.shape[0], dtype=bool)
+        if not self._is_feasible(A_ub, b_ub):
+            keep[[name.startswith("demand[") for name in c.ub_names]] = False
+            self.relaxed_rows = [c.ub_names[r] for r in np.flatnonzero(~keep)]
+            self.logger.warning(
+                f"Constraints are infeasible; relaxing demand rows {self.relaxed_rows}"
+            )
+            if not self._is_feasible(A_ub[keep], b_ub[keep]):
+                raise ValueError("Constraints remain infeasible after relaxing demand rows")
+        # 按行范数归一化，使 SLSQP 的约束容差与预算量级无关
+        self.A_ub, self.b_ub = self._normalize_rows(A_ub[keep].toarray(), b_ub[keep])
+        self.A_eq, self.b_eq = self._normalize_rows(c.A_eq.toarray(), c.b_eq)
+        self.bounds = self._bound_list(c.lower, c.upper)
+
+    @staticmethod
+    def _bound_list(lower: np.ndarray, upper: np.ndarray) -> List[Tuple]:
+        """变量界数组 -> SLSQP 格式 (无穷上界记为 None)"""
+        return list(zip(lower, np.where(np.isfinite(upper), upper, None)))
+
+    def _violation(self, x: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> float:
+        """线性约束 (按行归一化) 与变量界的最大违反量"""
+        return max(np.max(self.A_ub @ x - self.b_ub, initial=0.0),
+                   np.max(np.abs(self.A_eq @ x - self.b_eq), initial=0.0),
+                   np.max(lower - x, initial=0.0),
+                   np.max(x - upper, initial=0.0))
+
+    @staticmethod
+    def _normalize_rows(A: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """将每行约束除以其系数范数"""
+        norms = np.linalg.norm(A, axis=1)
+        norms[norms == 0] = 1.0
+        return A / norms[:, None], b / norms
+
+    def _linear_constraints(self) -> List[Dict]:
+        """SLSQP 格式的线性约束 (每次调用时构造，求解器对象本身保持可序列化)"""
+        linear = [{
+            "type": "ineq",
+            "fun": lambda x: self.b_ub - self.A_ub @ x,
+            "jac": lambda x: -self.A_ub
+        }]
+        if len(self.b_eq):
+            linear.append({
+                "type": "eq",
+                "fun": lambda x: self.A_eq @ x - self.b_eq,
+                "jac": lambda x: self.A_eq
+            })
+        return linear
+
+    def _is_feasible(self, A_ub: sp.csr_matrix, b_ub: np.ndarray) -> bool:
+        """用 LP 检验线性约束是否存在可行解"""
+        c = self.constraints
+        result = linprog(
+            np.zeros(c.n_variables),
+            A_ub=A_ub, b_ub=b_ub,
+            A_eq=c.A_eq if c.A_eq.shape[0] else None,
+            b_eq=c.b_eq if c.A_eq.shape[0] else None,
+            bounds=self._bound_list(c.lower, c.upper),
+            method="highs"
+        )
+        return result.status == 0
+
+    def set_target(self, objective: int, h: np.ndarray) -> None:
+        """
+        替换一个损失的目标向量 h (系数矩阵 G 不变，只更新一次项与常数项)，
+        供反复求解仅目标平移的子问题 (如 ADMM 的增广项)
+
+        Args:
+            objective: 损失序号
+            h: 新的目标向量
+        """
+        G = self.designs[objective]
+        h = np.asarray(h, dtype=float)
+        self.linear[objective] = -2 * G.T @ h / len(h)
+        self.constant[objective] = h @ h / len(h)
+
+    def losses(self, x: np.ndarray) -> np.ndarray:
+        """
+        计算各损失函数值
+
+        Args:
+            x: 展开后的分配向量
+
+        Returns:
+            np.ndarray: 形状为 (n_objectives,) 的损失
+        """
+        return 0.5 * np.einsum("i,mij,j->m", x, self.quadratic, x) + self.linear @ x + self.constant
+
+    def _gradients(self, x: np.ndarray) -> np.ndarray:
+        """各损失函数的梯度，形状为 (n_objectives, n_variables)"""
+        return self.quadratic @ x + self.linear
+
+    def _start_point(self) -> np.ndarray:
+        """默认初始点：投影到可行域的零向量"""
+        return self.constraints.project(
+            np.zeros((self.constraints.n_resources, self.constraints.n_levels))
+        ).reshape(-1)
+
+    def _minimize(self, weights: np.ndarray, x0: Optional[np.ndarray],
+                  extra_constraints: Optional[List[Dict]] = None,
+                  bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, Optional[str]]:
+        """
+        最小化损失的加权和 (bounds 为 (下界, 上界) 时代替原变量界)
+
+        Returns:
+            Tuple[np.ndarray, Optional[str]]: (SLSQP 返回的点, 失败原因)；
+                SLSQP 报告收敛且最大约束违反量不超过 feasibility_tolerance 时失败原因为 None
+        """
+        Q = np.tensordot(weights, self.quadratic, axes=1)
+        q = weights @ self.linear
+        extra_constraints = extra_constraints or []
+        result = minimize(
+            lambda x: 0.5 * x @ Q @ x + q @ x,
+            self._start_point() if x0 is None else x0,
+            jac=lambda x: Q @ x + q,
+            method="SLSQP",
+            bounds=self.bounds if bounds is None else self._bound_list(*bounds),
+            constraints=self._linear_constraints() + extra_constraints,
+            options={"ftol": self.tolerance, "maxiter": self.max_iterations}
+        )
+        x = result.x
+        lower, upper = (self.constraints.lower, self.constraints.upper) if bounds is None else bounds
+        violation = max([self._violation(x, lower, upper)] +
+                        [float(np.max(-np.atleast_1d(con["fun"](x)))) for con in extra_constraints])
+        if not result.success:
+            return x, f"SLSQP did not converge: {result.message}"
+        if not np.isfinite(violation) or violation > self.feasibility_tolerance:
+            return x, f"solution violates constraints by {violation:.3g}"
+        return x, None
+
+    def solve_weighted(self, weights: np.ndarray,
+                       x0: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        求解加权和问题 min sum_m w_m L_m(x)
+
+        Args:
+            weights: 各损失的权重 (如 AHP 权重)
+            x0: 热启动点
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (最优分配向量, 各损失值)
+
+        Raises:
+            RuntimeError: SLSQP 未收敛或解违反约束
+        """
+        weights = np.asarray(weights, dtype=float)
+        x, failure = self._minimize(weights / weights.sum(), x0)
+        if failure is not None:
+            raise RuntimeError(f"Weighted-sum QP failed: {failure}")
+        return x, self.losses(x)
+
+    def solve_epsilon(self, objective: int, epsilon: Dict[int, float],
+                      x0: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        求解 ε-约束问题 min L_objective(x) s.t. L_j(x) <= epsilon_j
+
+        Args:
+            objective: 被最小化的损失序号
+            epsilon: {损失序号: 上界}
+            x0: 热启动点
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (最优分配向量, 各损失值)
+
+        Raises:
+            RuntimeError: SLSQP 未收敛、解违反线性约束或 ε 上界
+        """
+        weights = np.zeros(self.n_objectives)
+        weights[objective] = 1.0
+        constraints = [{
+            "type": "ineq",
+            "fun": lambda x, j=j, e=e: e - self.losses(x)[j],
+            "jac": lambda x, j=j: -self._gradients(x)[j]
+        } for j, e in epsilon.items()]
+        x, failure = self._minimize(weights, x0, constraints)
+        if failure is not None:
+            raise RuntimeError(f"ε-constraint QP failed for {epsilon}: {failure}")
+        return x, self.losses(x)
+
+    def solve_integer(self, weights: np.ndarray,
+                      incumbent: Optional[np.ndarray] = None,
+                      max_nodes: int = 2000,
+                      tolerance: float = 1e-6) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        分支定界求加权和问题的整数最优解。
+
+        每个节点求解带收紧变量界的 QP 松弛，按松弛值最优优先展开，
+        在小数部分最大的变量上分支；松弛值不优于当前整数解的节点被剪去。
+        每个节点的松弛解都用 Constraints.round_feasible 取整，作为启发式整数解更新上界。
+        节点数随变量个数指数增长，只适用于小规模实例。
+
+        Args:
+            weights: 各损失的权重
+            incumbent: 初始整数解 (如进化算法取整修复后的最好解)，可行时用于剪枝
+            max_nodes: 最大展开节点数，用尽时返回当前最好的整数解
+            tolerance: 整数性与可行性判定阈值
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (整数分配向量, 各损失值)
+        """
+        weights = np.asarray(weights, dtype=float)
+        weights = weights / weights.sum()
+        c = self.constraints
+        lower, upper = np.ceil(c.lower - tolerance), np.floor(c.upper + tolerance)
+
+        best_x, best_value = None, np.inf
+        if incumbent is not None:
+            incumbent = np.rint(np.asarray(incumbent, dtype=float).reshape(-1))
+            if self._violation(incumbent, lower, upper) <= tolerance:
+                best_x, best_value = incumbent, float(weights @ self.losses(incumbent))
+
+        heap, counter = [], 0
+
+        def try_incumbent(x):
+            nonlocal best_x, best_value
+            rounded = c.round_feasible(x.reshape(c.n_resources, c.n_levels)).reshape(-1)
+            if self._violation(rounded, lower, upper) <= tolerance:
+                value = float(weights @ self.losses(rounded))
+                if value < best_value:
+                    best_x, best_value = rounded, value
+
+        def push(x0, lo, hi):
+            nonlocal counter
+            x, failure = self._minimize(weights, x0, bounds=(lo, hi))
+            if failure is not None or self._violation(x, lo, hi) > tolerance:
+                return  # 松弛不可行 (或未求解成功，没有可靠的下界)
+            value = float(weights @ self.losses(x))
+            if value < best_value - tolerance:
+                heapq.heappush(heap, (value, counter, lo, hi, x))
+                counter += 1
+
+        push(best_x, lower, upper)
+        n_nodes = 0
+        while heap and n_nodes < max_nodes:
+            value, _, lo, hi, x = heapq.heappop(heap)
+            if value >= best_value - tolerance:
+                break  # 最优优先：其余节点的下界均不更优
+            n_nodes += 1
+            try_incumbent(x)
+            fraction = np.abs(x - np.rint(x))
+            k = int(np.argmax(fraction))
+            if fraction[k] <= tolerance:
+                continue
+            down_hi, up_lo = hi.copy(), lo.copy()
+            down_hi[k], up_lo[k] = np.floor(x[k]), np.ceil(x[k])
+            for child_lo, child_hi in ((lo, down_hi), (up_lo, hi)):
+                if child_lo[k] <= child_hi[k]:
+                    push(np.clip(x, child_lo, child_hi), child_lo, child_hi)
+
+        if best_x is None:
+            raise ValueError("Branch and bound found no integer-feasible solution")
+        bound = heap[0][0] if heap else best_value
+        self.logger.info(
+            f"Branch and bound: {n_nodes} nodes, objective {best_value:.6g}, "
+            f"gap {max(best_value - bound, 0.0):.3g}"
+        )
+        return best_x, self.losses(best_x)
+
+    def payoff_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        逐个最小化各损失 (其余损失以极小权重打破平局，避免弱非支配解)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (各锚点的分配向量 (k, n), 各锚点的损失 (k, k))
+
+        Raises:
+            RuntimeError: 某个锚点求解失败 (ε 网格的范围由锚点确定)
+        """
+        solutions, table = [], []
+        for m in range(self.n_objectives):
+            weights = np.full(self.n_objectives, 1e-6)
+            weights[m] = 1.0
+            x, failure = self._minimize(weights, None)
+            if failure is not None:
+                raise RuntimeError(f"Anchor of objective {m} failed: {failure}")
+            solutions.append(x)
+            table.append(self.losses(x))
+        return np.array(solutions), np.array(table)
+
+    def _sweep_row(self, task: Tuple) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """沿一行 ε 网格依次求解，以前一个成功的解热启动；求解失败的网格点记录警告后跳过"""
+        objective, fixed, varying, x0 = task
+        results = []
+        x = x0
+        for epsilon in varying:
+            try:
+                x, f = self.solve_epsilon(objective, {**fixed, **epsilon}, x)
+            except RuntimeError as e:
+                self.logger.warning(f"Dropping ε grid point: {str(e)}")
+                continue
+            results.append((x, f))
+        return results
+
+    def epsilon_front(self, n_points: int = 10, objective: int = 1,
+                      n_jobs: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        ε-约束扫描求帕累托前沿
+
+        Args:
+            n_points: 每个受约束目标的 ε 网格点数
+            objective: 被最小化的损失序号，其余损失取 ε 上界
+            n_jobs: 并行进程数，约定同 resolve_n_jobs；不同网格行并行求解
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (前沿上的分配向量 (n, n_variables), 对应损失 (n, k))
+        """
+        anchors, table = self.payoff_table()
+        ideal, nadir = table.min(axis=0), table.max(axis=0)
+        others = [m for m in range(self.n_objectives) if m != objective]
+        grids = {m: np.linspace(ideal[m], nadir[m], n_points) for m in others}
+
+        # 第一个受约束目标每个取值为一行，行内扫描其余目标
+        lead, rest = others[0], others[1:]
+        inner = [{}]
+        for m in rest:
+            inner = [{**e, m: value} for e in inner for value in grids[m]]
+        tasks = [(objective, {lead: value}, inner, anchors[objective]) for value in grids[lead]]
+
+        n_workers = min(resolve_n_jobs(n_jobs), len(tasks))
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                rows = list(executor.map(self._sweep_row, tasks))
+        else:
+            rows = [self._sweep_row(task) for task in tasks]
+
+        solutions = np.vstack([anchors] + [x for row in rows for x, _ in row])
+        losses = np.vstack([table] + [f for row in rows for _, f in row])
+        mask = non_dominated_mask(losses)
+        self.logger.info(f"ε-constraint sweep: {len(losses)} solves, {int(mask.sum())} non-dominated")
+        return solutions[mask], losses[mask]
@@ -0,0 +1,291 @@
+"""
+进化算法模块 (p12_algorithms.py)
+按 OPTIMIZER_CONFIG["algorithm"] 选择进化引擎：
+
+- NSGA-II：非支配排序 + 拥挤距离
+- NSGA-III：非支配排序 + 参考方向小生境 (目标较多时比拥挤距离更能保持分布)
+- MOEA/D：将多目标问题分解为一组 Tchebycheff 子问题，子代只与邻域子问题竞争
+
+各引擎共用优化器的变异/交叉、约束修复、适应度评估和帕累托存档
+(ResourceOptimizer._make_offspring)，只负责亲本选择与环境选择。
+"""
+
+import logging
+from math import comb
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .config import OPTIMIZER_CONFIG
+from .p10_archive import non_dominated_ranks, select_nsga2
+
+
+def reference_directions(n_objectives: int, n_points: int) -> np.ndarray:
+    """
+    单纯形上均匀分布的参考方向 (Das-Dennis 格点)。
+
+    取点数不少于 n_points 的最小格点划分；多出的点按最远点采样剔除 (保留各顶点)。
+
+    Args:
+        n_objectives (int): 目标个数。
+        n_points (int): 参考方向个数。
+
+    Returns:
+        np.ndarray: 形状为 (n_points, n_objectives) 的参考方向，每行之和为 1。
+    """
+    divisions = 1
+    while comb(divisions + n_objectives - 1, n_objectives - 1) < n_points:
+        divisions += 1
+
+    def compositions(total, parts):
+        if parts == 1:
+            yield (total,)
+            return
+        for first in range(total, -1, -1):
+            for rest in compositions(total - first, parts - 1):
+                yield (first,) + rest
+
+    lattice = np.array(list(compositions(divisions, n_objectives)), dtype=float) / divisions
+    if len(lattice) == n_points:
+        return lattice
+
+    # 从各顶点出发做最远点采样
+    chosen = [int(np.argmax(lattice[:, m])) for m in range(n_objectives)][:n_points]
+    distance = np.min(np.linalg.norm(lattice[:, None, :] - lattice[chosen][None], axis=2), axis=1)
+    while len(chosen) < n_points:
+        chosen.append(int(np.argmax(distance)))
+        distance = np.minimum(distance, np.linalg.norm(lattice - lattice[chosen[-1]], axis=1))
+    return lattice[np.sort(chosen)]
+
+
+def _normalize(objectives: np.ndarray, first_front: np.ndarray) -> np.ndarray:
+    """NSGA-III 归一化：以理想点平移，用极端点所在超平面的截距缩放"""
+    ideal = objectives.min(axis=0)
+    translated = objectives - ideal
+    n_objectives = objectives.shape[1]
+
+    # 极端点：各坐标轴方向上 ASF 最小的解
+    axes = np.full((n_objectives, n_objectives), 1e-6) + np.eye(n_objectives) * (1 - 1e-6)
+    asf = np.max(translated[:, None, :] / axes[None], axis=2)
+    extreme = translated[np.argmin(asf, axis=0)]
+    try:
+        intercepts = 1.0 / np.linalg.solve(extreme, np.ones(n_objectives))
+        if np.any(~np.isfinite(intercepts)) or np.any(intercepts <= 1e-6):
+            raise np.linalg.LinAlgError
+    except np.linalg.LinAlgError:
+        intercepts = translated[first_front].max(axis=0)
+    intercepts = np.where(intercepts > 1e-12, intercepts, 1.0)
+    return translated / intercepts
+
+
+def select_nsga3(objectives: np.ndarray, k: int, reference_points: np.ndarray,
+                 rng: np.random.Generator) -> np.ndarray:
+    """
+    NSGA-III 环境选择 (Deb & Jain, 2014)。
+
+    Args:
+        objectives (np.ndarray): 形状为 (n, m) 的目标值。
+        k (int): 选出的个数。
+        reference_points (np.ndarray): 形状为 (r, m) 的参考方向。
+        rng (np.random.Generator): 小生境内随机选择所用的随机数生成器。
+
+    Returns:
+        np.ndarray: 被选中个体的下标。
+    """
+    ranks = non_dominated_ranks(objectives)
+    order = np.argsort(ranks, kind="stable")
+    if k >= len(order):
+        return order
+    last_rank = ranks[order[k - 1]]
+    candidates = np.flatnonzero(ranks <= last_rank)
+    chosen = np.flatnonzero(ranks < last_rank)
+    last_front = np.flatnonzero(ranks == last_rank)
+    if len(chosen) + len(last_front) == k:
+        return candidates
+
+    # 归一化后关联到最近的参考方向 (垂直距离)
+    normalized = _normalize(objectives[candidates], np.flatnonzero(ranks[candidates] == 0))
+    directions = reference_points / np.linalg.norm(reference_points, axis=1, keepdims=True)
+    projection = normalized @ directions.T
+    distance = np.linalg.norm(
+        normalized[:, None, :] - projection[:, :, None] * directions[None], axis=2
+    )
+    niche = np.argmin(distance, axis=1)
+    niche_distance = distance[np.arange(len(candidates)), niche]
+
+    position = {index: p for p, index in enumerate(candidates)}
+    niche_count = np.bincount(niche[[position[i] for i in chosen]],
+                              minlength=len(reference_points)).astype(float)
+
+    # 小生境保留：每次从成员最少的参考方向中补选一个
+    remaining = {}
+    for index in last_front:
+        remaining.setdefault(int(niche[position[index]]), []).append(int(index))
+    selected = []
+    n_needed = k - len(chosen)
+    while len(selected) < n_needed:
+        open_niches = np.array(sorted(remaining))
+        counts = niche_count[open_niches]
+        niche_id = int(rng.choice(open_niches[counts == counts.min()]))
+        members = remaining[niche_id]
+        if niche_count[niche_id] == 0:
+            pick = min(members, key=lambda i: niche_distance[position[i]])
+        else:
+            pick = members[int(rng.integers(len(members)))]
+        selected.append(pick)
+        members.remove(pick)
+        if not members:
+            del remaining[niche_id]
+        niche_count[niche_id] += 1
+    return np.concatenate([chosen, np.array(selected, dtype=int)])
+
+
+class NSGA2:
+    """NSGA-II：父代与子代合并后按非支配排序和拥挤距离选择"""
+
+    def __init__(self, optimizer):
+        """
+        Args:
+            optimizer: ResourceOptimizer 实例 (提供变异、修复、评估和存档)
+        """
+        self.optimizer = optimizer
+        self.logger = logging.getLogger(__name__)
+
+    def select(self, objectives: np.ndarray, k: int) -> np.ndarray:
+        """环境选择，返回被选中个体的下标"""
+        return select_nsga2(objectives, k)
+
+    def step(self, pop: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        执行一代进化
+
+        Args:
+            pop: (分配数组 (n, resource_type, hospital_level), 目标值数组 (n, 3))
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 下一代种群
+        """
+        allocations, fitness = pop
+        offspring, offspring_fitness = self.optimizer._make_offspring(allocations)
+        allocations = np.concatenate([allocations, offspring])
+        fitness = np.concatenate([fitness, offspring_fitness])
+        chosen = self.select(fitness, self.optimizer.population_size)
+        return allocations[chosen], fitness[chosen]
+
+
+class NSGA3(NSGA2):
+    """NSGA-III：最后一层前沿按参考方向小生境选择"""
+
+    def __init__(self, optimizer):
+        super().__init__(optimizer)
+        self.reference_points = reference_directions(
+            optimizer.n_objectives, optimizer.population_size
+        )
+
+    def select(self, objectives: np.ndarray, k: int) -> np.ndarray:
+        return select_nsga3(objectives, k, self.reference_points, self.optimizer.rng)
+
+
+class MOEAD:
+    """
+    MOEA/D：每个个体对应一个权重向量 (子问题)，在邻域内选亲本，
+    子代按归一化 Tchebycheff 函数替换邻域内较差的解 (每个子代至多替换 max_replacements 个)。
+    理想点取帕累托存档各目标的最小值，因此引擎本身无额外状态，检查点可逐位续算。
+    """
+
+    def __init__(self, optimizer, config: Optional[Dict] = None):
+        """
+        Args:
+            optimizer: ResourceOptimizer 实例
+            config: MOEA/D 参数，默认取 OPTIMIZER_CONFIG["moead"]
+        """
+        self.optimizer = optimizer
+        self.logger = logging.getLogger(__name__)
+        config = config or OPTIMIZER_CONFIG["moead"]
+        self.weights = reference_directions(optimizer.n_objectives, optimizer.population_size)
+        n_neighbors = min(config["neighbors"], len(self.weights))
+        distance = np.linalg.norm(self.weights[:, None, :] - self.weights[None], axis=2)
+        self.neighbors = np.argsort(distance, axis=1, kind="stable")[:, :n_neighbors]
+        self.delta = config["delta"]
+        self.max_replacements = config["max_replacements"]
+
+    def select(self, objectives: np.ndarray, k: int) -> np.ndarray:
+        """从合并种群中选出 k 个个体 (供岛屿迁移等外部调用，按 NSGA-II 规则)"""
+        return select_nsga2(objectives, k)
+
+    def _tchebycheff(self, objectives: np.ndarray, weights: np.ndarray,
+                     ideal: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        """归一化 Tchebycheff 聚合函数 max_m w_m |f_m - z_m| / scale_m"""
+        return np.max(weights * np.abs(objectives - ideal) / scale, axis=-1)
+
+    def step(self, pop: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        执行一代进化 (所有子问题同步产生子代后统一替换)
+
+        Args:
+            pop: (分配数组, 目标值数组)，第 i 个个体对应第 i 个权重向量
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 下一代种群
+        """
+        allocations, fitness = pop
+        rng = self.optimizer.rng
+        n = len(allocations)
+
+        # 以概率 delta 在邻域内选亲本，否则在整个种群中选
+        pool = self.neighbors.copy()
+        outside = rng.random(n) >= self.delta
+        pool[outside] = rng.integers(n, size=(int(outside.sum()), pool.shape[1]))
+        offspring, offspring_fitness = self.optimizer._make_offspring(allocations, pool)
+
+        ideal = self.optimizer.archive.objectives.min(axis=0)
+        nadir = np.maximum(fitness.max(axis=0), offspring_fitness.max(axis=0))
+        scale = np.maximum(nadir - ideal, 1e-12)
+
+        # 子代 i 与其邻域子问题 j 的改进量
+        current = self._tchebycheff(fitness, self.weights, ideal, scale)
+        targets = self.neighbors
+        child_value = self._tchebycheff(offspring_fitness[:, None, :], self.weights[targets],
+                                        ideal, scale)
+        improvement = current[targets] - child_value
+
+        # 每个子代只保留改进最大的 max_replacements 个子问题
+        rank = np.argsort(np.argsort(-improvement, axis=1, kind="stable"), axis=1)
+        valid = (improvement > 0) & (rank < self.max_replacements)
+        child = np.broadcast_to(np.arange(n)[:, None], targets.shape)[valid]
+        target, gain = targets[valid], improvement[valid]
+
+        # 每个子问题取改进最大的子代
+        order = np.lexsort((-gain, target))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = target[order][1:] != target[order][:-1]
+        winners, replaced = child[order][first], target[order][first]
+
+        allocations, fitness = allocations.copy(), fitness.copy()
+        allocations[replaced] = offspring[winners]
+        fitness[replaced] = offspring_fitness[winners]
+        return allocations, fitness
+
+
+# 算法注册表：OPTIMIZER_CONFIG["algorithm"] -> 引擎类
+ALGORITHMS = {
+    "NSGA-II": NSGA2,
+    "NSGA-III": NSGA3,
+    "MOEA/D": MOEAD,
+}
+
+
+def make_engine(name: str, optimizer):
+    """
+    按名称创建进化引擎
+
+    Args:
+        name: 算法名称，见 ALGORITHMS
+        optimizer: ResourceOptimizer 实例
+
+    Returns:
+        进化引擎实例
+    """
+    if name not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {name}. Available: {sorted(ALGORITHMS)}")
+    return ALGORITHMS[name](optimizer)
@@ -0,0 +1,204 @@
+"""
+运行遥测模块 (p13_telemetry.py)
+逐代记录优化过程的统计量：各目标的最小/平均/最大值、可行解比例、存档规模、
+前沿质量指标 (超体积、IGD/IGD+、间距、分布广度，见 p14_metrics)、评估吞吐量，以及变异、修复、评估、存档更新和环境选择各阶段的耗时。
+
+记录存放在预分配的定长环形缓冲区中 (超出容量时覆盖最早的代)，
+每代只做一次行写入和几次计时，开销可忽略；不借助性能分析器即可看出每代时间花在哪里。
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from .p08_utils import save_arrays_atomic, load_arrays
+from .p14_metrics import QUALITY_METRICS
+
+
+# 计时阶段 (各阶段为独占时间，嵌套计时从外层扣除)
+PHASES = ("variation", "repair", "evaluation", "archive", "selection")
+
+
+def _fields(n_objectives: int) -> tuple:
+    """遥测表的列名"""
+    stats = tuple(f"{stat}_{m}" for stat in ("min", "mean", "max") for m in range(n_objectives))
+    return (("generation",) + stats +
+            ("feasible_fraction", "archive_size") + QUALITY_METRICS +
+            ("evaluations", "total_evaluations", "evaluations_per_second", "time_total") +
+            tuple(f"time_{phase}" for phase in PHASES))
+
+
+class GenerationTelemetry:
+    """逐代统计量的有界环形缓冲区"""
+
+    def __init__(self, capacity: int = 10000, n_objectives: int = 3):
+        """
+        初始化缓冲区
+
+        Args:
+            capacity: 最多保留的代数，超出时覆盖最早的记录
+            n_objectives: 目标个数
+        """
+        self.logger = logging.getLogger(__name__)
+        self.capacity = capacity
+        self.n_objectives = n_objectives
+        self.fields = _fields(n_objectives)
+        self._column = {name: k for k, name in enumerate(self.fields)}
+        self._buffer = np.full((capacity, len(self.fields)), np.nan)
+        self._count = 0
+        self.total_evaluations = 0
+        self._reset_generation()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def _reset_generation(self) -> None:
+        """清零当前代的计时与评估计数"""
+        self._timings = dict.fromkeys(PHASES, 0.0)
+        self._stack = []
+        self._evaluations = 0
+        self._start = time.perf_counter()
+
+    def start(self) -> None:
+        """开始一代的计时"""
+        self._reset_generation()
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        """
+        累计一个阶段的独占耗时
+
+        Args:
+            phase: 阶段名，见 PHASES
+        """
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            self._timings[phase] += elapsed - nested
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def add_evaluations(self, n: int) -> None:
+        """累计当前代的适应度评估次数"""
+        self._evaluations += n
+
+    def record(self, generation: int, objectives: np.ndarray,
+               feasible_fraction: float, archive_size: int,
+               quality: Optional[Dict[str, float]] = None) -> None:
+        """
+        写入一代的统计量并开始下一代的计时
+
+        Args:
+            generation: 代数 (初始种群为 0)
+            objectives: 当前种群的目标值，形状为 (n, n_objectives)
+            feasible_fraction: 当前种群中可行解的比例
+            archive_size: 帕累托存档中的解个数
+            quality: 帕累托存档的前沿质量指标 (见 QUALITY_METRICS)，未计算的指标记为 nan
+        """
+        elapsed = time.perf_counter() - self._start
+        self.total_evaluations += self._evaluations
+        row = self._buffer[self._count % self.capacity]
+        row[0] = generation
+        m = self.n_objectives
+        row[1:1 + m] = objectives.min(axis=0)
+        row[1 + m:1 + 2 * m] = objectives.mean(axis=0)
+        row[1 + 2 * m:1 + 3 * m] = objectives.max(axis=0)
+        quality = quality or {}
+        values = ((feasible_fraction, archive_size) +
+                  tuple(quality.get(name, np.nan) for name in QUALITY_METRICS) +
+                  (self._evaluations, self.total_evaluations,
+                   self._evaluations / elapsed if elapsed > 0 else np.nan, elapsed) +
+                  tuple(self._timings[phase] for phase in PHASES))
+        row[1 + 3 * m:] = values
+        self._count += 1
+        self._reset_generation()
+
+    def as_array(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: 形状为 (n_generations, len(fields)) 的记录，按代数先后排列
+        """
+        if self._count <= self.capacity:
+            return self._buffer[:self._count].copy()
+        split = self._count % self.capacity
+        return np.concatenate([self._buffer[split:], self._buffer[:split]])
+
+    def latest(self, name: str, lag: int = 0) -> float:
+        """
+        最近第 lag 代 (0 为最新一代) 某一列的值，超出已保留的记录时为 nan
+
+        Args:
+            name: 列名
+            lag: 向前回溯的代数
+        """
+        if lag >= len(self):
+            return np.nan
+        return float(self._buffer[(self._count - 1 - lag) % self.capacity, self._column[name]])
+
+    def column(self, name: str) -> np.ndarray:
+        """按列名取出一列记录"""
+        return self.as_array()[:, self._column[name]]
+
+    def objective_history(self, statistic: str = "min") -> np.ndarray:
+        """
+        各目标逐代的统计量
+
+        Args:
+            statistic: "min"、"mean" 或 "max"
+
+        Returns:
+            np.ndarray: 形状为 (n_generations, n_objectives)
+        """
+        if statistic not in ("min", "mean", "max"):
+            raise ValueError(f"Unknown statistic: {statistic}")
+        start = self._column[f"{statistic}_0"]
+        return self.as_array()[:, start:start + self.n_objectives]
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        """按列拆分的记录 (列名 -> 一维数组)"""
+        table = self.as_array()
+        return {name: table[:, k] for k, name in enumerate(self.fields)}
+
+    def save(self, path: str) -> None:
+        """
+        以列存的 npz 文件原子地导出全部记录
+
+        Args:
+            path: 文件路径
+        """
+        save_arrays_atomic(path, self.to_dict())
+        self.logger.info(f"已导出 {len(self)} 代遥测记录至 {path}")
+
+    def restore(self, columns: Dict[str, np.ndarray]) -> None:
+        """
+        由 to_dict() 的结果恢复记录 (用于断点续算)；旧版本记录中缺少的列填 nan
+
+        Args:
+            columns: 列名 -> 一维数组
+        """
+        table = None
+        if columns:
+            length = len(next(iter(columns.values())))
+            table = np.column_stack([columns.get(name, np.full(length, np.nan))
+                                     for name in self.fields])
+        self._buffer[:] = np.nan
+        n = 0 if table is None else min(len(table), self.capacity)
+        if n:
+            self._buffer[:n] = table[-n:]
+            self.total_evaluations = int(table[-1, self._column["total_evaluations"]])
+        self._count = n
+        self._reset_generation()
+
+    @classmethod
+    def load(cls, path: str, capacity: int = 10000, n_objectives: int = 3) -> "GenerationTelemetry":
+        """读取 save() 导出的文件"""
+        telemetry = cls(capacity, n_objectives)
+        telemetry.restore(load_arrays(path))
+        return telemetry
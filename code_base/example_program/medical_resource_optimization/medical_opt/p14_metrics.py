@@ -0,0 +1,193 @@
+"""
+前沿质量指标模块 (p14_metrics.py)
+定量比较不同优化配置得到的帕累托前沿，并逐代度量收敛过程：
+
+- 超体积 (hypervolume)：二/三目标精确值，沿用 p10_archive 的阶梯扫描，O(n log n)
+- IGD / IGD+：参考前沿上各点到所得前沿的平均 (修正) 距离，越小越好
+- 间距 (spacing, Schott)：各点到最近邻的 L1 距离的标准差，越小分布越均匀
+- 分布广度 (spread, 广义 Δ 指标)：兼顾端点覆盖与间距均匀性，越小越好
+
+最近邻查询使用 KD 树，IGD+ 按块向量化计算 (内存占用有界)，
+10^4–10^5 个点的前沿也可逐代调用。
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .p10_archive import hypervolume, non_dominated_mask
+
+
+# front_metrics() 返回的指标 (也是遥测表中对应的列名)
+QUALITY_METRICS = ("hypervolume", "igd", "igd_plus", "spacing", "spread")
+
+# IGD+ 分块计算时每块的 (参考点 × 前沿点) 元素个数上限
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def igd(front: np.ndarray, reference_front: np.ndarray) -> float:
+    """
+    反转世代距离 (IGD)：参考前沿各点到所得前沿最近点的欧氏距离的平均值。
+
+    Args:
+        front (np.ndarray): 形状为 (n, m) 的所得前沿目标值。
+        reference_front (np.ndarray): 形状为 (r, m) 的参考前沿 (如 ε-约束精确前沿)。
+
+    Returns:
+        float: IGD，前沿为空时为 inf。
+    """
+    front = np.asarray(front, dtype=float)
+    reference_front = np.asarray(reference_front, dtype=float)
+    if len(front) == 0:
+        return np.inf
+    distance, _ = cKDTree(front).query(reference_front)
+    return float(np.mean(distance))
+
+
+def igd_plus(front: np.ndarray, reference_front: np.ndarray) -> float:
+    """
+    IGD+ (Ishibuchi 等, 2015)：距离只计所得点劣于参考点的分量，
+    d+(z, a) = ||max(a - z, 0)||，是弱帕累托一致的 IGD 变体。
+
+    被支配的点不会缩短任何距离，先筛掉后按块计算参考点与剩余点的两两距离
+    (逐目标原地累加，不产生 (r, n, m) 的中间数组)。
+
+    Args:
+        front (np.ndarray): 形状为 (n, m) 的所得前沿目标值。
+        reference_front (np.ndarray): 形状为 (r, m) 的参考前沿。
+
+    Returns:
+        float: IGD+，前沿为空时为 inf。
+    """
+    front = np.asarray(front, dtype=float)
+    reference_front = np.asarray(reference_front, dtype=float)
+    if len(front) == 0:
+        return np.inf
+    front = front[non_dominated_mask(front)]
+    chunk = max(1, min(len(reference_front), _CHUNK_ELEMENTS // len(front)))
+    excess = np.empty((chunk, len(front)))
+    total = np.empty((chunk, len(front)))
+    squared = np.empty(len(reference_front))
+    for start in range(0, len(reference_front), chunk):
+        block = reference_front[start:start + chunk]
+        rows = len(block)
+        total[:rows] = 0.0
+        for k in range(front.shape[1]):
+            np.subtract(front[:, k], block[:, k, None], out=excess[:rows])
+            np.maximum(excess[:rows], 0.0, out=excess[:rows])
+            np.multiply(excess[:rows], excess[:rows], out=excess[:rows])
+            total[:rows] += excess[:rows]
+        squared[start:start + rows] = total[:rows].min(axis=1)
+    return float(np.mean(np.sqrt(squared)))
+
+
+def _nearest_distance(front: np.ndarray, p: float) -> np.ndarray:
+    """各点到其余点中最近者的 Lp 距离"""
+    distance, _ = cKDTree(front).query(front, k=2, p=p)
+    return distance[:, 1]
+
+
+def spacing(front: np.ndarray) -> float:
+    """
+    间距指标 (Schott, 1995)：各点到最近邻的 L1 距离的样本标准差。
+
+    Args:
+        front (np.ndarray): 形状为 (n, m) 的前沿目标值。
+
+    Returns:
+        float: 间距，少于两个点时为 nan。
+    """
+    front = np.asarray(front, dtype=float)
+    if len(front) < 2:
+        return np.nan
+    return float(np.std(_nearest_distance(front, p=1), ddof=1))
+
+
+def spread(front: np.ndarray, reference_front: Optional[np.ndarray] = None) -> float:
+    """
+    广义分布广度 Δ (Zhou 等, 2006)：
+
+        Δ = (Σ_k d(e_k, S) + Σ_i |d_i - d̄|) / (Σ_k d(e_k, S) + |S| d̄)
+
+    其中 d_i 为前沿各点到最近邻的欧氏距离，e_k 为参考前沿在第 k 个目标上最差的端点。
+    不给参考前沿时端点项为 0，只度量间距的均匀性。
+
+    Args:
+        front (np.ndarray): 形状为 (n, m) 的前沿目标值。
+        reference_front (np.ndarray, optional): 形状为 (r, m) 的参考前沿。
+
+    Returns:
+        float: Δ (0 为理想)，少于两个点时为 nan。
+    """
+    front = np.asarray(front, dtype=float)
+    if len(front) < 2:
+        return np.nan
+    nearest = _nearest_distance(front, p=2)
+    mean = nearest.mean()
+    extreme = 0.0
+    if reference_front is not None and len(reference_front):
+        reference_front = np.asarray(reference_front, dtype=float)
+        ends = reference_front[np.argmax(reference_front, axis=0)]
+        extreme = float(np.sum(cKDTree(front).query(ends)[0]))
+    denominator = extreme + len(front) * mean
+    if denominator <= 0:
+        return 0.0
+    return float((extreme + np.sum(np.abs(nearest - mean))) / denominator)
+
+
+def front_metrics(front: np.ndarray,
+                  reference_front: Optional[np.ndarray] = None,
+                  normalization: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """
+    计算一个前沿的全部质量指标。
+
+    各目标先按 (f - ideal) / scale 归一化，超体积的参考点为全 1 (与
+    ResourceOptimizer.hv_reference 一致)；未给出归一化方式时取前沿与参考前沿合并后的
+    理想点与 1.1 倍跨度。
+
+    Args:
+        front (np.ndarray): 形状为 (n, m) 的前沿目标值。
+        reference_front (np.ndarray, optional): 形状为 (r, m) 的参考前沿，None 时 IGD/IGD+ 为 nan。
+        normalization (np.ndarray, optional): 形状为 (2, m)，依次为 ideal 与 scale。
+
+    Returns:
+        Dict[str, float]: 指标名 (见 QUALITY_METRICS) -> 指标值。
+    """
+    front = np.asarray(front, dtype=float)
+    if reference_front is not None:
+        reference_front = np.asarray(reference_front, dtype=float)
+    if normalization is None:
+        points = front if reference_front is None else np.concatenate([front, reference_front])
+        if len(points) == 0:
+            return dict.fromkeys(QUALITY_METRICS, np.nan)
+        ideal = points.min(axis=0)
+        scale = 1.1 * (points.max(axis=0) - ideal)
+        scale[scale <= 0] = 1.0
+    else:
+        ideal, scale = normalization
+    front = (front - ideal) / scale
+    metrics = {
+        "hypervolume": hypervolume(front, np.ones(front.shape[1])) if len(front) else 0.0,
+        "igd": np.nan,
+        "igd_plus": np.nan,
+        "spacing": spacing(front),
+        "spread": np.nan
+    }
+    if reference_front is not None:
+        reference_front = (reference_front - ideal) / scale
+        metrics["igd"] = igd(front, reference_front)
+        metrics["igd_plus"] = igd_plus(front, reference_front)
+    metrics["spread"] = spread(front, reference_front)
+    return metrics
+
+
+# 测试代码
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    reference = np.abs(rng.normal(size=(2000, 3)))
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+    approximation = reference[rng.choice(len(reference), 200, replace=False)] * 1.05
+
+    for name, value in front_metrics(approximation, reference).items():
+        print(f"{name}: {value:.6f}")
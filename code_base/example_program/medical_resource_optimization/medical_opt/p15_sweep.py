@@ -0,0 +1,334 @@
+"""
+情景扫描模块 (p15_sweep.py)
+对预算上限、需求阈值与单位成本做网格或拉丁超立方采样，批量求解全部情景：
+
+- 参数以点分路径指定，如 "BUDGET_LIMITS.1"、"DEMAND_THRESHOLDS.3"、"UNIT_COSTS.2.salary"
+- 情景之间按 (归一化) 参数距离构造多源最小生成树：根情景冷启动，
+  其余情景以树上父情景的最优解与帕累托前沿热启动 (相邻情景的最优配置通常相近)
+- 父情景求解完成后子情景即可提交，不同子树在进程池中并行求解；
+  父子关系只由参数决定，与完成先后无关，结果可复现
+- 结果汇总为一张列存表 (列名 -> 一维数组)，保存为 npz 或 csv
+"""
+
+import copy
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import BUDGET_CONFIG, HOSPITAL_LEVELS, OPTIMIZER_CONFIG, RESOURCE_TYPES, SYSTEM_CONFIG
+from .p05_constraints import Constraints
+from .p06_optimizer import ResourceOptimizer
+from .p08_utils import save_arrays_atomic
+from .p09_parallel import resolve_n_jobs
+
+
+# 可扫描的预算配置项
+SWEEP_SECTIONS = ("BUDGET_LIMITS", "DEMAND_THRESHOLDS", "UNIT_COSTS")
+
+
+def _parse_path(parameter: str) -> Tuple:
+    """"UNIT_COSTS.1.equipment" -> ("UNIT_COSTS", 1, "equipment")"""
+    keys = tuple(int(key) if key.isdigit() else key for key in parameter.split("."))
+    if keys[0] not in SWEEP_SECTIONS or len(keys) < 2:
+        raise ValueError(f"Unknown sweep parameter: {parameter}. "
+                         f"Expected e.g. 'BUDGET_LIMITS.1' under {SWEEP_SECTIONS}")
+    return keys
+
+
+def _set_parameter(config: Dict, parameter: str, value: float) -> None:
+    """在预算配置中按点分路径写入参数值 (路径必须已存在)"""
+    keys = _parse_path(parameter)
+    node = config
+    for key in keys[:-1]:
+        node = node[key]
+    if keys[-1] not in node:
+        raise KeyError(f"Sweep parameter {parameter} not found in budget config")
+    node[keys[-1]] = float(value)
+
+
+def _solve_sweep_scenario(task: Tuple) -> Dict:
+    """求解单个情景 (供 ScenarioSweep.run 在线程或进程中调用)"""
+    resource_types, hospital_levels, budget_config, seed, backend, seeds = task
+    started = time.perf_counter()
+    constraints = Constraints(budget_config, hospital_levels)
+    optimizer = ResourceOptimizer(resource_types, hospital_levels, budget_config, constraints,
+                                  seed=seed, parallel=False, backend=backend)
+    best, objectives, front = optimizer.optimize(seeds=seeds)
+    return {
+        "best": best,
+        "objectives": np.asarray(objectives),
+        "front": front[0].astype(np.float64),
+        "feasible": bool(constraints.is_feasible(best)),
+        "stop_reason": optimizer.stop_reason,
+        "generations": int(optimizer.telemetry.latest("generation")),
+        "evaluations": optimizer.telemetry.total_evaluations,
+        "seconds": time.perf_counter() - started
+    }
+
+
+class ScenarioSweep:
+    """预算/需求/成本情景的并行扫描器"""
+
+    def __init__(self,
+                 resource_types: Optional[Dict] = None,
+                 hospital_levels: Optional[Dict] = None,
+                 base_config: Optional[Dict] = None,
+                 config: Optional[Dict] = None):
+        """
+        初始化扫描器
+
+        Args:
+            resource_types: 资源类型配置，默认取 RESOURCE_TYPES
+            hospital_levels: 医院等级配置，默认取 HOSPITAL_LEVELS
+            base_config: 基准预算配置 (未扫描的参数取此处的值)，默认取 BUDGET_CONFIG
+            config: 扫描参数，默认取 OPTIMIZER_CONFIG["sweep"]
+        """
+        self.logger = logging.getLogger(__name__)
+        self.resource_types = RESOURCE_TYPES if resource_types is None else resource_types
+        self.hospital_levels = HOSPITAL_LEVELS if hospital_levels is None else hospital_levels
+        self.base_config = BUDGET_CONFIG if base_config is None else base_config
+        self.config = OPTIMIZER_CONFIG["sweep"] if config is None else config
+
+    def grid(self, axes: Dict[str, Sequence[float]]) -> Tuple[List[str], np.ndarray]:
+        """
+        全因子网格
+
+        Args:
+            axes: 参数路径 -> 取值列表，如 {"BUDGET_LIMITS.1": [800, 900, 1000, 1100, 1200]}
+
+        Returns:
+            Tuple[List[str], np.ndarray]: (参数路径, 形状为 (n_scenarios, n_parameters) 的取值)
+        """
+        parameters = list(axes)
+        for parameter in parameters:
+            _parse_path(parameter)
+        values = np.array(list(product(*(axes[p] for p in parameters))), dtype=float)
+        return parameters, values.reshape(-1, len(parameters))
+
+    def latin_hypercube(self, ranges: Dict[str, Tuple[float, float]], n_samples: int,
+                        seed: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+        """
+        拉丁超立方采样：每个参数的取值区间等分为 n_samples 层，每层恰好取一个样本
+
+        Args:
+            ranges: 参数路径 -> (下限, 上限)
+            n_samples: 情景个数
+            seed: 随机种子
+
+        Returns:
+            Tuple[List[str], np.ndarray]: (参数路径, 形状为 (n_samples, n_parameters) 的取值)
+        """
+        parameters = list(ranges)
+        for parameter in parameters:
+            _parse_path(parameter)
+        rng = np.random.default_rng(seed)
+        low, high = np.array([ranges[p] for p in parameters], dtype=float).T
+        strata = np.argsort(rng.random((n_samples, len(parameters))), axis=0)
+        unit = (strata + rng.random((n_samples, len(parameters)))) / n_samples
+        return parameters, low + unit * (high - low)
+
+    def scenario_configs(self, parameters: List[str], values: np.ndarray) -> List[Dict]:
+        """
+        由参数取值生成各情景的预算配置 (基准配置的深拷贝)
+
+        Args:
+            parameters: 参数路径
+            values: 形状为 (n_scenarios, n_parameters) 的取值
+
+        Returns:
+            List[Dict]: 各情景的预算配置
+        """
+        configs = []
+        for row in np.atleast_2d(values):
+            config = copy.deepcopy(self.base_config)
+            for parameter, value in zip(parameters, row):
+                _set_parameter(config, parameter, value)
+            configs.append(config)
+        return configs
+
+    @staticmethod
+    def warm_start_tree(values: np.ndarray, n_roots: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        热启动树：参数按取值范围归一化，以最远点采样选出 n_roots 个根情景，
+        再用多源 Prim 算法构造最小生成森林，每个情景的父节点为树上的相邻情景。
+
+        Args:
+            values: 形状为 (n_scenarios, n_parameters) 的取值
+            n_roots: 根情景个数 (冷启动，可同时开始求解)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (各情景的父情景下标，根为 -1；Prim 加入顺序)
+        """
+        n = len(values)
+        span = np.ptp(values, axis=0)
+        points = (values - values.min(axis=0)) / np.where(span > 0, span, 1.0)
+
+        # 根：从最接近中心的情景出发做最远点采样
+        roots = [int(np.argmin(np.linalg.norm(points - points.mean(axis=0), axis=1)))]
+        distance = np.linalg.norm(points - points[roots[0]], axis=1)
+        while len(roots) < min(n_roots, n):
+            roots.append(int(np.argmax(distance)))
+            distance = np.minimum(distance, np.linalg.norm(points - points[roots[-1]], axis=1))
+
+        parent = np.full(n, -1)
+        nearest = np.full(n, -1)
+        distance = np.full(n, np.inf)
+        added = np.zeros(n, dtype=bool)
+        order = []
+        for root in roots:
+            added[root] = True
+            order.append(root)
+            closer = np.linalg.norm(points - points[root], axis=1) < distance
+            distance[closer] = np.linalg.norm(points[closer] - points[root], axis=1)
+            nearest[closer] = root
+        while len(order) < n:
+            candidates = np.flatnonzero(~added)
+            k = int(candidates[np.argmin(distance[candidates])])
+            parent[k] = nearest[k]
+            added[k] = True
+            order.append(k)
+            step = np.linalg.norm(points - points[k], axis=1)
+            closer = (step < distance) & ~added
+            distance[closer] = step[closer]
+            nearest[closer] = k
+        return parent, np.array(order)
+
+    def _seeds(self, result: Dict) -> np.ndarray:
+        """父情景的热启动种子：最优解在前，帕累托前沿等间隔抽取至 n_seeds 个"""
+        front = result["front"]
+        n_front = min(len(front), self.config["n_seeds"] - 1)
+        chosen = np.linspace(0, len(front) - 1, n_front).round().astype(int) if n_front > 0 else []
+        return np.concatenate([result["best"][None], front[chosen]])
+
+    def run(self,
+            parameters: List[str],
+            values: np.ndarray,
+            backend: Optional[str] = None,
+            max_workers: Optional[int] = None,
+            seed: Optional[int] = None,
+            warm_start: Optional[bool] = None,
+            path: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        并行求解全部情景
+
+        Args:
+            parameters: 参数路径 (grid() / latin_hypercube() 的返回值)
+            values: 形状为 (n_scenarios, n_parameters) 的取值
+            backend: "process" (进程池) 或 "thread" (线程池)，默认取 config["backend"]
+            max_workers: 并发数，约定同 resolve_n_jobs，默认取 config["max_workers"]，
+                         为 None 时取 SYSTEM_CONFIG["parallel"]["n_jobs"]
+            seed: 各情景优化器的随机种子，默认取 OPTIMIZER_CONFIG["random_seed"]
+            warm_start: 是否沿热启动树以父情景的解热启动，默认取 config["warm_start"]
+            path: 结果表的保存路径 (.npz 或 .csv)，None 表示不保存
+
+        Returns:
+            Dict[str, np.ndarray]: 列存结果表，每行一个情景：
+                scenario、各参数路径、parent (热启动来源，冷启动为 -1)、
+                efficiency_loss / accessibility_loss / cost_loss (最优解目标值)、feasible、
+                front_size、generations、evaluations、stop_reason、seconds，
+                以及最优分配方案的各元素 x_{resource}_{level}
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        configs = self.scenario_configs(parameters, values)
+        backend = self.config["backend"] if backend is None else backend
+        if backend == "thread":
+            executor_class = ThreadPoolExecutor
+        elif backend == "process":
+            executor_class = ProcessPoolExecutor
+        else:
+            raise ValueError(f"Unknown sweep backend: {backend}")
+        if max_workers is None:
+            max_workers = self.config["max_workers"]
+        n_workers = resolve_n_jobs(
+            SYSTEM_CONFIG["parallel"]["n_jobs"] if max_workers is None else max_workers
+        )
+        seed = OPTIMIZER_CONFIG["random_seed"] if seed is None else seed
+        warm_start = self.config["warm_start"] if warm_start is None else warm_start
+
+        n = len(configs)
+        if warm_start:
+            parent, _ = self.warm_start_tree(values, n_workers)
+        else:
+            parent = np.full(n, -1)
+        children = [[] for _ in range(n)]
+        for child, p in enumerate(parent):
+            if p >= 0:
+                children[p].append(child)
+
+        self.logger.info(f"Sweeping {n} scenarios over {parameters} with {n_workers} workers "
+                         f"({int(np.sum(parent < 0))} cold starts)")
+        started = time.perf_counter()
+        results: List[Optional[Dict]] = [None] * n
+        with executor_class(max_workers=n_workers) as executor:
+            def submit(index):
+                seeds = self._seeds(results[parent[index]]) if parent[index] >= 0 else None
+                task = (self.resource_types, self.hospital_levels, configs[index], seed,
+                        self.config["optimizer_backend"], seeds)
+                return executor.submit(_solve_sweep_scenario, task)
+
+            pending = {submit(index): index for index in np.flatnonzero(parent < 0)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Scenario {index} failed: {str(e)}")
+                        raise
+                    for child in children[index]:
+                        pending[submit(child)] = child
+        self.logger.info(f"Sweep finished in {time.perf_counter() - started:.1f}s")
+
+        table = self._table(parameters, values, parent, results)
+        if path:
+            self.save(table, path)
+        return table
+
+    def _table(self, parameters: List[str], values: np.ndarray, parent: np.ndarray,
+               results: List[Dict]) -> Dict[str, np.ndarray]:
+        """将各情景的结果汇总为列存表"""
+        objectives = np.array([r["objectives"] for r in results])
+        best = np.array([r["best"].ravel() for r in results])
+        table = {"scenario": np.arange(len(results))}
+        table.update({parameter: values[:, k] for k, parameter in enumerate(parameters)})
+        table["parent"] = parent
+        table.update({name: objectives[:, k] for k, name in
+                      enumerate(("efficiency_loss", "accessibility_loss", "cost_loss"))})
+        for name in ("feasible", "generations", "evaluations", "stop_reason", "seconds"):
+            table[name] = np.array([r[name] for r in results])
+        table["front_size"] = np.array([len(r["front"]) for r in results])
+        n_levels = len(self.hospital_levels)
+        for k in range(best.shape[1]):
+            table[f"x_{k // n_levels + 1}_{k % n_levels + 1}"] = best[:, k]
+        return table
+
+    def save(self, table: Dict[str, np.ndarray], path: str) -> None:
+        """
+        保存结果表：.csv 用 pandas 导出，其余按列原子写入 npz
+
+        Args:
+            table: run() 返回的列存表
+            path: 文件路径
+        """
+        if path.endswith(".csv"):
+            pd.DataFrame(table).to_csv(path, index=False)
+        else:
+            save_arrays_atomic(path, table)
+        self.logger.info(f"已保存 {len(table['scenario'])} 个情景的结果至 {path}")
+
+
+# 测试代码
+if __name__ == "__main__":
+    sweep = ScenarioSweep()
+    parameters, values = sweep.grid({
+        "BUDGET_LIMITS.1": [800, 900, 1000, 1100, 1200],
+        "DEMAND_THRESHOLDS.1": [200, 220, 240]
+    })
+    table = sweep.run(parameters, values, path=OPTIMIZER_CONFIG["sweep"]["path"])
+    print(pd.DataFrame(table))
@@ -0,0 +1,122 @@
+"""
+鲁棒优化模块 (p16_robust.py)
+DEMAND_THRESHOLDS 只是需求的点估计。鲁棒模式下，可及性损失与需求约束针对
+K 个抽样需求情景同时评估：
+
+- 需求情景：以 DEMAND_THRESHOLDS 为均值的对数正态分布 (保持均值)，
+  变异系数取配置值或由需求数据的人口列估计 (DataLoader.estimate_demand_variation)
+- 公共随机数：标准正态样本只在创建时抽取一次，所有代、所有个体面对同一组情景，
+  个体间的比较不受抽样噪声影响，检查点续算结果不变
+- 风险度量：期望损失或 CVaR (最差 1 - alpha 比例情景的平均损失)，
+  由 (种群, K) 的损失张量一次广播计算
+- 机会约束：需求约束改为各级医院需求的 chance_level 分位数 (逐级机会约束的样本近似，
+  仍为线性约束，可直接投影修复)；全部情景同时满足的比例由 satisfaction() 给出
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+
+# 支持的风险度量
+RISK_MEASURES = ("expected", "cvar")
+
+
+class DemandScenarios:
+    """K 个抽样需求情景 (公共随机数)"""
+
+    def __init__(self,
+                 mean: np.ndarray,
+                 variation: np.ndarray,
+                 n_scenarios: int = 64,
+                 seed: Optional[int] = None):
+        """
+        抽取需求情景
+
+        Args:
+            mean: 各级医院需求的均值 (即 DEMAND_THRESHOLDS)
+            variation: 各级医院需求的变异系数，标量或形状为 (hospital_level,)
+            n_scenarios: 情景个数 K
+            seed: 标准正态样本的随机种子
+        """
+        self.logger = logging.getLogger(__name__)
+        self.mean = np.asarray(mean, dtype=float)
+        self._normal = np.random.default_rng(seed).standard_normal((n_scenarios, len(self.mean)))
+        self.set_distribution(self.mean, variation)
+
+    def __len__(self) -> int:
+        return len(self.demands)
+
+    def set_distribution(self, mean: np.ndarray, variation: np.ndarray) -> None:
+        """
+        更新需求分布 (沿用同一组标准正态样本，保持公共随机数)
+
+        Args:
+            mean: 各级医院需求的均值
+            variation: 各级医院需求的变异系数
+        """
+        self.mean = np.asarray(mean, dtype=float)
+        self.variation = np.broadcast_to(np.asarray(variation, dtype=float), self.mean.shape).copy()
+        sigma = np.sqrt(np.log1p(self.variation ** 2))
+        # 对数正态：exp(sigma z - sigma^2 / 2) 的均值为 1
+        self.demands = self.mean * np.exp(sigma * self._normal - sigma ** 2 / 2)
+
+    def accessibility_losses(self, supply: np.ndarray) -> np.ndarray:
+        """
+        各情景下的可及性损失 mean_j (1 - supply_j / demand_kj)^2
+
+        Args:
+            supply: 形状为 (..., hospital_level) 的各级医院资源总量
+
+        Returns:
+            np.ndarray: 形状为 (..., K) 的损失
+        """
+        satisfaction = supply[..., None, :] / self.demands
+        return np.mean((1 - satisfaction) ** 2, axis=-1)
+
+    @staticmethod
+    def risk(losses: np.ndarray, measure: str = "expected", alpha: float = 0.9) -> np.ndarray:
+        """
+        将各情景的损失汇总为风险度量
+
+        Args:
+            losses: 形状为 (..., K) 的损失
+            measure: "expected" (期望) 或 "cvar" (条件风险价值)
+            alpha: CVaR 的置信水平，取最差 ceil((1 - alpha) K) 个情景的平均
+
+        Returns:
+            np.ndarray: 形状为 (...) 的风险值
+        """
+        if measure == "expected":
+            return losses.mean(axis=-1)
+        if measure == "cvar":
+            n_scenarios = losses.shape[-1]
+            n_tail = min(max(1, int(np.ceil((1 - alpha) * n_scenarios - 1e-9))), n_scenarios)
+            tail = np.partition(losses, n_scenarios - n_tail, axis=-1)[..., n_scenarios - n_tail:]
+            return tail.mean(axis=-1)
+        raise ValueError(f"Unknown risk measure: {measure}. Available: {RISK_MEASURES}")
+
+    def satisfaction(self, supply: np.ndarray) -> np.ndarray:
+        """
+        各级医院同时满足需求的情景比例 (联合机会约束的满足概率)
+
+        Args:
+            supply: 形状为 (..., hospital_level) 的各级医院资源总量
+
+        Returns:
+            np.ndarray: 形状为 (...) 的比例
+        """
+        return np.mean(np.all(supply[..., None, :] >= self.demands, axis=-1), axis=-1)
+
+    def quantile(self, level: float) -> np.ndarray:
+        """
+        各级医院需求的样本分位数 (逐级机会约束的需求下限)
+
+        Args:
+            level: 满足概率，如 0.9
+
+        Returns:
+            np.ndarray: 形状为 (hospital_level,) 的需求下限
+        """
+        return np.quantile(self.demands, level, axis=0, method="higher")
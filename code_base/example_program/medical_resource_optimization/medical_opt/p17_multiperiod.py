@@ -0,0 +1,410 @@
+"""
+多期滚动规划模块 (p17_multiperiod.py)
+预算按年度下达，设备等资源跨年留存并逐年折旧。多期模型的决策为各期新增配置 y_t，
+期末存量 s_t = (1 - δ) s_{t-1} + y_t：
+
+- 预算约束按期：sum_j c_ij y_tij <= B_ti
+- 需求约束针对存量：sum_i s_tij >= D_tj (含上一窗口结转、折旧后的存量)
+- 效率与成本损失按各期新增配置与当期预算计算，可及性损失按各期存量与当期需求计算，
+  窗口内各期取平均 (单期时与 ResourceOptimizer 的损失一致)
+
+窗口模型复用 Constraints 与 ResourceOptimizer：窗口内的 (期, 医院等级) 展开为虚拟医院等级，
+按期预算编译为成本加权的 cap 规则，存量需求编译为带折旧系数的 linear 规则，
+附加规则按期复制。滚动规划每期只求解当前窗口，执行窗口第一期的决策后向前滚动一期，
+并以上一窗口的方案 (平移一期) 热启动，十年规划化为一系列小规模问题。
+"""
+
+import copy
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import OPTIMIZER_CONFIG
+from .p05_constraints import Constraints
+from .p06_optimizer import ResourceOptimizer
+from .p11_exact import ExactSolver
+
+
+class WindowModel:
+    """规划窗口 [start, start + n_periods) 的时间展开模型"""
+
+    def __init__(self,
+                 budgets: np.ndarray,
+                 demands: np.ndarray,
+                 cost_matrix: np.ndarray,
+                 depreciation: np.ndarray,
+                 inventory: np.ndarray):
+        """
+        Args:
+            budgets: 形状为 (H, resource_type) 的各期预算
+            demands: 形状为 (H, hospital_level) 的各期需求
+            cost_matrix: 形状为 (resource_type, hospital_level) 的单位成本
+            depreciation: 形状为 (resource_type,) 的年折旧率
+            inventory: 形状为 (resource_type, hospital_level) 的窗口开始前存量
+        """
+        self.budgets = np.asarray(budgets, dtype=float)
+        self.demands = np.asarray(demands, dtype=float)
+        self.cost_matrix = np.asarray(cost_matrix, dtype=float)
+        self.n_periods, self.n_resources = self.budgets.shape
+        self.n_levels = self.demands.shape[1]
+        retention = 1.0 - np.asarray(depreciation, dtype=float)
+
+        # decay[i, t, u] = (1 - δ_i)^(t - u)，u <= t
+        lag = np.arange(self.n_periods)[:, None] - np.arange(self.n_periods)[None, :]
+        self.decay = np.where(lag >= 0, retention[:, None, None] ** np.maximum(lag, 0), 0.0)
+        # 结转存量在各期末的剩余：(resource_type, H, hospital_level)
+        carry = retention[:, None] ** np.arange(1, self.n_periods + 1)
+        self.carried = carry[:, :, None] * np.asarray(inventory, dtype=float)[:, None, :]
+
+    def stock(self, purchases: np.ndarray) -> np.ndarray:
+        """
+        各期末存量
+
+        Args:
+            purchases: 形状为 (..., resource_type, H, hospital_level) 的各期新增配置
+
+        Returns:
+            np.ndarray: 同形状的存量
+        """
+        return self.carried + np.einsum("rtu,...rul->...rtl", self.decay, purchases)
+
+    def linear_terms(self, purchases: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        三个损失中平方项内的仿射量
+
+        Returns:
+            Tuple: (预算利用率 (..., resource_type, H), 需求满足度 (..., H, hospital_level),
+                    成本占比 (..., resource_type, H))
+        """
+        purchases = np.asarray(purchases, dtype=np.float64)
+        utilization = purchases.sum(axis=-1) / self.budgets.T
+        satisfaction = self.stock(purchases).sum(axis=-3) / self.demands
+        cost_share = np.sum(purchases * self.cost_matrix[:, None, :], axis=-1) / self.budgets.T
+        return utilization, satisfaction, cost_share
+
+    def losses(self, purchases: np.ndarray) -> np.ndarray:
+        """
+        (效率, 可及性, 成本) 损失，窗口内各期平均
+
+        Args:
+            purchases: 形状为 (..., resource_type, H, hospital_level)
+
+        Returns:
+            np.ndarray: 形状为 (..., 3)
+        """
+        utilization, satisfaction, cost_share = self.linear_terms(purchases)
+        return np.stack([
+            np.mean((1 - utilization) ** 2, axis=(-2, -1)),
+            np.mean((1 - satisfaction) ** 2, axis=(-2, -1)),
+            np.mean(cost_share ** 2, axis=(-2, -1))
+        ], axis=-1)
+
+    def budget_config(self, base_config: Dict) -> Dict:
+        """
+        窗口的预算配置：虚拟医院等级 t * hospital_level + j (从 1 编号)，
+        总预算为各期之和，内置需求约束置 0 (改由存量需求规则约束)，
+        按期预算与存量需求编译为附加规则，基准配置中的附加规则按期复制
+
+        Args:
+            base_config: 单期预算配置 (提供资源编号、单位成本与附加规则)
+
+        Returns:
+            Dict: 结构同 BUDGET_CONFIG 的窗口配置
+        """
+        resources = sorted(base_config["BUDGET_LIMITS"])
+        levels = sorted(base_config["DEMAND_THRESHOLDS"])
+        n_levels = len(levels)
+
+        def column(t, j):
+            return t * n_levels + levels.index(j) + 1
+
+        rules = []
+        for t in range(self.n_periods):
+            period_levels = [column(t, j) for j in levels]
+            for r, i in enumerate(resources):
+                rules.append({"type": "cap", "name": f"budget[{i}]@{t}", "resources": [i],
+                              "levels": period_levels, "weight": "cost",
+                              "limit": float(self.budgets[t, r])})
+            for k, j in enumerate(levels):
+                terms = [(i, column(u, j), float(self.decay[r, t, u]))
+                         for r, i in enumerate(resources) for u in range(t + 1)]
+                carried = float(self.carried[:, t, k].sum())
+                rules.append({"type": "linear", "name": f"demand[{j}]@{t}", "terms": terms,
+                              "sense": ">=", "rhs": float(self.demands[t, k]) - carried})
+            for index, rule in enumerate(base_config.get("CONSTRAINT_RULES", [])):
+                rules.append(self._period_rule(rule, index, t, column, levels))
+
+        return {
+            "BUDGET_LIMITS": {i: float(self.budgets[:, r].sum()) for r, i in enumerate(resources)},
+            "DEMAND_THRESHOLDS": {column(t, j): 0.0 for t in range(self.n_periods) for j in levels},
+            "UNIT_COSTS": copy.deepcopy(base_config["UNIT_COSTS"]),
+            "CONSTRAINT_RULES": rules
+        }
+
+    @staticmethod
+    def _period_rule(rule: Dict, index: int, t: int, column, levels: List[int]) -> Dict:
+        """将单期附加规则改写为第 t 期新增配置上的规则"""
+        rule = copy.deepcopy(rule)
+        rule["name"] = f"{rule.get('name', rule['type'] + f'[{index}]')}@{t}"
+        if rule["type"] == "linear":
+            rule["terms"] = [(i, column(t, j), coef) for i, j, coef in rule["terms"]]
+            return rule
+        specs = [rule] + [rule[key] for key in ("numerator", "denominator", "follow", "lead")
+                          if key in rule]
+        for spec in specs:
+            spec["levels"] = [column(t, j) for j in spec.get("levels", levels)]
+        return rule
+
+
+class MultiPeriodOptimizer(ResourceOptimizer):
+    """窗口模型上的 ResourceOptimizer：分配方案为 (resource_type, H × hospital_level)"""
+
+    def __init__(self, resource_types: Dict, hospital_levels: Dict, base_config: Dict,
+                 window: WindowModel, **kwargs):
+        """
+        Args:
+            resource_types: 资源类型配置
+            hospital_levels: 单期医院等级配置
+            base_config: 单期预算配置
+            window: 窗口模型
+            **kwargs: ResourceOptimizer 的其余参数 (seed, backend, weights 等)
+        """
+        self.window = window
+        budget_config = window.budget_config(base_config)
+        window_levels = {t * len(hospital_levels) + k + 1: f"{name}@{t}"
+                         for t in range(window.n_periods)
+                         for k, name in enumerate(hospital_levels.values())}
+        constraints = Constraints(budget_config, window_levels,
+                                  cost_matrix=np.tile(window.cost_matrix, window.n_periods))
+        kwargs.setdefault("robust", False)
+        super().__init__(resource_types, window_levels, budget_config, constraints, **kwargs)
+
+    def _window_view(self, allocation: np.ndarray) -> np.ndarray:
+        """(..., resource_type, H × hospital_level) -> (..., resource_type, H, hospital_level)"""
+        allocation = np.asarray(allocation)
+        return allocation.reshape(allocation.shape[:-1] + (self.window.n_periods, self.window.n_levels))
+
+    def _calculate_efficiency_loss(self, allocation: np.ndarray) -> np.ndarray:
+        """各期预算利用率偏差的平均"""
+        utilization, _, _ = self.window.linear_terms(self._window_view(allocation))
+        return np.mean((1 - utilization) ** 2, axis=(-2, -1))
+
+    def _calculate_accessibility_loss(self, allocation: np.ndarray) -> np.ndarray:
+        """各期存量需求满足度偏差的平均"""
+        _, satisfaction, _ = self.window.linear_terms(self._window_view(allocation))
+        return np.mean((1 - satisfaction) ** 2, axis=(-2, -1))
+
+    def _calculate_cost_loss(self, allocation: np.ndarray) -> np.ndarray:
+        """各期新增配置成本占预算比例的平均"""
+        _, _, cost_share = self.window.linear_terms(self._window_view(allocation))
+        return np.mean(cost_share ** 2, axis=(-2, -1))
+
+    def quadratic_objectives(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        三个损失的最小二乘形式：各仿射量对单位向量求值得到系数矩阵，对零向量求值得到常数项
+        """
+        n_variables = self.constraints.n_variables
+        basis = self._window_view(np.eye(n_variables).reshape(n_variables, self.window.n_resources, -1))
+        zero = self._window_view(np.zeros((self.window.n_resources, n_variables // self.window.n_resources)))
+        targets = (1.0, 1.0, 0.0)
+        forms = []
+        for terms, offset, target in zip(self.window.linear_terms(basis),
+                                         self.window.linear_terms(zero), targets):
+            G = (terms - offset).reshape(n_variables, -1).T
+            forms.append((G, target - offset.reshape(-1)))
+        return forms
+
+
+class RollingHorizonPlanner:
+    """多期滚动规划：每期求解一个窗口，执行第一期决策后向前滚动"""
+
+    def __init__(self,
+                 resource_types: Dict,
+                 hospital_levels: Dict,
+                 budget_config: Dict,
+                 constraints: Constraints,
+                 budgets: Optional[np.ndarray] = None,
+                 demands: Optional[np.ndarray] = None,
+                 config: Optional[Dict] = None,
+                 weights: Optional[np.ndarray] = None,
+                 seed: Optional[int] = None):
+        """
+        初始化规划器
+
+        Args:
+            resource_types: 资源类型配置
+            hospital_levels: 医院等级配置
+            budget_config: 单期预算配置 (首期预算与需求、单位成本、附加规则)
+            constraints: 单期约束条件对象 (提供单位成本矩阵)
+            budgets: 形状为 (n_periods, resource_type) 的各期预算，默认由首期预算按
+                     budget_growth 逐年增长
+            demands: 形状为 (n_periods, hospital_level) 的各期需求，默认由首期需求按
+                     demand_growth 逐年增长
+            config: 规划参数，默认取 OPTIMIZER_CONFIG["multi_period"]
+            weights: 选取执行方案所用的损失权重 (如 AHP 权重)，默认同 ResourceOptimizer
+            seed: 随机种子
+        """
+        self.logger = logging.getLogger(__name__)
+        self.resource_types = resource_types
+        self.hospital_levels = hospital_levels
+        self.budget_config = budget_config
+        self.cost_matrix = constraints.cost_matrix
+        self.config = OPTIMIZER_CONFIG["multi_period"] if config is None else config
+        self.weights = weights
+        self.seed = seed
+
+        n_periods = self.config["n_periods"]
+        growth = np.arange(n_periods)[:, None]
+        if budgets is None:
+            first = [budget_config["BUDGET_LIMITS"][i] for i in sorted(budget_config["BUDGET_LIMITS"])]
+            budgets = np.asarray(first, dtype=float) * (1 + self.config["budget_growth"]) ** growth
+        if demands is None:
+            first = [budget_config["DEMAND_THRESHOLDS"][j]
+                     for j in sorted(budget_config["DEMAND_THRESHOLDS"])]
+            demands = np.asarray(first, dtype=float) * (1 + self.config["demand_growth"]) ** growth
+        self.budgets = np.asarray(budgets, dtype=float)
+        self.demands = np.asarray(demands, dtype=float)
+        if len(self.budgets) != len(self.demands):
+            raise ValueError("budgets and demands must cover the same number of periods")
+
+        n_resources = len(resource_types)
+        depreciation = self.config["depreciation"]
+        if isinstance(depreciation, dict):
+            depreciation = [depreciation[i] for i in sorted(depreciation)]
+        self.depreciation = np.broadcast_to(np.asarray(depreciation, dtype=float), (n_resources,))
+        inventory = self.config["initial_inventory"]
+        self.initial_inventory = (np.zeros((n_resources, len(hospital_levels))) if inventory is None
+                                  else np.asarray(inventory, dtype=float))
+
+    def window_model(self, start: int, inventory: np.ndarray) -> WindowModel:
+        """从第 start 期开始的规划窗口 (末尾不足 window 期时截短)"""
+        stop = min(start + self.config["window"], len(self.budgets))
+        return WindowModel(self.budgets[start:stop], self.demands[start:stop],
+                           self.cost_matrix, self.depreciation, inventory)
+
+    def _choose(self, optimizer: MultiPeriodOptimizer,
+                front: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+        """从窗口的帕累托前沿中取加权损失最小的方案"""
+        allocations, objectives = front
+        best = int(np.argmin(objectives @ optimizer.weights))
+        return allocations[best].astype(np.float64)
+
+    def _shift(self, plan: np.ndarray, window: WindowModel) -> np.ndarray:
+        """
+        上一窗口的方案平移一期作为新窗口的热启动：丢弃已执行的第一期，末期重复最后一期
+
+        Args:
+            plan: 形状为 (..., resource_type, H_prev, hospital_level)
+            window: 新窗口
+
+        Returns:
+            np.ndarray: 形状为 (..., resource_type, H × hospital_level)
+        """
+        rest = plan[..., 1:, :]
+        if rest.shape[-2] == 0:
+            rest = plan
+        while rest.shape[-2] < window.n_periods:
+            rest = np.concatenate([rest, rest[..., -1:, :]], axis=-2)
+        rest = rest[..., :window.n_periods, :]
+        return rest.reshape(rest.shape[:-2] + (-1,))
+
+    def solve_window(self, start: int, inventory: np.ndarray,
+                     previous: Optional[np.ndarray] = None
+                     ) -> Tuple[np.ndarray, np.ndarray, Dict]:
+        """
+        求解一个窗口
+
+        Args:
+            start: 窗口第一期
+            inventory: 窗口开始前的存量
+            previous: 上一窗口的方案 (及前沿)，形状为 (n, resource_type, H_prev, hospital_level)，
+                      第一个为执行方案；None 表示冷启动
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, Dict]: (选定方案 (resource_type, H, hospital_level)，
+                前沿方案 (n, resource_type, H, hospital_level)，窗口统计)
+        """
+        window = self.window_model(start, inventory)
+        optimizer = MultiPeriodOptimizer(self.resource_types, self.hospital_levels, self.budget_config,
+                                         window, seed=self.seed, parallel=False,
+                                         backend=self.config["optimizer_backend"], weights=self.weights)
+        seeds = None if previous is None else self._shift(previous, window)
+        view = optimizer._window_view
+        if self.config["solver"] == "exact":
+            solver = ExactSolver(optimizer.constraints, optimizer.quadratic_objectives(),
+                                 tolerance=optimizer.exact_config["tolerance"],
+                                 max_iterations=optimizer.exact_config["max_iterations"],
+                                 feasibility_tolerance=optimizer.exact_config["feasibility_tolerance"])
+            x0 = None if seeds is None else optimizer.constraints.project(seeds[0]).reshape(-1)
+            x, _ = solver.solve_weighted(optimizer.weights, x0=x0)
+            plan = x.reshape(window.n_resources, -1)
+            front = plan[None]
+            stats = {"generations": 0, "evaluations": 0, "stop_reason": "exact"}
+        else:
+            _, _, (front, objectives) = optimizer.optimize(seeds=seeds, checkpoint_path=None)
+            plan = self._choose(optimizer, (front, objectives))
+            stats = {"generations": int(optimizer.telemetry.latest("generation")),
+                     "evaluations": optimizer.telemetry.total_evaluations,
+                     "stop_reason": optimizer.stop_reason}
+            front = front.astype(np.float64)
+        stats["feasible"] = bool(optimizer.constraints.is_feasible(plan))
+        return view(plan), view(front), stats
+
+    def run(self) -> Dict[str, np.ndarray]:
+        """
+        滚动求解全部各期
+
+        Returns:
+            Dict[str, np.ndarray]: 按期的列存结果：period、purchases (各期新增配置)、
+                inventory (各期末存量)、efficiency_loss / accessibility_loss / cost_loss
+                (执行方案在当期的损失)、window_feasible、generations、evaluations、seconds
+        """
+        n_periods = len(self.budgets)
+        inventory = self.initial_inventory
+        previous = None
+        rows = []
+        for start in range(n_periods):
+            started = time.perf_counter()
+            plan, front, stats = self.solve_window(start, inventory, previous)
+            purchase = plan[:, 0, :]
+            period = WindowModel(self.budgets[start:start + 1], self.demands[start:start + 1],
+                                 self.cost_matrix, self.depreciation, inventory)
+            losses = period.losses(purchase[:, None, :])
+            inventory = period.stock(purchase[:, None, :])[:, 0, :]
+            if self.config["warm_start"]:
+                # 执行方案在前，前沿等间隔抽取
+                n_front = min(len(front), self.config["n_seeds"] - 1)
+                chosen = np.linspace(0, len(front) - 1, max(n_front, 0)).round().astype(int)
+                previous = np.concatenate([plan[None], front[chosen]])
+            rows.append({"purchases": purchase, "inventory": inventory, "losses": losses,
+                         "seconds": time.perf_counter() - started, **stats})
+            self.logger.info(f"Period {start}: losses {np.round(losses, 4).tolist()}, "
+                             f"{stats['stop_reason']} after {rows[-1]['seconds']:.2f}s")
+
+        losses = np.array([row["losses"] for row in rows])
+        return {
+            "period": np.arange(n_periods),
+            "purchases": np.array([row["purchases"] for row in rows]),
+            "inventory": np.array([row["inventory"] for row in rows]),
+            "efficiency_loss": losses[:, 0],
+            "accessibility_loss": losses[:, 1],
+            "cost_loss": losses[:, 2],
+            "window_feasible": np.array([row["feasible"] for row in rows]),
+            "generations": np.array([row["generations"] for row in rows]),
+            "evaluations": np.array([row["evaluations"] for row in rows]),
+            "seconds": np.array([row["seconds"] for row in rows])
+        }
+
+
+# 测试代码
+if __name__ == "__main__":
+    from .config import BUDGET_CONFIG, HOSPITAL_LEVELS, RESOURCE_TYPES
+
+    planner = RollingHorizonPlanner(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG,
+                                    Constraints(BUDGET_CONFIG, HOSPITAL_LEVELS))
+    plan = planner.run()
+    for t in plan["period"]:
+        print(f"第 {t} 期新增配置:\n{np.round(plan['purchases'][t], 2)}")
+    print(f"各期可及性损失: {np.round(plan['accessibility_loss'], 4)}")
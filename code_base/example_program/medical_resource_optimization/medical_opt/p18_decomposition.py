@@ -0,0 +1,448 @@
+"""
+区域分解模块 (p18_decomposition.py)
+省级规模下按设施展开的单一问题过大，种群搜索难以收敛。分解模式把实例拆成若干区域子问题：
+
+- 每个区域有自己的需求、附加规则与 Constraints 切片 (预算行取全局预算，只作宽松上界)
+- 全局目标为各区域加权损失之和，区域间唯一的耦合是共享的预算行
+  sum_r sum_j c_rij x_rij <= B_i
+- 共享预算行用 ADMM (共享问题形式) 协调：x 步各区域并行求解带增广项的凸二次子问题，
+  z 步把各区域的预算占用投影到全局预算内 (闭式解)，对偶变量按残差更新，
+  ρ 按原始/对偶残差自适应调整；收敛后 ρ u 即各资源预算的影子价格
+- 子问题在进程池中求解，每个工作进程只为分到的区域建立一次求解器，
+  每轮只传输目标平移量与热启动点，单轮耗时取决于每核区域数而非总问题规模
+"""
+
+import copy
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import OPTIMIZER_CONFIG, SYSTEM_CONFIG
+from .p05_constraints import Constraints
+from .p06_optimizer import ResourceOptimizer
+from .p09_parallel import resolve_n_jobs
+from .p11_exact import ExactSolver
+from .p17_multiperiod import WindowModel
+
+
+# 自适应 ρ 相对初值的调整范围
+_RHO_RANGE = 1e3
+
+# 进程池工作进程的状态：该进程的区域求解器缓存 (仅在 ProcessPoolExecutor 的工作进程中设置；
+# 串行与线程后端使用各 RegionalDecomposition 实例自己的缓存)
+_REGION_STATE: Dict = {}
+
+
+def _init_region_worker(regions: List[Tuple]) -> None:
+    """工作进程初始化：建立该进程的区域求解器缓存，求解器在首次分到该区域时建立"""
+    _REGION_STATE["solvers"] = _RegionSolvers(regions)
+
+
+def _solve_region(task: Tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """工作进程中求解区域子问题 (见 _RegionSolvers.solve)"""
+    return _REGION_STATE["solvers"].solve(task)
+
+
+def _region_model(payload: Tuple) -> Tuple[Constraints, List[Tuple[np.ndarray, np.ndarray]], np.ndarray]:
+    """
+    区域子问题的约束切片、最小二乘形式与归一化权重
+
+    前三个形式为区域的三个损失 (预算按名义份额归一化)，第四个为预算占用
+    A x (按全局预算归一化的成本加权行和)，供 ADMM 增广项使用
+
+    Args:
+        payload: 区域配置 (见 RegionalDecomposition._region_payload)
+
+    Returns:
+        Tuple: (约束条件对象, [(G, h), ...], 权重)
+    """
+    resource_types, hospital_levels, objective_config, constraint_config, weights = payload
+    constraints = Constraints(constraint_config, hospital_levels)
+    optimizer = ResourceOptimizer(resource_types, hospital_levels, objective_config, constraints,
+                                  parallel=False, weights=weights, robust=False)
+    limits = np.array([constraint_config["BUDGET_LIMITS"][i] for i in constraints.resource_keys])
+    usage = (np.kron(np.eye(constraints.n_resources), np.ones(constraints.n_levels))
+             * constraints.cost_matrix.reshape(-1)) / limits[:, None]
+    forms = optimizer.quadratic_objectives() + [(usage, np.zeros(constraints.n_resources))]
+    return constraints, forms, optimizer.weights
+
+
+class _RegionSolvers:
+    """各区域子问题求解器的缓存，每个区域的求解器首次用到时建立并跨轮复用"""
+
+    def __init__(self, regions: List[Tuple]):
+        """
+        Args:
+            regions: 各区域配置 (见 RegionalDecomposition._region_payload)
+        """
+        self.regions = regions
+        self.solvers: Dict[int, Tuple[ExactSolver, np.ndarray]] = {}
+
+    def solver(self, index: int, limits: Optional[np.ndarray] = None) -> Tuple[ExactSolver, np.ndarray]:
+        """
+        区域的求解器与权重
+
+        Args:
+            index: 区域序号
+            limits: 区域预算行的上限 (分得的预算)，None 时取全局预算，求解器首次用到时建立并缓存
+        """
+        if limits is None and index in self.solvers:
+            return self.solvers[index]
+        payload = self.regions[index]
+        constraints, forms, weights = _region_model(payload)
+        if limits is not None:
+            config = dict(payload[3])
+            config["BUDGET_LIMITS"] = dict(zip(constraints.resource_keys, limits))
+            constraints = Constraints(config, payload[1], cost_matrix=constraints.cost_matrix)
+        exact_config = OPTIMIZER_CONFIG["exact"]
+        solver = ExactSolver(constraints, forms, tolerance=exact_config["tolerance"],
+                             max_iterations=exact_config["max_iterations"],
+                             feasibility_tolerance=exact_config["feasibility_tolerance"])
+        if limits is None:
+            self.solvers[index] = (solver, weights)
+        return solver, weights
+
+    def solve(self, task: Tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        ADMM 的 x 步：min w·L_r(x) + ρ/2 ||A_r x - target||^2，x ∈ 区域约束
+
+        每轮只通过 set_target 平移增广项的目标，求解器跨轮复用 (同一轮内各区域互不共享求解器，
+        线程后端可并发调用)；给出分得的预算时区域预算行改为该上限 (协调结束后的修复轮)，
+        该上限下区域约束不可行时保留热启动点 (上一轮的解)
+
+        Args:
+            task: (区域序号, target, ρ, 热启动点, 分得的预算或 None)
+
+        Returns:
+            Tuple: (分配向量, 三个损失, 预算占用 A_r x)
+        """
+        index, target, rho, x0, limits = task
+        solver, weights = self.solver(index, limits)
+        if solver.relaxed_rows and limits is not None:
+            return x0, solver.losses(x0)[:3], solver.designs[3] @ x0
+        solver.set_target(3, target)
+        # 增广项以 mean 形式给出，权重乘以行数还原为 ρ/2 ||·||^2
+        x, losses = solver.solve_weighted(np.append(weights, rho * len(target) / 2), x0=x0)
+        return x, losses[:3], solver.designs[3] @ x
+
+
+class RegionalDecomposition:
+    """按区域分解、以 ADMM 协调共享预算的求解器"""
+
+    def __init__(self,
+                 resource_types: Dict,
+                 hospital_levels: Dict,
+                 budget_config: Dict,
+                 regions: List[Dict],
+                 config: Optional[Dict] = None,
+                 weights: Optional[np.ndarray] = None):
+        """
+        初始化分解求解器
+
+        Args:
+            resource_types: 资源类型配置
+            hospital_levels: 医院等级配置
+            budget_config: 全局预算配置 (BUDGET_LIMITS 为各区域共享的总预算，
+                           UNIT_COSTS 与 CONSTRAINT_RULES 为各区域的默认值)
+            regions: 区域列表，每项含 "name"、"DEMAND_THRESHOLDS"，可选 "UNIT_COSTS"、
+                     "CONSTRAINT_RULES" (追加在默认规则之后) 与 "share" (损失归一化所用的
+                     名义预算份额，默认按需求总量分摊)
+            config: 分解参数，默认取 OPTIMIZER_CONFIG["decomposition"]
+            weights: 损失权重 (如 AHP 权重)，默认同 ResourceOptimizer
+        """
+        self.logger = logging.getLogger(__name__)
+        self.resource_types = resource_types
+        self.hospital_levels = hospital_levels
+        self.budget_config = budget_config
+        self.regions = regions
+        self.config = OPTIMIZER_CONFIG["decomposition"] if config is None else config
+        self.weights = weights
+
+        self.resource_keys = sorted(budget_config["BUDGET_LIMITS"])
+        self.level_keys = sorted(hospital_levels)
+        self.budgets = np.array([budget_config["BUDGET_LIMITS"][i] for i in self.resource_keys],
+                                dtype=float)
+        totals = np.array([sum(region["DEMAND_THRESHOLDS"].values()) for region in regions],
+                          dtype=float)
+        shares = [region.get("share") for region in regions]
+        default = totals / totals.sum() if totals.sum() > 0 else np.full(len(regions), 1 / len(regions))
+        self.shares = np.array([default[r] if s is None else s for r, s in enumerate(shares)],
+                               dtype=float)
+        self.payloads = [self._region_payload(r) for r in range(len(regions))]
+        self._models: Dict[int, Tuple] = {}
+        # 串行与线程后端的区域求解器 (进程后端在各工作进程中另建)
+        self._solvers = _RegionSolvers(self.payloads)
+
+    @property
+    def names(self) -> List[str]:
+        return [region.get("name", f"region[{r}]") for r, region in enumerate(self.regions)]
+
+    def region_config(self, index: int) -> Dict:
+        """
+        区域的约束配置 (Constraints 切片)：区域需求与规则，预算行取全局预算
+
+        Args:
+            index: 区域序号
+
+        Returns:
+            Dict: 结构同 BUDGET_CONFIG 的区域配置
+        """
+        region = self.regions[index]
+        return {
+            "BUDGET_LIMITS": dict(self.budget_config["BUDGET_LIMITS"]),
+            "DEMAND_THRESHOLDS": dict(region["DEMAND_THRESHOLDS"]),
+            "UNIT_COSTS": copy.deepcopy(region.get("UNIT_COSTS", self.budget_config["UNIT_COSTS"])),
+            "CONSTRAINT_RULES": (copy.deepcopy(self.budget_config.get("CONSTRAINT_RULES", [])) +
+                                 copy.deepcopy(region.get("CONSTRAINT_RULES", [])))
+        }
+
+    def _region_payload(self, index: int) -> Tuple:
+        """发送给工作进程的区域配置 (损失按名义预算份额归一化)"""
+        constraint_config = self.region_config(index)
+        objective_config = dict(constraint_config)
+        objective_config["BUDGET_LIMITS"] = {
+            i: float(b * self.shares[index]) for i, b in zip(self.resource_keys, self.budgets)
+        }
+        return (self.resource_types, self.hospital_levels, objective_config, constraint_config,
+                self.weights)
+
+    def _model(self, index: int) -> Tuple:
+        """当前进程中区域的 (约束, 最小二乘形式, 权重)，按需建立并缓存"""
+        if index not in self._models:
+            self._models[index] = _region_model(self.payloads[index])
+        return self._models[index]
+
+    def _executor(self, backend: Optional[str], max_workers: Optional[int]):
+        """按配置创建区域子问题的执行器，单个工作者时返回 None (在当前进程中求解)；
+        线程池共用本实例的求解器缓存，进程池的每个工作进程建立自己的缓存"""
+        backend = self.config["backend"] if backend is None else backend
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown decomposition backend: {backend}")
+        if max_workers is None:
+            max_workers = self.config["max_workers"]
+        n_workers = min(resolve_n_jobs(
+            SYSTEM_CONFIG["parallel"]["n_jobs"] if max_workers is None else max_workers
+        ), len(self.regions))
+        if n_workers <= 1:
+            return None
+        if backend == "thread":
+            return ThreadPoolExecutor(max_workers=n_workers)
+        return ProcessPoolExecutor(max_workers=n_workers, initializer=_init_region_worker,
+                                   initargs=(self.payloads,))
+
+    def solve(self, backend: Optional[str] = None,
+              max_workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        ADMM 协调求解 (缩放形式，g_r = A_r x_r 为区域 r 占全局预算的比例)：
+
+            x_r <- argmin w·L_r(x) + ρ/2 ||A_r x - z_r + u_r||^2   (各区域并行)
+            z   <- 将 g_r + u_r 投影到 {sum_r z_r <= 1}
+            u_r <- u_r + g_r - z_r
+
+        原始残差 ||g - z|| 与对偶残差 ρ||z - z_prev|| 均低于 tolerance 时停止。
+        z 始终满足全局预算；结束时仍超出预算的资源，各区域以 z_r B 为区域预算上限
+        再求解一轮 (区域在该上限下不可行时保留原解，超出量在 tolerance 量级)
+
+        Args:
+            backend: "process" 或 "thread"，默认取 config["backend"]
+            max_workers: 并发数，约定同 resolve_n_jobs，默认取 config["max_workers"]
+
+        Returns:
+            Dict[str, np.ndarray]: regions (区域名)、allocations (区域 × 资源 × 医院等级)、
+                losses (区域 × 3)、objective (各区域加权损失之和)、budget_limits (修复轮中各区域
+                的预算上限，区域 × 资源，未超支的资源为全局预算)、budget_usage (各资源总成本
+                占预算比例)、prices (各资源预算的影子价格，单位为加权损失/预算比例)、
+                iterations、converged、primal_residual / dual_residual / rho (逐轮历史)、seconds
+        """
+        config = self.config
+        if config["max_iterations"] < 1:
+            raise ValueError(f"max_iterations must be at least 1, got {config['max_iterations']}")
+        n_regions, n_resources = len(self.regions), len(self.resource_keys)
+        rho = float(config["rho"])
+        rho_min, rho_max = rho / _RHO_RANGE, rho * _RHO_RANGE
+        z = np.outer(self.shares, np.ones(n_resources))
+        u = np.zeros_like(z)
+        x = [None] * n_regions
+        history = {"primal_residual": [], "dual_residual": [], "rho": []}
+        converged = False
+
+        executor = self._executor(backend, max_workers)
+        if executor is None:
+            solve = lambda tasks: map(self._solvers.solve, tasks)
+        elif isinstance(executor, ThreadPoolExecutor):
+            solve = lambda tasks: executor.map(self._solvers.solve, tasks)
+        else:
+            solve = lambda tasks: executor.map(_solve_region, tasks)
+        self.logger.info(f"Solving {n_regions} regions with ADMM "
+                         f"({'serial' if executor is None else 'parallel'})")
+        started = time.perf_counter()
+        try:
+            for iteration in range(1, config["max_iterations"] + 1):
+                tasks = [(r, z[r] - u[r], rho, x[r], None) for r in range(n_regions)]
+                results = list(solve(tasks))
+                x = [result[0] for result in results]
+                usage = np.array([result[2] for result in results])
+
+                # z 步：逐资源投影到 sum_r z_r <= 1
+                v = usage + u
+                excess = np.maximum(v.sum(axis=0) - 1.0, 0.0)
+                z_previous = z
+                z = v - excess / n_regions
+                u = u + usage - z
+
+                primal = float(np.linalg.norm(usage - z))
+                dual = float(rho * np.linalg.norm(z - z_previous))
+                history["primal_residual"].append(primal)
+                history["dual_residual"].append(dual)
+                history["rho"].append(rho)
+                if primal <= config["tolerance"] and dual <= config["tolerance"]:
+                    converged = True
+                    break
+                if config["adaptive_rho"]:
+                    # 残差平衡：未达标的原始残差过大时加大 ρ，未达标的对偶残差过大时减小 ρ
+                    # (缩放对偶变量随之调整)，ρ 限制在初值的 _RHO_RANGE 倍以内
+                    if primal > config["tolerance"] and primal > 10 * dual and rho < rho_max:
+                        rho, u = rho * 2, u / 2
+                    elif dual > config["tolerance"] and dual > 10 * primal and rho > rho_min:
+                        rho, u = rho / 2, u * 2
+
+            # 修复轮：残差容差内仍超出全局预算的资源，各区域以分得的预算 z_r B
+            # (合计不超过全局预算) 为上限再求解一次
+            limits = np.tile(self.budgets, (n_regions, 1))
+            over = usage.sum(axis=0) > 1.0
+            if np.any(over):
+                limits[:, over] = np.maximum(z[:, over], 0.0) * self.budgets[over]
+                results = list(solve([(r, z[r] - u[r], rho, x[r], limits[r])
+                                      for r in range(n_regions)]))
+        except Exception as e:
+            self.logger.error(f"Error in regional decomposition: {str(e)}")
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        seconds = time.perf_counter() - started
+
+        allocations = np.array([result[0] for result in results]).reshape(
+            n_regions, n_resources, len(self.level_keys))
+        losses = np.array([result[1] for result in results])
+        usage = np.sum([result[2] for result in results], axis=0)
+        if np.any(usage > 1.0 + 1e-9):
+            self.logger.warning(f"Budgets exceeded by {np.round(usage - 1.0, 6).tolist()} "
+                                f"(fraction of the global budgets)")
+        weights = self._model(0)[2]
+        self.logger.info(f"ADMM {'converged' if converged else 'stopped'} after {iteration} "
+                         f"iterations in {seconds:.2f}s")
+        return {
+            "regions": np.array(self.names),
+            "allocations": allocations,
+            "losses": losses,
+            "objective": float(np.sum(losses @ weights)),
+            "budget_limits": limits,
+            "budget_usage": usage,
+            "prices": rho * u.mean(axis=0),
+            "iterations": iteration,
+            "converged": converged,
+            "primal_residual": np.array(history["primal_residual"]),
+            "dual_residual": np.array(history["dual_residual"]),
+            "rho": np.array(history["rho"]),
+            "seconds": seconds
+        }
+
+    def region_losses(self, index: int, allocation: np.ndarray) -> np.ndarray:
+        """
+        区域分配方案的三个损失
+
+        Args:
+            index: 区域序号
+            allocation: 形状为 (resource_type, hospital_level) 的分配方案
+
+        Returns:
+            np.ndarray: (效率, 可及性, 成本) 损失
+        """
+        _, forms, _ = self._model(index)
+        x = np.asarray(allocation, dtype=float).reshape(-1)
+        return np.array([np.mean((G @ x - h) ** 2) for G, h in forms[:3]])
+
+    def monolithic(self) -> Tuple[Constraints, List[Tuple[np.ndarray, np.ndarray]]]:
+        """
+        未分解的整体问题：(区域, 医院等级) 展开为虚拟医院等级 r * hospital_level + j，
+        预算行为共享的全局预算，需求行为各区域需求，各区域规则按区域改写。
+        各损失的最小二乘形式为区域形式的分块对角拼接，其均值与各区域损失之和只差常数倍。
+        用于小规模实例上核对分解解的最优性
+
+        Returns:
+            Tuple: (整体约束条件对象, [(G, h), ...])
+        """
+        n_levels = len(self.level_keys)
+
+        def column(r, j):
+            return r * n_levels + self.level_keys.index(j) + 1
+
+        rules, demands, costs, forms = [], {}, [], []
+        for r in range(len(self.regions)):
+            config = self.region_config(r)
+            for index, rule in enumerate(config["CONSTRAINT_RULES"]):
+                rules.append(WindowModel._period_rule(rule, index, r, column, self.level_keys))
+            demands.update({column(r, j): config["DEMAND_THRESHOLDS"][j] for j in self.level_keys})
+            costs.append(self._model(r)[0].cost_matrix)
+        combined = {
+            "BUDGET_LIMITS": dict(self.budget_config["BUDGET_LIMITS"]),
+            "DEMAND_THRESHOLDS": demands,
+            "UNIT_COSTS": copy.deepcopy(self.budget_config["UNIT_COSTS"]),
+            "CONSTRAINT_RULES": rules
+        }
+        levels = {column(r, j): f"{name}@{r}" for r in range(len(self.regions))
+                  for j, name in self.hospital_levels.items()}
+        constraints = Constraints(combined, levels, cost_matrix=np.hstack(costs))
+
+        # 区域变量 (i, j) 在整体向量中的下标为 i * (R × hospital_level) + r * hospital_level + j
+        n_regions, n_resources = len(self.regions), len(self.resource_keys)
+        for m in range(3):
+            blocks, targets = [], []
+            for r in range(n_regions):
+                G, h = self._model(r)[1][m]
+                block = np.zeros((len(h), n_resources, n_regions, n_levels))
+                block[:, :, r, :] = G.reshape(len(h), n_resources, n_levels)
+                blocks.append(block.reshape(len(h), -1))
+                targets.append(h)
+            forms.append((np.vstack(blocks), np.concatenate(targets)))
+        return constraints, forms
+
+    def solve_monolithic(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        直接求解未分解的整体加权问题 (小规模实例上的对照)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (分配方案 (区域 × 资源 × 医院等级)，损失 (区域 × 3))
+        """
+        constraints, forms = self.monolithic()
+        exact_config = OPTIMIZER_CONFIG["exact"]
+        solver = ExactSolver(constraints, forms, tolerance=exact_config["tolerance"],
+                             max_iterations=exact_config["max_iterations"],
+                             feasibility_tolerance=exact_config["feasibility_tolerance"])
+        x, _ = solver.solve_weighted(self._model(0)[2])
+        allocations = np.moveaxis(
+            x.reshape(len(self.resource_keys), len(self.regions), len(self.level_keys)), 1, 0
+        )
+        losses = np.array([self.region_losses(r, allocations[r]) for r in range(len(self.regions))])
+        return allocations, losses
+
+
+# 测试代码
+if __name__ == "__main__":
+    from .config import BUDGET_CONFIG, HOSPITAL_LEVELS, RESOURCE_TYPES
+
+    rng = np.random.default_rng(0)
+    base = {j: 0.04 * d for j, d in BUDGET_CONFIG["DEMAND_THRESHOLDS"].items()}
+    regions = [{"name": f"region{r}",
+                "DEMAND_THRESHOLDS": {j: float(d * rng.uniform(0.5, 1.5)) for j, d in base.items()}}
+               for r in range(8)]
+    decomposition = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, regions)
+    result = decomposition.solve()
+    print(f"迭代 {result['iterations']} 次，收敛: {result['converged']}")
+    print(f"预算占用: {np.round(result['budget_usage'], 4)}")
+    print(f"影子价格: {np.round(result['prices'], 4)}")
+    print(f"加权损失之和: {result['objective']:.6f}")
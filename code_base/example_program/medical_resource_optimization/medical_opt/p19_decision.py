@@ -0,0 +1,171 @@
+"""
+多准则决策模块 (p19_decision.py)
+在整个帕累托前沿上按 AHP / 模糊 AHP 权重选取折中方案，取代按目标字典序取最优：
+
+- TOPSIS：向量归一化后到正/负理想解的欧氏距离，贴近度越大越好
+- VIKOR：群体效用 S、个体遗憾 R 与折中指标 Q (v 为群体效用权重)，Q 越小越好
+- 模糊 TOPSIS (Chen, 2000)：三角模糊权重 (FuzzyAHP.fuzzy_ahp 的模糊权重向量)，
+  线性归一化后按顶点距离计算到模糊正/负理想解的距离
+
+三个目标均为损失 (越小越好)。全部计算为 (n, m) 数组上的逐列广播，前 k 名用 argpartition 选出，
+10^5 个点的前沿排序只需毫秒级，调整权重后无需重新优化。
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+# 支持的决策方法
+DECISION_METHODS = ("topsis", "vikor", "fuzzy_topsis")
+
+
+def _span(low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """各列的跨度，退化的列取 1 (该列对排序无影响)"""
+    span = high - low
+    return np.where(span > 0, span, 1.0)
+
+
+def crisp_weights(weights: np.ndarray) -> np.ndarray:
+    """
+    归一化的精确权重；三角模糊权重 (m, 3) 按重心法去模糊化 (同 FuzzyAHP.defuzzify_weights)
+
+    Args:
+        weights: 形状为 (m,) 的权重或 (m, 3) 的三角模糊权重
+
+    Returns:
+        np.ndarray: 形状为 (m,) 的权重，和为 1
+    """
+    weights = np.asarray(weights, dtype=float)
+    if weights.ndim == 2:
+        weights = weights.mean(axis=1)
+    return weights / weights.sum()
+
+
+def topsis(objectives: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    TOPSIS 贴近度 (成本型准则)
+
+    Args:
+        objectives: 形状为 (n, m) 的目标值 (损失)
+        weights: 形状为 (m,) 的权重 (模糊权重先去模糊化)
+
+    Returns:
+        np.ndarray: 形状为 (n,) 的贴近度 C = d- / (d+ + d-)，越大越好
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    norm = np.sqrt(np.einsum("ij,ij->j", objectives, objectives))
+    weighted = objectives * (crisp_weights(weights) / np.where(norm > 0, norm, 1.0))
+    # 成本型：正理想解取各列最小值，负理想解取最大值
+    d_best = np.sqrt(np.sum((weighted - weighted.min(axis=0)) ** 2, axis=1))
+    d_worst = np.sqrt(np.sum((weighted.max(axis=0) - weighted) ** 2, axis=1))
+    total = d_best + d_worst
+    return np.divide(d_worst, total, out=np.ones_like(total), where=total > 0)
+
+
+def vikor(objectives: np.ndarray, weights: np.ndarray,
+          v: float = 0.5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    VIKOR 折中排序 (成本型准则)
+
+    Args:
+        objectives: 形状为 (n, m) 的目标值 (损失)
+        weights: 形状为 (m,) 的权重 (模糊权重先去模糊化)
+        v: 群体效用 (多数准则) 的权重，0.5 为协商一致
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (Q, S, R)，均为形状 (n,)，越小越好
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    best, worst = objectives.min(axis=0), objectives.max(axis=0)
+    regret = (objectives - best) * (crisp_weights(weights) / _span(best, worst))
+    S = regret.sum(axis=1)
+    R = regret.max(axis=1)
+    Q = (v * (S - S.min()) / _span(S.min(), S.max()) +
+         (1 - v) * (R - R.min()) / _span(R.min(), R.max()))
+    return Q, S, R
+
+
+def fuzzy_topsis(objectives: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    模糊 TOPSIS 贴近度：评价值为精确的损失，权重为三角模糊数
+
+    损失线性归一化为 r = (max - f) / (max - min) ∈ [0, 1]，加权模糊评价 v = r ⊗ w̃，
+    模糊正/负理想解取各列各分量的最大/最小值，距离为顶点距离 sqrt(mean_k (a_k - b_k)^2)
+
+    Args:
+        objectives: 形状为 (n, m) 的目标值 (损失)
+        weights: 形状为 (m, 3) 的三角模糊权重 (l, m, u)；(m,) 的精确权重视为 (w, w, w)
+
+    Returns:
+        np.ndarray: 形状为 (n,) 的贴近度，越大越好
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    if weights.ndim == 1:
+        weights = np.repeat(weights[:, None], 3, axis=1)
+    weights = weights / weights[:, 1].sum()
+    best, worst = objectives.min(axis=0), objectives.max(axis=0)
+    rating = (worst - objectives) / _span(best, worst)
+    # v_ijk = r_ij w_jk，对 r ∈ [0, 1] 单调：理想解分量为 max(r) w_jk，负理想解为 min(r) w_jk
+    scale = np.sqrt(np.mean(weights ** 2, axis=1))
+    d_best = np.sum((rating.max(axis=0) - rating) * scale, axis=1)
+    d_worst = np.sum((rating - rating.min(axis=0)) * scale, axis=1)
+    total = d_best + d_worst
+    return np.divide(d_worst, total, out=np.ones_like(total), where=total > 0)
+
+
+def rank_front(objectives: np.ndarray,
+               weights: np.ndarray,
+               method: str = "topsis",
+               k: Optional[int] = None,
+               v: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按决策方法对前沿排序，返回前 k 个折中方案
+
+    Args:
+        objectives: 形状为 (n, m) 的前沿目标值
+        weights: 形状为 (m,) 的权重 (如 AHPCalculator 权重) 或 (m, 3) 的模糊权重
+                 (如 FuzzyAHP 的模糊权重向量)
+        method: "topsis"、"vikor" 或 "fuzzy_topsis"
+        k: 返回的方案个数，None 表示全部
+        v: VIKOR 的群体效用权重
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (按优劣排序的下标, 对应得分)，得分为 TOPSIS 贴近度
+            (越大越好) 或 VIKOR 的 Q (越小越好)
+    """
+    if method == "topsis":
+        order_key = -topsis(objectives, weights)
+    elif method == "vikor":
+        order_key = vikor(objectives, weights, v)[0]
+    elif method == "fuzzy_topsis":
+        order_key = -fuzzy_topsis(objectives, weights)
+    else:
+        raise ValueError(f"Unknown decision method: {method}. Available: {DECISION_METHODS}")
+
+    n = len(order_key)
+    k = n if k is None else min(k, n)
+    if k == 0:
+        return np.empty(0, dtype=int), np.empty(0)
+    top = np.argpartition(order_key, k - 1)[:k] if k < n else np.arange(n)
+    top = top[np.argsort(order_key[top], kind="stable")]
+    scores = order_key[top]
+    return top, (scores if method == "vikor" else -scores)
+
+
+# 测试代码
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    front = np.abs(rng.normal(size=(100000, 3)))
+    front /= np.linalg.norm(front, axis=1, keepdims=True)
+    ahp_weights = np.array([0.571, 0.286, 0.143])
+    fuzzy_weights = np.array([[0.45, 0.57, 0.68], [0.22, 0.29, 0.37], [0.11, 0.14, 0.19]])
+
+    for name, w in (("topsis", ahp_weights), ("vikor", ahp_weights), ("fuzzy_topsis", fuzzy_weights)):
+        started = time.perf_counter()
+        index, score = rank_front(front, w, name, k=5)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{name}: 前 5 名 {index.tolist()}，得分 {np.round(score, 4).tolist()}，耗时 {elapsed:.1f} ms")
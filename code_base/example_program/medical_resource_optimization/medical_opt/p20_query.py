@@ -0,0 +1,349 @@
+"""
+What-if 查询模块 (p20_query.py)
+在已保存的帕累托前沿 (帕累托存档、精确前沿) 与情景扫描结果上回答交互式问题，无需重新优化：
+
+- best_under：其余目标不超过给定上限时某个目标的最优值 ("成本损失不超过 X 时可及性损失最低是多少")。
+  单个上限时按该目标排序后的前缀最优表 O(log n) 查找；约束为线性、损失为凸函数，
+  相邻两个前沿解的凸组合仍可行，沿连线批量评估可把上限用足 (插值)
+- plan_for_weights：给定权重 (如调整后的 AHP 权重) 的加权最优方案，可与目标空间近邻插值
+- nearest：目标空间 (按理想点与跨度归一化) 的 KD 树近邻
+- scenario：情景扫描结果在参数空间 (按取值范围归一化) 的 KD 树近邻，按反距离加权插值分配方案
+- 可选的 QP 精修：以查询结果热启动 ExactSolver (ε-约束或加权和)，毫秒级得到精确解
+
+索引建立一次 (排序与 KD 树)，10^5 个点的前沿上单次查询在 1 ms 量级，含精修也远低于 100 ms。
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .config import OPTIMIZER_CONFIG
+from .p05_constraints import Constraints
+from .p06_optimizer import ResourceOptimizer
+from .p08_utils import load_arrays
+from .p11_exact import ExactSolver
+from .p15_sweep import SWEEP_SECTIONS, ScenarioSweep
+
+
+# 情景扫描结果表中的目标列
+OBJECTIVE_COLUMNS = ("efficiency_loss", "accessibility_loss", "cost_loss")
+
+
+def _exact_solver(optimizer: ResourceOptimizer) -> ExactSolver:
+    """优化器问题的精确求解器 (沿用 exact 配置)"""
+    return ExactSolver(optimizer.constraints, optimizer.quadratic_objectives(),
+                       tolerance=optimizer.exact_config["tolerance"],
+                       max_iterations=optimizer.exact_config["max_iterations"],
+                       feasibility_tolerance=optimizer.exact_config["feasibility_tolerance"])
+
+
+class FrontIndex:
+    """前沿 / 情景扫描结果上的 what-if 查询索引"""
+
+    def __init__(self,
+                 objectives: np.ndarray,
+                 allocations: np.ndarray,
+                 optimizer: Optional[ResourceOptimizer] = None,
+                 parameters: Optional[np.ndarray] = None,
+                 parameter_names: Optional[List[str]] = None,
+                 sweep: Optional[ScenarioSweep] = None,
+                 config: Optional[Dict] = None):
+        """
+        建立索引
+
+        Args:
+            objectives: 形状为 (n, m) 的目标值
+            allocations: 形状为 (n, resource_type, hospital_level) 的分配方案
+            optimizer: 前沿所属问题的优化器，提供插值时的目标评估与 QP 精修；None 时不插值、不精修
+            parameters: 形状为 (n, p) 的情景参数 (情景扫描结果)
+            parameter_names: 参数路径，如 ["BUDGET_LIMITS.1"]
+            sweep: 生成情景的扫描器，scenario() 精修时据此构造情景的预算配置
+            config: 查询参数，默认取 OPTIMIZER_CONFIG["query"]
+        """
+        self.logger = logging.getLogger(__name__)
+        self.objectives = np.asarray(objectives, dtype=float)
+        self.allocations = np.asarray(allocations, dtype=float)
+        self.optimizer = optimizer
+        self.sweep = sweep
+        self.config = OPTIMIZER_CONFIG["query"] if config is None else config
+        self._solver: Optional[ExactSolver] = None
+
+        # 目标空间：按理想点与跨度归一化后建 KD 树
+        self.ideal = self.objectives.min(axis=0)
+        span = self.objectives.max(axis=0) - self.ideal
+        self.scale = np.where(span > 0, span, 1.0)
+        self._tree = cKDTree((self.objectives - self.ideal) / self.scale)
+
+        # 单个上限的查询表：order[k] 按目标 k 升序排列的下标，
+        # prefix[k][:, m] 为前 t 个点中目标 m 最小者在 order[k] 中的位置
+        n, m = self.objectives.shape
+        self._order = np.argsort(self.objectives, axis=0, kind="stable").T
+        self._sorted = np.take_along_axis(self.objectives, self._order.T, axis=0).T
+        self._prefix = np.empty((m, n, m), dtype=np.int64)
+        positions = np.arange(n)
+        for k in range(m):
+            ordered = self.objectives[self._order[k]]
+            for j in range(m):
+                running = np.minimum.accumulate(ordered[:, j])
+                # 前缀最小值每次下降处的位置向后填充
+                self._prefix[k][:, j] = np.maximum.accumulate(
+                    np.where(ordered[:, j] == running, positions, 0)
+                )
+
+        self.parameter_names = parameter_names
+        self.parameters = None
+        if parameters is not None:
+            self.parameters = np.atleast_2d(np.asarray(parameters, dtype=float))
+            self._parameter_low = self.parameters.min(axis=0)
+            span = self.parameters.max(axis=0) - self._parameter_low
+            self._parameter_scale = np.where(span > 0, span, 1.0)
+            self._parameter_tree = cKDTree(
+                (self.parameters - self._parameter_low) / self._parameter_scale
+            )
+        self.logger.info(f"Indexed {n} solutions"
+                         + ("" if parameters is None else f" over {self.parameters.shape[1]} parameters"))
+
+    @classmethod
+    def from_optimizer(cls, optimizer: ResourceOptimizer, **kwargs) -> "FrontIndex":
+        """以优化器的帕累托存档建立索引"""
+        return cls(optimizer.archive.objectives, optimizer.archive.solutions,
+                   optimizer=optimizer, **kwargs)
+
+    @classmethod
+    def from_sweep(cls, table: Dict[str, np.ndarray], sweep: Optional[ScenarioSweep] = None,
+                   **kwargs) -> "FrontIndex":
+        """
+        以情景扫描结果表 (ScenarioSweep.run 的返回值或保存的文件内容) 建立索引
+
+        Args:
+            table: 列存结果表，参数列为点分路径，分配方案列为 x_{资源}_{等级}
+            sweep: 生成该结果的扫描器，默认为 ScenarioSweep() (需与原扫描的基准配置一致)
+            **kwargs: 传给构造函数的其余参数
+        """
+        sweep = ScenarioSweep() if sweep is None else sweep
+        names = [name for name in table if name.split(".")[0] in SWEEP_SECTIONS]
+        shape = (len(sweep.resource_types), len(sweep.hospital_levels))
+        allocations = np.column_stack([
+            table[f"x_{i}_{j}"] for i in range(1, shape[0] + 1) for j in range(1, shape[1] + 1)
+        ]).reshape((-1,) + shape)
+        objectives = np.column_stack([table[name] for name in OBJECTIVE_COLUMNS])
+        parameters = np.column_stack([table[name] for name in names]) if names else None
+        return cls(objectives, allocations, parameters=parameters, parameter_names=names,
+                   sweep=sweep, **kwargs)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "FrontIndex":
+        """
+        读取保存的帕累托存档 (solutions/objectives，如 main.py 导出的 pareto_archive.npz)
+        或情景扫描结果 (含 scenario 列) 并建立索引
+
+        Args:
+            path: npz 文件路径
+            **kwargs: optimizer、sweep 等其余参数
+        """
+        arrays = load_arrays(path)
+        if "scenario" in arrays:
+            return cls.from_sweep(arrays, **kwargs)
+        return cls(arrays["objectives"], arrays["solutions"], **kwargs)
+
+    @property
+    def _can_interpolate(self) -> bool:
+        """插值需要目标函数；整数模式下连线上的点不是整数方案，不插值"""
+        return self.optimizer is not None and not self.optimizer.integer
+
+    def _evaluate(self, allocations: np.ndarray) -> np.ndarray:
+        """批量评估 (使用优化器的目标函数)"""
+        return self.optimizer._evaluate_batch(allocations)
+
+    def solver(self) -> ExactSolver:
+        """前沿所属问题的精确求解器 (首次使用时建立)"""
+        if self.optimizer is None:
+            raise ValueError("QP refinement needs the optimizer the front belongs to")
+        if self._solver is None:
+            self._solver = _exact_solver(self.optimizer)
+        return self._solver
+
+    def _segments(self, start: int, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        从 start 出发到各 ends 的连线上等间隔取点并批量评估
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (分配方案 (k × steps, ...), 目标值)
+        """
+        steps = np.linspace(0.0, 1.0, self.config["interpolation_steps"] + 1)[1:]
+        origin = self.allocations[start]
+        points = origin + steps[None, :, None, None] * (self.allocations[ends] - origin)[:, None]
+        points = points.reshape((-1,) + origin.shape)
+        return points, self._evaluate(points)
+
+    def nearest(self, point: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        目标空间中离给定目标值最近的 k 个解
+
+        Args:
+            point: 形状为 (m,) 的目标值
+            k: 近邻个数
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (下标, 归一化距离)
+        """
+        distance, index = self._tree.query((np.asarray(point, dtype=float) - self.ideal) / self.scale,
+                                           k=min(k, len(self.objectives)))
+        return np.atleast_1d(index), np.atleast_1d(distance)
+
+    def best_under(self, objective: int, bounds: Dict[int, float],
+                   interpolate: bool = True,
+                   refine: Optional[bool] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        其余目标满足上限时，某个目标的最优方案
+
+        Args:
+            objective: 被最小化的目标序号 (0 效率, 1 可及性, 2 成本)
+            bounds: {目标序号: 上限}
+            interpolate: 是否沿与越界近邻的连线插值，把上限用足 (需要 optimizer，整数模式下不插值)
+            refine: 是否以 ε-约束 QP 精修，默认取 config["refine"] (需要 optimizer)
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: (分配方案, 目标值)，无解满足上限时为 None
+        """
+        refine = self.config["refine"] if refine is None else refine
+        if len(bounds) == 1:
+            (k, limit), = bounds.items()
+            count = int(np.searchsorted(self._sorted[k], limit, side="right"))
+            if count == 0:
+                return None
+            best = int(self._order[k][self._prefix[k][count - 1, objective]])
+        else:
+            feasible = np.all([self.objectives[:, k] <= limit for k, limit in bounds.items()], axis=0)
+            if not np.any(feasible):
+                return None
+            candidates = np.flatnonzero(feasible)
+            best = int(candidates[np.argmin(self.objectives[candidates, objective])])
+        allocation, values = self.allocations[best], self.objectives[best]
+
+        if interpolate and self._can_interpolate:
+            # 目标更优但越界的解中，越界量 (归一化) 最小的若干个作为连线的另一端
+            keys = np.array(list(bounds))
+            limits = np.array(list(bounds.values()))
+            better = np.flatnonzero(self.objectives[:, objective] < values[objective])
+            if len(better):
+                excess = np.max((self.objectives[better][:, keys] - limits) / self.scale[keys], axis=1)
+                ends = better[np.argsort(excess)[:self.config["neighbours"]]]
+                points, evaluated = self._segments(best, ends)
+                ok = np.all(evaluated[:, keys] <= limits, axis=1)
+                if np.any(ok) and evaluated[ok, objective].min() < values[objective]:
+                    choice = np.flatnonzero(ok)[np.argmin(evaluated[ok, objective])]
+                    allocation, values = points[choice], evaluated[choice]
+
+        if refine:
+            try:
+                x, losses = self.solver().solve_epsilon(objective, bounds, x0=allocation.reshape(-1))
+            except RuntimeError as e:
+                self.logger.warning(f"QP refinement failed, keeping indexed plan: {str(e)}")
+            else:
+                if np.all(losses[list(bounds)] <= np.array(list(bounds.values())) + 1e-9):
+                    allocation, values = x.reshape(allocation.shape), losses
+        return allocation, values
+
+    def plan_for_weights(self, weights: np.ndarray, interpolate: bool = True,
+                         refine: Optional[bool] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        给定权重的加权和最优方案
+
+        Args:
+            weights: 形状为 (m,) 的损失权重
+            interpolate: 是否与目标空间近邻连线插值 (需要 optimizer，整数模式下不插值)
+            refine: 是否以加权和 QP 精修，默认取 config["refine"] (需要 optimizer)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (分配方案, 目标值)
+        """
+        refine = self.config["refine"] if refine is None else refine
+        weights = np.asarray(weights, dtype=float)
+        weights = weights / weights.sum()
+        best = int(np.argmin(self.objectives @ weights))
+        allocation, values = self.allocations[best], self.objectives[best]
+
+        if interpolate and self._can_interpolate:
+            neighbours, _ = self.nearest(values, self.config["neighbours"] + 1)
+            ends = neighbours[neighbours != best]
+            if len(ends):
+                points, evaluated = self._segments(best, ends)
+                choice = int(np.argmin(evaluated @ weights))
+                if evaluated[choice] @ weights < values @ weights:
+                    allocation, values = points[choice], evaluated[choice]
+
+        if refine:
+            try:
+                x, losses = self.solver().solve_weighted(weights, x0=allocation.reshape(-1))
+            except RuntimeError as e:
+                self.logger.warning(f"QP refinement failed, keeping indexed plan: {str(e)}")
+            else:
+                allocation, values = x.reshape(allocation.shape), losses
+        return allocation, values
+
+    def scenario(self, values: np.ndarray, k: Optional[int] = None,
+                 refine: Optional[bool] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        未求解过的情景参数对应的方案：参数空间 k 近邻按反距离加权插值
+
+        精修时按 sweep 构造该情景的问题，插值方案投影到该情景的可行域后以加权和 QP 精修；
+        否则目标值同样按反距离加权插值 (近似)
+
+        Args:
+            values: 形状为 (p,) 的参数取值，顺序同 parameter_names
+            k: 近邻个数，默认取 config["neighbours"]
+            refine: 是否精修，默认取 config["refine"]
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: (分配方案, 目标值, 近邻情景下标)
+        """
+        if self.parameters is None:
+            raise ValueError("Scenario queries need a sweep table with parameter columns")
+        refine = self.config["refine"] if refine is None else refine
+        k = min(self.config["neighbours"] if k is None else k, len(self.parameters))
+        point = (np.asarray(values, dtype=float) - self._parameter_low) / self._parameter_scale
+        distance, index = self._parameter_tree.query(point, k=k)
+        distance, index = np.atleast_1d(distance), np.atleast_1d(index)
+        if distance[0] <= 1e-12:
+            weights = (np.arange(len(index)) == 0).astype(float)
+        else:
+            weights = 1.0 / distance ** 2
+        weights /= weights.sum()
+        allocation = np.tensordot(weights, self.allocations[index], axes=1)
+        objectives = weights @ self.objectives[index]
+
+        if refine:
+            if self.sweep is None:
+                raise ValueError("Scenario refinement needs the ScenarioSweep that produced the table")
+            config = self.sweep.scenario_configs(self.parameter_names, np.asarray(values, dtype=float))[0]
+            constraints = Constraints(config, self.sweep.hospital_levels)
+            optimizer = ResourceOptimizer(self.sweep.resource_types, self.sweep.hospital_levels, config,
+                                          constraints, parallel=False, backend="array")
+            x0 = constraints.project(allocation).reshape(-1)
+            x, objectives = _exact_solver(optimizer).solve_weighted(optimizer.weights, x0=x0)
+            allocation = x.reshape(allocation.shape)
+        return allocation, objectives, index
+
+
+# 测试代码
+if __name__ == "__main__":
+    import time
+    from .config import BUDGET_CONFIG, HOSPITAL_LEVELS, RESOURCE_TYPES
+
+    optimizer = ResourceOptimizer(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG,
+                                  Constraints(BUDGET_CONFIG, HOSPITAL_LEVELS), backend="array")
+    optimizer.optimize()
+    index = FrontIndex.from_optimizer(optimizer)
+    cost_limit = float(np.median(index.objectives[:, 2]))
+
+    started = time.perf_counter()
+    _, values = index.best_under(1, {2: cost_limit})
+    print(f"成本损失 <= {cost_limit:.4f} 时可及性损失最低为 {values[1]:.6f} "
+          f"({(time.perf_counter() - started) * 1000:.2f} ms)")
+    started = time.perf_counter()
+    _, values = index.plan_for_weights([0.5, 0.3, 0.2], refine=True)
+    print(f"权重 (0.5, 0.3, 0.2) 的方案目标值 {np.round(values, 6)} "
+          f"({(time.perf_counter() - started) * 1000:.2f} ms)")
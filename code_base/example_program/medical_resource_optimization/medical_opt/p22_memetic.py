@@ -0,0 +1,266 @@
+"""
+模因局部精修模块 (p22_memetic.py)
+进化算法接近前沿后收敛变慢，而三个损失均为光滑的二次函数 (ResourceOptimizer.quadratic_objectives)，
+因此对存档或种群中的解做几步基于梯度的局部下降即可把前沿"磨"得更精确：
+
+- 约束感知：梯度先投影到有效约束 (等式、紧的不等式与变量界) 的零空间 (Rosen 梯度投影)，
+  沿投影方向移动时有效约束保持成立，步长再按未起作用的约束做比值检验，候选点始终可行；
+  投影后没有公共下降方向但乘子符号表明可离开某个不等式约束时，释放该约束后重新投影
+- 公共下降方向 (MGDA)：投影梯度凸包中范数最小的元素 d = -Σ λ_m P∇L_m，
+  λ 按单纯形的各个面枚举精确求出；d = 0 的解为 (有效约束下的) 帕累托稳定点，不再移动
+- 步长：从各损失沿 d 的精确线搜索步长中的最小者开始逐次减半 (整数模式下候选点再取整修复)，
+  取第一个支配原解的候选点
+- 一批解的同级候选点一次向量化评估，只有未改进的解才评估下一级步长；
+  各级步长都没有改进的解退出后续步，不再消耗评估
+"""
+
+import logging
+from itertools import combinations
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .config import OPTIMIZER_CONFIG
+
+
+def min_norm_weights(gradients: np.ndarray) -> np.ndarray:
+    """
+    批量求梯度凸包中范数最小元素的组合系数
+
+    目标个数很少，逐一枚举单纯形的各个面 S：在面内 min λᵀMλ s.t. Σλ = 1 的解由 KKT 方程
+    [[M_S, 1], [1ᵀ, 0]] [λ; μ] = [0; 1] 给出 (伪逆兼顾梯度共线、M_S 奇异的情形)，
+    取全部非负解中范数最小者，得到精确解 (近似解不能保证对每个目标都是下降方向)
+
+    Args:
+        gradients: 形状为 (n, m, d) 的梯度，每个解 m 个目标
+
+    Returns:
+        np.ndarray: 形状为 (n, m) 的单纯形权重 λ，使 ||Σ_m λ_m g_m|| 最小
+    """
+    n, m, _ = gradients.shape
+    gram = gradients @ np.swapaxes(gradients, 1, 2)
+    best = np.full((n, m), 1.0 / m)
+    best_norm = np.full(n, np.inf)
+    for size in range(1, m + 1):
+        for face in combinations(range(m), size):
+            face = list(face)
+            kkt = np.ones((n, size + 1, size + 1))
+            kkt[:, :size, :size] = gram[:, face][:, :, face]
+            kkt[:, size, size] = 0.0
+            raw = np.linalg.pinv(kkt)[:, :size, size]
+            valid = np.all(raw >= -1e-9, axis=1) & (np.abs(raw.sum(axis=1) - 1.0) < 1e-6)
+            weights = np.zeros((n, m))
+            weights[:, face] = np.maximum(raw, 0.0)
+            weights /= np.maximum(weights.sum(axis=1, keepdims=True), 1e-300)
+            norm = np.einsum("ni,nij,nj->n", weights, gram, weights)
+            better = valid & (norm < best_norm)
+            best[better], best_norm[better] = weights[better], norm[better]
+    return best
+
+
+class LocalRefiner:
+    """约束感知的多目标梯度局部搜索"""
+
+    def __init__(self, optimizer, config: Optional[Dict] = None):
+        """
+        初始化局部精修
+
+        Args:
+            optimizer: ResourceOptimizer 实例，提供二次损失、可行域投影与批量评估
+            config: 覆盖 OPTIMIZER_CONFIG["memetic"] 的配置项
+        """
+        self.logger = logging.getLogger(__name__)
+        self.optimizer = optimizer
+        self.config = dict(OPTIMIZER_CONFIG["memetic"])
+        self.config.update(config or {})
+        forms = optimizer.quadratic_objectives()
+        self.designs = [G for G, _ in forms]
+        self.targets = [h for _, h in forms]
+        # L_m(x) = mean((G x - h)^2) 的海森矩阵 2 GᵀG / len(h)，形状 (m, d, d)
+        self.hessians = np.stack([2.0 * G.T @ G / len(h) for G, h in forms])
+
+        # 全部约束写成 rows @ x <= rhs (不等式行与有限的变量界)，等式行始终有效
+        constraints = optimizer.constraints
+        n = constraints.n_variables
+        identity = np.eye(n)
+        finite = np.isfinite(constraints.upper)
+        self.rows = np.vstack([constraints.A_ub.toarray(), -identity, identity[finite]])
+        self.rhs = np.concatenate([constraints.b_ub, -constraints.lower, constraints.upper[finite]])
+        self.equalities = constraints.A_eq.toarray()
+
+    def _tangent_projection(self, x: np.ndarray, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将向量投影到各解处有效约束的零空间
+
+        Args:
+            x: 形状为 (n, d) 的分配向量
+            vectors: 形状为 (n, m, d) 的待投影向量 (如梯度)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (投影后的向量 (n, m, d), 各约束行的松弛量 (n, rows))
+        """
+        slack = self.rhs - x @ self.rows.T
+        projected, _ = self._project(self._active(slack), vectors)
+        return projected, slack
+
+    def _active(self, slack: np.ndarray) -> np.ndarray:
+        """松弛量不超过 active_tolerance * (1 + |右端项|) 的不等式行"""
+        return slack <= self.config["active_tolerance"] * (1.0 + np.abs(self.rhs))
+
+    def _project(self, active: np.ndarray, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        P v = v - Nᵀ c，c = (N Nᵀ)⁺ N v，N 为有效不等式行 (无效行置零) 与等式行；
+        伪逆同时处理线性相关的有效约束
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (投影后的向量 (n, m, d), 系数 c (n, rows + 等式行数, m))
+        """
+        normals = np.concatenate([
+            self.rows[None] * active[:, :, None],
+            np.broadcast_to(self.equalities, (len(active),) + self.equalities.shape)
+        ], axis=1)
+        gram = normals @ np.swapaxes(normals, 1, 2)
+        coefficients = np.linalg.pinv(gram, hermitian=True) @ (normals @ np.swapaxes(vectors, 1, 2))
+        return vectors - np.swapaxes(np.swapaxes(normals, 1, 2) @ coefficients, 1, 2), coefficients
+
+    def _descent_direction(self, x: np.ndarray, gradients: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        有效约束下的公共下降方向
+
+        投影梯度的最小范数组合为零时，组合梯度 ḡ = Σ λ_m ∇L_m = Nᵀc 在有效行上的系数 c
+        即负的拉格朗日乘子；某个不等式行的 c 为正时该解并非 KKT 点，释放 c 最大的一行
+        (Rosen 梯度投影)，在更大的切空间中重新求方向，沿新方向移动时离开该约束进入可行域内部
+
+        Args:
+            x: 形状为 (n, d) 的分配向量
+            gradients: 形状为 (n, m, d) 的梯度
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (下降方向 (n, d)，为零表示帕累托稳定点，
+                各约束行的松弛量 (n, rows))
+        """
+        slack = self.rhs - x @ self.rows.T
+        active = self._active(slack)
+        direction = np.zeros_like(x)
+        pending = np.arange(len(x))
+        # 每轮至少释放一行，有效行释放完后方向即为 (投影到等式约束的) 梯度组合
+        for _ in range(self.rows.shape[0] + 1):
+            projected, coefficients = self._project(active[pending], gradients[pending])
+            weights = min_norm_weights(projected)
+            direction[pending] = -np.einsum("nm,nmd->nd", weights, projected)
+            norm2 = np.einsum("nd,nd->n", direction[pending], direction[pending])
+            stationary = norm2 <= self.config["tolerance"]
+            # 有效不等式行上的系数，按行范数换算为梯度沿法向的分量
+            combined = np.einsum("nm,nkm->nk", weights, coefficients[:, :len(self.rhs)])
+            combined = np.where(active[pending], combined * np.linalg.norm(self.rows, axis=1), -np.inf)
+            release = stationary & (combined.max(axis=1) > np.sqrt(self.config["tolerance"]))
+            if not np.any(release):
+                break
+            pending = pending[release]
+            active[pending, np.argmax(combined[release], axis=1)] = False
+        return direction, slack
+
+    def gradients(self, x: np.ndarray) -> np.ndarray:
+        """
+        三个损失在一批展开分配向量处的梯度
+
+        Args:
+            x: 形状为 (n, d) 的分配向量
+
+        Returns:
+            np.ndarray: 形状为 (n, m, d) 的梯度
+        """
+        return np.stack([2.0 * (x @ G.T - h) @ G / len(h)
+                         for G, h in zip(self.designs, self.targets)], axis=1)
+
+    def refine(self, allocations: np.ndarray, fitness: np.ndarray,
+               steps: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        对一批解做若干步约束感知的公共下降，只接受支配原解的点
+
+        Args:
+            allocations: 形状为 (n, resource_type, hospital_level) 的分配方案
+            fitness: 形状为 (n, 3) 的目标值
+            steps: 每个解的局部步数，默认取配置
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, int]: (精修后的分配方案 (float64), 目标值, 评估次数)；
+                未改进的解原样返回
+        """
+        steps = self.config["steps"] if steps is None else steps
+        ladder = 0.5 ** np.arange(self.config["backtracks"])
+        shape = allocations.shape[1:]
+        x = np.asarray(allocations, dtype=np.float64).reshape(len(allocations), -1).copy()
+        f = np.asarray(fitness, dtype=float).copy()
+        active = np.ones(len(x), dtype=bool)
+        evaluations = 0
+        for _ in range(steps):
+            index = np.flatnonzero(active)
+            if len(index) == 0:
+                break
+            gradients = self.gradients(x[index])
+            direction, slack = self._descent_direction(x[index], gradients)
+            norm2 = np.einsum("nd,nd->n", direction, direction)
+            # 帕累托稳定点 (公共下降方向为零) 不再移动
+            moving = norm2 > self.config["tolerance"]
+            active[index[~moving]] = False
+            index, direction, gradients, slack = index[moving], direction[moving], gradients[moving], slack[moving]
+            if len(index) == 0:
+                break
+
+            # 各损失沿 d 的精确线搜索步长 -∇L_m·d / dᵀH_m d 取最小者 (此时每个损失都不增)，
+            # 不超过未起作用约束允许的最大步长，再逐次减半
+            slope = -np.einsum("nmd,nd->nm", gradients, direction)
+            curvature = np.einsum("mde,nd,ne->nm", self.hessians, direction, direction)
+            step = np.min(np.where(curvature > 0, slope / np.where(curvature > 0, curvature, 1.0), np.inf), axis=1)
+            rate = direction @ self.rows.T
+            limits = np.where(rate > 0, np.maximum(slack, 0.0) / np.where(rate > 0, rate, 1.0), np.inf)
+            step = np.minimum(step, limits.min(axis=1))
+            # 逐级减半：只对尚未找到改进的解评估下一级步长
+            pending = np.arange(len(index))
+            for scale in ladder:
+                rows = index[pending]
+                candidates = x[rows] + (scale * step[pending])[:, None] * direction[pending]
+                candidates = candidates.reshape((-1,) + shape)
+                if self.optimizer.integer:
+                    candidates = self.optimizer._repair_allocations(candidates)
+                with self.optimizer.telemetry.timer("evaluation"):
+                    candidate_fitness = self.optimizer._evaluate_batch(candidates)
+                evaluations += len(candidates)
+                better = (np.all(candidate_fitness <= f[rows], axis=1) &
+                          np.any(candidate_fitness < f[rows], axis=1))
+                x[rows[better]] = candidates[better].reshape(-1, x.shape[1])
+                f[rows[better]] = candidate_fitness[better]
+                pending = pending[~better]
+                if len(pending) == 0:
+                    break
+            # 各级步长都没有改进的解不再继续
+            active[index[pending]] = False
+        return x.reshape((len(x),) + shape), f, evaluations
+
+
+# 测试代码
+if __name__ == "__main__":
+    import time
+
+    from .config import BUDGET_CONFIG, HOSPITAL_LEVELS, RESOURCE_TYPES
+    from .p05_constraints import Constraints
+    from .p06_optimizer import ResourceOptimizer
+    from .p10_archive import hypervolume
+
+    # 默认需求阈值超出预算所能覆盖的数量 (可行域为空)，演示时取可行的需求
+    budget_config = dict(BUDGET_CONFIG, DEMAND_THRESHOLDS={1: 80, 2: 60, 3: 40})
+    optimizer = ResourceOptimizer(RESOURCE_TYPES, HOSPITAL_LEVELS, budget_config,
+                                  Constraints(budget_config, HOSPITAL_LEVELS), backend="array")
+    started = time.perf_counter()
+    optimizer.optimize()
+    print(f"进化结束：存档 {len(optimizer.archive)} 个解，"
+          f"{optimizer.telemetry.total_evaluations} 次评估，耗时 {time.perf_counter() - started:.2f} s")
+    reference = optimizer.archive.objectives.max(axis=0) * 1.1
+    before = hypervolume(optimizer.archive.objectives, reference)
+
+    started = time.perf_counter()
+    stats = optimizer.refine_archive()
+    after = hypervolume(optimizer.archive.objectives, reference)
+    print(f"局部精修：{stats['improved']} 个解被改进，{stats['evaluations']} 次评估，"
+          f"耗时 {time.perf_counter() - started:.2f} s；超体积 {before:.6f} -> {after:.6f}")
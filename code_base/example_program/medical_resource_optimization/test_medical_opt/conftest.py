@@ -0,0 +1,43 @@
+"""
+测试公用夹具
+"""
+
+from typing import Callable, Optional
+
+import pytest
+
+from medical_opt.config import BUDGET_CONFIG, HOSPITAL_LEVELS, RESOURCE_TYPES
+from medical_opt.p05_constraints import Constraints
+from medical_opt.p06_optimizer import ResourceOptimizer
+
+
+@pytest.fixture(scope="session")
+def feasible_budget() -> dict:
+    """
+    需求阈值可行的预算配置 (各测试共用，不要原地修改，需要变体时用 dict(feasible_budget, ...))
+
+    默认需求阈值超出预算所能覆盖的数量 (可行域为空)，测试取可行的需求。
+    """
+    return dict(BUDGET_CONFIG, DEMAND_THRESHOLDS={1: 80, 2: 60, 3: 40})
+
+
+@pytest.fixture(scope="session")
+def make_optimizer(feasible_budget) -> Callable[..., ResourceOptimizer]:
+    """
+    小规模、串行评估的优化器工厂
+
+    工厂参数为种群规模、代数与预算配置 (默认 feasible_budget)，其余关键字参数传给
+    ResourceOptimizer，默认 seed=0、parallel=False、backend="array"。
+    """
+    def make(population_size: int = 16, generations: int = 4,
+             budget_config: Optional[dict] = None, **kwargs) -> ResourceOptimizer:
+        config = feasible_budget if budget_config is None else budget_config
+        kwargs.setdefault("seed", 0)
+        kwargs.setdefault("parallel", False)
+        kwargs.setdefault("backend", "array")
+        optimizer = ResourceOptimizer(RESOURCE_TYPES, HOSPITAL_LEVELS, config,
+                                      Constraints(config, HOSPITAL_LEVELS), **kwargs)
+        optimizer.population_size, optimizer.n_generations = population_size, generations
+        return optimizer
+
+    return make
@@ -0,0 +1,202 @@
+"""
+约束条件模块测试 (p05_constraints.py)
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from medical_opt.config import BUDGET_CONFIG, HOSPITAL_LEVELS
+from medical_opt.p05_constraints import Constraints
+
+
+def _large_constraints(n_resources: int, n_levels: int, seed: int = 0) -> Constraints:
+    """构造 n_resources × n_levels 个变量、预算留有余量的可行约束"""
+    rng = np.random.default_rng(seed)
+    costs = rng.integers(5, 20, n_resources).astype(float)
+    demand = {j + 1: float(rng.integers(20, 60)) for j in range(n_levels)}
+    total = sum(demand.values())
+    budget_config = {
+        "BUDGET_LIMITS": {i + 1: costs[i] * total / n_resources * 1.3 for i in range(n_resources)},
+        "DEMAND_THRESHOLDS": demand,
+        "UNIT_COSTS": {i + 1: {"unit": costs[i]} for i in range(n_resources)},
+    }
+    return Constraints(budget_config, {j + 1: f"level-{j + 1}" for j in range(n_levels)})
+
+
+def test_builtin_rows_match_dense_checks(feasible_budget):
+    """稀疏系统的批量可行性与逐项的预算/需求/非负检验一致"""
+    constraints = Constraints(feasible_budget, HOSPITAL_LEVELS)
+    assert constraints.A_ub.shape == (6, 9)
+    assert constraints.ub_names[:4] == ["budget[1]", "budget[2]", "budget[3]", "demand[1]"]
+    rng = np.random.default_rng(0)
+    plans = rng.uniform(-5, 60, (200, constraints.n_resources, constraints.n_levels))
+    dense = np.array([
+        constraints.budget_constraint(x) and constraints.demand_constraint(x, None) and
+        constraints.non_negativity_constraint(x) for x in plans
+    ])
+    np.testing.assert_array_equal(constraints.is_feasible(plans, tolerance=0.0), dense)
+
+
+def test_rules_compile_to_rows_and_bounds(feasible_budget):
+    """各类声明式规则编译为对应的不等式行、等式行或变量界"""
+    rules = [
+        {"type": "cap", "levels": [1], "limit": 300, "weight": "cost", "name": "spend"},
+        {"type": "floor", "resources": [2], "levels": [3], "limit": 20},
+        {"type": "ratio", "numerator": {"resources": [2]}, "denominator": {"resources": [3]},
+         "ratio": 0.5, "per_level": True},
+        {"type": "coupling", "follow": {"resources": [2]}, "lead": {"resources": [1]}, "factor": 0.2},
+        {"type": "minimum", "resources": [3], "levels": [3], "value": 5},
+        {"type": "maximum", "resources": [1], "levels": [3], "value": 40},
+        {"type": "linear", "terms": [[1, 1, 1.0], [2, 1, -2.0]], "sense": "<=", "rhs": 0},
+    ]
+    constraints = Constraints(dict(feasible_budget, CONSTRAINT_RULES=rules), HOSPITAL_LEVELS)
+    # 1 (cap) + 1 (floor) + 3 (ratio 逐级) + 1 (linear) 行附加不等式，1 行等式
+    assert constraints.A_ub.shape[0] == constraints.n_builtin_rows + 6
+    assert constraints.A_eq.shape[0] == 1
+    assert "spend" in constraints.ub_names
+    assert constraints.lower[constraints._variable_index(3, 3)] == 5
+    assert constraints.upper[constraints._variable_index(1, 3)] == 40
+
+    # 成本加权的上限：第 1 级医院的总支出
+    row = constraints.ub_names.index("spend")
+    plan = np.arange(1.0, 10.0).reshape(3, 3)
+    spend = (plan[:, 0] * constraints.cost_matrix[:, 0]).sum()
+    assert np.isclose(constraints.A_ub[row] @ plan.reshape(-1), spend)
+    # floor 规则写成 -x <= -limit
+    assert constraints.b_ub[constraints.n_builtin_rows + 1] == -20
+
+
+def test_unknown_rule_type_is_rejected(feasible_budget):
+    """未知规则类型在编译时报错"""
+    with pytest.raises(ValueError):
+        Constraints(dict(feasible_budget, CONSTRAINT_RULES=[{"type": "bogus"}]), HOSPITAL_LEVELS)
+
+
+def test_presolve_bounds_and_redundancy(feasible_budget):
+    """预处理把单变量行转为变量界、删除冗余行，并检测明显不可行"""
+    rules = [
+        {"type": "linear", "terms": [[1, 1, 2.0]], "sense": "<=", "rhs": 50},
+        {"type": "cap", "resources": [1], "levels": [1], "limit": 1000},
+        {"type": "maximum", "resources": [1], "levels": [1, 2, 3], "value": 30},
+    ]
+    constraints = Constraints(dict(feasible_budget, CONSTRAINT_RULES=rules), HOSPITAL_LEVELS)
+    reduced = constraints.presolve()
+    assert not reduced["infeasible"]
+    assert reduced["upper"][constraints._variable_index(1, 1)] == 25
+    # 单变量行被转为变量界后删除，其余保留的行号指向原系统
+    assert reduced["A_ub"].shape[0] == len(reduced["ub_rows"]) < constraints.A_ub.shape[0]
+    assert np.all(np.diff(reduced["A_ub"].indptr) > 1)
+
+    impossible = [{"type": "maximum", "value": 1.0}]
+    constraints = Constraints(dict(feasible_budget, CONSTRAINT_RULES=impossible), HOSPITAL_LEVELS)
+    assert constraints.presolve()["infeasible"]
+
+
+def test_project_is_feasible(feasible_budget):
+    """任意 (含负值) 方案投影后满足全部约束"""
+    constraints = Constraints(feasible_budget, HOSPITAL_LEVELS)
+    rng = np.random.default_rng(0)
+    raw = rng.uniform(-50, 150, (40, constraints.n_resources, constraints.n_levels))
+    projected = constraints.project(raw)
+    assert projected.shape == raw.shape
+    assert constraints.is_feasible(projected).all()
+
+
+def test_project_far_points_into_tight_region():
+    """需求接近预算所能覆盖的数量时，远离可行域的方案 (Dykstra 会长时间停滞) 投影后仍可行"""
+    tight = dict(BUDGET_CONFIG, DEMAND_THRESHOLDS={1: 85.3, 2: 64.0, 3: 42.9})
+    constraints = Constraints(tight, HOSPITAL_LEVELS)
+    assert not constraints.is_empty()
+    raw = np.random.default_rng(0).uniform(0, [[1000], [800], [500]], (500, 3, 3))
+    projected = constraints.project(raw)
+    assert constraints.is_feasible(projected).all()
+
+
+def test_project_keeps_feasible_points_and_is_nearest(feasible_budget):
+    """可行点投影后不变；投影点比可行域内的其他点更接近原方案"""
+    constraints = Constraints(feasible_budget, HOSPITAL_LEVELS)
+    rng = np.random.default_rng(1)
+    feasible = constraints.project(rng.uniform(0, 100, (20, constraints.n_resources, constraints.n_levels)))
+    np.testing.assert_allclose(constraints.project(feasible), feasible, atol=1e-4)
+
+    raw = rng.uniform(0, 150, (constraints.n_resources, constraints.n_levels))
+    projected = constraints.project(raw)
+    distance = np.linalg.norm(projected - raw)
+    assert np.all(np.linalg.norm((feasible - raw).reshape(20, -1), axis=1) >= distance - 1e-6)
+
+
+def test_project_single_matches_batch(feasible_budget):
+    """单个方案与批量中的同一方案投影结果一致 (逐行冻结，与批次大小无关)"""
+    constraints = Constraints(feasible_budget, HOSPITAL_LEVELS)
+    raw = np.random.default_rng(2).uniform(0, 150, (5, constraints.n_resources, constraints.n_levels))
+    batch = constraints.project(raw)
+    for k in range(len(raw)):
+        np.testing.assert_array_equal(constraints.project(raw[k]), batch[k])
+
+
+def test_project_infeasible_region_keeps_budget(feasible_budget):
+    """可行域为空 (默认需求超出预算) 时返回满足预算与非负约束的方案"""
+    constraints = Constraints(BUDGET_CONFIG, HOSPITAL_LEVELS)
+    assert constraints.is_empty()
+    assert not Constraints(feasible_budget, HOSPITAL_LEVELS).is_empty()
+    raw = np.random.default_rng(3).uniform(0, 150, (10, constraints.n_resources, constraints.n_levels))
+    projected = constraints.project(raw)
+    assert np.all(projected >= 0)
+    costs = (projected * constraints.cost_matrix).sum(axis=2)
+    assert np.all(costs <= constraints.budget_vector + 1e-9)
+
+
+def test_round_feasible_is_integer_and_feasible(feasible_budget):
+    """投影后的方案取整后仍可行，且每个元素都偏离连续解不到 2 个单位"""
+    constraints = Constraints(feasible_budget, HOSPITAL_LEVELS)
+    rng = np.random.default_rng(0)
+    continuous = constraints.project(rng.uniform(0, 80, (50, constraints.n_resources, constraints.n_levels)))
+    rounded = constraints.round_feasible(continuous)
+    assert rounded.shape == continuous.shape
+    assert np.array_equal(rounded, np.rint(rounded))
+    assert constraints.is_feasible(rounded).all()
+    assert np.abs(rounded - continuous).max() < 2.0
+
+
+def test_round_feasible_respects_rules(feasible_budget):
+    """附加的比例、耦合 (等式) 与上限规则在取整后仍满足"""
+    rules = [
+        {"type": "ratio", "numerator": {"resources": [1]}, "denominator": {"resources": [2]}, "ratio": 0.5},
+        {"type": "coupling", "follow": {"resources": [3]}, "lead": {"resources": [1]}, "factor": 1.0},
+        {"type": "cap", "resources": [2], "limit": 150},
+    ]
+    constraints = Constraints(dict(feasible_budget, CONSTRAINT_RULES=rules), HOSPITAL_LEVELS)
+    rng = np.random.default_rng(1)
+    continuous = constraints.project(rng.uniform(0, 80, (50, constraints.n_resources, constraints.n_levels)))
+    rounded = constraints.round_feasible(continuous)
+    assert constraints.is_feasible(rounded).all()
+
+
+def test_round_feasible_single_plan(feasible_budget):
+    """单个方案 (二维输入) 的形状保持不变"""
+    constraints = Constraints(feasible_budget, HOSPITAL_LEVELS)
+    plan = constraints.project(np.full((constraints.n_resources, constraints.n_levels), 30.7))
+    rounded = constraints.round_feasible(plan)
+    assert rounded.shape == plan.shape
+    assert constraints.is_feasible(rounded[None]).all()
+
+
+def test_round_feasible_scales_to_large_plans():
+    """上千个变量的方案取整耗时与连续投影相当，不随变量数平方增长"""
+    constraints = _large_constraints(10, 100)
+    assert constraints.n_variables >= 1000
+    rng = np.random.default_rng(2)
+    raw = rng.uniform(0, 60, (20, constraints.n_resources, constraints.n_levels))
+
+    started = time.perf_counter()
+    continuous = constraints.project(raw)
+    project_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    rounded = constraints.round_feasible(continuous)
+    round_seconds = time.perf_counter() - started
+
+    assert constraints.is_feasible(rounded).all()
+    assert np.array_equal(rounded, np.rint(rounded))
+    assert round_seconds < max(5.0 * project_seconds, 1.0)
@@ -0,0 +1,327 @@
+"""
+优化器模块测试 (p06_optimizer.py)
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from medical_opt.config import HOSPITAL_LEVELS, OPTIMIZER_CONFIG, RESOURCE_TYPES
+from medical_opt.p05_constraints import Constraints
+from medical_opt.p06_optimizer import migration_targets, precision_report, run_scenarios
+from medical_opt.p10_archive import non_dominated_mask
+
+
+def test_migration_targets():
+    """环形拓扑只迁往下一个岛屿，全连接迁往其余全部岛屿"""
+    assert migration_targets(3, 4, "ring") == [0]
+    assert migration_targets(1, 4, "complete") == [0, 2, 3]
+    assert migration_targets(0, 1, "ring") == []
+    with pytest.raises(ValueError):
+        migration_targets(0, 2, "star")
+
+
+def test_islands_merge_into_feasible_front(monkeypatch, make_optimizer):
+    """各岛屿进化并迁移后，合并的前沿互不支配且满足约束"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "population_size", 12)
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "generations", 4)
+    monkeypatch.setitem(OPTIMIZER_CONFIG["islands"], "migration_interval", 2)
+    monkeypatch.setitem(OPTIMIZER_CONFIG["islands"], "migration_size", 3)
+    optimizer = make_optimizer(backend="deap")
+    allocations, objectives = optimizer.optimize_islands(n_islands=2)
+    assert len(allocations) == len(objectives) > 0
+    assert non_dominated_mask(objectives).all()
+    assert optimizer.constraints.is_feasible(allocations, tolerance=1e-6).all()
+
+
+@pytest.mark.parametrize("backend", ["deap", "array"])
+def test_resume_is_bit_exact(tmp_path, backend, make_optimizer):
+    """从检查点恢复后继续进化，结果与未中断的运行逐位一致"""
+    uninterrupted = make_optimizer(generations=6, backend=backend)
+    expected = uninterrupted.optimize(checkpoint_path=None)
+
+    path = str(tmp_path / "checkpoint.npz")
+    first = make_optimizer(generations=3, backend=backend)
+    first.optimize(checkpoint_path=path, checkpoint_interval=1)
+    resumed = make_optimizer(generations=6, backend=backend)
+    result = resumed.optimize(resume_from=path, checkpoint_path=None)
+
+    np.testing.assert_array_equal(result[0], expected[0])
+    assert result[1] == expected[1]
+    np.testing.assert_array_equal(result[2][0], expected[2][0])
+    np.testing.assert_array_equal(result[2][1], expected[2][1])
+    np.testing.assert_array_equal(resumed.get_objective_history(), uninterrupted.get_objective_history())
+
+
+def test_interleaved_optimizers_do_not_interfere(make_optimizer):
+    """交替推进的两个同种子优化器与单独运行的结果相同，且不修改全局随机状态"""
+    random.seed(123)
+    np.random.seed(123)
+    python_state, numpy_state = random.getstate(), np.random.get_state()[1].copy()
+
+    first, second = make_optimizer(seed=5, backend="deap"), make_optimizer(seed=5, backend="deap")
+    runs = [first._evolve(), second._evolve()]
+    results = [None, None]
+    while any(result is None for result in results):
+        for k, run in enumerate(runs):
+            if results[k] is None:
+                try:
+                    next(run)
+                except StopIteration as stop:
+                    results[k] = stop.value
+    alone = make_optimizer(seed=5, backend="deap").optimize()
+    for result in results:
+        np.testing.assert_array_equal(result[2][1], alone[2][1])
+
+    assert random.getstate() == python_state
+    np.testing.assert_array_equal(np.random.get_state()[1], numpy_state)
+
+
+def test_run_scenarios_threads_match_sequential(monkeypatch, feasible_budget):
+    """线程池并发求解多个情景，结果与逐个求解一致"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "population_size", 12)
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "generations", 3)
+    configs = [feasible_budget, dict(feasible_budget, BUDGET_LIMITS={1: 1200, 2: 900, 3: 600})]
+    concurrent = run_scenarios(configs, RESOURCE_TYPES, HOSPITAL_LEVELS, backend="thread",
+                               max_workers=2, seeds=[1, 2])
+    sequential = run_scenarios(configs, RESOURCE_TYPES, HOSPITAL_LEVELS, backend="thread",
+                               max_workers=1, seeds=[1, 2])
+    for a, b in zip(concurrent, sequential):
+        np.testing.assert_array_equal(a[2][1], b[2][1])
+    with pytest.raises(ValueError):
+        run_scenarios(configs, RESOURCE_TYPES, HOSPITAL_LEVELS, backend="fiber")
+
+
+def test_array_backend_front_is_feasible(make_optimizer):
+    """array 后端：前沿可行、互不支配，评估次数为初始种群加每代一批子代"""
+    optimizer = make_optimizer()
+    best, fitness, (allocations, objectives) = optimizer.optimize()
+    assert best.shape == (len(RESOURCE_TYPES), len(HOSPITAL_LEVELS))
+    assert len(fitness) == 3
+    assert optimizer.constraints.is_feasible(allocations, tolerance=1e-6).all()
+    assert non_dominated_mask(objectives).all()
+    np.testing.assert_allclose(optimizer._evaluate_batch(allocations), objectives)
+    generations = int(optimizer.telemetry.latest("generation"))
+    assert optimizer.telemetry.total_evaluations == optimizer.population_size * (generations + 1)
+
+
+def test_vary_array_mixes_parent_genes(make_optimizer):
+    """向量化变异/交叉产生 population_size 个子代，未变异的子代由亲本基因组成"""
+    optimizer = make_optimizer()
+    optimizer.mut_prob = 0.0
+    parents = np.arange(10 * 9, dtype=float).reshape(10, 3, 3)
+    offspring = optimizer._vary_array(parents)
+    assert offspring.shape == (optimizer.population_size, 3, 3)
+    # 每个位置的基因都来自某个亲本的同一位置
+    flat_parents, flat_offspring = parents.reshape(10, -1), offspring.reshape(len(offspring), -1)
+    for child in flat_offspring:
+        assert np.all(np.any(flat_parents == child, axis=0))
+
+
+def test_seed_allocations_fill_the_seeded_fraction(make_optimizer):
+    """种子个数按比例截取或扰动补足，并全部修复到可行域"""
+    optimizer = make_optimizer()
+    n_seeded = int(round(OPTIMIZER_CONFIG["warm_start"]["fraction"] * optimizer.population_size))
+    rng = np.random.default_rng(0)
+    many = rng.uniform(0, 60, (50, 3, 3))
+    few = rng.uniform(0, 60, (2, 3, 3))
+    for seeds in (many, few):
+        seeded = optimizer._seed_allocations(seeds)
+        assert len(seeded) == n_seeded
+        assert optimizer.constraints.is_feasible(seeded, tolerance=1e-6).all()
+    # 第一个种子优先保留 (已可行时修复后不变)
+    feasible = optimizer.constraints.project(many)
+    np.testing.assert_allclose(optimizer._seed_allocations(feasible)[0], feasible[0], atol=1e-4)
+
+
+def test_warm_start_does_not_lose_previous_front(make_optimizer):
+    """以上一次的前沿热启动，初始存档就包含不劣于上一次结果的解"""
+    previous = make_optimizer(generations=5)
+    _, _, (front, objectives) = previous.optimize()
+    order = np.argsort(objectives[:, 0])
+    warm = make_optimizer(generations=0, seed=9)
+    warm.optimize(seeds=front[order])
+    _, warm_objectives = warm.archive.to_arrays()
+    assert np.any(np.all(warm_objectives <= objectives[order[0]] + 1e-6, axis=1))
+
+
+def test_load_seed_solutions(tmp_path):
+    """种子文件：csv 单矩阵与 npz 存档均可读取，缺失文件被跳过"""
+    from medical_opt.p08_utils import load_seed_solutions, save_arrays_atomic
+    matrix = np.arange(9.0).reshape(3, 3)
+    np.savetxt(tmp_path / "best.csv", matrix, delimiter=",")
+    save_arrays_atomic(str(tmp_path / "front.npz"), {"solutions": np.ones((4, 3, 3))})
+    seeds = load_seed_solutions([str(tmp_path / "best.csv"), str(tmp_path / "missing.csv"),
+                                 str(tmp_path / "front.npz")], (3, 3))
+    assert seeds.shape == (5, 3, 3)
+    np.testing.assert_array_equal(seeds[0], matrix)
+
+
+@pytest.mark.parametrize("backend", ["deap", "array"])
+def test_integer_mode_front_is_integral(backend, make_optimizer):
+    """整数模式：前沿与最优解均为满足约束的整数分配"""
+    optimizer = make_optimizer(backend=backend, integer=True)
+    best, _, (allocations, objectives) = optimizer.optimize()
+    np.testing.assert_array_equal(allocations, np.round(allocations))
+    np.testing.assert_array_equal(best, np.round(best))
+    assert optimizer.constraints.is_feasible(allocations, tolerance=1e-6).all()
+    assert non_dominated_mask(objectives).all()
+
+
+def test_integer_branch_and_bound_does_not_worsen(monkeypatch, make_optimizer):
+    """分支定界精修得到的整数解，加权损失不高于存档中最好的整数解"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG["integer"], "branch_and_bound", True)
+    optimizer = make_optimizer(integer=True)
+    best, fitness, (allocations, objectives) = optimizer.optimize()
+    np.testing.assert_array_equal(best, np.round(best))
+    assert optimizer.constraints.is_feasible(best[None], tolerance=1e-6).all()
+    assert np.dot(fitness, optimizer.weights) <= np.min(objectives @ optimizer.weights) + 1e-9
+
+
+def test_max_evaluations_budget(make_optimizer):
+    """评估次数预算：不超过预算，停止原因为 max_evaluations，仍返回可行前沿"""
+    optimizer = make_optimizer(population_size=20, generations=50)
+    _, _, (allocations, _) = optimizer.optimize(max_evaluations=75)
+    assert optimizer.stop_reason == "max_evaluations"
+    assert optimizer.telemetry.total_evaluations == 60
+    assert int(optimizer.telemetry.latest("generation")) == 2
+    assert optimizer.constraints.is_feasible(allocations, tolerance=1e-6).all()
+
+
+def test_deadline_budget(monkeypatch, tmp_path, make_optimizer):
+    """时间预算：预计下一代超时即停止，并保存可续算的检查点"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG["stopping"], "hv_window", 0)
+    optimizer = make_optimizer(generations=10000)
+    evaluate = optimizer._evaluate_batch
+
+    def slow(allocations):
+        time.sleep(0.01)
+        return evaluate(allocations)
+
+    optimizer._evaluate_batch = slow
+    started = time.perf_counter()
+    path = str(tmp_path / "checkpoint.npz")
+    _, _, (allocations, _) = optimizer.optimize(deadline=0.3, checkpoint_path=path)
+    assert time.perf_counter() - started < 1.0
+    assert optimizer.stop_reason == "deadline"
+    assert 0 < len(allocations)
+    _, generation, finished = optimizer.load_checkpoint(path)
+    assert generation == int(optimizer.telemetry.latest("generation")) and not finished
+
+
+def test_stop_reason_generations_and_stalled(monkeypatch, make_optimizer):
+    """跑满代数时停止原因为 generations；超体积窗口内无增长时为 stalled"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG["stopping"], "hv_window", 0)
+    optimizer = make_optimizer(generations=3)
+    optimizer.optimize()
+    assert optimizer.stop_reason == "generations"
+
+    monkeypatch.setitem(OPTIMIZER_CONFIG["stopping"], "hv_window", 1)
+    monkeypatch.setitem(OPTIMIZER_CONFIG["stopping"], "hv_tolerance", np.inf)
+    optimizer = make_optimizer(generations=10)
+    optimizer.optimize()
+    assert optimizer.stop_reason == "stalled"
+    assert int(optimizer.telemetry.latest("generation")) == 1
+
+
+def test_optimize_async_matches_optimize(monkeypatch, make_optimizer):
+    """协程版本与同步版本结果一致，进度回调 (普通函数或协程函数) 每代调用一次"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG["stopping"], "hv_window", 0)
+    expected = make_optimizer().optimize()
+    generations, seen = [], []
+
+    async def record(event):
+        seen.append(event["generation"])
+
+    result = asyncio.run(make_optimizer().optimize_async(
+        progress_callback=lambda event: generations.append(event["generation"])))
+    asyncio.run(make_optimizer().optimize_async(progress_callback=record))
+    assert generations == seen == [0, 1, 2, 3, 4, 4]
+    np.testing.assert_array_equal(result[2][1], expected[2][1])
+
+
+def test_optimize_stream_stops_when_abandoned(monkeypatch, make_optimizer):
+    """提前结束迭代或取消等待中的任务后，当前一代完成即停止，不再调度后续各代"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG["stopping"], "hv_window", 0)
+    optimizer = make_optimizer(generations=10000)
+
+    async def take(n):
+        events = []
+        async for event in optimizer.optimize_stream():
+            events.append(event)
+            if len(events) == n:
+                break
+        return events
+
+    events = asyncio.run(take(3))
+    assert [event["generation"] for event in events] == [0, 1, 2]
+    assert optimizer.stop_reason == "cancelled"
+    assert int(optimizer.telemetry.latest("generation")) == 2
+
+    async def cancel_running():
+        task = asyncio.create_task(optimizer.optimize_async())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.1)
+        return int(optimizer.telemetry.latest("generation"))
+
+    stopped = asyncio.run(cancel_running())
+    assert optimizer.stop_reason == "cancelled"
+    time.sleep(0.1)
+    assert int(optimizer.telemetry.latest("generation")) == stopped < 10000
+
+
+def test_cancel_from_another_thread(monkeypatch, make_optimizer):
+    """其他线程调用 cancel() 后，optimize() 返回当前前沿，停止原因为 cancelled"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG["stopping"], "hv_window", 0)
+    optimizer = make_optimizer(generations=10000)
+    timer = threading.Timer(0.2, optimizer.cancel)
+    timer.start()
+    _, _, (allocations, _) = optimizer.optimize()
+    timer.join()
+    assert optimizer.stop_reason == "cancelled"
+    assert optimizer.constraints.is_feasible(allocations, tolerance=1e-6).all()
+
+
+def test_compact_storage_front_is_feasible(make_optimizer):
+    """紧凑模式：种群与存档以 float32 存储，转回 float64 后仍满足约束，目标值与重新评估一致"""
+    optimizer = make_optimizer(population_size=20, generations=5, backend="deap", compact=True)
+    assert optimizer.backend == "array"
+    assert optimizer.storage_dtype == np.float32
+    _, _, (allocations, objectives) = optimizer.optimize()
+    assert allocations.dtype == np.float32
+    assert optimizer.constraints.is_feasible(allocations.astype(np.float64)).all()
+    np.testing.assert_allclose(optimizer._evaluate_batch(allocations), objectives, rtol=1e-6)
+    assert optimizer.memory_usage()["archive_solutions"] == allocations.size * 4
+
+
+def test_compact_integer_storage(make_optimizer):
+    """紧凑整数模式：存储为能容纳最大单位数的最小整数类型"""
+    optimizer = make_optimizer(integer=True, compact=True, backend="deap")
+    assert optimizer.storage_dtype.kind == "i" and optimizer.storage_dtype.itemsize >= 2
+    stored = optimizer._store(np.array([[1.4, 2.6]]))
+    np.testing.assert_array_equal(stored, [[1, 3]])
+    _, _, (allocations, _) = optimizer.optimize()
+    assert allocations.dtype == optimizer.storage_dtype
+    assert optimizer.constraints.is_feasible(allocations.astype(np.float64), tolerance=1e-6).all()
+
+
+def test_precision_report(monkeypatch, feasible_budget):
+    """精度报告：紧凑存储字节数减半，前沿全部可行，转存误差很小"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "population_size", 12)
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "generations", 3)
+    report = precision_report(RESOURCE_TYPES, HOSPITAL_LEVELS, feasible_budget,
+                              Constraints(feasible_budget, HOSPITAL_LEVELS), seed=0)
+    full, compact = report["float64"], report["compact"]
+    assert (full["dtype"], compact["dtype"]) == ("float64", "float32")
+    assert compact["bytes_per_individual"] * 2 == full["bytes_per_individual"]
+    assert full["max_storage_error"] == 0.0
+    assert compact["max_storage_error"] < 1e-3
+    assert full["feasible_fraction"] == compact["feasible_fraction"] == 1.0
+    assert compact["hypervolume"] == pytest.approx(full["hypervolume"], rel=0.05)
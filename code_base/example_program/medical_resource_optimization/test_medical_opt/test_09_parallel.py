@@ -0,0 +1,193 @@
+"""
+并行评估模块测试 (p09_parallel.py)
+"""
+
+import os
+import random as random_module
+import time
+from functools import partial
+
+import numpy as np
+import pytest
+
+from medical_opt import p09_parallel
+from medical_opt.config import SYSTEM_CONFIG
+from medical_opt.p09_parallel import (ParallelEvaluator, QueueTransport, SocketTransport,
+                                      make_transport, resolve_n_jobs)
+
+
+def _objectives(x: np.ndarray) -> tuple:
+    """单个体评估函数 (模块级，可被 pickle)"""
+    return float(x.sum()), float((x ** 2).sum())
+
+
+def _batch_objectives(x: np.ndarray) -> np.ndarray:
+    """向量化评估函数"""
+    flat = x.reshape(len(x), -1)
+    return np.column_stack([flat.sum(axis=1), (flat ** 2).sum(axis=1)])
+
+
+def _noisy_objectives(x: np.ndarray) -> tuple:
+    """依赖全局随机流的评估函数"""
+    return float(x.sum() + np.random.random()), float(random_module.random())
+
+
+def _cached_segments(_) -> list:
+    """工作进程中缓存的共享内存名称"""
+    return sorted(p09_parallel._WORKER_STATE["segments"])
+
+
+def test_resolve_n_jobs():
+    """joblib 约定：负数相对 CPU 核心数，0/None 为 1"""
+    n_cpus = os.cpu_count() or 1
+    assert resolve_n_jobs(3) == 3
+    assert resolve_n_jobs(-1) == n_cpus
+    assert resolve_n_jobs(0) == 1
+    assert resolve_n_jobs(-(n_cpus + 5)) == 1
+
+
+def _slow_objectives(x: np.ndarray) -> tuple:
+    """评估耗时约 2 ms 的单个体评估函数"""
+    time.sleep(0.002)
+    return _objectives(x)
+
+
+def test_default_threshold_chooses_evaluation_path():
+    """默认配置下廉价的向量化种群批量在主进程内评估；单个体评估昂贵时经进程池评估"""
+    settings = SYSTEM_CONFIG["parallel"]
+    population = np.random.default_rng(2).uniform(size=(100, 3, 3))
+    with ParallelEvaluator(_batch_objectives, (3, 3), 2, n_jobs=2, vectorized=True,
+                           min_batch_size=settings["min_batch_size"],
+                           min_batch_seconds=settings["min_batch_seconds"]) as evaluator:
+        for _ in range(3):
+            np.testing.assert_allclose(evaluator.evaluate(population), _batch_objectives(population))
+        assert evaluator._pool is None
+
+    with ParallelEvaluator(_slow_objectives, (3, 3), 2, n_jobs=2,
+                           min_batch_size=settings["min_batch_size"],
+                           min_batch_seconds=settings["min_batch_seconds"]) as evaluator:
+        # 首批串行评估以取得耗时估计，之后的批量分派到进程池
+        evaluator.evaluate(population[:10])
+        assert evaluator._pool is None
+        np.testing.assert_allclose(evaluator.evaluate(population[:20]),
+                                   [_objectives(x) for x in population[:20]])
+        assert evaluator._pool is not None
+
+
+def test_parallel_matches_serial():
+    """多进程评估结果与主进程串行评估一致"""
+    population = np.random.default_rng(0).uniform(size=(37, 3, 3))
+    expected = np.array([_objectives(x) for x in population])
+    with ParallelEvaluator(_objectives, (3, 3), 2, n_jobs=2) as evaluator:
+        np.testing.assert_allclose(evaluator.evaluate(population), expected)
+        assert evaluator._pool is not None
+
+
+def test_chunk_random_streams_are_reproducible():
+    """分块随机流由 (种子, 调用序号, 起始下标) 派生，同一配置下重复运行结果相同"""
+    population = np.zeros((30, 2))
+    runs = []
+    for _ in range(2):
+        with ParallelEvaluator(_noisy_objectives, (2,), 2, n_jobs=2, seed=7) as evaluator:
+            runs.append([evaluator.evaluate(population) for _ in range(2)])
+    np.testing.assert_array_equal(runs[0][0], runs[1][0])
+    np.testing.assert_array_equal(runs[0][1], runs[1][1])
+    assert not np.array_equal(runs[0][0], runs[0][1])
+
+
+def test_map_interface():
+    """map 对构造时的评估函数 (或其 partial) 走共享内存，其余函数退化为内置 map"""
+    individuals = [np.full((2,), k, dtype=float) for k in range(6)]
+    with ParallelEvaluator(_objectives, (2,), 2, n_jobs=2) as evaluator:
+        expected = [_objectives(x) for x in individuals]
+        assert evaluator.map(_objectives, individuals) == expected
+        assert evaluator.map(partial(_objectives), individuals) == expected
+        assert evaluator.map(len, individuals) == [2] * 6
+        assert evaluator.map(_objectives, []) == []
+        assert evaluator._pool is not None
+
+
+def test_vectorized_chunks():
+    """向量化评估函数按块调用，结果与逐个体评估一致"""
+    population = np.random.default_rng(1).uniform(size=(50, 3, 3))
+    expected = _batch_objectives(population)
+    with ParallelEvaluator(_batch_objectives, (3, 3), 2, n_jobs=2, vectorized=True) as evaluator:
+        np.testing.assert_allclose(evaluator.evaluate(population), expected)
+    serial = ParallelEvaluator(_batch_objectives, (3, 3), 2, n_jobs=1, vectorized=True)
+    np.testing.assert_allclose(serial.evaluate(population), expected)
+
+
+def test_workers_release_resized_buffers():
+    """缓冲区多次扩容后，工作进程只保留当前一对缓冲区的映射"""
+    evaluator = ParallelEvaluator(_objectives, (2,), 2, n_jobs=2)
+    try:
+        seen = set()
+        for size in (4, 40, 400):
+            evaluator.evaluate(np.ones((size, 2)))
+            seen |= {evaluator._x_shm.name, evaluator._f_shm.name}
+            for names in evaluator._pool.map(_cached_segments, range(8)):
+                assert len(names) <= 2
+        assert len(seen) == 6
+    finally:
+        evaluator.close()
+
+
+def test_array_backend_evaluates_through_pool(monkeypatch, make_optimizer):
+    """array 后端启用并行时经进程池评估，结果与串行运行一致"""
+    monkeypatch.setitem(SYSTEM_CONFIG["parallel"], "n_jobs", 2)
+    # 默认阈值下廉价的向量化评估不经进程池，这里要求总是分派
+    monkeypatch.setitem(SYSTEM_CONFIG["parallel"], "min_batch_seconds", 0.0)
+    results = []
+    for parallel in (False, True):
+        optimizer = make_optimizer(population_size=20, generations=3, seed=3, parallel=parallel)
+        try:
+            results.append(optimizer.optimize(checkpoint_path=None))
+            if parallel:
+                assert optimizer._parallel_evaluator.vectorized
+                assert optimizer._parallel_evaluator._pool is not None
+        finally:
+            optimizer.close()
+    np.testing.assert_allclose(results[0][2][1], results[1][2][1])
+
+
+def test_queue_transport_delivers_to_inbox():
+    """队列通信：移民只进入目标岛屿的收件队列，结果进入结果队列"""
+    transport = QueueTransport(3)
+    transport.send(1, ["elite"])
+    transport.send(1, ["second"])
+    transport.send_result(2, "front")
+    deadline = time.monotonic() + 5
+    received = []
+    while len(received) < 2 and time.monotonic() < deadline:
+        received += transport.receive(1)
+    assert received == [["elite"], ["second"]]
+    assert transport.receive(0) == []
+    assert transport.poll_results(timeout=5) == [(2, "front")]
+
+
+def test_socket_transport_round_trip():
+    """TCP 通信：岛屿之间与岛屿到收集端的消息可达"""
+    base_port = 52000 + os.getpid() % 5000
+    sender, receiver = SocketTransport.localhost(2, base_port), SocketTransport.localhost(2, base_port)
+    collector = SocketTransport.localhost(2, base_port)
+    receiver.bind(1)
+    collector.bind_collector()
+    try:
+        sender.send(1, {"elites": [1, 2]})
+        sender.send_result(0, "front")
+        deadline = time.monotonic() + 5
+        received = []
+        while not received and time.monotonic() < deadline:
+            received = receiver.receive(1)
+            time.sleep(0.01)
+        assert received == [{"elites": [1, 2]}]
+        assert collector.poll_results(timeout=5) == [(0, "front")]
+    finally:
+        receiver.close()
+        collector.close()
+
+
+def test_make_transport_rejects_unknown_kind():
+    """未知的迁移通信方式报错"""
+    with pytest.raises(ValueError):
+        make_transport({"transport": "pigeon"}, 2)
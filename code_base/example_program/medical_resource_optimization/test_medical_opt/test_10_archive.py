@@ -0,0 +1,99 @@
+"""
+帕累托存档模块测试 (p10_archive.py)
+"""
+
+import numpy as np
+import pytest
+
+from medical_opt.p10_archive import (ParetoArchive, crowding_distance, hypervolume, non_dominated_mask,
+                                     non_dominated_ranks, select_nsga2)
+
+
+def _brute_force_mask(objectives: np.ndarray) -> np.ndarray:
+    """两两比较的非支配筛选 (重复点保留第一个)"""
+    n = len(objectives)
+    keep = np.ones(n, dtype=bool)
+    for i in range(n):
+        for j in range(n):
+            dominates = np.all(objectives[j] <= objectives[i]) and np.any(objectives[j] < objectives[i])
+            duplicate = j < i and np.array_equal(objectives[j], objectives[i])
+            if dominates or duplicate:
+                keep[i] = False
+                break
+    return keep
+
+
+def _grid_hypervolume(points: np.ndarray, reference: np.ndarray) -> float:
+    """按坐标网格逐格累加的精确超体积 (小规模对照)"""
+    points = points[np.all(points < reference, axis=1)]
+    axes = [np.unique(np.append(points[:, m], reference[m])) for m in range(points.shape[1])]
+    volume = 0.0
+    for cell in np.array(np.meshgrid(*[a[:-1] for a in axes], indexing="ij")).reshape(len(axes), -1).T:
+        if np.any(np.all(points <= cell, axis=1)):
+            widths = [a[np.searchsorted(a, c) + 1] - c for a, c in zip(axes, cell)]
+            volume += np.prod(widths)
+    return volume
+
+
+@pytest.mark.parametrize("n_objectives", [2, 3, 4])
+def test_non_dominated_mask_matches_brute_force(n_objectives):
+    """扫描算法与两两比较一致 (含重复点与取值相同的目标)"""
+    rng = np.random.default_rng(n_objectives)
+    objectives = rng.integers(0, 6, (120, n_objectives)).astype(float)
+    np.testing.assert_array_equal(non_dominated_mask(objectives), _brute_force_mask(objectives))
+
+
+def test_ranks_peel_successive_fronts():
+    """非支配排序的每一层都是去掉前面各层后的非支配集合"""
+    rng = np.random.default_rng(0)
+    objectives = rng.integers(0, 8, (150, 3)).astype(float)
+    ranks = non_dominated_ranks(objectives)
+    remaining = np.arange(len(objectives))
+    rank = 0
+    while len(remaining):
+        points = objectives[remaining]
+        front = np.array([not np.any(np.all(points <= p, axis=1) & np.any(points < p, axis=1))
+                          for p in points])
+        np.testing.assert_array_equal(ranks[remaining[front]], rank)
+        remaining = remaining[~front]
+        rank += 1
+
+
+def test_hypervolume_3d_is_exact():
+    """三维超体积与逐格累加的结果一致；不优于参考点的点不贡献体积"""
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0, 1, (25, 3))
+    reference = np.array([1.1, 1.0, 1.2])
+    assert np.isclose(hypervolume(points, reference), _grid_hypervolume(points, reference))
+    assert np.isclose(hypervolume(np.array([[0.5, 0.5, 0.5]]), np.ones(3)), 0.125)
+    assert hypervolume(np.array([[1.0, 0.0, 0.0]]), np.ones(3)) == 0.0
+    two = rng.uniform(0, 1, (15, 2))
+    assert np.isclose(hypervolume(two, np.ones(2)), _grid_hypervolume(two, np.ones(2)))
+    with pytest.raises(ValueError):
+        hypervolume(rng.uniform(size=(3, 4)), np.ones(4))
+
+
+def test_crowding_and_selection():
+    """边界点拥挤距离为无穷大；环境选择先取完整的低层前沿"""
+    objectives = np.array([[0, 4], [1, 3], [2, 2], [3, 1], [4, 0], [5, 5], [6, 6]], dtype=float)
+    distance = crowding_distance(objectives[:5])
+    assert np.isinf(distance[[0, 4]]).all() and np.isfinite(distance[1:4]).all()
+    chosen = select_nsga2(objectives, 6)
+    assert set(chosen.tolist()) == {0, 1, 2, 3, 4, 5}
+    assert set(select_nsga2(objectives, 2).tolist()) == {0, 4}
+
+
+def test_archive_keeps_non_dominated_and_respects_capacity():
+    """存档只保留非支配解，重复目标值保留旧成员，超出容量时保留边界点"""
+    archive = ParetoArchive(capacity=5, n_objectives=2)
+    assert archive.update(np.array([[0.0], [1.0]]), np.array([[1, 1], [2, 2]])) == 1
+    assert archive.update(np.array([[9.0]]), np.array([[1, 1]])) == 0
+    solutions, objectives = archive.to_arrays()
+    assert solutions[0, 0] == 0.0 and len(archive) == 1
+
+    front = np.column_stack([np.linspace(0, 1, 20), 1 - np.linspace(0, 1, 20)])
+    archive.update(np.arange(20.0)[:, None], front - 2)
+    _, objectives = archive.to_arrays()
+    assert len(archive) == 5
+    assert non_dominated_mask(objectives).all()
+    assert {-2.0, -1.0} <= set(objectives[:, 0].tolist())
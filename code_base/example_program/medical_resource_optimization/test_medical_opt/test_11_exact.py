@@ -0,0 +1,69 @@
+"""
+精确求解模块测试 (p11_exact.py)
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from medical_opt.p11_exact import ExactSolver
+
+
+@pytest.fixture
+def make_solver(make_optimizer):
+    """由小规模优化器的约束与二次目标构造精确求解器"""
+    def make(**kwargs) -> ExactSolver:
+        optimizer = make_optimizer()
+        return ExactSolver(optimizer.constraints, optimizer.quadratic_objectives(), **kwargs)
+
+    return make
+
+
+def test_weighted_solution_is_feasible_and_optimal(make_solver):
+    """加权和最优解可行，且不劣于可行域内的随机点"""
+    solver = make_solver()
+    weights = np.array([0.4, 0.35, 0.25])
+    x, losses = solver.solve_weighted(weights)
+    c = solver.constraints
+    assert c.is_feasible(x.reshape(1, c.n_resources, c.n_levels), tolerance=1e-6).all()
+    np.testing.assert_allclose(losses, solver.losses(x))
+
+    rng = np.random.default_rng(0)
+    others = c.project(rng.uniform(0, 100, (50, c.n_resources, c.n_levels))).reshape(50, -1)
+    weighted = np.array([weights @ solver.losses(y) for y in others]) / weights.sum()
+    assert weights @ losses / weights.sum() <= weighted.min() + 1e-6
+
+
+def test_epsilon_front_points_are_feasible_and_non_dominated(make_solver):
+    """ε-约束前沿上的点满足约束且互不支配"""
+    solver = make_solver()
+    x, losses = solver.epsilon_front(n_points=5)
+    c = solver.constraints
+    assert len(x) > 0
+    assert c.is_feasible(x.reshape(-1, c.n_resources, c.n_levels), tolerance=1e-6).all()
+    for f in losses:
+        dominated = np.all(losses <= f, axis=1) & np.any(losses < f, axis=1)
+        assert not dominated.any()
+
+
+def test_failed_weighted_solve_raises(make_solver):
+    """SLSQP 未收敛时加权和求解抛出 RuntimeError，而不是返回未收敛的点"""
+    solver = make_solver(max_iterations=1)
+    with pytest.raises(RuntimeError):
+        solver.solve_weighted(np.ones(3))
+
+
+def test_infeasible_epsilon_point_is_dropped(caplog, make_solver):
+    """ε 上界无法同时满足的网格点被跳过并记录警告，返回的点都满足各自的上界"""
+    solver = make_solver()
+    _, table = solver.payoff_table()
+    ideal = table.min(axis=0)
+    with pytest.raises(RuntimeError):
+        solver.solve_epsilon(1, {0: ideal[0], 2: ideal[2]})
+
+    with caplog.at_level(logging.WARNING, logger="medical_opt.p11_exact"):
+        results = solver._sweep_row((1, {0: ideal[0]}, [{2: ideal[2]}, {2: table[:, 2].max()}], None))
+    assert any("Dropping" in record.message for record in caplog.records)
+    assert len(results) == 1
+    assert results[0][1][2] <= table[:, 2].max() + 1e-6
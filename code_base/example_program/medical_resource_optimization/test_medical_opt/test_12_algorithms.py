@@ -0,0 +1,100 @@
+"""
+进化算法模块测试 (p12_algorithms.py)
+"""
+
+import numpy as np
+import pytest
+
+from medical_opt.config import OPTIMIZER_CONFIG
+from medical_opt.p10_archive import non_dominated_mask, non_dominated_ranks
+from medical_opt.p12_algorithms import MOEAD, NSGA3, make_engine, reference_directions, select_nsga3
+
+
+@pytest.fixture
+def small_run(monkeypatch):
+    """小规模配置 (引擎按构造时的种群规模生成权重向量，须在创建优化器前设置)"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "population_size", 20)
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "generations", 4)
+
+
+@pytest.mark.parametrize("n_objectives, n_points", [(3, 15), (3, 20), (2, 7), (4, 10)])
+def test_reference_directions(n_objectives, n_points):
+    """参考方向个数正确、互不相同、每行之和为 1，且保留单纯形各顶点"""
+    directions = reference_directions(n_objectives, n_points)
+    assert directions.shape == (n_points, n_objectives)
+    assert np.all(directions >= 0)
+    np.testing.assert_allclose(directions.sum(axis=1), 1.0)
+    assert len(np.unique(directions, axis=0)) == n_points
+    for vertex in np.eye(n_objectives):
+        assert np.any(np.all(np.isclose(directions, vertex), axis=1))
+
+
+def test_select_nsga3_keeps_better_fronts():
+    """NSGA-III 选择：下标互不重复，较好的前沿整体入选，最后一层只取部分"""
+    rng = np.random.default_rng(0)
+    objectives = rng.random((60, 3))
+    ranks = non_dominated_ranks(objectives)
+    k = 25
+    chosen = select_nsga3(objectives, k, reference_directions(3, k), np.random.default_rng(1))
+    assert len(chosen) == len(np.unique(chosen)) == k
+    last_rank = np.sort(ranks)[k - 1]
+    assert set(np.flatnonzero(ranks < last_rank)) <= set(chosen.tolist())
+    assert np.all(ranks[chosen] <= last_rank)
+
+    # 个数足够时全部保留
+    assert len(select_nsga3(objectives, 100, reference_directions(3, 10), rng)) == 60
+
+
+def test_select_nsga3_spreads_over_niches():
+    """同一前沿上的点集中在一端时，选择仍覆盖各参考方向附近的点"""
+    t = np.concatenate([np.linspace(0.0, 0.1, 40), [0.5, 1.0]])
+    objectives = np.column_stack([t, 1.0 - t])
+    chosen = select_nsga3(objectives, 5, reference_directions(2, 5), np.random.default_rng(0))
+    assert {40, 41} <= set(chosen.tolist())
+
+
+@pytest.mark.parametrize("algorithm, engine", [("NSGA-III", NSGA3), ("MOEA/D", MOEAD)])
+def test_engine_front_is_feasible(small_run, algorithm, engine, make_optimizer):
+    """NSGA-III 与 MOEA/D 引擎得到的前沿可行且互不支配"""
+    optimizer = make_optimizer(population_size=20, algorithm=algorithm)
+    _, _, (allocations, objectives) = optimizer.optimize()
+    assert isinstance(optimizer.engine, engine)
+    assert len(allocations) > 0
+    assert optimizer.constraints.is_feasible(allocations, tolerance=1e-6).all()
+    assert non_dominated_mask(objectives).all()
+
+
+def test_moead_step_only_improves_subproblems(small_run, make_optimizer):
+    """MOEA/D 一代进化后，每个子问题的 Tchebycheff 值不变差"""
+    optimizer = make_optimizer(population_size=20, algorithm="MOEA/D")
+    engine = optimizer.engine
+    assert len(engine.weights) == optimizer.population_size
+    allocations, fitness = optimizer._initial_population_array(optimizer.population_size)
+    optimizer.archive.update(allocations, fitness)
+
+    # 记录 step 内部使用的理想点与缩放，在同一尺度下比较替换前后
+    used = {}
+    tchebycheff = engine._tchebycheff
+
+    def recording(objectives, weights, ideal, scale):
+        used["ideal"], used["scale"] = ideal, scale
+        return tchebycheff(objectives, weights, ideal, scale)
+
+    engine._tchebycheff = recording
+    _, new_fitness = engine.step((allocations, fitness))
+    before = tchebycheff(fitness, engine.weights, used["ideal"], used["scale"])
+    after = tchebycheff(new_fitness, engine.weights, used["ideal"], used["scale"])
+    assert np.all(after <= before + 1e-12)
+    assert np.any(after < before)
+
+
+def test_moead_switches_to_array_backend(make_optimizer):
+    """MOEA/D 只在数组表示下实现，deap 后端自动切换为 array"""
+    optimizer = make_optimizer(backend="deap", algorithm="MOEA/D")
+    assert optimizer.backend == "array"
+
+
+def test_unknown_algorithm():
+    """未知算法名抛出 ValueError"""
+    with pytest.raises(ValueError, match="Unknown algorithm"):
+        make_engine("SPEA2", None)
@@ -0,0 +1,100 @@
+"""
+运行遥测模块测试 (p13_telemetry.py)
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from medical_opt.p13_telemetry import PHASES, GenerationTelemetry
+
+
+def _record(telemetry: GenerationTelemetry, generation: int, evaluations: int = 10) -> None:
+    """写入一代目标值为 generation 的记录"""
+    telemetry.add_evaluations(evaluations)
+    objectives = np.full((4, telemetry.n_objectives), float(generation))
+    objectives[0] -= 1.0
+    telemetry.record(generation, objectives, feasible_fraction=1.0, archive_size=generation)
+
+
+def test_record_statistics():
+    """每代写入各目标的最小/平均/最大值与累计评估次数"""
+    telemetry = GenerationTelemetry(capacity=10, n_objectives=2)
+    for generation in range(3):
+        _record(telemetry, generation)
+    assert len(telemetry) == 3
+    np.testing.assert_array_equal(telemetry.column("generation"), [0, 1, 2])
+    np.testing.assert_array_equal(telemetry.objective_history("min"), [[-1, -1], [0, 0], [1, 1]])
+    np.testing.assert_allclose(telemetry.objective_history("mean")[:, 0], [-0.25, 0.75, 1.75])
+    np.testing.assert_array_equal(telemetry.objective_history("max")[:, 1], [0, 1, 2])
+    np.testing.assert_array_equal(telemetry.column("total_evaluations"), [10, 20, 30])
+    assert telemetry.total_evaluations == 30
+    assert np.isnan(telemetry.latest("hypervolume"))
+    with pytest.raises(ValueError):
+        telemetry.objective_history("median")
+
+
+def test_ring_buffer_keeps_latest_generations():
+    """超出容量时覆盖最早的代，按代数先后返回"""
+    telemetry = GenerationTelemetry(capacity=4)
+    for generation in range(10):
+        _record(telemetry, generation)
+    assert len(telemetry) == 4
+    np.testing.assert_array_equal(telemetry.column("generation"), [6, 7, 8, 9])
+    assert telemetry.latest("generation") == 9
+    assert telemetry.latest("generation", lag=3) == 6
+    assert np.isnan(telemetry.latest("generation", lag=4))
+    assert telemetry.total_evaluations == 100
+
+
+def test_nested_timers_are_exclusive():
+    """嵌套计时从外层扣除，各阶段为独占时间"""
+    telemetry = GenerationTelemetry()
+    telemetry.start()
+    with telemetry.timer("variation"):
+        time.sleep(0.02)
+        with telemetry.timer("repair"):
+            time.sleep(0.05)
+    _record(telemetry, 0)
+    variation, repair = telemetry.latest("time_variation"), telemetry.latest("time_repair")
+    assert 0.015 <= variation < 0.06
+    assert repair >= 0.045
+    assert telemetry.latest("time_total") >= variation + repair
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """导出后读取得到相同的记录，旧版本记录中缺少的列填 nan"""
+    telemetry = GenerationTelemetry(capacity=8)
+    for generation in range(5):
+        _record(telemetry, generation)
+    path = str(tmp_path / "telemetry.npz")
+    telemetry.save(path)
+    loaded = GenerationTelemetry.load(path, capacity=8)
+    np.testing.assert_array_equal(loaded.as_array(), telemetry.as_array())
+    assert loaded.total_evaluations == telemetry.total_evaluations
+
+    columns = telemetry.to_dict()
+    del columns["spacing"]
+    restored = GenerationTelemetry(capacity=3)
+    restored.restore(columns)
+    np.testing.assert_array_equal(restored.column("generation"), [2, 3, 4])
+    assert np.isnan(restored.column("spacing")).all()
+
+
+def test_optimizer_records_every_generation(make_optimizer):
+    """优化器逐代记录遥测：代数连续，评估次数与阶段耗时均被累计"""
+    optimizer = make_optimizer(population_size=12)
+    optimizer.optimize()
+    table = optimizer.get_telemetry()
+    generations = table["generation"]
+    np.testing.assert_array_equal(generations, np.arange(len(generations)))
+    assert len(generations) >= 2
+    np.testing.assert_array_equal(table["evaluations"], 12)
+    assert optimizer.telemetry.total_evaluations == 12 * len(generations)
+    assert np.all(table["feasible_fraction"] == 1.0)
+    assert np.all(table["time_evaluation"] > 0)
+    assert set(f"time_{phase}" for phase in PHASES) <= set(table)
+    history = optimizer.get_objective_history()
+    assert history.shape == (len(generations), 3)
+    np.testing.assert_array_equal(history, optimizer.telemetry.objective_history("min"))
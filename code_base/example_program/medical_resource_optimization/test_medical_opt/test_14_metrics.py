@@ -0,0 +1,105 @@
+"""
+前沿质量指标模块测试 (p14_metrics.py)
+"""
+
+import numpy as np
+import pytest
+
+import medical_opt.p14_metrics as metrics_module
+from medical_opt.p14_metrics import QUALITY_METRICS, front_metrics, igd, igd_plus, spacing, spread
+
+
+def _brute_igd_plus(front: np.ndarray, reference_front: np.ndarray) -> float:
+    """按定义逐对计算的 IGD+"""
+    excess = np.maximum(front[None, :, :] - reference_front[:, None, :], 0.0)
+    return float(np.mean(np.min(np.linalg.norm(excess, axis=2), axis=1)))
+
+
+def test_igd_matches_definition():
+    """IGD 为参考点到最近前沿点距离的平均值，前沿与参考前沿相同时为 0"""
+    rng = np.random.default_rng(0)
+    front, reference = rng.random((30, 3)), rng.random((50, 3))
+    expected = np.mean(np.min(np.linalg.norm(reference[:, None] - front[None], axis=2), axis=1))
+    assert igd(front, reference) == pytest.approx(expected)
+    assert igd(reference, reference) == 0.0
+    assert igd(np.empty((0, 3)), reference) == np.inf
+
+
+def test_igd_plus_matches_definition(monkeypatch):
+    """IGD+ 分块计算与逐对定义一致，被支配的点不影响结果"""
+    rng = np.random.default_rng(1)
+    front, reference = rng.random((40, 3)), rng.random((70, 3))
+    expected = _brute_igd_plus(front, reference)
+    assert igd_plus(front, reference) == pytest.approx(expected)
+    # 极小的分块也得到相同结果
+    monkeypatch.setattr(metrics_module, "_CHUNK_ELEMENTS", 7)
+    assert igd_plus(front, reference) == pytest.approx(expected)
+    # 优于全部参考点的前沿 IGD+ 为 0，而 IGD 不为 0
+    better = reference.min(axis=0)[None] - 0.1
+    assert igd_plus(better, reference) == 0.0
+    assert igd(better, reference) > 0
+
+
+def test_spacing_and_spread_of_uniform_front():
+    """等距前沿的间距与无端点项的分布广度为 0，不均匀时为正"""
+    t = np.linspace(0.0, 1.0, 11)
+    uniform = np.column_stack([t, 1.0 - t])
+    assert spacing(uniform) == pytest.approx(0.0, abs=1e-12)
+    assert spread(uniform) == pytest.approx(0.0, abs=1e-12)
+    # 参考前沿的端点已被覆盖时端点项为 0
+    assert spread(uniform, uniform) == pytest.approx(0.0, abs=1e-12)
+
+    uneven = np.column_stack([t ** 3, 1.0 - t ** 3])
+    assert spacing(uneven) > 0
+    assert spread(uneven) > 0
+    # 缺少一端的前沿分布广度变差
+    assert spread(uniform[:6], uniform) > spread(uniform, uniform)
+    assert np.isnan(spacing(uniform[:1])) and np.isnan(spread(uniform[:1]))
+
+
+def test_front_metrics_keys_and_normalization():
+    """front_metrics 返回全部指标；归一化后超体积在 [0, 1] 内，无参考前沿时 IGD 为 nan"""
+    rng = np.random.default_rng(2)
+    reference = np.abs(rng.normal(size=(200, 3)))
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+    front = reference[::4] * 1.05
+
+    result = front_metrics(front, reference)
+    assert tuple(result) == QUALITY_METRICS
+    assert 0 < result["hypervolume"] < 1
+    assert 0 < result["igd_plus"] <= result["igd"]
+    without = front_metrics(front)
+    assert np.isnan(without["igd"]) and np.isnan(without["igd_plus"])
+
+    # 给定归一化时按 (f - ideal) / scale 计算
+    ideal, scale = np.zeros(3), np.full(3, 2.0)
+    scaled = front_metrics(front, reference, np.stack([ideal, scale]))
+    assert scaled["igd"] == pytest.approx(igd(front, reference) / 2.0)
+    assert all(np.isnan(value) for value in front_metrics(np.empty((0, 3))).values())
+
+
+def test_closer_front_has_better_metrics():
+    """更接近参考前沿的近似前沿：超体积更大，IGD 与 IGD+ 更小"""
+    rng = np.random.default_rng(3)
+    reference = np.abs(rng.normal(size=(300, 3)))
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+    sample = reference[rng.choice(len(reference), 60, replace=False)]
+    normalization = np.stack([np.zeros(3), np.full(3, 1.5)])
+    near = front_metrics(sample * 1.02, reference, normalization)
+    far = front_metrics(sample * 1.2, reference, normalization)
+    assert near["hypervolume"] > far["hypervolume"]
+    assert near["igd"] < far["igd"]
+    assert near["igd_plus"] < far["igd_plus"]
+
+
+def test_optimizer_records_metrics_every_generation(make_optimizer):
+    """给定参考前沿时，优化器逐代把 IGD/IGD+ 写入遥测，最终前沿的指标与 front_quality 一致"""
+    optimizer = make_optimizer(population_size=12)
+    _, _, (_, reference) = optimizer.optimize()
+    optimizer.reference_front = reference
+    optimizer.optimize()
+    table = optimizer.get_telemetry()
+    for name in QUALITY_METRICS:
+        assert np.isfinite(table[name]).all()
+    assert np.all(np.diff(table["hypervolume"]) >= -1e-12)
+    assert optimizer.front_quality()["igd"] == pytest.approx(table["igd"][-1])
@@ -0,0 +1,113 @@
+"""
+情景扫描模块测试 (p15_sweep.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from medical_opt.config import HOSPITAL_LEVELS, OPTIMIZER_CONFIG
+from medical_opt.p05_constraints import Constraints
+from medical_opt.p08_utils import load_arrays
+from medical_opt.p15_sweep import ScenarioSweep
+
+
+@pytest.fixture
+def small_run(monkeypatch):
+    """各情景的小规模优化配置"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "population_size", 12)
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "generations", 3)
+
+
+def test_grid_and_parameter_paths(feasible_budget):
+    """全因子网格按参数顺序展开；未知的配置项或路径报错"""
+    sweep = ScenarioSweep(base_config=feasible_budget)
+    parameters, values = sweep.grid({"BUDGET_LIMITS.1": [800, 1000, 1200],
+                                     "UNIT_COSTS.2.salary": [12, 15]})
+    assert parameters == ["BUDGET_LIMITS.1", "UNIT_COSTS.2.salary"]
+    assert values.shape == (6, 2)
+    np.testing.assert_array_equal(values[:2], [[800, 12], [800, 15]])
+    with pytest.raises(ValueError):
+        sweep.grid({"HOSPITAL_LEVELS.1": [1]})
+    with pytest.raises(KeyError):
+        sweep.scenario_configs(["UNIT_COSTS.2.equipment"], np.array([[1.0]]))
+
+
+def test_latin_hypercube_strata():
+    """拉丁超立方：每个参数的每一层恰好有一个样本，且落在给定区间内"""
+    sweep = ScenarioSweep()
+    ranges = {"BUDGET_LIMITS.1": (800, 1200), "DEMAND_THRESHOLDS.3": (40, 60)}
+    parameters, values = sweep.latin_hypercube(ranges, 20, seed=0)
+    assert values.shape == (20, 2)
+    for k, parameter in enumerate(parameters):
+        low, high = ranges[parameter]
+        strata = np.floor((values[:, k] - low) / (high - low) * 20).astype(int)
+        np.testing.assert_array_equal(np.sort(strata), np.arange(20))
+    np.testing.assert_array_equal(sweep.latin_hypercube(ranges, 20, seed=0)[1], values)
+
+
+def test_scenario_configs_do_not_touch_base(feasible_budget):
+    """情景配置为基准配置的深拷贝，只修改扫描的参数"""
+    base = {key: dict(value) if isinstance(value, dict) else value
+            for key, value in feasible_budget.items()}
+    sweep = ScenarioSweep(base_config=base)
+    configs = sweep.scenario_configs(["UNIT_COSTS.1.equipment", "DEMAND_THRESHOLDS.2"],
+                                     np.array([[12.0, 70.0], [8.0, 50.0]]))
+    assert configs[0]["UNIT_COSTS"][1]["equipment"] == 12.0
+    assert configs[1]["DEMAND_THRESHOLDS"][2] == 50.0
+    assert configs[1]["UNIT_COSTS"][2] == base["UNIT_COSTS"][2]
+    assert base["UNIT_COSTS"][1]["equipment"] == 10
+    assert base["DEMAND_THRESHOLDS"][2] == 60
+
+
+def test_warm_start_tree_is_spanning_forest():
+    """热启动树：恰有 n_roots 个根，每个情景的父情景先于其加入，且为已加入情景中最近的一个"""
+    rng = np.random.default_rng(0)
+    values = rng.random((30, 2)) * [400, 20] + [800, 40]
+    parent, order = ScenarioSweep.warm_start_tree(values, n_roots=3)
+    assert np.sum(parent < 0) == 3
+    assert sorted(order.tolist()) == list(range(30))
+    position = np.empty(30, dtype=int)
+    position[order] = np.arange(30)
+    points = (values - values.min(axis=0)) / np.ptp(values, axis=0)
+    for child in np.flatnonzero(parent >= 0):
+        assert position[parent[child]] < position[child]
+        earlier = order[:position[child]]
+        distance = np.linalg.norm(points[earlier] - points[child], axis=1)
+        assert np.linalg.norm(points[parent[child]] - points[child]) == pytest.approx(distance.min())
+
+
+@pytest.mark.parametrize("warm_start", [False, True])
+def test_run_is_reproducible_and_feasible(small_run, tmp_path, warm_start, feasible_budget):
+    """重复扫描结果逐位一致 (父子关系与完成先后无关)，冷启动时与并发数无关；各情景最优解可行"""
+    sweep = ScenarioSweep(base_config=feasible_budget)
+    parameters, values = sweep.grid({"BUDGET_LIMITS.1": [900, 1100], "DEMAND_THRESHOLDS.1": [70, 90]})
+    path = str(tmp_path / "sweep.npz")
+    table = sweep.run(parameters, values, backend="thread", max_workers=2, seed=0,
+                      warm_start=warm_start, path=path)
+    assert np.all(table["feasible"])
+    assert np.sum(table["parent"] < 0) == (2 if warm_start else 4)
+    # 热启动树的根个数等于并发数，冷启动时可与单线程比较
+    repeated = sweep.run(parameters, values, backend="thread", max_workers=2 if warm_start else 1,
+                         seed=0, warm_start=warm_start)
+    np.testing.assert_array_equal(table["parent"], repeated["parent"])
+    for name in ("efficiency_loss", "accessibility_loss", "cost_loss", "x_1_1"):
+        np.testing.assert_array_equal(table[name], repeated[name])
+
+    # 最优分配方案各元素与情景配置一致地满足约束
+    configs = sweep.scenario_configs(parameters, values)
+    best = np.column_stack([table[f"x_{i}_{j}"] for i in (1, 2, 3) for j in (1, 2, 3)])
+    for config, allocation in zip(configs, best.reshape(-1, 3, 3)):
+        assert Constraints(config, HOSPITAL_LEVELS).is_feasible(allocation, tolerance=1e-6)
+
+    saved = load_arrays(path)
+    np.testing.assert_array_equal(saved["cost_loss"], table["cost_loss"])
+    sweep.save(table, str(tmp_path / "sweep.csv"))
+    assert len(pd.read_csv(tmp_path / "sweep.csv")) == 4
+
+
+def test_unknown_backend(feasible_budget):
+    """未知的扫描后端报错"""
+    sweep = ScenarioSweep(base_config=feasible_budget)
+    with pytest.raises(ValueError):
+        sweep.run(["BUDGET_LIMITS.1"], np.array([[900.0]]), backend="fiber")
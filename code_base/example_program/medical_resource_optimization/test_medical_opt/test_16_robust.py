@@ -0,0 +1,103 @@
+"""
+鲁棒优化模块测试 (p16_robust.py)
+"""
+
+import numpy as np
+import pytest
+
+from medical_opt.config import OPTIMIZER_CONFIG
+from medical_opt.p16_robust import DemandScenarios
+
+MEAN = np.array([80.0, 60.0, 40.0])
+
+
+def test_scenarios_keep_the_mean():
+    """对数正态情景的样本均值接近 DEMAND_THRESHOLDS，变异系数接近配置值"""
+    scenarios = DemandScenarios(MEAN, 0.2, n_scenarios=20000, seed=0)
+    assert len(scenarios) == 20000
+    assert np.all(scenarios.demands > 0)
+    np.testing.assert_allclose(scenarios.demands.mean(axis=0), MEAN, rtol=0.01)
+    np.testing.assert_allclose(scenarios.demands.std(axis=0) / MEAN, 0.2, rtol=0.05)
+
+
+def test_common_random_numbers():
+    """同一种子得到相同情景；更新分布时沿用同一组标准正态样本"""
+    first = DemandScenarios(MEAN, 0.1, n_scenarios=32, seed=3)
+    second = DemandScenarios(MEAN, 0.1, n_scenarios=32, seed=3)
+    np.testing.assert_array_equal(first.demands, second.demands)
+    z = np.log(first.demands / MEAN)
+    first.set_distribution(MEAN, [0.1, 0.3, 0.0])
+    np.testing.assert_allclose(first.demands[:, 2], MEAN[2])
+    # 变异系数增大时各情景的排序不变
+    np.testing.assert_array_equal(np.argsort(first.demands[:, 1]), np.argsort(z[:, 1]))
+
+
+def test_risk_measures():
+    """期望为平均值；CVaR 为最差 1 - alpha 比例情景的平均值，不小于期望"""
+    losses = np.array([[1.0, 2.0, 3.0, 4.0, 10.0, 0.0, 5.0, 6.0, 7.0, 8.0]])
+    assert DemandScenarios.risk(losses, "expected")[0] == pytest.approx(4.6)
+    assert DemandScenarios.risk(losses, "cvar", alpha=0.9)[0] == pytest.approx(10.0)
+    assert DemandScenarios.risk(losses, "cvar", alpha=0.8)[0] == pytest.approx(9.0)
+    assert DemandScenarios.risk(losses, "cvar", alpha=0.0)[0] == pytest.approx(4.6)
+    with pytest.raises(ValueError):
+        DemandScenarios.risk(losses, "worst")
+
+
+def test_losses_and_satisfaction_broadcast():
+    """损失与满足比例按 (种群, K) 广播计算，与逐情景计算一致"""
+    scenarios = DemandScenarios(MEAN, 0.2, n_scenarios=50, seed=1)
+    supply = np.array([[80.0, 60.0, 40.0], [100.0, 70.0, 50.0]])
+    losses = scenarios.accessibility_losses(supply)
+    assert losses.shape == (2, 50)
+    expected = np.mean((1 - supply[1] / scenarios.demands[7]) ** 2)
+    assert losses[1, 7] == pytest.approx(expected)
+    satisfaction = scenarios.satisfaction(supply)
+    assert satisfaction[0] < satisfaction[1]
+    assert satisfaction[1] == np.mean(np.all(supply[1] >= scenarios.demands, axis=1))
+    assert np.all(scenarios.quantile(0.9) >= np.quantile(scenarios.demands, 0.89, axis=0))
+
+
+def test_robust_objective_matches_quadratic_form(make_optimizer):
+    """鲁棒可及性损失 (期望) 与按情景堆叠的二次型一致"""
+    optimizer = make_optimizer(robust=True)
+    allocations = optimizer.constraints.project(np.random.default_rng(0).uniform(0, 60, (5, 3, 3)))
+    objectives = optimizer._evaluate_batch(allocations)
+    G, h = optimizer.quadratic_objectives()[1]
+    x = allocations.reshape(5, -1)
+    np.testing.assert_allclose(objectives[:, 1], np.mean((x @ G.T - h) ** 2, axis=1))
+
+
+def test_chance_constraints_raise_the_front(monkeypatch, make_optimizer):
+    """机会约束：需求下限取情景分位数，前沿上的解逐级满足需求的情景比例不低于 chance_level，
+    同时满足各级需求的比例高于按均值约束"""
+    # 默认变异系数下 0.9 分位数的总需求超出预算所能覆盖的数量，取较小的变异系数
+    monkeypatch.setitem(OPTIMIZER_CONFIG["robust"], "variation", 0.05)
+    monkeypatch.setitem(OPTIMIZER_CONFIG["robust"], "chance_level", 0.9)
+    constrained = make_optimizer(robust=True)
+    np.testing.assert_array_equal(
+        -constrained.constraints.b_ub[3:6], constrained.demand_scenarios.quantile(0.9)
+    )
+    _, _, (allocations, _) = constrained.optimize()
+    assert constrained.constraints.is_feasible(allocations, tolerance=1e-6).all()
+    supply = allocations.sum(axis=1)
+    per_level = np.mean(supply[:, None, :] >= constrained.demand_scenarios.demands, axis=1)
+    assert np.all(per_level >= 0.9)
+
+    monkeypatch.setitem(OPTIMIZER_CONFIG["robust"], "chance_level", None)
+    nominal = make_optimizer(robust=True)
+    _, _, (nominal_allocations, _) = nominal.optimize()
+    assert (constrained.demand_satisfaction(allocations).mean() >
+            nominal.demand_satisfaction(nominal_allocations).mean())
+
+    with pytest.raises(ValueError):
+        make_optimizer(robust=False).demand_satisfaction(allocations)
+
+
+def test_set_demand_variation_updates_constraints(monkeypatch, make_optimizer):
+    """更新变异系数后机会约束的需求下限随之变化"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG["robust"], "chance_level", 0.9)
+    optimizer = make_optimizer(robust=True)
+    before = -optimizer.constraints.b_ub[3:6].copy()
+    optimizer.set_demand_variation(0.4)
+    after = -optimizer.constraints.b_ub[3:6]
+    assert np.all(after > before)
@@ -0,0 +1,136 @@
+"""
+多期滚动规划模块测试 (p17_multiperiod.py)
+"""
+
+import numpy as np
+import pytest
+
+from medical_opt.config import HOSPITAL_LEVELS, OPTIMIZER_CONFIG, RESOURCE_TYPES
+from medical_opt.p05_constraints import Constraints
+from medical_opt.p17_multiperiod import MultiPeriodOptimizer, RollingHorizonPlanner, WindowModel
+
+BUDGETS = np.array([[1000.0, 800.0, 500.0], [1100.0, 800.0, 450.0], [900.0, 850.0, 500.0]])
+DEMANDS = np.array([[80.0, 60.0, 40.0], [85.0, 62.0, 42.0], [90.0, 64.0, 44.0]])
+DEPRECIATION = np.array([0.1, 0.0, 0.2])
+
+
+@pytest.fixture(scope="module")
+def constraints(feasible_budget) -> Constraints:
+    """单期约束"""
+    return Constraints(feasible_budget, HOSPITAL_LEVELS)
+
+
+@pytest.fixture
+def make_window(constraints):
+    """三期窗口"""
+    def make(inventory=None) -> WindowModel:
+        inventory = np.zeros((3, 3)) if inventory is None else inventory
+        return WindowModel(BUDGETS, DEMANDS, constraints.cost_matrix, DEPRECIATION, inventory)
+
+    return make
+
+
+@pytest.fixture
+def make_planner(feasible_budget, constraints):
+    """四期规划、两期窗口的规划器"""
+    def make(**overrides) -> RollingHorizonPlanner:
+        config = dict(OPTIMIZER_CONFIG["multi_period"], n_periods=4, window=2, demand_growth=0.02)
+        config.update(overrides)
+        return RollingHorizonPlanner(RESOURCE_TYPES, HOSPITAL_LEVELS, feasible_budget, constraints,
+                                     config=config, seed=0)
+
+    return make
+
+
+def test_stock_follows_depreciation_recurrence(make_window):
+    """期末存量满足 s_t = (1 - δ) s_{t-1} + y_t (含窗口开始前的存量)"""
+    rng = np.random.default_rng(0)
+    inventory = rng.uniform(0, 20, (3, 3))
+    window = make_window(inventory)
+    purchases = rng.uniform(0, 30, (3, 3, 3))
+    stock = window.stock(purchases)
+    previous = inventory
+    for t in range(3):
+        expected = (1 - DEPRECIATION)[:, None] * previous + purchases[:, t, :]
+        np.testing.assert_allclose(stock[:, t, :], expected)
+        previous = expected
+    # 批量输入
+    np.testing.assert_allclose(window.stock(np.stack([purchases] * 2))[1], stock)
+
+
+def test_single_period_matches_resource_optimizer(constraints, make_optimizer):
+    """单期、零存量的窗口损失与 ResourceOptimizer 的损失一致"""
+    window = WindowModel(BUDGETS[:1], DEMANDS[:1], constraints.cost_matrix, DEPRECIATION, np.zeros((3, 3)))
+    optimizer = make_optimizer()
+    allocations = constraints.project(np.random.default_rng(1).uniform(0, 60, (6, 3, 3)))
+    np.testing.assert_allclose(window.losses(allocations[:, :, None, :]),
+                               optimizer._evaluate_batch(allocations))
+
+
+def test_window_constraints_match_period_checks(feasible_budget, constraints, make_window):
+    """窗口约束等价于非负、按期预算与按期存量需求的逐项检查"""
+    window = make_window(np.full((3, 3), 5.0))
+    optimizer = MultiPeriodOptimizer(RESOURCE_TYPES, HOSPITAL_LEVELS, feasible_budget, window,
+                                     seed=0, parallel=False, backend="array")
+    rng = np.random.default_rng(2)
+    plans = optimizer.constraints.project(rng.uniform(0, 40, (200, 3, 9)))
+    plans[100:] += rng.normal(0, 3, (100, 3, 9))
+    view = optimizer._window_view(plans)
+    costs = np.sum(view * constraints.cost_matrix[:, None, :], axis=-1)
+    budget_ok = np.all(costs <= BUDGETS.T + 1e-9, axis=(1, 2))
+    demand_ok = np.all(window.stock(view).sum(axis=1) >= DEMANDS - 1e-9, axis=(1, 2))
+    expected = budget_ok & demand_ok & np.all(plans >= 0, axis=(1, 2))
+    assert 0 < expected.sum() < len(plans)
+    np.testing.assert_array_equal(optimizer.constraints.is_feasible(plans, tolerance=1e-9), expected)
+
+
+def test_quadratic_objectives_match_losses(feasible_budget, make_window):
+    """窗口优化器的最小二乘形式与三个损失一致"""
+    window = make_window(np.full((3, 3), 5.0))
+    optimizer = MultiPeriodOptimizer(RESOURCE_TYPES, HOSPITAL_LEVELS, feasible_budget, window,
+                                     seed=0, parallel=False, backend="array")
+    plans = np.random.default_rng(3).uniform(0, 40, (5, 3, 9))
+    objectives = optimizer._evaluate_batch(plans)
+    for m, (G, h) in enumerate(optimizer.quadratic_objectives()):
+        np.testing.assert_allclose(objectives[:, m], np.mean((plans.reshape(5, -1) @ G.T - h) ** 2, axis=1))
+
+
+def test_rolling_horizon_exact_plan_is_feasible(constraints, make_planner):
+    """滚动规划 (精确求解)：各期新增配置满足当期预算，期末存量满足当期需求并按折旧结转"""
+    planner = make_planner(depreciation=0.1)
+    plan = planner.run()
+    assert plan["purchases"].shape == (4, 3, 3)
+    assert plan["window_feasible"].all()
+    costs = np.sum(plan["purchases"] * constraints.cost_matrix, axis=-1)
+    assert np.all(costs <= planner.budgets + 1e-6)
+    assert np.all(plan["inventory"].sum(axis=1) >= planner.demands - 1e-6)
+    np.testing.assert_allclose(plan["inventory"][1], 0.9 * plan["inventory"][0] + plan["purchases"][1])
+    np.testing.assert_array_equal(planner.demands[:, 0], 80 * 1.02 ** np.arange(4))
+
+
+def test_rolling_horizon_evolutionary(monkeypatch, make_planner):
+    """滚动规划 (进化算法，热启动)：各窗口的执行方案可行"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "population_size", 12)
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "generations", 3)
+    plan = make_planner(solver="evolutionary", n_periods=3).run()
+    assert plan["window_feasible"].all()
+    assert np.all(plan["evaluations"] > 0)
+    assert np.all(plan["inventory"].sum(axis=1) >= make_planner(n_periods=3).demands - 1e-6)
+
+
+def test_shift_repeats_the_last_period(make_planner):
+    """热启动：丢弃已执行的第一期，末期重复最后一期"""
+    planner = make_planner()
+    previous = np.arange(2 * 3 * 2 * 3, dtype=float).reshape(2, 3, 2, 3)
+    shifted = planner._shift(previous, planner.window_model(3, np.zeros((3, 3))))
+    assert shifted.shape == (2, 3, 3)
+    np.testing.assert_array_equal(shifted, previous[:, :, 1, :])
+    widened = planner._shift(previous, planner.window_model(0, np.zeros((3, 3))))
+    np.testing.assert_array_equal(widened.reshape(2, 3, 2, 3)[:, :, 0], previous[:, :, 1])
+
+
+def test_mismatched_periods_are_rejected(feasible_budget, constraints):
+    """各期预算与需求的期数不一致时报错"""
+    with pytest.raises(ValueError):
+        RollingHorizonPlanner(RESOURCE_TYPES, HOSPITAL_LEVELS, feasible_budget, constraints,
+                              budgets=BUDGETS, demands=DEMANDS[:2])
@@ -0,0 +1,124 @@
+"""
+区域分解模块测试 (p18_decomposition.py)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from medical_opt.config import BUDGET_CONFIG, HOSPITAL_LEVELS, OPTIMIZER_CONFIG, RESOURCE_TYPES
+from medical_opt.p18_decomposition import RegionalDecomposition
+
+
+def _regions(scale: float, n_regions: int = 4) -> list:
+    """各区域需求在基准需求附近随机取值，scale 越大共享预算越紧"""
+    rng = np.random.default_rng(0)
+    base = {1: 20.0, 2: 15.0, 3: 10.0}
+    return [{"name": f"region{r}",
+             "DEMAND_THRESHOLDS": {j: float(scale * d * rng.uniform(0.5, 1.5)) for j, d in base.items()}}
+            for r in range(n_regions)]
+
+
+def _weighted(decomposition: RegionalDecomposition, losses: np.ndarray) -> float:
+    """各区域加权损失之和"""
+    return float(np.sum(losses @ decomposition._model(0)[2]))
+
+
+def test_region_config_and_shares():
+    """区域配置取全局预算与区域需求，规则追加在默认规则之后；名义份额默认按需求总量分摊"""
+    regions = _regions(1.0, 3)
+    regions[2]["share"] = 0.5
+    regions[1]["CONSTRAINT_RULES"] = [{"type": "floor", "resources": [2], "levels": [3], "limit": 5}]
+    base = dict(BUDGET_CONFIG, CONSTRAINT_RULES=[{"type": "cap", "levels": [1], "limit": 900,
+                                                  "weight": "cost"}])
+    decomposition = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, base, regions)
+    config = decomposition.region_config(1)
+    assert config["BUDGET_LIMITS"] == BUDGET_CONFIG["BUDGET_LIMITS"]
+    assert config["DEMAND_THRESHOLDS"] == regions[1]["DEMAND_THRESHOLDS"]
+    assert [rule["type"] for rule in config["CONSTRAINT_RULES"]] == ["cap", "floor"]
+    assert decomposition.region_config(0)["CONSTRAINT_RULES"][-1]["type"] == "cap"
+
+    totals = np.array([sum(region["DEMAND_THRESHOLDS"].values()) for region in regions])
+    np.testing.assert_allclose(decomposition.shares[:2], (totals / totals.sum())[:2])
+    assert decomposition.shares[2] == 0.5
+    assert decomposition.names == ["region0", "region1", "region2"]
+
+
+def test_admm_matches_monolithic():
+    """共享预算紧时 ADMM 协调的解满足全局预算与各区域需求，加权损失与整体求解一致"""
+    decomposition = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, _regions(1.1))
+    result = decomposition.solve(backend="thread", max_workers=1)
+    assert np.all(result["budget_usage"] <= 1.0 + 1e-6)
+    assert np.max(result["budget_usage"]) > 0.999
+    for r, region in enumerate(decomposition.regions):
+        supply = result["allocations"][r].sum(axis=0)
+        demands = np.array([region["DEMAND_THRESHOLDS"][j] for j in sorted(HOSPITAL_LEVELS)])
+        assert np.all(supply >= demands - 1e-6)
+        np.testing.assert_allclose(decomposition.region_losses(r, result["allocations"][r]),
+                                   result["losses"][r], atol=1e-12)
+
+    _, losses = decomposition.solve_monolithic()
+    assert result["objective"] == pytest.approx(_weighted(decomposition, losses), rel=1e-3)
+    # 紧的预算行影子价格为正，宽松的为 0
+    binding = result["budget_usage"] > 0.999
+    assert np.all(result["prices"][binding] > 0)
+    assert np.all(result["prices"][~binding] == pytest.approx(0.0, abs=1e-9))
+
+
+def test_loose_budget_converges():
+    """共享预算宽松时 ADMM 收敛，残差低于阈值且影子价格为 0"""
+    decomposition = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, _regions(0.6))
+    result = decomposition.solve(backend="thread", max_workers=1)
+    assert result["converged"]
+    tolerance = decomposition.config["tolerance"]
+    assert result["primal_residual"][-1] <= tolerance and result["dual_residual"][-1] <= tolerance
+    assert len(result["rho"]) == result["iterations"]
+    np.testing.assert_allclose(result["prices"], 0.0, atol=1e-9)
+    _, losses = decomposition.solve_monolithic()
+    assert result["objective"] == pytest.approx(_weighted(decomposition, losses), rel=1e-3)
+
+
+def test_region_rules_are_respected():
+    """区域附加规则只约束该区域"""
+    regions = _regions(1.0)
+    regions[1]["CONSTRAINT_RULES"] = [{"type": "floor", "resources": [2], "levels": [3], "limit": 8}]
+    decomposition = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, regions)
+    result = decomposition.solve(backend="thread", max_workers=1)
+    assert result["allocations"][1][1, 2] >= 8 - 1e-6
+    assert result["allocations"][0][1, 2] < 8
+
+
+def test_parallel_matches_serial():
+    """进程池并行求解各区域与串行求解结果相同"""
+    decomposition = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, _regions(1.0))
+    serial = decomposition.solve(backend="thread", max_workers=1)
+    parallel = decomposition.solve(backend="process", max_workers=2)
+    np.testing.assert_allclose(parallel["allocations"], serial["allocations"], atol=1e-9)
+    assert parallel["iterations"] == serial["iterations"]
+    with pytest.raises(ValueError):
+        decomposition.solve(backend="fiber")
+
+
+def test_concurrent_instances_do_not_share_regions():
+    """同一进程中两个分解实例在不同线程中同时求解，结果与各自单独求解相同"""
+    first = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, _regions(1.0))
+    second = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, _regions(0.6, 3))
+    expected = [d.solve(backend="thread", max_workers=1)["allocations"] for d in (first, second)]
+    for backend, workers in (("thread", 1), ("thread", 2)):
+        fresh = [RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, d.regions)
+                 for d in (first, second)]
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(d.solve, backend=backend, max_workers=workers) for d in fresh]
+            results = [future.result() for future in futures]
+        for result, allocations in zip(results, expected):
+            np.testing.assert_allclose(result["allocations"], allocations, atol=1e-9)
+
+
+def test_max_iterations_must_be_positive():
+    """max_iterations 小于 1 时报错"""
+    config = dict(OPTIMIZER_CONFIG["decomposition"], max_iterations=0)
+    decomposition = RegionalDecomposition(RESOURCE_TYPES, HOSPITAL_LEVELS, BUDGET_CONFIG, _regions(1.0),
+                                          config=config)
+    with pytest.raises(ValueError):
+        decomposition.solve(backend="thread", max_workers=1)
@@ -0,0 +1,116 @@
+"""
+多准则决策模块测试 (p19_decision.py)
+"""
+
+import numpy as np
+import pytest
+
+from medical_opt.config import OPTIMIZER_CONFIG
+from medical_opt.p19_decision import crisp_weights, fuzzy_topsis, rank_front, topsis, vikor
+
+WEIGHTS = np.array([0.571, 0.286, 0.143])
+FUZZY_WEIGHTS = np.array([[0.45, 0.57, 0.68], [0.22, 0.29, 0.37], [0.11, 0.14, 0.19]])
+
+
+def _front(n: int, seed: int = 0) -> np.ndarray:
+    """单位球面上的三目标前沿"""
+    front = np.abs(np.random.default_rng(seed).normal(size=(n, 3)))
+    return front / np.linalg.norm(front, axis=1, keepdims=True)
+
+
+def test_crisp_weights():
+    """精确权重归一化；三角模糊权重按重心法去模糊化"""
+    np.testing.assert_allclose(crisp_weights([2.0, 1.0, 1.0]), [0.5, 0.25, 0.25])
+    np.testing.assert_allclose(crisp_weights(FUZZY_WEIGHTS), FUZZY_WEIGHTS.mean(axis=1) /
+                               FUZZY_WEIGHTS.mean(axis=1).sum())
+
+
+def test_topsis_matches_definition():
+    """TOPSIS 贴近度与逐点按定义计算一致"""
+    front = _front(20)
+    w = WEIGHTS / WEIGHTS.sum()
+    weighted = front / np.linalg.norm(front, axis=0) * w
+    expected = []
+    for row in weighted:
+        d_best = np.linalg.norm(row - weighted.min(axis=0))
+        d_worst = np.linalg.norm(row - weighted.max(axis=0))
+        expected.append(d_worst / (d_best + d_worst))
+    np.testing.assert_allclose(topsis(front, WEIGHTS), expected)
+
+
+def test_vikor_matches_definition():
+    """VIKOR 的 S、R、Q 与定义一致，各项最优的点 Q 为 0"""
+    front = _front(20, seed=1)
+    w = WEIGHTS / WEIGHTS.sum()
+    best, worst = front.min(axis=0), front.max(axis=0)
+    regret = w * (front - best) / (worst - best)
+    Q, S, R = vikor(front, WEIGHTS, v=0.3)
+    np.testing.assert_allclose(S, regret.sum(axis=1))
+    np.testing.assert_allclose(R, regret.max(axis=1))
+    expected = (0.3 * (S - S.min()) / (S.max() - S.min()) +
+                0.7 * (R - R.min()) / (R.max() - R.min()))
+    np.testing.assert_allclose(Q, expected)
+
+    dominant = np.vstack([front, front.min(axis=0)])
+    Q, _, _ = vikor(dominant, WEIGHTS)
+    assert Q[-1] == 0.0 and np.all(Q[:-1] > 0)
+
+
+def test_fuzzy_topsis_matches_vertex_distance():
+    """模糊 TOPSIS 与按三角模糊数逐分量、顶点距离的定义计算一致；精确权重视为退化的模糊数"""
+    front = _front(15, seed=2)
+    w = FUZZY_WEIGHTS / FUZZY_WEIGHTS[:, 1].sum()
+    rating = (front.max(axis=0) - front) / (front.max(axis=0) - front.min(axis=0))
+    v = rating[:, :, None] * w[None]
+    positive, negative = v.max(axis=0), v.min(axis=0)
+    d_best = np.sum(np.sqrt(np.mean((v - positive) ** 2, axis=2)), axis=1)
+    d_worst = np.sum(np.sqrt(np.mean((v - negative) ** 2, axis=2)), axis=1)
+    np.testing.assert_allclose(fuzzy_topsis(front, FUZZY_WEIGHTS), d_worst / (d_best + d_worst))
+    np.testing.assert_allclose(fuzzy_topsis(front, WEIGHTS),
+                               fuzzy_topsis(front, np.repeat(WEIGHTS[:, None], 3, axis=1)))
+
+
+@pytest.mark.parametrize("method, weights", [("topsis", WEIGHTS), ("vikor", WEIGHTS),
+                                             ("fuzzy_topsis", FUZZY_WEIGHTS)])
+def test_rank_front_top_k(method, weights):
+    """前 k 名与全排序的前 k 个一致；TOPSIS 得分降序，VIKOR 的 Q 升序"""
+    front = _front(5000, seed=3)
+    full, full_scores = rank_front(front, weights, method)
+    assert sorted(full.tolist()) == list(range(5000))
+    step = np.diff(full_scores)
+    assert np.all(step >= 0) if method == "vikor" else np.all(step <= 0)
+
+    top, scores = rank_front(front, weights, method, k=10)
+    np.testing.assert_array_equal(scores, full_scores[:10])
+    np.testing.assert_array_equal(top, full[:10])
+    assert len(rank_front(front, weights, method, k=0)[0]) == 0
+    assert len(rank_front(front[:3], weights, method, k=10)[0]) == 3
+
+
+def test_weights_shift_the_compromise():
+    """加大某一目标的权重，排名第一的方案在该目标上的损失变小"""
+    front = _front(2000, seed=4)
+    for method in ("topsis", "vikor", "fuzzy_topsis"):
+        first = rank_front(front, [0.8, 0.1, 0.1], method, k=1)[0][0]
+        third = rank_front(front, [0.1, 0.1, 0.8], method, k=1)[0][0]
+        assert front[first, 0] < front[third, 0]
+        assert front[third, 2] < front[first, 2]
+    with pytest.raises(ValueError):
+        rank_front(front, WEIGHTS, "electre")
+
+
+def test_optimizer_compromise_solutions(monkeypatch, make_optimizer):
+    """优化器对帕累托存档排序；select_best 时 optimize() 返回排名第一的折中方案"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG["decision"], "select_best", True)
+    optimizer = make_optimizer(weights=WEIGHTS)
+    best_allocation, best_fitness, _ = optimizer.optimize()
+
+    allocations, objectives, scores = optimizer.compromise_solutions(k=3, method="vikor")
+    assert allocations.shape == (3, 3, 3) and objectives.shape == (3, 3)
+    index, expected = rank_front(optimizer.archive.objectives, WEIGHTS, "vikor", k=3)
+    np.testing.assert_array_equal(scores, expected)
+    np.testing.assert_array_equal(objectives, optimizer.archive.objectives[index])
+
+    allocations, objectives, _ = optimizer.compromise_solutions(k=1)
+    np.testing.assert_array_equal(best_allocation, allocations[0])
+    np.testing.assert_allclose(best_fitness, objectives[0])
@@ -0,0 +1,133 @@
+"""
+What-if 查询模块测试 (p20_query.py)
+"""
+
+import numpy as np
+import pytest
+
+from medical_opt.config import HOSPITAL_LEVELS, OPTIMIZER_CONFIG
+from medical_opt.p05_constraints import Constraints
+from medical_opt.p08_utils import save_arrays_atomic
+from medical_opt.p15_sweep import ScenarioSweep
+from medical_opt.p20_query import FrontIndex
+
+
+@pytest.fixture(scope="module")
+def optimized(make_optimizer):
+    """小规模优化后的优化器 (帕累托存档作为前沿)"""
+    optimizer = make_optimizer(population_size=24, generations=6)
+    optimizer.optimize()
+    return optimizer
+
+
+def _random_front(n: int = 500) -> FrontIndex:
+    """随机三目标点集的索引 (无优化器，不插值)"""
+    rng = np.random.default_rng(0)
+    return FrontIndex(rng.random((n, 3)), rng.random((n, 3, 3)))
+
+
+def test_best_under_matches_brute_force():
+    """单个与多个上限的查询结果与逐点筛选一致；无解满足上限时为 None"""
+    index = _random_front()
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        objective, bounded = rng.choice(3, 2, replace=False)
+        limit = rng.random()
+        allocation, values = index.best_under(int(objective), {int(bounded): limit})
+        feasible = np.flatnonzero(index.objectives[:, bounded] <= limit)
+        assert values[objective] == index.objectives[feasible, objective].min()
+        assert values[bounded] <= limit
+        np.testing.assert_array_equal(allocation, index.allocations[np.flatnonzero(
+            np.all(index.objectives == values, axis=1))[0]])
+
+    bounds = {1: 0.5, 2: 0.4}
+    _, values = index.best_under(0, bounds)
+    feasible = (index.objectives[:, 1] <= 0.5) & (index.objectives[:, 2] <= 0.4)
+    assert values[0] == index.objectives[feasible, 0].min()
+    assert index.best_under(0, {1: -1.0}) is None
+    assert index.best_under(0, {1: -1.0, 2: 0.5}) is None
+
+
+def test_best_under_interpolates_and_refines(optimized):
+    """沿连线插值把上限用足：满足上限且不差于存档中的解；QP 精修进一步不变差"""
+    index = FrontIndex.from_optimizer(optimized)
+    limit = float(np.median(index.objectives[:, 2]))
+    _, indexed = index.best_under(1, {2: limit}, interpolate=False, refine=False)
+    allocation, interpolated = index.best_under(1, {2: limit}, refine=False)
+    assert interpolated[2] <= limit
+    assert interpolated[1] <= indexed[1]
+    np.testing.assert_allclose(optimized._evaluate_batch(allocation[None])[0], interpolated)
+    assert optimized.constraints.is_feasible(allocation, tolerance=1e-6)
+
+    allocation, refined = index.best_under(1, {2: limit}, refine=True)
+    assert refined[2] <= limit + 1e-9
+    assert refined[1] <= interpolated[1] + 1e-9
+    assert optimized.constraints.is_feasible(allocation, tolerance=1e-6)
+
+
+def test_plan_for_weights(optimized):
+    """加权最优方案：不插值时为存档中加权和最小者，插值与精修逐步不变差，精修结果与精确求解一致"""
+    index = FrontIndex.from_optimizer(optimized)
+    weights = np.array([0.5, 0.3, 0.2])
+    _, indexed = index.plan_for_weights(weights, interpolate=False, refine=False)
+    assert indexed @ weights == pytest.approx(np.min(index.objectives @ weights))
+    _, interpolated = index.plan_for_weights(weights, refine=False)
+    assert interpolated @ weights <= indexed @ weights
+    allocation, refined = index.plan_for_weights(weights * 10, refine=True)
+    assert refined @ weights <= interpolated @ weights + 1e-9
+    _, exact = index.solver().solve_weighted(weights)
+    assert refined @ weights == pytest.approx(exact @ weights, rel=1e-4)
+    assert optimized.constraints.is_feasible(allocation, tolerance=1e-6)
+
+    with pytest.raises(ValueError):
+        _random_front().solver()
+
+
+def test_nearest_and_load(optimized, tmp_path):
+    """目标空间近邻；从保存的帕累托存档读取的索引与原索引一致"""
+    index = FrontIndex.from_optimizer(optimized)
+    neighbours, distance = index.nearest(index.objectives[3], k=2)
+    assert neighbours[0] == 3 and distance[0] == 0.0
+    assert len(neighbours) == min(2, len(index.objectives))
+
+    path = str(tmp_path / "pareto_archive.npz")
+    save_arrays_atomic(path, {"solutions": optimized.archive.solutions,
+                              "objectives": optimized.archive.objectives})
+    loaded = FrontIndex.load(path)
+    np.testing.assert_array_equal(loaded.objectives, index.objectives)
+    assert loaded.best_under(0, {2: 1.0})[1][0] == index.best_under(0, {2: 1.0}, interpolate=False)[1][0]
+
+
+def test_scenario_queries(monkeypatch, tmp_path, feasible_budget):
+    """情景查询：已求解的情景原样返回，其间按反距离加权插值，精修后的方案满足该情景的约束"""
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "population_size", 12)
+    monkeypatch.setitem(OPTIMIZER_CONFIG, "generations", 3)
+    sweep = ScenarioSweep(base_config=feasible_budget)
+    parameters, values = sweep.grid({"BUDGET_LIMITS.1": [900, 1100], "DEMAND_THRESHOLDS.1": [70, 90]})
+    path = str(tmp_path / "sweep.npz")
+    sweep.run(parameters, values, backend="thread", max_workers=1, seed=0, path=path)
+    index = FrontIndex.load(path, sweep=sweep)
+    assert index.parameter_names == parameters
+
+    allocation, objectives, neighbours = index.scenario(values[2], refine=False)
+    assert neighbours[0] == 2
+    np.testing.assert_array_equal(allocation, index.allocations[2])
+    np.testing.assert_array_equal(objectives, index.objectives[2])
+
+    # 网格中心到四个情景等距，插值为四个方案的平均
+    allocation, objectives, neighbours = index.scenario([1000, 80], k=4, refine=False)
+    np.testing.assert_allclose(allocation, index.allocations.mean(axis=0))
+    np.testing.assert_allclose(objectives, index.objectives.mean(axis=0))
+
+    allocation, objectives, _ = index.scenario([1000, 80], refine=True)
+    config = sweep.scenario_configs(parameters, np.array([[1000.0, 80.0]]))[0]
+    assert Constraints(config, HOSPITAL_LEVELS).is_feasible(allocation, tolerance=1e-6)
+    assert np.all(np.isfinite(objectives))
+
+    # 没有生成结果的扫描器时无法构造情景问题
+    unrefinable = FrontIndex(index.objectives, index.allocations, parameters=index.parameters,
+                             parameter_names=parameters)
+    with pytest.raises(ValueError):
+        unrefinable.scenario([1000, 80], refine=True)
+    with pytest.raises(ValueError):
+        _random_front().scenario([1000, 80])
@@ -0,0 +1,184 @@
+"""
+空间可及性模块测试 (p21_spatial.py)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from medical_opt.config import HOSPITAL_LEVELS
+from medical_opt.p04_objective import ObjectiveFunction
+from medical_opt.p21_spatial import SpatialAccessibility, weighted_gini, weighted_variance
+
+
+def _engine(n_points: int = 300, n_facilities: int = 30, seed: int = 0, **config) -> SpatialAccessibility:
+    """50 × 50 区域内随机的人口中心与各级机构 (默认不缓存)"""
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 50, (n_points, 2))
+    population = rng.integers(100, 5000, n_points)
+    facilities = rng.uniform(0, 50, (n_facilities, 2))
+    levels = np.resize(list(HOSPITAL_LEVELS), n_facilities)
+    capacity = rng.uniform(1, 3, n_facilities)
+    return SpatialAccessibility(points, population, facilities, levels, capacity=capacity,
+                                config=dict({"radius": 12.0, "cache_dir": None}, **config))
+
+
+def _dense_distances(engine: SpatialAccessibility) -> np.ndarray:
+    """逐对计算的需求点-机构距离"""
+    return np.linalg.norm(engine.points[:, None] - engine.facilities[None], axis=2)
+
+
+def test_weighted_gini_matches_definition():
+    """整数权重的加权基尼系数等于按权重重复取值后的基尼系数 Σ|x_i - x_j| / (2 n² μ)"""
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 10, 40)
+    weights = rng.integers(1, 5, 40)
+    repeated = np.repeat(values, weights)
+    expected = np.abs(repeated[:, None] - repeated[None]).sum() / (2 * len(repeated) ** 2 * repeated.mean())
+    assert weighted_gini(values, weights) == pytest.approx(expected)
+
+    assert weighted_gini(np.full(10, 3.0), np.ones(10)) == pytest.approx(0.0, abs=1e-12)
+    assert weighted_gini(np.eye(10)[0], np.ones(10)) == pytest.approx(0.9)
+    assert weighted_gini(np.zeros(5), np.ones(5)) == 0.0
+    # 批量计算与逐行计算一致
+    batch = rng.uniform(0, 10, (4, 3, 40))
+    np.testing.assert_allclose(weighted_gini(batch, weights)[2, 1], weighted_gini(batch[2, 1], weights))
+
+
+def test_weighted_variance_matches_numpy():
+    """加权方差与 np.average 的定义一致，并按最后一维批量计算"""
+    rng = np.random.default_rng(1)
+    values, weights = rng.normal(size=(5, 30)), rng.uniform(0, 2, 30)
+    mean = np.average(values, weights=weights, axis=1)
+    expected = np.average((values - mean[:, None]) ** 2, weights=weights, axis=1)
+    np.testing.assert_allclose(weighted_variance(values, weights), expected)
+
+
+def test_distance_structures_match_brute_force():
+    """最近机构距离与半径内稀疏距离矩阵与逐对计算一致"""
+    engine = _engine()
+    dense = _dense_distances(engine)
+    distance, index = engine.nearest_facility(k=3)
+    np.testing.assert_allclose(distance, np.sort(dense, axis=1)[:, :3])
+    np.testing.assert_allclose(dense[np.arange(len(dense))[:, None], index], distance)
+
+    level = 2
+    members = engine.facility_levels == level
+    nearest, index = engine.nearest_facility(level)
+    np.testing.assert_allclose(nearest[:, 0], dense[:, members].min(axis=1))
+    assert np.all(engine.facility_levels[index] == level)
+
+    matrix = engine.radius_distances().toarray()
+    inside = dense <= 12.0
+    np.testing.assert_allclose(matrix[inside], dense[inside])
+    assert np.all(matrix[~inside] == 0)
+    assert engine.radius_distances().nnz == inside.sum()
+    assert engine.coverage() == pytest.approx(engine.population[inside.any(axis=1)].sum() /
+                                              engine.population.sum())
+
+    np.testing.assert_allclose(engine.distance_matrix(3)[1], engine.level_distances())
+
+
+def test_haversine_distances():
+    """经纬度坐标下的距离为大圆距离 (千米)"""
+    rng = np.random.default_rng(2)
+    points = np.column_stack([rng.uniform(116.0, 117.0, 200), rng.uniform(39.5, 40.5, 200)])
+    facilities = np.column_stack([rng.uniform(116.0, 117.0, 20), rng.uniform(39.5, 40.5, 20)])
+    engine = SpatialAccessibility(points, np.ones(200), facilities, np.resize(list(HOSPITAL_LEVELS), 20),
+                                  config={"metric": "haversine", "radius": 20.0, "cache_dir": None})
+    lon1, lat1 = np.radians(points[:, None, 0]), np.radians(points[:, None, 1])
+    lon2, lat2 = np.radians(facilities[None, :, 0]), np.radians(facilities[None, :, 1])
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    dense = 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+    distance, _ = engine.nearest_facility()
+    np.testing.assert_allclose(distance[:, 0], dense.min(axis=1), rtol=1e-9)
+    matrix = engine.radius_distances()
+    assert matrix.nnz == np.sum(dense <= 20.0)
+    np.testing.assert_allclose(matrix.toarray()[dense <= 20.0], dense[dense <= 20.0], rtol=1e-9)
+
+
+def test_cache_round_trip(tmp_path):
+    """距离结构缓存为 npy 文件，再次构造时以内存映射读取且结果相同"""
+    cache_dir = str(tmp_path / "spatial")
+    first = _engine(cache_dir=cache_dir)
+    matrix = first.radius_distances()
+    distance, _ = first.nearest_facility(k=2)
+    assert len(os.listdir(cache_dir)) == 5
+
+    second = _engine(cache_dir=cache_dir)
+    cached, _ = second.nearest_facility(k=2)
+    assert isinstance(cached, np.memmap)
+    np.testing.assert_array_equal(cached, distance)
+    assert (second.radius_distances() != matrix).nnz == 0
+    # 不同半径或坐标使用不同的缓存
+    second.radius_distances(8.0)
+    _engine(seed=1, cache_dir=cache_dir).nearest_facility(k=2)
+    assert len(os.listdir(cache_dir)) == 10
+
+
+@pytest.mark.parametrize("decay", ["binary", "gaussian"])
+def test_two_step_floating_catchment(decay):
+    """2SFCA 可及性与逐机构、逐需求点的定义一致；人口加权的可及资源总量等于被服务机构的供给"""
+    engine = _engine(decay=decay)
+    dense = _dense_distances(engine)
+    if decay == "binary":
+        weights = (dense <= 12.0).astype(float)
+    else:
+        edge = np.exp(-0.5)
+        weights = np.where(dense <= 12.0, (np.exp(-0.5 * (dense / 12.0) ** 2) - edge) / (1 - edge), 0.0)
+
+    rng = np.random.default_rng(3)
+    allocations = rng.uniform(10, 100, (4, 3, 3))
+    access = engine.access(allocations)
+    assert access.shape == (4, 3, len(engine.points))
+
+    allocation = allocations[1]
+    supply = np.zeros((3, len(engine.facilities)))
+    for f, column in enumerate(engine.facility_columns):
+        same = engine.facility_columns == column
+        supply[:, f] = allocation[:, column] * engine.level_shares[column, f]
+        assert engine.level_shares[column, same].sum() == pytest.approx(1.0)
+    served = weights.T @ engine.population
+    ratio = np.where(served > 0, supply / np.where(served > 0, served, 1.0), 0.0)
+    np.testing.assert_allclose(access[1], ratio @ weights.T)
+    np.testing.assert_allclose(access[1] @ engine.population, supply[:, served > 0].sum(axis=1))
+
+
+def test_disparity_and_objective():
+    """差异指标按资源批量计算；空间可及性目标为各资源差异的平均值"""
+    engine = _engine()
+    allocations = np.random.default_rng(4).uniform(10, 100, (5, 3, 3))
+    gini = engine.disparity(allocations)
+    assert gini.shape == (5, 3) and np.all((gini >= 0) & (gini <= 1))
+    np.testing.assert_allclose(engine.disparity(allocations, "variance"),
+                               weighted_variance(engine.access(allocations), engine.population))
+    with pytest.raises(ValueError):
+        engine.disparity(allocations, "theil")
+
+    objective = ObjectiveFunction()
+    assert objective.spatial_accessibility_objective(allocations[0], engine) == pytest.approx(gini[0].mean())
+
+    summary = engine.summary(allocations[0])
+    np.testing.assert_allclose(summary["gini"], gini[0])
+    assert 0 < summary["coverage"] <= 1
+
+
+def test_invalid_inputs(tmp_path):
+    """非法的度量、级别与人口报错；CSV 缺少必需列时报错"""
+    points, facilities = np.zeros((3, 2)), np.ones((2, 2))
+    with pytest.raises(ValueError):
+        SpatialAccessibility(points, np.ones(3), facilities, [1, 2], config={"metric": "manhattan"})
+    with pytest.raises(ValueError):
+        SpatialAccessibility(points, np.ones(2), facilities, [1, 2])
+    with pytest.raises(ValueError):
+        SpatialAccessibility(points, np.ones(3), facilities, [1, 7])
+    with pytest.raises(ValueError):
+        SpatialAccessibility(points, np.zeros(3), facilities, [1, 2])
+
+    pd.DataFrame({"x": [0.0], "y": [0.0], "population": [10]}).to_csv(tmp_path / "points.csv", index=False)
+    pd.DataFrame({"x": [1.0], "y": [1.0]}).to_csv(tmp_path / "facilities.csv", index=False)
+    with pytest.raises(ValueError):
+        SpatialAccessibility.from_csv(str(tmp_path / "points.csv"), str(tmp_path / "facilities.csv"))
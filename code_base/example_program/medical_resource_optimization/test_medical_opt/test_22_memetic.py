@@ -0,0 +1,137 @@
+"""
+模因局部精修模块测试 (p22_memetic.py)
+"""
+
+import numpy as np
+import pytest
+
+from medical_opt.config import OPTIMIZER_CONFIG
+from medical_opt.p06_optimizer import ResourceOptimizer
+from medical_opt.p10_archive import hypervolume, non_dominated_mask
+from medical_opt.p22_memetic import LocalRefiner, min_norm_weights
+
+
+def _feasible_points(optimizer: ResourceOptimizer, n: int, seed: int = 0) -> np.ndarray:
+    """投影到可行域上的随机分配方案"""
+    rng = np.random.default_rng(seed)
+    return optimizer.constraints.project(rng.uniform(0, 60, (n, 3, 3)))
+
+
+def test_min_norm_weights_is_minimal():
+    """单纯形权重使梯度组合的范数不大于单纯形网格上的任何组合"""
+    rng = np.random.default_rng(0)
+    gradients = rng.normal(size=(20, 3, 5))
+    weights = min_norm_weights(gradients)
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+    assert np.all(weights >= 0)
+    norms = np.linalg.norm(np.einsum("nm,nmd->nd", weights, gradients), axis=1)
+
+    grid = np.array([(a, b, 1 - a - b) for a in np.linspace(0, 1, 41)
+                     for b in np.linspace(0, 1, 41) if a + b <= 1 + 1e-12])
+    grid_norms = np.linalg.norm(np.einsum("km,nmd->nkd", np.clip(grid, 0, 1), gradients), axis=2)
+    assert np.all(norms <= grid_norms.min(axis=1) + 1e-9)
+
+
+def test_min_norm_weights_special_cases():
+    """相反的梯度组合为零；一个梯度处于其余梯度的公共下降方向时取该梯度"""
+    g = np.array([1.0, 2.0, 0.0])
+    opposite = np.stack([g, -g, np.array([5.0, 0.0, 1.0])])[None]
+    weights = min_norm_weights(opposite)
+    assert np.linalg.norm(weights[0] @ opposite[0]) == pytest.approx(0.0, abs=1e-9)
+
+    small = np.array([[1.0, 0.0], [1.0, 1.0], [1.0, -2.0]])[None]
+    np.testing.assert_allclose(min_norm_weights(small), [[1.0, 0.0, 0.0]], atol=1e-9)
+    # 共线的梯度 (Gram 矩阵奇异)
+    collinear = np.stack([g, 2 * g, 3 * g])[None]
+    np.testing.assert_allclose(min_norm_weights(collinear), [[1.0, 0.0, 0.0]], atol=1e-9)
+
+
+def test_gradients_match_finite_differences(make_optimizer):
+    """解析梯度与二次损失的中心差分一致"""
+    optimizer = make_optimizer()
+    refiner = LocalRefiner(optimizer)
+    x = _feasible_points(optimizer, 3).reshape(3, -1)
+    gradients = refiner.gradients(x)
+    eps = 1e-5
+    for k in range(x.shape[1]):
+        step = np.zeros_like(x)
+        step[:, k] = eps
+        upper = optimizer._evaluate_batch((x + step).reshape(3, 3, 3))
+        lower = optimizer._evaluate_batch((x - step).reshape(3, 3, 3))
+        np.testing.assert_allclose(gradients[:, :, k], (upper - lower) / (2 * eps), rtol=1e-5, atol=1e-10)
+
+
+def test_tangent_projection_keeps_active_constraints(make_optimizer):
+    """投影后的方向与有效约束的法向正交，沿投影方向的小步移动保持可行"""
+    optimizer = make_optimizer()
+    refiner = LocalRefiner(optimizer)
+    x = _feasible_points(optimizer, 8, seed=1).reshape(8, -1)
+    vectors = np.random.default_rng(2).normal(size=(8, 3, x.shape[1]))
+    projected, slack = refiner._tangent_projection(x, vectors)
+    active = slack <= refiner.config["active_tolerance"] * (1.0 + np.abs(refiner.rhs))
+    assert active.any()
+    for i in range(len(x)):
+        np.testing.assert_allclose(refiner.rows[active[i]] @ projected[i].T, 0.0, atol=1e-8)
+        if len(refiner.equalities):
+            np.testing.assert_allclose(refiner.equalities @ projected[i].T, 0.0, atol=1e-8)
+    # 投影为幂等的
+    again, _ = refiner._tangent_projection(x, projected)
+    np.testing.assert_allclose(again, projected, atol=1e-8)
+
+
+def test_refine_dominates_and_stays_feasible(make_optimizer):
+    """精修后的解可行且弱支配原解；评估次数计入返回值，稳定点不再消耗评估"""
+    optimizer = make_optimizer()
+    refiner = LocalRefiner(optimizer)
+    allocations = _feasible_points(optimizer, 12, seed=3)
+    fitness = optimizer._evaluate_batch(allocations)
+    refined, refined_fitness, evaluations = refiner.refine(allocations, fitness, steps=3)
+    assert refined.shape == allocations.shape and refined.dtype == np.float64
+    assert optimizer.constraints.is_feasible(refined, tolerance=1e-6).all()
+    assert np.all(refined_fitness <= fitness)
+    assert np.any(np.any(refined_fitness < fitness, axis=1))
+    np.testing.assert_allclose(optimizer._evaluate_batch(refined), refined_fitness)
+    assert 0 < evaluations <= 12 * 3 * refiner.config["backtracks"]
+
+    # 未改进的解原样返回
+    unchanged = np.all(refined_fitness == fitness, axis=1)
+    np.testing.assert_array_equal(refined[unchanged], allocations[unchanged])
+    _, _, none = refiner.refine(allocations, fitness, steps=0)
+    assert none == 0
+
+
+def test_refine_archive_improves_front(make_optimizer):
+    """对存档精修：有解被改进，存档超体积不减且仍为可行的非支配集"""
+    optimizer = make_optimizer()
+    optimizer.optimize()
+    reference = optimizer.archive.objectives.max(axis=0) * 1.1
+    volume = hypervolume(optimizer.archive.objectives, reference)
+    stats = optimizer.refine_archive(steps=3)
+    assert stats["improved"] > 0 and stats["evaluations"] > 0
+    assert hypervolume(optimizer.archive.objectives, reference) >= volume
+    assert non_dominated_mask(optimizer.archive.objectives).all()
+    assert optimizer.constraints.is_feasible(optimizer.archive.solutions.astype(float), tolerance=1e-6).all()
+    # 沿第一个目标均匀选取至多 members 个成员
+    assert optimizer.refine_archive(members=5, steps=1)["members"] == 5
+
+
+def test_integer_mode_candidates_are_integral(make_optimizer):
+    """整数模式下精修的候选点取整修复，结果仍为可行的整数方案"""
+    optimizer = make_optimizer(integer=True)
+    _, _, (allocations, fitness) = optimizer.optimize()
+    refined, _, _ = LocalRefiner(optimizer).refine(allocations, fitness, steps=2)
+    np.testing.assert_array_equal(refined, np.round(refined))
+    assert optimizer.constraints.is_feasible(refined, tolerance=1e-6).all()
+
+
+def test_memetic_steps_during_evolution(monkeypatch, make_optimizer):
+    """进化中按 interval 精修第一前沿、结束后精修存档时，前沿可行且评估次数增加"""
+    plain = make_optimizer()
+    plain.optimize()
+    monkeypatch.setitem(OPTIMIZER_CONFIG["memetic"], "enabled", True)
+    monkeypatch.setitem(OPTIMIZER_CONFIG["memetic"], "interval", 2)
+    monkeypatch.setitem(OPTIMIZER_CONFIG["memetic"], "members", 4)
+    memetic = make_optimizer()
+    _, _, (allocations, _) = memetic.optimize()
+    assert memetic.constraints.is_feasible(allocations, tolerance=1e-6).all()
+    assert memetic.telemetry.total_evaluations > plain.telemetry.total_evaluations